@@ -7,121 +7,332 @@ import json
 from datetime import datetime
 
 # Import our modules
-from src.data_ingestion import load_raw_data
-from src.data_aggregation import aggregate_to_district_level
+from src.data_ingestion import load_raw_frames, raw_files, attach_district_names
+from src.data_aggregation import aggregate_enrolment, aggregate_biometric, aggregate_demographic, merge_district_aggregates
 from src.feature_engineering import feature_engineer
 from src.feature_normalization import normalize_features
 from src.scoring_bsi import compute_bsi
+from src.spatial_features import add_spatial_features_from_file, ADJACENCY_FILENAME
 from src.scoring_cps import compute_camp_priority_score
 from src.strategy_recommendation import recommend_camp_strategy
+from src.result_export import export_results, PINCODE_RESULT_STEM
+from src.pipeline_dag import PipelineDAG, Stage
+from src.stage_metrics import StageMetrics, METRICS_FILENAME, PROFILE_DIRNAME
+from src.audit_log import start_audit_log, stop_audit_log
+from src.run_summary import summarize_run, render_summary
+from src.history_store import append_run, HISTORY_DIRNAME
+from src.data_quality import rule_totals, QUALITY_REPORT_FILENAME, QUALITY_SAMPLES_FILENAME, QUARANTINE_FILENAME
+from src.rollups import build_pincode_dim, attach_parents, rollup_all, ROLLUP_STEM
+from src.dimensions import DIMENSIONS
+from src.anomaly_detection import detect_anomalies, add_anomaly_flags
+from src.demand_forecast import forecast_demand
+from src.cohort_projection import project_mandatory_updates, add_cohort_features, MBU_STEM
 
-def setup_logger(output_dir):
-    """Sets up logging to both console and audit_log.txt"""
-    os.makedirs(output_dir, exist_ok=True)
-    log_filepath = os.path.join(output_dir, "audit_log.txt")
+def setup_logger(output_dir, quiet=False):
+    """
+    Sets up queued logging to audit_log.jsonl (structured, one JSON record per line) and,
+    unless quiet, the console. Returns the root logger and the listener to stop at the end.
+    """
+    listener = start_audit_log(output_dir, quiet=quiet)
+    return logging.getLogger(), listener
+
+def aggregate_districts(agg_enrol: pd.DataFrame, agg_bio: pd.DataFrame, agg_demo: pd.DataFrame,
+                        key: str = 'district') -> pd.DataFrame:
+    df_dist = merge_district_aggregates(agg_enrol, agg_bio, agg_demo, key)
+    if df_dist.empty:
+        raise RuntimeError("Aggregation resulted in empty dataframe.")
+    return df_dist
+
+def build_pipeline_dag(input_path: str, checkpoint_dir: str = None, adjacency_path: str = None,
+                       metrics: StageMetrics = None, max_workers: int = 4, granularity: str = 'district',
+                       registry_dir: str = None, as_of: str = None) -> PipelineDAG:
+    """
+    The pipeline stages as a DAG. The three per-source aggregations only depend on ingestion
+    and run concurrently.
     
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    ingest -> agg_enrolment / agg_biometric / agg_demographic -> aggregate -> cohort_features
+           -> features -> normalize -> bsi [-> spatial] -> cps -> strategy -> flags -> attach_state
+    ingest -> cohort (mandatory biometric updates by enrolment age band) -> cohort_features
+    ingest -> anomalies (daily update series) -> flags
+    ingest -> forecast (30/90-day update demand) -> strategy (camp sizing)
     
-    if logger.hasHandlers():
-        logger.handlers.clear()
-        
-    file_handler = logging.FileHandler(log_filepath, mode='w')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    With granularity='pincode' every stage from aggregation to strategy works on pincodes;
+    attach_state adds each pincode's parent district and state (pincode_dim) and 'rollup'
+    aggregates the scored pincodes to district and state level. The spatial stage needs a
+    district adjacency and is skipped.
     
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    Ingestion replaces state, district and pincode names by int32 codes from the registries in
+    registry_dir; every later stage works on the codes and attach_state adds the names back.
+    The registry files are part of the ingestion cache key, so checkpointed codes always
+    match the registries.
+    
+    as_of (YYYY-MM-DD, default today) is the reference date of the recency features; rows dated
+    after it are rejected during ingestion. It is a stage parameter, so checkpoints are keyed by it.
+    """
+    dag = PipelineDAG(checkpoint_dir, max_workers=max_workers, metrics=metrics)
+    input_files = raw_files(input_path)
+    as_of = as_of or pd.Timestamp.now().date().isoformat()
+    registry_files = [p for p in (os.path.join(registry_dir, f) for f, _, _ in DIMENSIONS.values())
+                      if os.path.exists(p)] if registry_dir else []
     
-    return logger
+    dag.add(Stage('ingest', load_raw_frames, params={'data_dir': input_path, 'registry_dir': registry_dir, 'today': as_of},
+                  files=input_files + registry_files, description="Step 1: Ingestion - Loading Multi-Source Data"))
+    return add_scoring_stages(dag, as_of, granularity, adjacency_path)
 
-def run_aadhaar_netra_pipeline(input_path: str, output_dir: str):
+def add_scoring_stages(dag: PipelineDAG, as_of: str, granularity: str = 'district',
+                       adjacency_path: str = None) -> PipelineDAG:
+    """
+    Adds every stage after ingestion (see build_pipeline_dag) to a DAG whose 'ingest' stage
+    returns the ingested frames ('biometric', 'demographic', 'enrolment' with int32 codes,
+    'district_dim' and the '<name>_registry' frames). The watch mode (src/data_watcher.py)
+    scores its running state through the same stages.
+    """
+    key = {'key': granularity}
+    dag.add(Stage('agg_enrolment', aggregate_enrolment, ['ingest:enrolment'], params=key,
+                  description="Step 2a: Aggregation - Enrolment"))
+    dag.add(Stage('agg_biometric', aggregate_biometric, ['ingest:biometric'], params=key,
+                  description="Step 2b: Aggregation - Biometric"))
+    dag.add(Stage('agg_demographic', aggregate_demographic, ['ingest:demographic'], params=key,
+                  description="Step 2c: Aggregation - Demographic"))
+    dag.add(Stage('aggregate', aggregate_districts, ['agg_enrolment', 'agg_biometric', 'agg_demographic'], params=key,
+                  description=f"Step 2: Aggregation - Grouping by {granularity.capitalize()}"))
+    dag.add(Stage('cohort', project_mandatory_updates, ['ingest'], params={'as_of': as_of, **key},
+                  description="Step 2f: Cohort Projection - Mandatory biometric updates due"))
+    dag.add(Stage('cohort_features', add_cohort_features, ['aggregate', 'cohort:features'], params=key,
+                  description="Step 2g: Cohort Projection - Due but not done"))
+    dag.add(Stage('features', feature_engineer, ['cohort_features'], params={'as_of': as_of},
+                  description=f"Step 3: Feature Engineering - As of {as_of}"))
+    dag.add(Stage('normalize', normalize_features, ['features'], description="Step 4: Normalization"))
+    dag.add(Stage('bsi', compute_bsi, ['normalize'], description="Step 5: BSI Scoring"))
+    
+    # Spatial features need BSI, so they run after BSI scoring
+    scored = 'bsi'
+    if granularity == 'district' and adjacency_path and os.path.exists(adjacency_path):
+        dag.add(Stage('spatial', add_spatial_features_from_file, ['bsi', 'ingest:district_dim'],
+                      params={'adjacency_path': adjacency_path},
+                      files=[adjacency_path], description=f"Step 5b: Spatial Features - Using adjacency {adjacency_path}"))
+        scored = 'spatial'
+    
+    dag.add(Stage('cps', compute_camp_priority_score, [scored], description="Step 6: CPS Scoring"))
+    dag.add(Stage('forecast', forecast_demand, ['ingest'], params={'as_of': as_of, **key},
+                  description="Step 2e: Demand Forecast - Next 30/90 days of updates"))
+    dag.add(Stage('strategy', recommend_camp_strategy, ['cps', 'forecast'], params=key,
+                  description="Step 7: Strategy Recommendation"))
+    dag.add(Stage('anomalies', detect_anomalies, ['ingest'], params={'as_of': as_of, **key},
+                  description="Step 2d: Anomaly Detection - Daily update series"))
+    dag.add(Stage('flags', add_anomaly_flags, ['strategy', 'anomalies'], params=key,
+                  description="Step 7d: Anomaly flags"))
+    if granularity == 'pincode':
+        dag.add(Stage('pincode_dim', build_pincode_dim, ['ingest'],
+                      description="Step 7a: Pincode -> district/state dimension"))
+        dag.add(Stage('attach_state', attach_parents, ['flags', 'pincode_dim'], cache=False,
+                      description="Step 7b: Attaching parent district and state"))
+        dag.add(Stage('rollup', rollup_all, ['attach_state'], cache=False,
+                      description="Step 7c: District and state roll-ups"))
+    else:
+        dag.add(Stage('attach_state', attach_district_names, ['flags', 'ingest:district_dim'], cache=False,
+                      description="Step 7b: Attaching district names and states"))
+    return dag
+
+def run_aadhaar_netra_pipeline(input_path: str, output_dir: str, write_csv: bool = False, adjacency_path: str = None,
+                               use_checkpoints: bool = True, profile: bool = False, quiet: bool = False,
+                               summary: bool = False, history_dir: str = None, granularity: str = 'district',
+                               as_of: str = None):
     """
     Orchestrates the pipeline using the data folder path.
+    
+    Results are exported as Parquet/Arrow; CSV views are written only when write_csv is True.
+    Spatial neighbourhood features are added when a district adjacency file is available
+    (adjacency_path, or district_adjacency.npz in the data folder).
+    
+    Stage outputs are checkpointed under <output_dir>/checkpoints, keyed by a hash of their inputs,
+    code and parameters: unchanged stages are loaded instead of recomputed, and a failed run
+    resumes from the last completed stage.
+    
+    Per-stage metrics (wall/CPU time, peak RSS, rows and bytes in/out) are appended to
+    stage_metrics.jsonl next to audit_log.jsonl. With profile=True every stage also runs under
+    cProfile (profiles/<stage>.prof) with tracemalloc, and stages run serially so the
+    measurements do not overlap.
+    
+    Logging goes through a background queue, so stages never block on file or console I/O.
+    quiet=True skips all console output (the audit log is still written). Summary statistics
+    (feature ranges, score and tier distributions, top districts) are computed only with
+    summary=True, in one pass over the final table, and logged as a 'run_summary' record.
+    
+    Every run's ranks, scores and tiers are appended to the history store (history_dir,
+    default <output_dir>/history) for rank-delta and time-travel queries (src/history_store.py).
+    
+    granularity='pincode' scores pincodes instead of districts: the compact pincode table is
+    written to final_ranked_pincodes.parquet/.arrow and its district and state roll-ups to
+    pincode_rollup_district / pincode_rollup_state (.parquet/.arrow).
+    
+    Raw rows are validated during ingestion (src/data_quality.py); per-file rule counts, a sample
+    of violating rows and the rejected rows are written to data_quality_report.csv,
+    data_quality_samples.csv and quarantine.csv.
+    
+    as_of (date, default today) fixes the reference date: the run scores the data as it was on
+    that day (later rows are quarantined as future-dated), is reproducible, and is stored in the
+    history under that date. For many dates at once see src/backfill.py.
     """
-    logger = setup_logger(output_dir)
+    logger, listener = setup_logger(output_dir, quiet=quiet)
     logger.info("xxx STARTING AADHAAR NETRA PIPELINE (REAL DATA) xxx")
     logger.info(f"Input Directory: {input_path}")
     logger.info(f"Output Directory: {output_dir}")
     
     try:
-        # 1. Ingestion
-        logger.info("Step 1: Ingestion - Loading Multi-Source Data")
-        dfs, metadata = load_raw_data(input_path)
+        as_of = (pd.Timestamp(as_of) if as_of else pd.Timestamp.now()).date()
+        logger.info(f"As of: {as_of}")
+        adjacency_path = adjacency_path or os.path.join(input_path, ADJACENCY_FILENAME)
+        if granularity == 'pincode':
+            logger.info("Step 5b: Spatial Features - Skipped (district-level only)")
+        elif not os.path.exists(adjacency_path):
+            logger.info("Step 5b: Spatial Features - Skipped (no district adjacency file)")
+        
+        checkpoint_dir = os.path.join(output_dir, "checkpoints") if use_checkpoints else None
+        metrics = StageMetrics(
+            os.path.join(output_dir, METRICS_FILENAME),
+            profile_dir=os.path.join(output_dir, PROFILE_DIRNAME) if profile else None,
+            trace_memory=profile
+        )
+        # Entity codes are registered in the history store, so they stay stable across runs
+        history_dir = history_dir or os.path.join(output_dir, HISTORY_DIRNAME)
+        dag = build_pipeline_dag(input_path, checkpoint_dir, adjacency_path, metrics, max_workers=1 if profile else 4,
+                                 granularity=granularity, registry_dir=history_dir,
+                                 as_of=as_of.isoformat())
+        outputs = dag.run()
         
-        if not dfs['biometric'].empty:
+        cached = [name for name, status in dag.status.items() if status == 'cached']
+        if cached:
+            logger.info(f"Reused checkpoints for {len(cached)} of {len(dag.status)} stages: {', '.join(cached)}")
+        
+        raw = outputs['ingest']
+        if not raw['biometric'].empty:
             logger.info("Biometric data loaded.")
         else:
             logger.warning("Biometric data missing/empty.")
-
-        # 2. Aggregation
-        logger.info("Step 2: Aggregation - Grouping by District")
-        df_dist = aggregate_to_district_level(dfs)
-        
-        if df_dist.empty:
-            raise RuntimeError("Aggregation resulted in empty dataframe.")
-            
-        logger.info(f"Aggregated to {len(df_dist)} districts.")
-        
-        # 3. Feature Engineering
-        logger.info("Step 3: Feature Engineering")
-        df_feat = feature_engineer(df_dist)
         
-        # 4. Normalization
-        logger.info("Step 4: Normalization")
-        df_norm = normalize_features(df_feat)
+        # District -> State dimension, collected during ingestion
+        district_dim = raw['district_dim']
+        dim_path = os.path.join(output_dir, "district_state_dim.csv")
+        district_dim.to_csv(dim_path, index=False)
+        logger.info(f"Saved district-state dimension ({len(district_dim)} districts) to {dim_path}")
         
-        # 5. BSI Scoring
-        logger.info("Step 5: BSI Scoring")
-        df_bsi = compute_bsi(df_norm)
+        # Data quality: rule counts per file, sampled violations, quarantined rows
+        raw['quality_counts'].to_csv(os.path.join(output_dir, QUALITY_REPORT_FILENAME), index=False)
+        raw['quality_samples'].to_csv(os.path.join(output_dir, QUALITY_SAMPLES_FILENAME), index=False)
+        raw['quarantine'].to_csv(os.path.join(output_dir, QUARANTINE_FILENAME), index=False)
+        totals = rule_totals(raw['quality_counts'])
+        flagged = totals[totals['violations'] > 0]
+        logger.info(f"Data quality: {len(raw['quarantine'])} rows quarantined"
+                    + (f" ({', '.join(f'{r.rule}={r.violations}' for r in flagged.itertuples())})" if len(flagged) else ""),
+                    extra={'event': 'data_quality', 'violations': dict(zip(totals['rule'], totals['violations'].astype(int)))})
         
-        # 6. CPS Scoring
-        logger.info("Step 6: CPS Scoring")
-        df_cps = compute_camp_priority_score(df_bsi)
+        logger.info(f"Aggregated to {len(outputs['aggregate'])} {granularity}s.")
         
-        # 7. Strategy
-        logger.info("Step 7: Strategy Recommendation")
-        df_final = recommend_camp_strategy(df_cps)
+        df_final = outputs['attach_state']
         
         # 8. Export
         timestamp = datetime.now().isoformat()
-        final_csv_path = os.path.join(output_dir, "final_ranked_districts.csv")
-        df_final.to_csv(final_csv_path, index=False)
-        logger.info(f"Saved final ranked list to {final_csv_path}")
+        run_metadata = {
+            'timestamp': timestamp,
+            'input_path': input_path,
+            'as_of': as_of.isoformat(),
+            'row_counts': {k: len(raw[k]) for k in ['biometric', 'demographic', 'enrolment']},
+            'quarantined_rows': len(raw['quarantine']),
+            'granularity': granularity,
+            'district_count': len(df_final) if granularity == 'district' else int(df_final['district_id'].nunique()),
+            'stage_keys': dag.keys
+        }
+        if granularity == 'pincode':
+            run_metadata['pincode_count'] = len(df_final)
+            with metrics.stage('export', [df_final]):
+                export_results(df_final, output_dir, run_metadata=run_metadata, write_csv=write_csv,
+                               stem=PINCODE_RESULT_STEM, compact=True, shard_column=None)
+                for level, table in outputs['rollup'].items():
+                    export_results(table, output_dir, run_metadata=run_metadata, stem=f"{ROLLUP_STEM}_{level}",
+                                   shard_column=None)
+        else:
+            with metrics.stage('export', [df_final]):
+                export_results(df_final, output_dir, run_metadata=run_metadata, write_csv=write_csv)
+        # Monthly mandatory biometric updates due per entity (projection beyond the as-of month)
+        export_results(outputs['cohort']['monthly'], output_dir, run_metadata=run_metadata, stem=MBU_STEM,
+                       shard_column=None)
+        
+        if granularity == 'pincode':
+            logger.info("History store skipped (tracks district-level runs)")
+        else:
+            with metrics.stage('history', [df_final]):
+                try:
+                    append_run(history_dir, df_final, run_ts=datetime.fromisoformat(timestamp), run_date=as_of)
+                except ImportError as e:
+                    logger.warning(f"History store skipped (needs pyarrow): {e}")
         
-        top20_csv_path = os.path.join(output_dir, "top_20_priority_districts.csv")
-        df_top20 = df_final[df_final['is_top_20']].copy()
-        df_top20.to_csv(top20_csv_path, index=False)
+        if summary:
+            run_summary = summarize_run(df_final)
+            logger.info("Run summary", extra={'event': 'run_summary', 'summary': run_summary})
         
         # Console Summary
-        print("\n" + "="*50)
-        print("AADHAAR NETRA PIPELINE SUMMARY")
-        print("="*50)
-        print(f"Total Districts: {len(df_final)}")
-        print("\nTier Distribution:")
-        print(df_final['cps_tier'].value_counts().sort_index().to_string())
-        print("\nTop 5 Priority Districts:")
-        cols = ['district_id', 'cps_score', 'cps_tier', 'camp_type']
-        print(df_final[cols].head(5).to_string(index=False))
-        print("="*50 + "\n")
+        if not quiet:
+            print("\n" + "="*50)
+            print("AADHAAR NETRA PIPELINE SUMMARY")
+            print("="*50)
+            if granularity == 'pincode':
+                print(f"Total Pincodes: {len(df_final)} (in {run_metadata['district_count']} districts)")
+            else:
+                print(f"Total Districts: {len(df_final)}")
+            print("\nTier Distribution:")
+            print(df_final['cps_tier'].value_counts().sort_index().to_string())
+            print(f"\nTop 5 Priority {granularity.capitalize()}s:")
+            cols = (['pincode'] if granularity == 'pincode' else []) + ['district_id', 'cps_score', 'cps_tier', 'camp_type']
+            print(df_final[cols].head(5).to_string(index=False))
+            if granularity == 'pincode':
+                print("\nTop 5 Districts (pincode roll-up):")
+                print(outputs['rollup']['district'][['district_id', 'n_pincodes', 'cps_score', 'cps_score_max',
+                                                     'pincodes_tier_1', 'cps_tier']].head(5).to_string(index=False))
+            print("\nStage Timings:")
+            print(metrics.summary()[['stage', 'status', 'wall_s', 'cpu_s', 'rss_peak_mb', 'rows_out']].to_string(index=False))
+            if summary:
+                print("\n" + render_summary(run_summary))
+            print("="*50 + "\n")
         
         logger.info("xxx PIPELINE EXECUTION SUCCESSFUL xxx")
         
     except Exception as e:
         logger.error(f"Pipeline Execution Failed: {str(e)}")
         raise e
+    finally:
+        stop_audit_log(listener)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        inp = sys.argv[1]
-        out_d = sys.argv[2]
-        run_aadhaar_netra_pipeline(inp, out_d)
+    # '--csv' additionally writes the legacy CSV views; '--no-checkpoints' recomputes every stage;
+    # '--profile' writes cProfile output per stage (stages run serially); '--quiet' skips console output;
+    # '--summary' computes and logs the run summary statistics
+    write_csv = '--csv' in sys.argv
+    use_checkpoints = '--no-checkpoints' not in sys.argv
+    profile = '--profile' in sys.argv
+    quiet = '--quiet' in sys.argv
+    summary = '--summary' in sys.argv
+    # '--granularity pincode' scores pincodes, with district and state roll-ups;
+    # '--as-of YYYY-MM-DD' scores the data as of that date
+    argv = sys.argv[1:]
+    options = {'--granularity': 'district', '--as-of': None}
+    for flag in options:
+        if flag in argv:
+            i = argv.index(flag)
+            options[flag] = argv[i + 1]
+            argv = argv[:i] + argv[i + 2:]
+    granularity, as_of = options['--granularity'], options['--as-of']
+    args = [a for a in argv if not a.startswith('--')]
+    if len(args) > 1:
+        inp = args[0]
+        out_d = args[1]
+        run_aadhaar_netra_pipeline(inp, out_d, write_csv=write_csv, use_checkpoints=use_checkpoints, profile=profile,
+                                   quiet=quiet, summary=summary, granularity=granularity, as_of=as_of)
     else:
         # Default behavior: Assume 'data' folder in current dir
         print("Using default 'data' folder...")
         if os.path.exists("data"):
-             run_aadhaar_netra_pipeline("data", "final_output_real")
+             run_aadhaar_netra_pipeline("data", "final_output_real", write_csv=write_csv, use_checkpoints=use_checkpoints,
+                                        profile=profile, quiet=quiet, summary=summary, granularity=granularity, as_of=as_of)
         else:
              print("Error: 'data' folder not found.")
@@ -0,0 +1,272 @@
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional, Tuple
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.data_aggregation import _id_column
+from src.backfill import daily_arrays
+
+logger = logging.getLogger(__name__)
+
+# Update series checked per entity: source -> output column prefix
+SERIES = {'biometric': 'bio', 'demographic': 'demo'}
+DEFAULT_HISTORY_DAYS = 365
+SUM_DAYS = 7 # z-scores compare 7-day sums, which smooths the weekday pattern of sparse series
+BASELINE_WEEKS = 8 # ...with the sums ending on the same weekday in the 8 weeks before
+RECENT_DAYS = 14
+CHANGE_DAYS = 90
+MIN_SEGMENT = 7 # days on each side of a change point (shorter shifts are outliers, not level changes)
+
+# Flag thresholds; severity is the largest multiple of the threshold an entity reaches
+Z_THRESHOLD = 4.0
+CHANGE_THRESHOLD = 1.358 # 5% critical value of the sup of a Brownian bridge (Kolmogorov)
+MIN_SHIFT = 0.5 # a level change must halve (or double) the daily mean
+ZERO_EXPECTED = 10.0 # P(no row | usual row rate) = exp(-10) ~ 5e-5
+# In order of precedence when an entity triggers several
+FLAGS = ['drop_to_zero', 'level_drop', 'low_outlier', 'level_rise', 'high_outlier']
+MIN_ROWS = 10 # rows in the window below which a series is too sparse for level and zero-run tests
+MAX_BLOCK_CELLS = 8_000_000 # entities x scored days x baseline weeks materialized per block
+
+def entity_count(frames: Dict[str, pd.DataFrame], key: str = 'district') -> int:
+    """
+    Size of the code space: the '<key>_registry' frame, or the largest code in the series + 1.
+    """
+    registry = frames.get(f"{key}_registry")
+    if registry is not None:
+        return len(registry)
+    id_col = _id_column(key)
+    return max((int(df[id_col].max()) + 1 for df in (frames.get(s) for s in SERIES)
+                if df is not None and not df.empty), default=0)
+
+def update_series(frames: Dict[str, pd.DataFrame], source: str, end: pd.Timestamp, history_days: int,
+                  n_entities: int, key: str = 'district') -> Tuple[np.ndarray, np.ndarray, Optional[pd.Timestamp]]:
+    """
+    Daily counts and rows (entities x days) of one source over the days its feed covers, up to
+    `end` and at most `history_days`: days before the first row are unknown rather than zero,
+    and days after the last row of any entity are a lagging feed, not silent entities.
+
+    Outputs:
+        (counts, rows, last): the arrays and the date of their last day (None when the source has
+        no rows up to `end`).
+    """
+    df = frames.get(source, pd.DataFrame())
+    dates = df['date'][df['date'] <= end] if not df.empty else pd.Series(dtype='datetime64[ns]')
+    if dates.empty:
+        empty = np.zeros((n_entities, 0))
+        return empty, empty, None
+    last = dates.max().normalize()
+    origin = max(dates.min().normalize(), end - pd.Timedelta(days=history_days - 1))
+    daily = daily_arrays({source: df}, origin, (last - origin).days + 1, n_entities, key)
+    return daily[f"{source}_count"], daily[f"{source}_rows"], last
+
+def rolling_robust_z(counts: np.ndarray, sum_days: int = SUM_DAYS, weeks: int = BASELINE_WEEKS,
+                     last: Optional[int] = None) -> np.ndarray:
+    """
+    Robust z-score of every (entity, day) of a daily count array: the trailing `sum_days` sum
+    against the median and MAD of the sums ending on the same weekday in the previous `weeks`
+    weeks. Sums are Anscombe-transformed (2 sqrt(x + 3/8), ~unit variance for Poisson counts),
+    so low counts are not skewed. The spread is floored at 1 and at the sd of the series before
+    the scored days: rows arrive in clumps (one per pincode and day), so a sparse series whose
+    same-weekday sums are mostly 0 (MAD 0) is not scored as if it were Poisson. Days whose
+    baseline median is 0 (no regular activity to compare against) are not scored.
+
+    Inputs:
+        counts: (entities x days) daily counts.
+        last: Only score the last `last` days (default: all days with a full baseline).
+
+    Outputs:
+        np.ndarray: (entities x days) z-scores, NaN where not scored.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n_entities, n_days = counts.shape
+    span = 7 * weeks + 1
+    z = np.full(counts.shape, np.nan)
+    first = sum_days - 1 + span - 1 # first day with a full baseline
+    if n_days <= first:
+        return z
+    scored = n_days - first if last is None else min(last, n_days - first)
+
+    csum = np.cumsum(counts, axis=1)
+    sums = csum[:, sum_days - 1:] - np.pad(csum, ((0, 0), (1, 0)))[:, :n_days - sum_days + 1]
+    sums = 2.0 * np.sqrt(sums + 0.375)
+    zero = 2.0 * np.sqrt(0.375) # a sum of 0, transformed
+    history = sums[:, :sums.shape[1] - scored]
+    floor = np.maximum(history.std(axis=1), 1.0)[:, None]
+    block = max(1, MAX_BLOCK_CELLS // (scored * weeks))
+    for lo in range(0, n_entities, block):
+        # Windows of span days; every 7th value before the last is a same-weekday baseline sum
+        windows = sliding_window_view(sums[lo:lo + block], span, axis=1)[:, -scored:]
+        baseline = windows[..., 0:span - 1:7]
+        median = np.median(baseline, axis=-1)
+        mad = np.median(np.abs(baseline - median[..., None]), axis=-1)
+        scale = np.maximum(1.4826 * mad, floor[lo:lo + block])
+        z[lo:lo + block, -scored:] = np.where(median > zero, (windows[..., -1] - median) / scale, np.nan)
+    return z
+
+def cusum_change_point(counts: np.ndarray, min_segment: int = MIN_SEGMENT) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Single change point in the mean of every series at once (standardized CUSUM / Brownian bridge
+    statistic): for a split after day k of n, (S_k - k/n S_n) / (sigma sqrt(n)), where S is the
+    cumulative sum and sigma the sd of day-to-day differences / sqrt(2) (barely affected by the
+    shift itself; floored at the Poisson sd of the mean). Splits leave at least min_segment days
+    on each side, and the largest day is first lowered to the second largest, so a single spike
+    is an outlier rather than a level change.
+
+    Outputs:
+        (stat, split, ratio): per entity, the max |statistic|, the first day after the change
+        (index into the window) and the mean after / mean before (inf when the mean before is 0).
+        Series shorter than 2 * min_segment days are not tested (NaN stat and ratio, split -1).
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.shape[1]
+    if n < 2 * min_segment:
+        missing = np.full(len(counts), np.nan)
+        return missing, np.full(len(counts), -1), missing.copy()
+    counts = np.minimum(counts, np.partition(counts, n - 2, axis=1)[:, n - 2:n - 1])
+    csum = np.cumsum(counts, axis=1)
+    k = np.arange(1, n)
+    bridge = csum[:, :-1] - k / n * csum[:, -1:]
+
+    sigma = np.diff(counts, axis=1).std(axis=1) / np.sqrt(2)
+    sigma = np.maximum(sigma, np.sqrt(np.maximum(csum[:, -1] / n, 1.0 / n)))
+    stat_k = np.abs(bridge) / (sigma[:, None] * np.sqrt(n))
+    stat_k[:, :min_segment - 1] = 0.0
+    stat_k[:, n - min_segment:] = 0.0
+
+    best = np.argmax(stat_k, axis=1)
+    rows = np.arange(len(counts))
+    before = csum[rows, best] / (best + 1)
+    after = (csum[:, -1] - csum[rows, best]) / (n - best - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(before > 0, after / before, np.where(after > 0, np.inf, 1.0))
+    return stat_k[rows, best], best + 1, ratio
+
+def zero_run(rows: np.ndarray, baseline_days: int = 7 * BASELINE_WEEKS,
+             min_rows: int = MIN_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Days without any reported row up to the last day, and the number of rows expected in that
+    run at the daily row rate of the `baseline_days` before the last reported day (that day
+    itself is left out: the window is chosen to end on a row). Rows (one per pincode and day)
+    rather than update counts, since a row carries a clump of updates. With fewer than
+    min_rows rows in the baseline the rate is not estimated (expected 0).
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    n_entities, n_days = rows.shape
+    day = np.arange(n_days)
+    last = np.max(np.where(rows > 0, day, -1), axis=1)
+    run = n_days - 1 - last
+
+    csum = np.pad(np.cumsum(rows, axis=1), ((0, 0), (1, 0)))
+    start = np.maximum(last - baseline_days, 0)
+    idx = np.arange(n_entities)
+    n_rows = csum[idx, np.maximum(last, 0)] - csum[idx, start]
+    rate = np.where(n_rows >= min_rows, n_rows / np.maximum(last - start, 1), 0.0)
+    return run, rate * run
+
+def detect_anomalies(frames: Dict[str, pd.DataFrame], as_of: Optional[str] = None, key: str = 'district',
+                     history_days: int = DEFAULT_HISTORY_DAYS) -> pd.DataFrame:
+    """
+    Anomalies in the daily biometric and demographic update series of every district (or
+    pincode), computed for all series at once on (entities x days) arrays:
+
+    - '<src>_zscore' / '<src>_min_zscore': robust z-score of the last 7 days (rolling_robust_z),
+      and its minimum over the last 14 days.
+    - '<src>_change_stat', '<src>_change_date', '<src>_change_ratio': strongest shift in the mean
+      over the last 90 days (cusum_change_point).
+    - '<src>_zero_run_days', '<src>_expected_rows': current run of days without updates and
+      the rows expected in it at the entity's usual rate (zero_run).
+
+    'anomaly_flag' is the first of FLAGS an entity triggers in either series ('none' otherwise),
+    'anomaly_source' the series, and 'anomaly_severity' the largest multiple of a threshold
+    reached (>= 1 means flagged). A drop to zero is flagged long before days_since_last_update
+    moves the BSI.
+
+    Inputs:
+        frames: Ingested frames ('biometric', 'demographic' with parsed dates and int32 codes,
+                '<key>_registry' for the code space).
+        as_of: Last day considered (default: today).
+        history_days: Days of history loaded into the arrays (at most).
+
+    Outputs:
+        pd.DataFrame: One row per entity with activity in the window, keyed by 'district_code'
+                      (or 'pincode_code').
+    """
+    id_col = _id_column(key)
+    end = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+    n_entities = entity_count(frames, key)
+    logger.info(f"Detecting anomalies in {n_entities} {key} series over up to {history_days} days until {end.date()}...")
+    if n_entities == 0:
+        return pd.DataFrame(columns=[id_col, 'anomaly_flag', 'anomaly_source', 'anomaly_severity'])
+
+    active = np.zeros(n_entities, dtype=bool)
+    out = {id_col: np.arange(n_entities, dtype=np.int32)}
+    severity = np.zeros((len(FLAGS), len(SERIES), n_entities))
+    for s_idx, (source, prefix) in enumerate(SERIES.items()):
+        counts, rows, last = update_series(frames, source, end, history_days, n_entities, key)
+        if last is None:
+            for col in ['zscore', 'min_zscore', 'change_stat', 'change_ratio', 'zero_run_days', 'expected_rows']:
+                out[f"{prefix}_{col}"] = np.full(n_entities, np.nan)
+            out[f"{prefix}_change_date"] = pd.NaT
+            continue
+        active |= rows.any(axis=1)
+
+        z = rolling_robust_z(counts, last=RECENT_DAYS)
+        recent = z[:, -RECENT_DAYS:]
+        out[f"{prefix}_zscore"] = z[:, -1]
+        out[f"{prefix}_min_zscore"] = np.fmin.reduce(recent, axis=1) # NaN-ignoring
+
+        window = counts[:, -CHANGE_DAYS:]
+        stat, split, ratio = cusum_change_point(window)
+        out[f"{prefix}_change_stat"] = stat
+        out[f"{prefix}_change_date"] = (last - pd.to_timedelta(window.shape[1] - 1 - split, unit='D')).where(split >= 0)
+        out[f"{prefix}_change_ratio"] = ratio
+
+        run, expected = zero_run(rows)
+        out[f"{prefix}_zero_run_days"] = run
+        out[f"{prefix}_expected_rows"] = expected
+
+        # Severity per flag (multiples of its threshold; only counted when the flag fires)
+        changed = np.where(rows[:, -CHANGE_DAYS:].sum(axis=1) >= MIN_ROWS, np.nan_to_num(stat) / CHANGE_THRESHOLD, 0.0)
+        candidates = {
+            'drop_to_zero': expected / ZERO_EXPECTED,
+            'level_drop': np.where(ratio <= 1 - MIN_SHIFT, changed, 0.0),
+            'low_outlier': -np.nan_to_num(np.fmin.reduce(recent, axis=1)) / Z_THRESHOLD,
+            'level_rise': np.where(ratio >= 1 / (1 - MIN_SHIFT), changed, 0.0),
+            'high_outlier': np.nan_to_num(np.fmax.reduce(recent, axis=1)) / Z_THRESHOLD
+        }
+        for f_idx, flag in enumerate(FLAGS):
+            severity[f_idx, s_idx] = candidates[flag]
+
+    fired = severity >= 1.0
+    any_fired = fired.any(axis=1) # (flags, entities)
+    first = np.argmax(any_fired, axis=0)
+    flagged = any_fired.any(axis=0)
+    rows = np.arange(n_entities)
+    source_idx = np.argmax(severity[first, :, rows], axis=1)
+
+    df = pd.DataFrame(out)
+    df['anomaly_flag'] = np.where(flagged, np.array(FLAGS)[first], 'none')
+    df['anomaly_source'] = np.where(flagged, np.array(list(SERIES))[source_idx], 'none')
+    df['anomaly_severity'] = np.where(flagged, severity[first, source_idx, rows], np.clip(severity.max(axis=(0, 1)), 0.0, None))
+    df = df[active].reset_index(drop=True)
+    logger.info(f"Anomalies: {df['anomaly_flag'].value_counts().to_dict()}")
+    return df
+
+def add_anomaly_flags(df: pd.DataFrame, anomalies: pd.DataFrame, key: str = 'district') -> pd.DataFrame:
+    """
+    Merges the anomaly columns into the scored frame; entities without recent activity get
+    flag 'none' and severity 0.
+    """
+    id_col = _id_column(key)
+    out = df.drop(columns=[c for c in anomalies.columns if c != id_col and c in df.columns])
+    out = out.merge(anomalies, on=id_col, how='left')
+    out['anomaly_flag'] = out['anomaly_flag'].fillna('none')
+    out['anomaly_source'] = out['anomaly_source'].fillna('none')
+    out['anomaly_severity'] = out['anomaly_severity'].fillna(0.0)
+    return out
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,304 @@
+
+import glob
+import http.client
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse, urlencode, parse_qs
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError: # Optional dependency: required for downloading, not for reading CSV drops
+    pa = pa_csv = pq = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "download_manifest.json"
+DEFAULT_PAGE_SIZE = 500_000
+DEFAULT_CONNECTIONS = 4
+DEFAULT_RETRIES = 3
+KINDS = ['biometric', 'demographic', 'enrolment']
+# Recorded API pages: api_data_aadhar_<kind>_<offset>_<offset + rows>.csv
+PAGE_PATTERN = re.compile(r"api_data_aadhar_([a-z]+)_(\d+)_(\d+)\.csv$")
+
+def page_name(kind: str, offset: int, end: int) -> str:
+    return f"api_data_aadhar_{kind}_{offset}_{end}"
+
+def plan_pages(total: int, page_size: int) -> List[Tuple[int, int]]:
+    """
+    (offset, expected rows) of every page of a resource with `total` rows.
+    """
+    return [(offset, min(page_size, total - offset)) for offset in range(0, total, page_size)]
+
+class PageDownloader:
+    """
+    Fetches the pages of the paginated open-data API (data.gov.in style:
+    GET <base_url>/<resource>?format=csv&offset=&limit=[&api-key=]) into a Parquet ingestion cache.
+
+    - Pages are fetched concurrently by `connections` worker threads, each reusing one
+      keep-alive connection, so at most `connections` connections are open.
+    - Each response is parsed as it is read from the socket (pyarrow CSV reader) and written as
+      <cache_dir>/api_data_aadhar_<kind>_<offset>_<end>.parquet (tmp + rename): no CSV is stored.
+    - The row count of each page is checked against the resource total; a short or failed page
+      is retried up to `retries` times with exponential backoff.
+    - Completed pages are recorded in download_manifest.json (rewritten atomically after each
+      page), so a resumed download only fetches the pages still missing. Cached pages that no
+      longer match the plan (e.g. the old last page of a resource that has grown) are deleted
+      and fetched again.
+
+    load_raw_data reads the cache directory like a folder of CSV drops.
+    """
+
+    def __init__(self, base_url: str, cache_dir: str, resources: Optional[Dict[str, str]] = None,
+                 api_key: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                 connections: int = DEFAULT_CONNECTIONS, retries: int = DEFAULT_RETRIES, timeout: float = 60.0):
+        if pa_csv is None:
+            raise ImportError("pyarrow is required to download API pages.")
+        url = urlparse(base_url)
+        self.scheme, self.host, self.port = url.scheme or 'http', url.hostname, url.port
+        self.base_path = url.path.rstrip('/')
+        self.cache_dir = cache_dir
+        self.resources = resources or {kind: kind for kind in KINDS}
+        self.api_key = api_key
+        self.page_size = page_size
+        self.connections = connections
+        self.retries = retries
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.manifest = self._load_manifest()
+
+    # --- Manifest ---
+    def _manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, MANIFEST_FILENAME)
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            manifest = json.load(f)
+        # A page counts as done only while its file is still there
+        return {name: entry for name, entry in manifest.items()
+                if os.path.exists(os.path.join(self.cache_dir, entry['file']))}
+
+    def _write_manifest(self) -> None:
+        path = self._manifest_path()
+        with open(path + ".tmp", 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+    def _record(self, name: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.manifest[name] = entry
+            self._write_manifest()
+
+    def _drop_stale(self, kind: str, planned: List[str]) -> List[str]:
+        # Cached pages of a kind that are not in the current plan (the last page of a resource
+        # that has grown since, or pages of another page size) overlap the planned pages:
+        # their files and manifest entries are removed so no row is ingested twice
+        stale = [name for name, entry in self.manifest.items() if entry['kind'] == kind and name not in planned]
+        if stale:
+            with self._lock:
+                for name in stale:
+                    path = os.path.join(self.cache_dir, self.manifest.pop(name)['file'])
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._write_manifest()
+            logger.info(f"{kind}: removed {len(stale)} cached pages that no longer match the resource")
+        return stale
+
+    # --- HTTP ---
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def _reset_connection(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def _request(self, kind: str, params: Dict[str, Any]) -> http.client.HTTPResponse:
+        query = dict(params, **({'api-key': self.api_key} if self.api_key else {}))
+        conn = self._connection()
+        conn.request("GET", f"{self.base_path}/{self.resources[kind]}?{urlencode(query)}")
+        response = conn.getresponse()
+        if response.status != 200:
+            response.read()
+            raise http.client.HTTPException(f"HTTP {response.status} for {kind} {params}")
+        return response
+
+    def _with_retries(self, func, *args):
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args)
+            except (OSError, http.client.HTTPException, pa.ArrowInvalid, ValueError) as e:
+                self._reset_connection() # the connection state is unknown after a failure
+                if attempt == self.retries:
+                    raise
+                delay = 0.1 * 2 ** attempt
+                logger.warning(f"{func.__name__}{args}: {e}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _total(self, kind: str) -> int:
+        response = self._request(kind, {'format': 'json', 'offset': 0, 'limit': 0})
+        return int(json.loads(response.read())['total'])
+
+    def fetch_total(self, kind: str) -> int:
+        """
+        Total number of rows of a resource (the 'total' field of a JSON response).
+        """
+        return self._with_retries(self._total, kind)
+
+    def _page(self, kind: str, offset: int, rows: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        response = self._request(kind, {'format': 'csv', 'offset': offset, 'limit': rows})
+        # Same values as pandas.read_csv: dates stay strings, empty fields are nulls
+        table = pa_csv.read_csv(response, convert_options=pa_csv.ConvertOptions(
+            column_types={'date': pa.string()}, strings_can_be_null=True))
+        if table.num_rows != rows:
+            raise ValueError(f"{kind} page at offset {offset}: {table.num_rows} rows, expected {rows}")
+
+        name = page_name(kind, offset, offset + rows)
+        path = os.path.join(self.cache_dir, f"{name}.parquet")
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return {'kind': kind, 'offset': offset, 'rows': rows, 'file': os.path.basename(path),
+                'bytes': os.path.getsize(path), 'seconds': round(time.perf_counter() - start, 3)}
+
+    def fetch_page(self, kind: str, offset: int, rows: int) -> Dict[str, Any]:
+        """
+        Downloads one page into the cache and records it in the manifest.
+        """
+        entry = self._with_retries(self._page, kind, offset, rows)
+        self._record(page_name(kind, offset, offset + rows), entry)
+        return entry
+
+    # --- Download ---
+    def download(self, kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Downloads every missing page of the given resources (default: all).
+
+        Outputs:
+            list: Manifest entries of the pages fetched by this call ({'kind', 'offset', 'rows', 'file',
+                  'bytes', 'seconds'}); pages already in the cache are skipped.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        start = time.perf_counter()
+        tasks = []
+        for kind in kinds or list(self.resources):
+            total = self.fetch_total(kind)
+            pages = plan_pages(total, self.page_size)
+            self._drop_stale(kind, [page_name(kind, offset, offset + rows) for offset, rows in pages])
+            todo = [(kind, offset, rows) for offset, rows in pages
+                    if page_name(kind, offset, offset + rows) not in self.manifest]
+            logger.info(f"{kind}: {total} rows, {len(pages)} pages, {len(pages) - len(todo)} already cached")
+            tasks.extend(todo)
+
+        fetched = []
+        if tasks:
+            with ThreadPoolExecutor(max_workers=min(self.connections, len(tasks))) as pool:
+                futures = [pool.submit(self.fetch_page, *task) for task in tasks]
+                for future in as_completed(futures):
+                    fetched.append(future.result())
+        fetched.sort(key=lambda e: (e['kind'], e['offset']))
+
+        rows = sum(e['rows'] for e in fetched)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Downloaded {len(fetched)} pages ({rows:,} rows) in {elapsed:.1f}s "
+                    f"({rows / max(elapsed, 1e-9):,.0f} rows/s, {self.connections} connections)")
+        return fetched
+
+# --- Local stand-in API (tests, benchmarks) ---
+def load_recorded_pages(pages_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Recorded API pages (CSV files named by offset) as one header and a list of row lines per kind.
+    """
+    recorded: Dict[str, Dict[str, Any]] = {}
+    files = []
+    for path in glob.glob(os.path.join(pages_dir, "*.csv")):
+        match = PAGE_PATTERN.search(os.path.basename(path))
+        if match:
+            files.append((match.group(1), int(match.group(2)), path))
+    for kind, _, path in sorted(files):
+        with open(path, 'rb') as f:
+            header, *lines = f.read().splitlines(keepends=True)
+        entry = recorded.setdefault(kind, {'header': header, 'lines': []})
+        entry['lines'].extend(lines)
+    return recorded
+
+def make_api_handler(recorded: Dict[str, Dict[str, Any]], faults: Optional[Dict[Tuple[str, int], int]] = None):
+    """
+    Request handler of the stand-in API. faults maps (kind, offset) to a number of requests for
+    that page that fail (HTTP 503 and truncated bodies alternate) before it is served correctly.
+    """
+    faults = dict(faults or {})
+    lock = threading.Lock()
+
+    class RecordedApiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # keep-alive
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            kind = url.path.strip('/').split('/')[-1]
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if kind not in recorded:
+                return self._send(404, b'{"error": "unknown resource"}', "application/json")
+            lines = recorded[kind]['lines']
+            offset, limit = int(query.get('offset', 0)), int(query.get('limit', 10))
+
+            if query.get('format') == 'json':
+                body = json.dumps({'total': len(lines), 'count': 0, 'offset': offset, 'limit': limit})
+                return self._send(200, body.encode('utf-8'), "application/json")
+
+            rows = lines[offset:offset + limit]
+            with lock:
+                remaining = faults.get((kind, offset), 0)
+                if remaining:
+                    faults[(kind, offset)] = remaining - 1
+            if remaining % 2 == 1:
+                return self._send(503, b'{"error": "unavailable"}', "application/json")
+            if remaining:
+                rows = rows[:len(rows) // 2]
+            self._send(200, recorded[kind]['header'] + b''.join(rows), "text/csv")
+
+        def log_message(self, format, *args):
+            pass
+
+    return RecordedApiHandler
+
+def serve_recorded_pages(pages_dir: str, host: str = "127.0.0.1", port: int = 0,
+                         faults: Optional[Dict[Tuple[str, int], int]] = None) -> ThreadingHTTPServer:
+    """
+    Starts the stand-in API in a background thread and returns the server
+    (server.server_address has the bound port; call server.shutdown() to stop).
+    """
+    server = ThreadingHTTPServer((host, port), make_api_handler(load_recorded_pages(pages_dir), faults))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="recorded-api", daemon=True).start()
+    logger.info(f"Recorded API pages from {pages_dir} served on http://{host}:{server.server_address[1]}")
+    return server
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.cli download <base_url> [cache_dir]
+    pass
@@ -0,0 +1,89 @@
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+AUDIT_LOG_FILENAME = "audit_log.jsonl"
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is kept as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, message, thread, plus any `extra=` fields
+    (e.g. extra={'event': 'stage_metrics', 'metrics': {...}}).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+def start_audit_log(output_dir: str, quiet: bool = False, level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Routes all logging through a queue: callers only enqueue records, and a background
+    listener thread writes <output_dir>/audit_log.jsonl and, unless quiet, the console.
+
+    Replaces the handlers of the root logger. Call stop_audit_log with the returned
+    listener to flush and detach.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    file_handler = logging.FileHandler(os.path.join(output_dir, AUDIT_LOG_FILENAME), mode='w')
+    file_handler.setFormatter(JsonFormatter())
+    handlers: List[logging.Handler] = [file_handler]
+    if not quiet:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    return listener
+
+def stop_audit_log(listener: logging.handlers.QueueListener) -> None:
+    """
+    Drains the queue, closes the file/console handlers and detaches the queue handler.
+    """
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+
+def read_audit_log(path: str, event: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Parses audit_log.jsonl, optionally keeping only records with the given 'event' field.
+    """
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if event is not None:
+        entries = [e for e in entries if e.get('event') == event]
+    return entries
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,175 @@
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Sequence
+
+from src.data_aggregation import _id_column
+from src.feature_normalization import minmax_scale
+from src.scoring_bsi import bsi_from_terms, bsi_tier_codes, BSI_TIERS
+from src.scoring_cps import cps_from_terms, cps_tier_codes, CPS_TIERS
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_FILENAME = "backfill_rankings.parquet"
+
+# Per-source count columns summed per entity (as in src/data_aggregation.py)
+SOURCE_COUNTS = {
+    'enrolment': ['age_0_5', 'age_5_17', 'age_18_greater'],
+    'biometric': ['bio_age_5_17', 'bio_age_17_'],
+    'demographic': ['demo_age_5_17', 'demo_age_17_']
+}
+# Output columns after 'as_of' and the entity code: the BSI/CPS history only. The cohort projection
+# (mbu_*), demand forecast, camp capacity and anomaly columns of a batch or watch run are not backfilled:
+# the history store keeps ranks, scores and tiers, and those stages score the latest date only.
+BACKFILL_COLUMNS = ['total_aadhaar_holders', 'total_biometric_updates', 'days_since_last_update',
+                    'bsi_score', 'bsi_tier', 'cps_score', 'cps_tier', 'cps_rank']
+# Frames already collapsed to one row per (day, entity) carry the raw row count (src/data_watcher.py)
+ROWS_COLUMN = 'n_rows'
+
+def _day_index(dates: pd.Series, origin: pd.Timestamp) -> np.ndarray:
+    return ((dates.to_numpy(dtype='datetime64[ns]') - np.datetime64(origin, 'ns')) // np.timedelta64(1, 'D')).astype(np.int64)
+
+def daily_arrays(dfs: Dict[str, pd.DataFrame], origin: pd.Timestamp, n_days: int, n_entities: int,
+                 key: str = 'district') -> Dict[str, np.ndarray]:
+    """
+    Per-entity, per-day activity of the ingested (coded) frames, as dense (entities x days) arrays
+    indexed by the int32 entity code and the day since origin. Rows outside the window are ignored.
+
+    Outputs:
+        dict: '<source>_count' (summed age bands, float64) and '<source>_rows' (row count, or the
+              sum of ROWS_COLUMN when the frame has one) per source.
+    """
+    id_col = _id_column(key)
+    arrays = {}
+    for source, columns in SOURCE_COUNTS.items():
+        df = dfs.get(source, pd.DataFrame())
+        count = np.zeros(n_entities * n_days)
+        rows = np.zeros(n_entities * n_days, dtype=np.int64)
+        if not df.empty:
+            day = _day_index(df['date'], origin)
+            code = df[id_col].to_numpy(dtype=np.int64)
+            valid = (day >= 0) & (day < n_days) & (code >= 0)
+            cell = code[valid] * n_days + day[valid]
+            total = sum(df[c].to_numpy(dtype=np.float64) for c in columns if c in df.columns)
+            count = np.bincount(cell, np.broadcast_to(total, len(df))[valid], minlength=n_entities * n_days)
+            if ROWS_COLUMN in df.columns:
+                rows = np.bincount(cell, df[ROWS_COLUMN].to_numpy(dtype=np.float64)[valid],
+                                   minlength=n_entities * n_days).astype(np.int64)
+            else:
+                rows = np.bincount(cell, minlength=n_entities * n_days)
+        arrays[f"{source}_count"] = count.reshape(n_entities, n_days)
+        arrays[f"{source}_rows"] = rows.reshape(n_entities, n_days)
+    return arrays
+
+def backfill_scores(dfs: Dict[str, pd.DataFrame], dates: Sequence, n_entities: int = None,
+                    key: str = 'district') -> pd.DataFrame:
+    """
+    BSI/CPS scores, tiers and ranks of every district (or pincode) for many as-of dates in one pass,
+    instead of one pipeline run per date.
+
+    The district aggregates as of day d are prefix sums of the daily arrays (holders, biometric
+    updates) and a running max of the last day with biometric rows; the features, the per-date
+    Min-Max normalization and the scores are then computed for all dates at once on
+    (entities x dates) arrays, with the pipeline's definitions (feature_engineer,
+    normalize_features, compute_bsi, compute_camp_priority_score). Entities without enrolment
+    rows up to d are left out of that date, as in merge_district_aggregates.
+
+    The spatial features, the mandatory-update cohorts, the demand forecast, the camp strategy and
+    the anomaly flags are not part of the backfill (see BACKFILL_COLUMNS). Ties in CPS are ranked by
+    entity code, as in compute_camp_priority_score, so ranks match a single run of the same date.
+
+    Inputs:
+        dfs: Ingested frames ('enrolment', 'biometric', 'demographic' with int32 codes and parsed dates).
+        dates: As-of dates; rows dated after a date do not count for it.
+        n_entities: Size of the code space (default: largest code seen + 1).
+
+    Outputs:
+        pd.DataFrame: One row per (as_of, entity), ranked within each date: 'as_of', 'district_code'
+                      (or 'pincode_code'), 'total_aadhaar_holders', 'total_biometric_updates',
+                      'days_since_last_update', 'bsi_score', 'bsi_tier', 'cps_score', 'cps_tier', 'cps_rank'.
+    """
+    id_col = _id_column(key)
+    as_of = pd.DatetimeIndex(pd.to_datetime(list(dates))).normalize()
+    frames = [dfs[k] for k in SOURCE_COUNTS if k in dfs and not dfs[k].empty]
+    if not len(as_of) or not frames:
+        return pd.DataFrame(columns=['as_of', id_col] + BACKFILL_COLUMNS)
+
+    origin = min(min(df['date'].min() for df in frames), as_of.min())
+    n_days = int((as_of.max() - origin).days) + 1
+    if n_entities is None:
+        n_entities = max(int(df[id_col].max()) for df in frames) + 1
+    logger.info(f"Backfilling {len(as_of)} dates over {n_days} days for {n_entities} {key}s...")
+
+    daily = daily_arrays(dfs, origin, n_days, n_entities, key)
+    cols = ((as_of - origin).days).to_numpy()
+    present = np.cumsum(daily['enrolment_rows'], axis=1)[:, cols] > 0
+    ranked = present.any(axis=0)
+    if not ranked.all():
+        logger.warning(f"{int((~ranked).sum())} dates have no enrolment rows yet and are not ranked.")
+        as_of, cols, present = as_of[ranked], cols[ranked], present[:, ranked]
+
+    # --- Aggregates as of every date: prefix sums and running max over days ---
+    holders = np.cumsum(daily['enrolment_count'], axis=1)[:, cols]
+    bio = np.cumsum(daily['biometric_count'], axis=1)[:, cols]
+    day = np.arange(n_days)[None, :]
+    last_bio = np.maximum.accumulate(np.where(daily['biometric_rows'] > 0, day, -1), axis=1)[:, cols]
+    del daily
+
+    # --- Features (feature_engineer), NaN for entities not in that date's aggregate ---
+    # merge_district_aggregates fills a missing last-update date with 0 (the epoch), so entities
+    # without biometric rows count their days from 1970-01-01
+    epoch_days = (as_of - pd.Timestamp(0)).days.to_numpy()
+    days_since = np.where(last_bio >= 0, cols[None, :] - last_bio, epoch_days[None, :]).astype(np.float64)
+    days_since[~present] = np.nan
+
+    coverage = np.minimum(bio / np.where(holders == 0, 1, holders), 1.0)
+    gap = 1.0 - coverage
+    consistency = coverage / (1.0 + days_since / 365.0)
+    adult = holders * 0.75
+    for values in (coverage, gap, consistency, adult):
+        values[~present] = np.nan
+
+    # --- Normalization per date (column-wise, NaNs ignored) and scoring ---
+    consistency_norm = minmax_scale(consistency)
+    bsi = bsi_from_terms(minmax_scale(days_since), consistency_norm, minmax_scale(gap))
+    cps = cps_from_terms(bsi, minmax_scale(adult), consistency_norm)
+
+    # Rank per date: CPS descending, ties by code; absent entities sort last
+    codes = np.broadcast_to(np.arange(n_entities)[:, None], cps.shape)
+    order = np.lexsort((codes.T, np.where(present, -cps, np.inf).T), axis=-1)
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(1, n_entities + 1)[None, :], axis=-1)
+
+    # Long format, date-major and ranked within each date
+    d_idx, ordered = np.nonzero(np.take_along_axis(present.T, order, axis=-1))
+    e_idx = order[d_idx, ordered]
+    out = pd.DataFrame({
+        'as_of': as_of[d_idx],
+        id_col: e_idx.astype(np.int32),
+        'total_aadhaar_holders': holders[e_idx, d_idx],
+        'total_biometric_updates': bio[e_idx, d_idx],
+        'days_since_last_update': days_since[e_idx, d_idx],
+        'bsi_score': bsi[e_idx, d_idx],
+        'cps_score': cps[e_idx, d_idx],
+        'cps_rank': rank[d_idx, e_idx].astype(np.int32)
+    })
+    out.insert(6, 'bsi_tier', np.array(BSI_TIERS + ['Unknown'])[bsi_tier_codes(out['bsi_score'].to_numpy())])
+    out['cps_tier'] = np.array(CPS_TIERS + ['Unknown'])[cps_tier_codes(out['cps_score'].to_numpy())]
+    out = out[['as_of', id_col] + BACKFILL_COLUMNS]
+    logger.info(f"Backfill complete: {len(out)} rows.")
+    return out
+
+def backfill_dates(dfs: Dict[str, pd.DataFrame], start=None, end=None, freq: str = 'D') -> pd.DatetimeIndex:
+    """
+    As-of dates from start to end (defaults: the first and last date in the data).
+    """
+    dates = [dfs[k]['date'] for k in SOURCE_COUNTS if k in dfs and not dfs[k].empty]
+    if not dates:
+        return pd.DatetimeIndex([])
+    start = pd.Timestamp(start) if start is not None else min(d.min() for d in dates)
+    end = pd.Timestamp(end) if end is not None else max(d.max() for d in dates)
+    return pd.date_range(start.normalize(), end.normalize(), freq=freq)
+
+if __name__ == "__main__":
+    pass
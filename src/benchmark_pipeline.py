@@ -0,0 +1,233 @@
+
+import pandas as pd
+import numpy as np
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Any, List, Callable, Optional
+
+from src.generate_full_mock_data import generate_mock_dataset
+from src.data_ingestion import load_raw_data
+from src.data_aggregation import aggregate_to_district_level
+from src.feature_engineering import feature_engineer
+from src.feature_normalization import normalize_features
+from src.scoring_bsi import compute_bsi
+from src.scoring_cps import compute_camp_priority_score
+from src.strategy_recommendation import recommend_camp_strategy
+
+logger = logging.getLogger(__name__)
+
+# Rows per file type at scale 1x; larger scales multiply every type
+BASE_ROWS = {'biometric': 50_000, 'demographic': 50_000, 'enrolment': 5_000}
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_ENTITIES = [1_000, 20_000]
+DEFAULT_REPEATS = 3
+TIME_TOLERANCE = 0.20
+MEMORY_TOLERANCE = 0.20
+# Regressions smaller than this are timer / allocator noise
+MIN_TIME_DELTA_S = 0.02
+MIN_MEMORY_DELTA_MB = 2.0
+HISTORY_FILENAME = "history.jsonl"
+BASELINE_FILENAME = "baseline.json"
+MB = 1024 * 1024
+
+def scenario_name(scale: int, entities: int) -> str:
+    return f"{scale}x_{entities // 1000}k"
+
+def prepare_dataset(data_root: str, scale: int, entities: int, seed: int = 0) -> str:
+    """
+    Generates (once) the synthetic raw files for a scenario; reused across benchmark runs.
+    """
+    path = os.path.join(data_root, scenario_name(scale, entities))
+    marker = os.path.join(path, "_COMPLETE")
+    if not os.path.exists(marker):
+        shutil.rmtree(path, ignore_errors=True)
+        rows = {kind: n * scale for kind, n in BASE_ROWS.items()}
+        generate_mock_dataset(path, rows, n_districts=entities, pincodes_per_district=5, seed=seed)
+        open(marker, 'w').close()
+    return path
+
+def measure(func: Callable, args: tuple, repeats: int) -> Dict[str, Any]:
+    """
+    Best-of-N wall time, then one extra call under tracemalloc for the peak allocation.
+    """
+    times = []
+    result = None
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'result': result,
+        'time_s': round(min(times), 6),
+        'time_median_s': round(float(np.median(times)), 6),
+        'peak_mb': round(peak / MB, 3)
+    }
+
+def _full_run(data_dir: str) -> None:
+    from pipeline_orchestrator import run_aadhaar_netra_pipeline # repository root module, imported lazily
+    out_dir = tempfile.mkdtemp()
+    try:
+        run_aadhaar_netra_pipeline(data_dir, out_dir, use_checkpoints=False, quiet=True)
+    finally:
+        shutil.rmtree(out_dir)
+
+def benchmark_scenario(data_dir: str, repeats: int = DEFAULT_REPEATS, full_run: bool = True) -> List[Dict[str, Any]]:
+    """
+    Times every stage on the output of the previous one, plus the end-to-end pipeline.
+    """
+    results = []
+
+    def _stage(name, func, *args):
+        m = measure(func, args, repeats)
+        out = m.pop('result')
+        results.append({'stage': name, **m})
+        return out
+
+    dfs, _ = _stage('load_raw_data', load_raw_data, data_dir)
+    df = _stage('aggregate_to_district_level', aggregate_to_district_level, dfs)
+    df = _stage('feature_engineer', feature_engineer, df)
+    df = _stage('normalize_features', normalize_features, df)
+    df = _stage('compute_bsi', compute_bsi, df)
+    df = _stage('compute_camp_priority_score', compute_camp_priority_score, df)
+    _stage('recommend_camp_strategy', recommend_camp_strategy, df)
+    if full_run:
+        _stage('full_pipeline', _full_run, data_dir)
+    return results
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+                        time_tolerance: float = TIME_TOLERANCE,
+                        memory_tolerance: float = MEMORY_TOLERANCE) -> pd.DataFrame:
+    """
+    Joins results with the baseline on (scenario, stage) and flags regressions beyond the tolerances.
+    """
+    cur = pd.DataFrame(results)[['scenario', 'stage', 'time_s', 'peak_mb']]
+    base = pd.DataFrame(baseline)[['scenario', 'stage', 'time_s', 'peak_mb']]
+    cmp = cur.merge(base, on=['scenario', 'stage'], how='left', suffixes=('', '_baseline'))
+
+    cmp['time_ratio'] = (cmp['time_s'] / cmp['time_s_baseline']).round(3)
+    cmp['memory_ratio'] = (cmp['peak_mb'] / cmp['peak_mb_baseline']).round(3)
+    cmp['time_regression'] = ((cmp['time_ratio'] > 1 + time_tolerance) &
+                              (cmp['time_s'] - cmp['time_s_baseline'] > MIN_TIME_DELTA_S))
+    cmp['memory_regression'] = ((cmp['memory_ratio'] > 1 + memory_tolerance) &
+                                (cmp['peak_mb'] - cmp['peak_mb_baseline'] > MIN_MEMORY_DELTA_MB))
+    cmp['regression'] = cmp['time_regression'] | cmp['memory_regression']
+    return cmp
+
+def run_benchmarks(results_dir: str = "benchmarks", data_root: Optional[str] = None, scales: List[int] = None,
+                   entities: List[int] = None, repeats: int = DEFAULT_REPEATS, full_run: bool = True,
+                   save_baseline: bool = False, time_tolerance: float = TIME_TOLERANCE,
+                   memory_tolerance: float = MEMORY_TOLERANCE) -> bool:
+    """
+    Runs every (scale, entities) scenario, appends the results to history.jsonl and compares them
+    against baseline.json. Returns False if any stage regressed beyond the tolerances.
+    """
+    scales = scales or DEFAULT_SCALES
+    entities = entities or DEFAULT_ENTITIES
+    data_root = data_root or os.path.join(results_dir, "data")
+    os.makedirs(results_dir, exist_ok=True)
+
+    run = {
+        'run_at': datetime.now().isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+    # Benchmark output should not be drowned by stage logs
+    logging.disable(logging.WARNING)
+    results = []
+    try:
+        for scale in scales:
+            for n in entities:
+                name = scenario_name(scale, n)
+                data_dir = prepare_dataset(data_root, scale, n)
+                print(f"Benchmarking {name} ...")
+                for r in benchmark_scenario(data_dir, repeats, full_run):
+                    results.append({'scenario': name, 'scale': scale, 'entities': n, **r})
+    finally:
+        logging.disable(logging.NOTSET)
+
+    with open(os.path.join(results_dir, HISTORY_FILENAME), 'a') as f:
+        for r in results:
+            f.write(json.dumps({**run, **r}) + "\n")
+
+    table = pd.DataFrame(results)
+    print("\nBenchmark Results")
+    print(table[['scenario', 'stage', 'time_s', 'time_median_s', 'peak_mb']].to_string(index=False))
+
+    baseline_path = os.path.join(results_dir, BASELINE_FILENAME)
+    if save_baseline or not os.path.exists(baseline_path):
+        with open(baseline_path, 'w') as f:
+            json.dump({**run, 'results': results}, f, indent=2)
+        print(f"\nSaved baseline to {baseline_path}")
+        return True
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    cmp = compare_to_baseline(results, baseline['results'], time_tolerance, memory_tolerance)
+    print(f"\nComparison with baseline {baseline.get('git_revision')} ({baseline.get('run_at')}):")
+    print(cmp[['scenario', 'stage', 'time_ratio', 'memory_ratio', 'regression']].to_string(index=False))
+
+    regressions = cmp[cmp['regression']]
+    if not regressions.empty:
+        print(f"\nFAILED: {len(regressions)} stage(s) regressed beyond tolerance "
+              f"(time +{time_tolerance:.0%}, memory +{memory_tolerance:.0%})")
+        return False
+    print("\nNo regressions.")
+    return True
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.benchmark_pipeline [--scales 1,10] [--entities 1000]
+    parser = argparse.ArgumentParser(description="Stage-level pipeline benchmarks with regression thresholds")
+    parser.add_argument("--results-dir", default="benchmarks")
+    parser.add_argument("--data-root", default=None, help="Cache for generated datasets (default <results-dir>/data)")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)))
+    parser.add_argument("--entities", default=",".join(map(str, DEFAULT_ENTITIES)))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--skip-full-run", action="store_true")
+    parser.add_argument("--save-baseline", action="store_true", help="Replace the baseline with this run")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args()
+
+    ok = run_benchmarks(
+        args.results_dir,
+        args.data_root,
+        scales=[int(s) for s in args.scales.split(',')],
+        entities=[int(e) for e in args.entities.split(',')],
+        repeats=args.repeats,
+        full_run=not args.skip_full_run,
+        save_baseline=args.save_baseline,
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance
+    )
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,336 @@
+
+import pandas as pd
+import numpy as np
+import logging
+import sqlite3
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Hybrid Decision Engine (Post_MVP_Architecture.md, Module 2)
+W_CPS = 0.70
+W_CONFIDENCE = 0.30
+
+SECONDS_PER_DAY = 86400
+USER_COOLDOWN_DAYS = 30     # One request per user per 30 days
+CONFIDENCE_WINDOW_DAYS = 30 # Requests counted towards the confidence score
+
+REQUEST_STATUSES = ('PENDING', 'PROCESSED', 'FULFILLED')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    request_id    TEXT PRIMARY KEY,
+    state         TEXT NOT NULL DEFAULT '',
+    district_id   TEXT NOT NULL,
+    locality_hash TEXT,
+    user_hash     TEXT NOT NULL,
+    timestamp     INTEGER NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'PENDING'
+                  CHECK (status IN ('PENDING', 'PROCESSED', 'FULFILLED'))
+);
+CREATE INDEX IF NOT EXISTS idx_requests_district_ts ON requests (state, district_id, timestamp);
+
+-- Latest accepted request per user: the 30-day rule is a primary-key lookup
+CREATE TABLE IF NOT EXISTS user_last_request (
+    user_hash      TEXT PRIMARY KEY,
+    last_timestamp INTEGER NOT NULL
+) WITHOUT ROWID;
+
+-- (district, day) pairs touched since the last aggregation
+CREATE TABLE IF NOT EXISTS dirty_days (
+    state       TEXT NOT NULL,
+    district_id TEXT NOT NULL,
+    day         INTEGER NOT NULL,
+    PRIMARY KEY (state, district_id, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_request_counts (
+    state       TEXT NOT NULL,
+    district_id TEXT NOT NULL,
+    day         INTEGER NOT NULL,
+    n_requests  INTEGER NOT NULL,
+    PRIMARY KEY (state, district_id, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS hybrid_priority (
+    state            TEXT NOT NULL,
+    district_id      TEXT NOT NULL,
+    cps_score        REAL NOT NULL,
+    requests_30d     INTEGER NOT NULL,
+    confidence_score REAL NOT NULL,
+    hybrid_score     REAL NOT NULL,
+    as_of_day        INTEGER NOT NULL,
+    PRIMARY KEY (state, district_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS engine_state (
+    key   TEXT PRIMARY KEY,
+    value INTEGER
+) WITHOUT ROWID;
+"""
+
+def open_request_db(path: str = ":memory:") -> sqlite3.Connection:
+    """
+    Opens (and initialises) the Request DB. SQLite stands in for the production store.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144") # 256 MB page cache for random-key index inserts
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(requests)")]
+    if columns and 'state' not in columns:
+        _add_state_keys(conn)
+    conn.executescript(SCHEMA)
+    if columns and 'state' not in columns:
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO dirty_days SELECT DISTINCT state, district_id, timestamp / ? FROM requests",
+                         (SECONDS_PER_DAY,))
+    return conn
+
+def _add_state_keys(conn: sqlite3.Connection) -> None:
+    """
+    Upgrades a Request DB keyed on the district name alone. Existing requests get state '';
+    the derived tables are dropped and rebuilt from the requests on the next aggregation.
+    """
+    logger.warning("Request DB predates (state, district) keys; existing requests are kept with state ''.")
+    with conn:
+        conn.execute("ALTER TABLE requests ADD COLUMN state TEXT NOT NULL DEFAULT ''")
+        conn.execute("DROP INDEX IF EXISTS idx_requests_district_ts")
+        for table in ('dirty_days', 'daily_request_counts', 'hybrid_priority'):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+def _districts(df: pd.DataFrame) -> List[Tuple[str, str]]:
+    # (state, district_id): district names repeat across states. Frames without 'state' use ''.
+    state = df['state'] if 'state' in df.columns else pd.Series('', index=df.index)
+    return list(zip(state.astype(str), df['district_id'].astype(str)))
+
+def _to_epoch_seconds(ts: pd.Series) -> np.ndarray:
+    ts = pd.to_datetime(ts, utc=True)
+    return (ts - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+
+def _uuid4_batch(n: int) -> list:
+    """
+    Generates n random UUID4 strings from one urandom call (uuid.uuid4() per row dominates large batches).
+    """
+    raw = np.frombuffer(os.urandom(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40 # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80 # RFC 4122 variant
+    hexed = raw.tobytes().hex()
+    return [f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+            for h in (hexed[i:i + 32] for i in range(0, 32 * n, 32))]
+
+def submit_requests(conn: sqlite3.Connection, requests_df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Inserts a batch of citizen requests in one transaction, enforcing one request per user per 30 days.
+
+    Inputs:
+        requests_df: Columns 'district_id', 'user_hash', 'timestamp' and optionally
+                     'state', 'request_id', 'locality_hash', 'status'.
+
+    Outputs:
+        dict: {'accepted': n, 'rejected': n}
+    """
+    required = ['district_id', 'user_hash', 'timestamp']
+    missing = [col for col in required if col not in requests_df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for request ingestion: {missing}")
+    if requests_df.empty:
+        return {'accepted': 0, 'rejected': 0}
+
+    # Plain Python lists: sqlite3 binds these much faster than iterating pandas string arrays
+    n = len(requests_df)
+    timestamps = np.asarray(_to_epoch_seconds(requests_df['timestamp']), dtype=np.int64)
+    order = np.argsort(timestamps, kind='stable')
+
+    def _column(name, default):
+        if name not in requests_df.columns:
+            return default
+        values = requests_df[name].to_numpy(dtype=object)[order]
+        return [None if pd.isna(v) else str(v) for v in values]
+
+    districts = _districts(requests_df)
+    districts = [districts[i] for i in order]
+    user_hashes = [str(v) for v in requests_df['user_hash'].to_numpy(dtype=object)[order]]
+    timestamps = timestamps[order].tolist()
+    request_ids = _column('request_id', None) or _uuid4_batch(n)
+    locality_hashes = _column('locality_hash', [None] * n)
+    statuses = _column('status', ['PENDING'] * n)
+
+    cooldown = USER_COOLDOWN_DAYS * SECONDS_PER_DAY
+
+    with conn:
+        # Indexed lookup of each user's last accepted request, via a join on the primary key
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_users (user_hash TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("DELETE FROM batch_users")
+        conn.executemany("INSERT OR IGNORE INTO batch_users VALUES (?)", ((u,) for u in set(user_hashes)))
+        last_seen = dict(conn.execute(
+            "SELECT u.user_hash, u.last_timestamp FROM batch_users b JOIN user_last_request u USING (user_hash)"
+        ))
+
+        # Single ordered pass over the batch (it may contain several requests per user)
+        accept = np.zeros(n, dtype=bool)
+        new_last = {}
+        for i, (user, ts) in enumerate(zip(user_hashes, timestamps)):
+            last = new_last.get(user, last_seen.get(user))
+            if last is None or ts >= last + cooldown:
+                accept[i] = True
+                new_last[user] = ts
+
+        # Inserting in (state, district_id, timestamp) order keeps index page writes local
+        idx = sorted(np.flatnonzero(accept).tolist(), key=lambda i: (districts[i], timestamps[i]))
+        conn.executemany(
+            "INSERT INTO requests (request_id, state, district_id, locality_hash, user_hash, timestamp, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((request_ids[i], *districts[i], locality_hashes[i], user_hashes[i], timestamps[i], statuses[i])
+             for i in idx)
+        )
+        conn.executemany(
+            "INSERT INTO user_last_request (user_hash, last_timestamp) VALUES (?, ?) "
+            "ON CONFLICT (user_hash) DO UPDATE SET last_timestamp = MAX(last_timestamp, excluded.last_timestamp)",
+            new_last.items()
+        )
+        dirty = {(*districts[i], timestamps[i] // SECONDS_PER_DAY) for i in idx}
+        conn.executemany("INSERT OR IGNORE INTO dirty_days (state, district_id, day) VALUES (?, ?, ?)", dirty)
+
+    n_accepted = int(accept.sum())
+    logger.info(f"Request batch: {n_accepted} accepted, {n - n_accepted} rejected (30-day rule).")
+    return {'accepted': n_accepted, 'rejected': n - n_accepted}
+
+def aggregate_daily(conn: sqlite3.Connection) -> Set[Tuple[str, str]]:
+    """
+    Incremental daily aggregation: recounts only the (district, day) pairs touched since the
+    last call, using the (state, district_id, timestamp) index.
+
+    Outputs:
+        set: (state, district_id) of the districts whose daily counts changed.
+    """
+    with conn:
+        changed = set(conn.execute("SELECT DISTINCT state, district_id FROM dirty_days"))
+        conn.execute(
+            """
+            INSERT INTO daily_request_counts (state, district_id, day, n_requests)
+            SELECT d.state, d.district_id, d.day,
+                   (SELECT COUNT(*) FROM requests r
+                    WHERE r.state = d.state AND r.district_id = d.district_id
+                      AND r.timestamp >= d.day * :spd AND r.timestamp < (d.day + 1) * :spd)
+            FROM dirty_days d WHERE 1
+            ON CONFLICT (state, district_id, day) DO UPDATE SET n_requests = excluded.n_requests
+            """,
+            {'spd': SECONDS_PER_DAY}
+        )
+        conn.execute("DELETE FROM dirty_days")
+
+    logger.info(f"Daily aggregation refreshed {len(changed)} districts.")
+    return changed
+
+def refresh_hybrid_priority(conn: sqlite3.Connection, cps_df: pd.DataFrame,
+                            changed_districts: Optional[Set[Tuple[str, str]]] = None,
+                            as_of: Optional[pd.Timestamp] = None,
+                            saturation_rate: float = 0.01) -> pd.DataFrame:
+    """
+    Recomputes the hybrid priority for changed districts only.
+
+    A district is recomputed if its request counts changed, its CPS changed, or requests fell out
+    of the 30-day window since the last refresh.
+
+    Confidence Score = min(1, requests_30d / (saturation_rate * total_aadhaar_holders)) * 100
+    Hybrid Priority  = (0.70 * CPS) + (0.30 * Confidence)
+
+    Confidence is normalized by population rather than by the busiest district, so one district's
+    demand never rescales every other district's score.
+
+    Inputs:
+        cps_df: Dataframe with 'district_id', 'cps_score', 'total_aadhaar_holders' and optionally 'state';
+                one row per (state, district_id).
+        changed_districts: Output of aggregate_daily.
+        as_of: Reference date (defaults to today, UTC).
+
+    Outputs:
+        pd.DataFrame: The recomputed hybrid_priority rows.
+    """
+    required = ['district_id', 'cps_score', 'total_aadhaar_holders']
+    missing = [col for col in required if col not in cps_df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for hybrid priority: {missing}")
+
+    as_of = pd.Timestamp.now(tz='UTC') if as_of is None else pd.Timestamp(as_of)
+    as_of_day = int(_to_epoch_seconds(pd.Series([as_of]))[0] // SECONDS_PER_DAY)
+    window_start = as_of_day - CONFIDENCE_WINDOW_DAYS + 1
+
+    with conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS cps_input (state TEXT, district_id TEXT, cps_score REAL, "
+                     "holders REAL, PRIMARY KEY (state, district_id)) WITHOUT ROWID")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS changed (state TEXT, district_id TEXT, "
+                     "PRIMARY KEY (state, district_id)) WITHOUT ROWID")
+        conn.execute("DELETE FROM cps_input")
+        conn.execute("DELETE FROM changed")
+
+        # A repeated (state, district_id) is an error, not a silent overwrite
+        conn.executemany("INSERT INTO cps_input VALUES (?, ?, ?, ?)", (
+            (*district, cps, holders) for district, cps, holders in zip(
+                _districts(cps_df), cps_df['cps_score'].astype(float), cps_df['total_aadhaar_holders'].astype(float))
+        ))
+
+        # 1. Request counts changed
+        conn.executemany("INSERT OR IGNORE INTO changed VALUES (?, ?)", changed_districts or ())
+
+        # 2. CPS changed or district not scored yet
+        conn.execute("""
+            INSERT OR IGNORE INTO changed
+            SELECT c.state, c.district_id FROM cps_input c LEFT JOIN hybrid_priority h USING (state, district_id)
+            WHERE h.district_id IS NULL OR h.cps_score != c.cps_score
+        """)
+
+        # 3. Days that slid out of the window since the previous refresh
+        row = conn.execute("SELECT value FROM engine_state WHERE key = 'last_as_of_day'").fetchone()
+        if row is not None and row[0] < as_of_day:
+            conn.execute("""
+                INSERT OR IGNORE INTO changed
+                SELECT DISTINCT state, district_id FROM daily_request_counts WHERE day >= ? AND day < ?
+            """, (row[0] - CONFIDENCE_WINDOW_DAYS + 1, window_start))
+
+        conn.execute("""
+            INSERT OR REPLACE INTO hybrid_priority
+                (state, district_id, cps_score, requests_30d, confidence_score, hybrid_score, as_of_day)
+            SELECT state, district_id, cps_score, requests_30d, confidence,
+                   ROUND(:w_cps * cps_score + :w_conf * confidence, 2), :as_of_day
+            FROM (
+                SELECT state, district_id, cps_score, requests_30d,
+                       ROUND(MIN(1.0, requests_30d / MAX(:sat * holders, 1.0)) * 100.0, 2) AS confidence
+                FROM (
+                    SELECT c.state, c.district_id, c.cps_score, c.holders,
+                           (SELECT COALESCE(SUM(d.n_requests), 0) FROM daily_request_counts d
+                            WHERE d.state = c.state AND d.district_id = c.district_id
+                              AND d.day BETWEEN :start AND :as_of_day)
+                           AS requests_30d
+                    FROM changed JOIN cps_input c USING (state, district_id)
+                )
+            )
+        """, {'w_cps': W_CPS, 'w_conf': W_CONFIDENCE, 'as_of_day': as_of_day,
+              'sat': saturation_rate, 'start': window_start})
+
+        conn.execute("INSERT OR REPLACE INTO engine_state VALUES ('last_as_of_day', ?)", (as_of_day,))
+
+        updated = pd.read_sql_query(
+            "SELECT h.* FROM hybrid_priority h JOIN changed USING (state, district_id)", conn
+        )
+
+    logger.info(f"Hybrid priority recomputed for {len(updated)} districts.")
+    return updated
+
+def get_hybrid_priority(conn: sqlite3.Connection) -> pd.DataFrame:
+    """
+    Full hybrid ranking, highest priority first, with the rank shift introduced by citizen demand
+    (kept separately for auditability of hybrid adjustments).
+    """
+    df = pd.read_sql_query("SELECT * FROM hybrid_priority", conn)
+    df['cps_rank'] = df['cps_score'].rank(method='first', ascending=False).astype(int)
+    df = df.sort_values('hybrid_score', ascending=False).reset_index(drop=True)
+    df['hybrid_rank'] = df.index + 1
+    df['rank_shift'] = df['cps_rank'] - df['hybrid_rank']
+    return df
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,290 @@
+
+import argparse
+import logging
+import os
+import sys
+from typing import List, Optional
+
+# Only the standard library is imported at module level: pandas, NumPy, pyarrow and the
+# pipeline modules are imported inside the subcommand that needs them, so '--help' and
+# argument errors return immediately and each subcommand loads only its own dependencies.
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+SUMMARY_COLUMNS = ['district_id', 'state', 'cps_score', 'cps_tier', 'bsi_score', 'bsi_tier', 'camp_type']
+
+def _thresholds(value: Optional[str]) -> Optional[List[float]]:
+    return [float(v) for v in value.split(',')] if value else None
+
+def score_state(data_dir: str, state: str, as_of: Optional[str] = None):
+    """
+    Scores the districts of one state through the pipeline's stages after ingestion (cohort
+    projection, demand forecast, anomaly flags, BSI, CPS and strategy; see
+    data_watcher.score_frames), without checkpoints, spatial features or columnar export.
+    Normalization, and therefore every score, is relative to the districts of that state.
+
+    as_of (YYYY-MM-DD, default today) is the reference date, as in the full pipeline.
+
+    Outputs:
+        pd.DataFrame: Ranked districts, the pipeline output's columns minus the spatial ones.
+    """
+    import pandas as pd
+    from src.data_ingestion import load_raw_frames
+    from src.data_watcher import score_frames
+
+    as_of = as_of or pd.Timestamp.now().date().isoformat()
+    frames = load_raw_frames(data_dir, state=state, today=as_of)
+    if all(frames[k].empty for k in ['biometric', 'demographic', 'enrolment']):
+        raise ValueError(f"No rows for state '{state}' in {data_dir}")
+    return score_frames(frames, as_of)['attach_state']
+
+def retier_results(df, bsi_thresholds: Optional[List[float]] = None, cps_thresholds: Optional[List[float]] = None):
+    """
+    Re-assigns 'bsi_tier' / 'cps_tier' from the stored scores, optionally with new cut-offs.
+    Scores, ranks and camp strategy (driven by the CPS score) are unchanged.
+    """
+    import numpy as np
+    from src.scoring_bsi import bsi_tier_codes, BSI_TIERS
+    from src.scoring_cps import cps_tier_codes, CPS_TIERS
+
+    for name, tiers, thresholds in [('BSI', BSI_TIERS, bsi_thresholds), ('CPS', CPS_TIERS, cps_thresholds)]:
+        if thresholds is not None and (len(thresholds) != len(tiers) - 1 or sorted(thresholds, reverse=True) != thresholds):
+            raise ValueError(f"{name} thresholds must be {len(tiers) - 1} descending values, got {thresholds}")
+
+    out = df.copy()
+    bsi_codes = bsi_tier_codes(out['bsi_score'].to_numpy(dtype=float), bsi_thresholds)
+    out['bsi_tier'] = np.array(BSI_TIERS + ['Unknown'])[bsi_codes]
+    cps_codes = cps_tier_codes(out['cps_score'].to_numpy(dtype=float), cps_thresholds)
+    out['cps_tier'] = np.array(CPS_TIERS + ['Unknown'])[cps_codes]
+    return out
+
+def cmd_run(args) -> int:
+    from pipeline_orchestrator import run_aadhaar_netra_pipeline # repository root module
+
+    if not os.path.exists(args.input_path):
+        print(f"Error: '{args.input_path}' folder not found.", file=sys.stderr)
+        return 1
+    run_aadhaar_netra_pipeline(args.input_path, args.output_dir, write_csv=args.csv,
+                               adjacency_path=args.adjacency, use_checkpoints=not args.no_checkpoints,
+                               profile=args.profile, quiet=args.quiet, summary=args.summary,
+                               history_dir=args.history, granularity=args.granularity, as_of=args.as_of)
+    return 0
+
+def cmd_backfill(args) -> int:
+    import time
+    from src.data_ingestion import load_raw_frames, attach_district_names
+    from src.backfill import backfill_scores, backfill_dates, BACKFILL_FILENAME
+    from src.history_store import append_backfill, HISTORY_DIRNAME
+
+    if not os.path.exists(args.data_dir):
+        print(f"Error: '{args.data_dir}' folder not found.", file=sys.stderr)
+        return 1
+    start_time = time.perf_counter()
+    history_dir = args.history or os.path.join(args.output_dir, HISTORY_DIRNAME)
+    # Rows after the last as-of date are rejected like any future-dated row
+    frames = load_raw_frames(args.data_dir, today=args.end, registry_dir=history_dir)
+    dates = backfill_dates(frames, args.start, args.end)
+    scores = backfill_scores(frames, dates, n_entities=len(frames['district_registry']))
+    scores = attach_district_names(scores, frames['district_dim'])
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, BACKFILL_FILENAME)
+    scores.to_parquet(path, index=False)
+    if not args.no_history:
+        append_backfill(history_dir, scores)
+    print(f"Backfilled {scores['as_of'].nunique()} dates ({len(scores)} district rankings) "
+          f"in {time.perf_counter() - start_time:.1f}s -> {path}")
+    return 0
+
+def cmd_download(args) -> int:
+    from src.api_downloader import PageDownloader
+
+    resources = dict(r.split('=', 1) for r in args.resource) or None
+    downloader = PageDownloader(args.base_url, args.cache_dir, resources=resources, api_key=args.api_key,
+                                page_size=args.page_size, connections=args.connections, retries=args.retries)
+    fetched = downloader.download()
+    print(f"Fetched {len(fetched)} pages ({sum(e['rows'] for e in fetched):,} rows); "
+          f"{len(downloader.manifest)} pages cached in {args.cache_dir}")
+    return 0
+
+def cmd_watch(args) -> int:
+    from src.data_watcher import DataWatcher
+
+    if not os.path.exists(args.data_dir):
+        print(f"Error: '{args.data_dir}' folder not found.", file=sys.stderr)
+        return 1
+    watcher = DataWatcher(args.data_dir, args.output_dir, history_dir=args.history, adjacency_path=args.adjacency,
+                          debounce=args.debounce, write_history=not args.no_history)
+    try:
+        watcher.run(interval=args.interval, once=args.once)
+    except KeyboardInterrupt:
+        logger.info("Watch stopped.")
+    return 0
+
+def cmd_score_state(args) -> int:
+    df = score_state(args.data_dir, args.state, args.as_of)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        df.to_csv(args.output, index=False)
+        logger.info(f"Saved {len(df)} scored districts to {args.output}")
+
+    if args.summary:
+        from src.run_summary import summarize_run, render_summary
+        print(render_summary(summarize_run(df)))
+    print(f"\n{args.state}: {len(df)} districts")
+    print(df['cps_tier'].value_counts().sort_index().to_string())
+    print(df[[c for c in SUMMARY_COLUMNS if c in df.columns]].head(args.top).to_string(index=False))
+    return 0
+
+def cmd_retier(args) -> int:
+    from datetime import datetime
+    from src.result_export import find_results, read_results, read_run_metadata, export_results, write_csv_views
+
+    path = find_results(args.output_dir)
+    df = read_results(path, memory_map=False)
+    before = df['cps_tier'].astype(str)
+    df = retier_results(df, _thresholds(args.bsi_thresholds), _thresholds(args.cps_thresholds))
+
+    if path.endswith('.csv'):
+        write_csv_views(df, args.output_dir)
+    else:
+        metadata = read_run_metadata(path)
+        metadata['retiered_at'] = datetime.now().isoformat()
+        metadata['tier_thresholds'] = {'bsi': args.bsi_thresholds, 'cps': args.cps_thresholds}
+        export_results(df, args.output_dir, run_metadata=metadata,
+                       write_csv=os.path.exists(os.path.join(args.output_dir, "final_ranked_districts.csv")))
+
+    changed = int((before.to_numpy() != df['cps_tier'].astype(str).to_numpy()).sum())
+    print(f"Re-tiered {len(df)} districts ({changed} changed CPS tier)")
+    print(df['cps_tier'].value_counts().sort_index().to_string())
+    return 0
+
+def cmd_history(args) -> int:
+    from src.history_store import list_runs, read_run
+
+    if args.as_of is None:
+        print(list_runs(args.history_dir).to_string(index=False))
+        return 0
+    df = read_run(args.history_dir, args.as_of)
+    print(df[['cps_rank', 'district_id', 'cps_score', 'cps_tier', 'bsi_score', 'bsi_tier']].head(args.top).to_string(index=False))
+    return 0
+
+def cmd_compare(args) -> int:
+    from src.history_store import compare_runs, tier_transitions, moved_into_tier, top_n_churn
+
+    cmp = compare_runs(args.history_dir, args.old, args.new)
+    cols = ['district_id', 'rank_old', 'rank_new', 'rank_delta', 'cps_tier_old', 'cps_tier_new']
+    print(f"Run {cmp.attrs['old_run']} -> {cmp.attrs['new_run']}: {len(cmp)} districts")
+
+    print("\nTier transitions:")
+    print(tier_transitions(cmp).to_string())
+
+    moved = moved_into_tier(cmp, args.tier)
+    print(f"\nMoved into {args.tier}: {len(moved)}")
+    if len(moved):
+        print(moved[cols].to_string(index=False))
+
+    churn = top_n_churn(cmp, args.top)
+    print(f"\nTop {args.top} churn: {churn['churn']:.0%} (entered: {', '.join(churn['entered']) or '-'}; "
+          f"exited: {', '.join(churn['exited']) or '-'})")
+
+    movers = cmp.dropna(subset=['rank_delta'])
+    movers = movers.iloc[movers['rank_delta'].abs().to_numpy().argsort(kind='stable')[::-1]]
+    print(f"\nLargest rank changes:")
+    print(movers[cols].head(args.top).to_string(index=False))
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Aadhaar Netra command line")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors; 'run' prints nothing")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Full pipeline (checkpointed DAG, columnar export)")
+    run.add_argument("input_path", nargs="?", default="data")
+    run.add_argument("output_dir", nargs="?", default="final_output_real")
+    run.add_argument("--csv", action="store_true", help="Also write the CSV views")
+    run.add_argument("--adjacency", default=None, help="District adjacency .npz for the spatial features")
+    run.add_argument("--no-checkpoints", action="store_true")
+    run.add_argument("--profile", action="store_true")
+    run.add_argument("--summary", action="store_true", help="Compute and log run summary statistics")
+    run.add_argument("--history", default=None, help="History store to append to (default <output_dir>/history)")
+    run.add_argument("--granularity", choices=["district", "pincode"], default="district",
+                     help="Score districts, or pincodes with district and state roll-ups")
+    run.add_argument("--as-of", default=None, help="Reference date YYYY-MM-DD (default: today)")
+    run.set_defaults(func=cmd_run)
+
+    backfill = sub.add_parser("backfill", help="Daily district BSI/CPS rankings for a range of as-of dates in one pass "
+                                     "(no cohort, forecast, strategy or anomaly columns)")
+    backfill.add_argument("data_dir", nargs="?", default="data")
+    backfill.add_argument("output_dir", nargs="?", default="final_output_real")
+    backfill.add_argument("--start", default=None, help="First as-of date (default: first date in the data)")
+    backfill.add_argument("--end", default=None, help="Last as-of date (default: last date in the data)")
+    backfill.add_argument("--history", default=None, help="History store to append to (default <output_dir>/history)")
+    backfill.add_argument("--no-history", action="store_true", help="Only write the rankings file")
+    backfill.set_defaults(func=cmd_backfill)
+
+    download = sub.add_parser("download", help="Fetch the paginated API resources into a Parquet ingestion cache")
+    download.add_argument("base_url", help="e.g. https://api.data.gov.in/resource")
+    download.add_argument("cache_dir", nargs="?", default="data_cache")
+    download.add_argument("--resource", action="append", default=[], metavar="KIND=ID",
+                          help="Resource path per kind (biometric, demographic, enrolment); default: the kind name")
+    download.add_argument("--api-key", default=os.environ.get("DATA_GOV_API_KEY"))
+    download.add_argument("--page-size", type=int, default=500_000)
+    download.add_argument("--connections", type=int, default=4, help="Concurrent keep-alive connections")
+    download.add_argument("--retries", type=int, default=3, help="Retries per page (failed or short)")
+    download.set_defaults(func=cmd_download)
+
+    watch = sub.add_parser("watch", help="Re-score and publish as new files land in the data folder")
+    watch.add_argument("data_dir", nargs="?", default="data")
+    watch.add_argument("output_dir", nargs="?", default="final_output_real")
+    watch.add_argument("--interval", type=float, default=1.0, help="Seconds between scans")
+    watch.add_argument("--debounce", type=float, default=2.0, help="Seconds a batch of new files must be unchanged")
+    watch.add_argument("--adjacency", default=None, help="District adjacency .npz for the spatial features")
+    watch.add_argument("--history", default=None, help="History store to append to (default <output_dir>/history)")
+    watch.add_argument("--no-history", action="store_true", help="Do not append each publish to the history store")
+    watch.add_argument("--once", action="store_true", help="Process the files present now and exit")
+    watch.set_defaults(func=cmd_watch)
+
+    score = sub.add_parser("score-state", help="Score the districts of one state (no export or spatial features)")
+    score.add_argument("state")
+    score.add_argument("--data-dir", default="data")
+    score.add_argument("--as-of", default=None, help="Reference date YYYY-MM-DD (default: today)")
+    score.add_argument("--output", default=None, help="Write the scored districts to this CSV")
+    score.add_argument("--top", type=int, default=10)
+    score.add_argument("--summary", action="store_true", help="Also print feature, score and tier statistics")
+    score.set_defaults(func=cmd_score_state)
+
+    retier = sub.add_parser("retier", help="Re-assign tiers of exported results from the stored scores")
+    retier.add_argument("output_dir", nargs="?", default="final_output_real")
+    retier.add_argument("--bsi-thresholds", default=None, help="e.g. 0.75,0.5,0.25")
+    retier.add_argument("--cps-thresholds", default=None, help="e.g. 85,70,55,40")
+    retier.set_defaults(func=cmd_retier)
+
+    history = sub.add_parser("history", help="List stored runs, or show the ranking as of a date / run id")
+    history.add_argument("history_dir", nargs="?", default="final_output_real/history")
+    history.add_argument("--as-of", default=None, help="Date (latest run on or before it) or run id")
+    history.add_argument("--top", type=int, default=20)
+    history.set_defaults(func=cmd_history)
+
+    compare = sub.add_parser("compare", help="Rank deltas, tier transitions and top-N churn between two runs")
+    compare.add_argument("history_dir", nargs="?", default="final_output_real/history")
+    compare.add_argument("--old", default=None, help="Date or run id (default: run before --new)")
+    compare.add_argument("--new", default=None, help="Date or run id (default: latest run)")
+    compare.add_argument("--tier", default="Tier 1")
+    compare.add_argument("--top", type=int, default=20)
+    compare.set_defaults(func=cmd_compare)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format=LOG_FORMAT)
+    try:
+        return args.func(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.cli {run,backfill,download,watch,score-state,retier,history,compare} ...
+    sys.exit(main())
@@ -0,0 +1,163 @@
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional, Tuple
+
+from src.data_aggregation import _id_column
+from src.dimensions import DIMENSIONS, code_labels
+
+logger = logging.getLogger(__name__)
+
+MBU_STEM = "mbu_projection"
+# Enrolment age bands in years [from, to) and the ages at which a biometric update is mandatory
+BANDS = {'age_0_5': (0, 5), 'age_5_17': (5, 18)}
+MBU_AGES = (5, 15)
+DEFAULT_HORIZON_MONTHS = 24
+# Biometric updates of 5-17 year olds count as mandatory updates done
+DONE_COLUMN = 'bio_age_5_17'
+COHORT_FEATURES = ['mbu_due_to_date', 'mbu_done_to_date', 'mbu_due_not_done', 'mbu_due_next_12m']
+
+def month_index(dates: pd.Series, origin: pd.Timestamp) -> np.ndarray:
+    return ((dates.dt.year - origin.year) * 12 + (dates.dt.month - origin.month)).to_numpy(dtype=np.int64)
+
+def monthly_array(df: pd.DataFrame, column: str, id_col: str, origin: pd.Timestamp,
+                  n_months: int, n_entities: int) -> np.ndarray:
+    """
+    (entities x months) sums of one count column by entity code and calendar month since origin.
+    """
+    out = np.zeros(n_entities * n_months)
+    if df.empty or column not in df.columns:
+        return out.reshape(n_entities, n_months)
+    month = month_index(df['date'], origin)
+    code = df[id_col].to_numpy(dtype=np.int64)
+    valid = (month >= 0) & (month < n_months) & (code >= 0)
+    cell = code[valid] * n_months + month[valid]
+    out = np.bincount(cell, df[column].to_numpy(dtype=np.float64)[valid], minlength=n_entities * n_months)
+    return out.reshape(n_entities, n_months)
+
+def cohort_windows(band: Tuple[int, int], ages=MBU_AGES) -> Dict[int, Tuple[int, int]]:
+    """
+    Months after enrolment in which a child of the band reaches each mandatory-update age,
+    as (first, last) month offsets. Ages are taken as uniform within the band, so 1/12 of a
+    band-year of the cohort falls due in every month of the window; ages at or below the start
+    of the band do not apply (the biometrics were captured at enrolment).
+    """
+    start, end = band
+    return {age: (max((age - end) * 12, 0) + 1, (age - start) * 12) for age in ages if age > start}
+
+def box_shift(x: np.ndarray, first: int, last: int, weight: float) -> np.ndarray:
+    """
+    Cohort shift of monthly counts by a box kernel, for all entities at once:
+    out[:, t] = weight * sum(x[:, t - last : t - first + 1]), with prefix sums.
+    """
+    n = x.shape[1]
+    csum = np.pad(np.cumsum(x, axis=1), ((0, 0), (1, 0)))
+    t = np.arange(n)
+    hi = np.clip(t - first + 1, 0, n)
+    lo = np.clip(t - last, 0, n)
+    return weight * (csum[:, hi] - csum[:, lo])
+
+def project_mandatory_updates(frames: Dict[str, pd.DataFrame], as_of: Optional[str] = None, key: str = 'district',
+                              horizon_months: int = DEFAULT_HORIZON_MONTHS) -> Dict[str, pd.DataFrame]:
+    """
+    Projects the mandatory biometric updates (at age 5 and 15) falling due per district (or
+    pincode) and month, from the children enrolled in the data.
+
+    The enrolment rows are kept by age band as monthly (entities x months) arrays; each band is
+    shifted forward by the box kernel of every update age (cohort_windows), e.g. a child
+    enrolled at 0-5 is due at 5 within the next 60 months (1/60 of the cohort per month) and at
+    15 in months 121-180. Biometric updates of 5-17 year olds (bio_age_5_17) count as done.
+    Only cohorts enrolled since the first month of the data are projected.
+
+    Inputs:
+        frames: Ingested frames ('enrolment' and 'biometric' with parsed dates and int32 codes,
+                '<key>_registry' for the code space and labels).
+        as_of: Reference date (default: today); the projection runs from its month on.
+        horizon_months: Months projected after the as-of month.
+
+    Outputs:
+        dict:
+        - 'features': One row per entity with child enrolments: 'mbu_due_to_date' (due up to
+          the as-of month), 'mbu_done_to_date', 'mbu_due_not_done' (due minus done, >= 0) and
+          'mbu_due_next_12m'.
+        - 'monthly': Long format, one row per (entity, month) from the first enrolment month to
+          the horizon: 'month', 'mbu_due_age_5', 'mbu_due_age_15', 'mbu_due', 'mbu_done' (NaN
+          after the as-of month) and 'projected'.
+    """
+    id_col = _id_column(key)
+    label_col = DIMENSIONS[key][1]
+    end = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+    enrol = frames.get('enrolment', pd.DataFrame())
+    bio = frames.get('biometric', pd.DataFrame())
+    enrol = enrol[enrol['date'] <= end] if not enrol.empty else enrol
+    bio = bio[bio['date'] <= end] if not bio.empty else bio
+    registry = frames.get(f"{key}_registry")
+    n_entities = len(registry) if registry is not None else max(
+        (int(df[id_col].max()) + 1 for df in (enrol, bio) if not df.empty), default=0)
+
+    features_columns = [id_col] + COHORT_FEATURES
+    monthly_columns = ([id_col, label_col, 'month'] + [f"mbu_due_age_{age}" for age in MBU_AGES]
+                       + ['mbu_due', 'mbu_done', 'projected'])
+    if enrol.empty or n_entities == 0:
+        logger.warning("No enrolment rows: mandatory update projection skipped.")
+        return {'features': pd.DataFrame(columns=features_columns), 'monthly': pd.DataFrame(columns=monthly_columns)}
+
+    first = enrol['date'].min()
+    origin = pd.Timestamp(year=first.year, month=first.month, day=1)
+    current = month_index(pd.Series([end]), origin)[0]
+    n_months = current + 1 + horizon_months
+    logger.info(f"Projecting mandatory biometric updates of {n_entities} {key}s from "
+                f"{origin.strftime('%Y-%m')} to {horizon_months} months after {end.strftime('%Y-%m')}...")
+
+    due = {age: np.zeros((n_entities, n_months)) for age in MBU_AGES}
+    children = np.zeros(n_entities)
+    for column, band in BANDS.items():
+        enrolled = monthly_array(enrol, column, id_col, origin, n_months, n_entities)
+        children += enrolled.sum(axis=1)
+        weight = 1.0 / (12 * (band[1] - band[0]))
+        for age, (lo, hi) in cohort_windows(band).items():
+            due[age] += box_shift(enrolled, lo, hi, weight)
+    total_due = sum(due.values())
+    done = monthly_array(bio, DONE_COLUMN, id_col, origin, n_months, n_entities)
+
+    active = children > 0
+    due_to_date = total_due[:, :current + 1].sum(axis=1)
+    done_to_date = done[:, :current + 1].sum(axis=1)
+    features = pd.DataFrame({
+        id_col: np.arange(n_entities, dtype=np.int32),
+        'mbu_due_to_date': due_to_date,
+        'mbu_done_to_date': done_to_date,
+        'mbu_due_not_done': np.maximum(due_to_date - done_to_date, 0.0),
+        'mbu_due_next_12m': total_due[:, current + 1:current + 13].sum(axis=1)
+    })[active].reset_index(drop=True)
+
+    codes = np.flatnonzero(active).astype(np.int32)
+    months = pd.date_range(origin, periods=n_months, freq='MS')
+    projected = np.arange(n_months) > current
+    monthly = pd.DataFrame({
+        id_col: np.repeat(codes, n_months),
+        label_col: np.repeat(code_labels(registry, codes, label_col, id_col), n_months) if registry is not None else None,
+        'month': np.tile(months, len(codes)),
+        **{f"mbu_due_age_{age}": due[age][active].ravel() for age in MBU_AGES},
+        'mbu_due': total_due[active].ravel(),
+        'mbu_done': np.where(projected, np.nan, done[active]).ravel(),
+        'projected': np.tile(projected, len(codes))
+    })
+    logger.info(f"Mandatory updates: {due_to_date.sum():,.0f} due to date, {features['mbu_due_not_done'].sum():,.0f} "
+                f"not done, {features['mbu_due_next_12m'].sum():,.0f} due in the next 12 months.")
+    return {'features': features, 'monthly': monthly}
+
+def add_cohort_features(df: pd.DataFrame, cohort: pd.DataFrame, key: str = 'district') -> pd.DataFrame:
+    """
+    Merges the mandatory-update features into the aggregated table (0 for entities without
+    child enrolments), ahead of feature engineering and normalization.
+    """
+    id_col = _id_column(key)
+    out = df.drop(columns=[c for c in COHORT_FEATURES if c in df.columns])
+    out = out.merge(cohort[[id_col] + COHORT_FEATURES], on=id_col, how='left')
+    out[COHORT_FEATURES] = out[COHORT_FEATURES].fillna(0.0)
+    return out
+
+if __name__ == "__main__":
+    pass
@@ -1,73 +1,84 @@
 
 import pandas as pd
+import numpy as np
 import logging
 from typing import Dict
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def aggregate_to_district_level(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+# Entity key per granularity: int32 code column of the ingested frames (see src/dimensions.py),
+# kept as the id column of the aggregates
+GRANULARITIES = {'district': 'district_code', 'pincode': 'pincode_code'}
+
+ENROLMENT_AGE_COLS = ['age_0_5', 'age_5_17', 'age_18_greater']
+BIOMETRIC_AGE_COLS = ['bio_age_5_17', 'bio_age_17_']
+DEMOGRAPHIC_AGE_COLS = ['demo_age_5_17', 'demo_age_17_']
+
+def _id_column(key: str) -> str:
+    if key not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{key}' (expected one of {list(GRANULARITIES)})")
+    return GRANULARITIES[key]
+
+def aggregate_enrolment(df_enrol: pd.DataFrame, key: str = 'district') -> pd.DataFrame:
     """
-    Aggregates multi-source data (Biometric, Demographic, Enrolment) to district level.
-    
-    Outputs a DataFrame with:
-    - district_id
-    - total_aadhaar_holders
-    - total_biometric_updates
-    - total_demographic_updates
-    - biometric_coverage_count (proxied by total biometrics here)
-    - last_biometric_update_date
+    Enrolment (base for population): 'district_code' (or 'pincode_code', see GRANULARITIES), 'total_aadhaar_holders'.
     """
-    logger.info("Aggregating multi-source data...")
+    id_col = _id_column(key)
+    if df_enrol.empty:
+        return pd.DataFrame(columns=[id_col, 'total_aadhaar_holders'])
     
-    # 1. Enrolment (Base for Population)
-    df_enrol = dfs.get('enrolment', pd.DataFrame())
-    if not df_enrol.empty:
-        # Sum age groups to get totals
-        # Check columns existence
-        req_cols = ['age_0_5', 'age_5_17', 'age_18_greater']
-        for c in req_cols:
-            if c not in df_enrol.columns:
-                df_enrol[c] = 0
-                
-        df_enrol['total_holders'] = df_enrol['age_0_5'] + df_enrol['age_5_17'] + df_enrol['age_18_greater']
-        
-        agg_enrol = df_enrol.groupby('district')['total_holders'].sum().reset_index()
-        agg_enrol.rename(columns={'district': 'district_id', 'total_holders': 'total_aadhaar_holders'}, inplace=True)
-    else:
-        agg_enrol = pd.DataFrame(columns=['district_id', 'total_aadhaar_holders'])
+    # Sum age groups to get totals; missing age columns count as 0
+    total_holders = df_enrol.reindex(columns=ENROLMENT_AGE_COLS, fill_value=0).sum(axis=1)
+    
+    agg_enrol = total_holders.groupby(df_enrol[id_col]).sum().reset_index()
+    agg_enrol.columns = [id_col, 'total_aadhaar_holders']
+    return agg_enrol
 
-    # 2. Biometric
-    df_bio = dfs.get('biometric', pd.DataFrame())
-    if not df_bio.empty:
-        df_bio['total_bio'] = df_bio.get('bio_age_5_17', 0) + df_bio.get('bio_age_17_', 0)
-        
-        # Updates Count
-        agg_bio_count = df_bio.groupby('district')['total_bio'].sum().reset_index()
-        agg_bio_count.rename(columns={'district': 'district_id', 'total_bio': 'total_biometric_updates'}, inplace=True)
-        
-        # Max Date
-        agg_bio_date = df_bio.groupby('district')['date'].max().reset_index()
-        agg_bio_date.rename(columns={'district': 'district_id', 'date': 'last_biometric_update_date'}, inplace=True)
-    else:
-        agg_bio_count = pd.DataFrame(columns=['district_id', 'total_biometric_updates'])
-        agg_bio_date = pd.DataFrame(columns=['district_id', 'last_biometric_update_date'])
+def aggregate_biometric(df_bio: pd.DataFrame, key: str = 'district') -> pd.DataFrame:
+    """
+    Biometric: 'district_code' (or 'pincode_code'), 'total_biometric_updates', 'last_biometric_update_date'.
+    """
+    id_col = _id_column(key)
+    if df_bio.empty:
+        return pd.DataFrame(columns=[id_col, 'total_biometric_updates', 'last_biometric_update_date'])
+    
+    total_bio = df_bio.reindex(columns=BIOMETRIC_AGE_COLS, fill_value=0).sum(axis=1)
+    
+    # Updates Count and Max Date in one grouping
+    agg_bio = pd.DataFrame({'total_biometric_updates': total_bio, 'last_biometric_update_date': df_bio['date']})
+    agg_bio = agg_bio.groupby(df_bio[id_col]).agg({
+        'total_biometric_updates': 'sum',
+        'last_biometric_update_date': 'max'
+    })
+    agg_bio.index.name = id_col
+    return agg_bio.reset_index()
 
-    # 3. Demographic
-    df_demo = dfs.get('demographic', pd.DataFrame())
-    if not df_demo.empty:
-        df_demo['total_demo'] = df_demo.get('demo_age_5_17', 0) + df_demo.get('demo_age_17_', 0)
-        agg_demo = df_demo.groupby('district')['total_demo'].sum().reset_index()
-        agg_demo.rename(columns={'district': 'district_id', 'total_demo': 'total_demographic_updates'}, inplace=True)
-    else:
-        agg_demo = pd.DataFrame(columns=['district_id', 'total_demographic_updates'])
+def aggregate_demographic(df_demo: pd.DataFrame, key: str = 'district') -> pd.DataFrame:
+    """
+    Demographic: 'district_code' (or 'pincode_code'), 'total_demographic_updates'.
+    """
+    id_col = _id_column(key)
+    if df_demo.empty:
+        return pd.DataFrame(columns=[id_col, 'total_demographic_updates'])
+    
+    total_demo = df_demo.reindex(columns=DEMOGRAPHIC_AGE_COLS, fill_value=0).sum(axis=1)
+    agg_demo = total_demo.groupby(df_demo[id_col]).sum().reset_index()
+    agg_demo.columns = [id_col, 'total_demographic_updates']
+    return agg_demo
 
-    # 4. Merge All
+def merge_district_aggregates(agg_enrol: pd.DataFrame, agg_bio: pd.DataFrame, agg_demo: pd.DataFrame,
+                              key: str = 'district') -> pd.DataFrame:
+    """
+    Merges the per-source aggregates into the district (or pincode) vector (see aggregate_to_district_level).
+    """
+    id_col = _id_column(key)
+    agg_bio_count = agg_bio[[id_col, 'total_biometric_updates']]
+    agg_bio_date = agg_bio[[id_col, 'last_biometric_update_date']]
+    
     # Start with enrolment (population base)
     if agg_enrol.empty and not agg_bio_count.empty:
         # Fallback if no enrolment file but bio exists
-        base_df = agg_bio_count[['district_id']].drop_duplicates()
+        base_df = agg_bio_count[[id_col]].drop_duplicates()
     elif not agg_enrol.empty:
         base_df = agg_enrol
     else:
@@ -75,21 +86,45 @@ def aggregate_to_district_level(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         return pd.DataFrame()
 
     # Merge Biometric
-    base_df = pd.merge(base_df, agg_bio_count, on='district_id', how='left').fillna(0)
-    base_df = pd.merge(base_df, agg_bio_date, on='district_id', how='left')
+    base_df = pd.merge(base_df, agg_bio_count, on=id_col, how='left').fillna(0)
+    base_df = pd.merge(base_df, agg_bio_date, on=id_col, how='left')
     
     # Merge Demographic
-    base_df = pd.merge(base_df, agg_demo, on='district_id', how='left').fillna(0)
+    base_df = pd.merge(base_df, agg_demo, on=id_col, how='left').fillna(0)
     
     # Biometric Coverage Count proxy
     # In this dataset, total_biometric_updates is our best proxy for coverage activity
     base_df['biometric_coverage_count'] = base_df['total_biometric_updates']
     
-    # Ensure ID string
-    base_df['district_id'] = base_df['district_id'].astype(str)
+    # Integer codes; names are attached at export
+    base_df[id_col] = base_df[id_col].astype(np.int32)
     
-    logger.info(f"Aggregated data for {len(base_df)} districts.")
+    logger.info(f"Aggregated data for {len(base_df)} {key}s.")
     return base_df
 
+def aggregate_to_district_level(dfs: Dict[str, pd.DataFrame], key: str = 'district') -> pd.DataFrame:
+    """
+    Aggregates multi-source data (Biometric, Demographic, Enrolment) to district level
+    (or pincode level with key='pincode': same columns, 'pincode_code' instead of 'district_code').
+    
+    The three per-source aggregations are independent (the DAG orchestrator runs them
+    concurrently); merge_district_aggregates joins them.
+    
+    Outputs a DataFrame with:
+    - district_code (int32, see src/dimensions.py)
+    - total_aadhaar_holders
+    - total_biometric_updates
+    - total_demographic_updates
+    - biometric_coverage_count (proxied by total biometrics here)
+    - last_biometric_update_date
+    """
+    logger.info("Aggregating multi-source data...")
+    
+    agg_enrol = aggregate_enrolment(dfs.get('enrolment', pd.DataFrame()), key)
+    agg_bio = aggregate_biometric(dfs.get('biometric', pd.DataFrame()), key)
+    agg_demo = aggregate_demographic(dfs.get('demographic', pd.DataFrame()), key)
+    
+    return merge_district_aggregates(agg_enrol, agg_bio, agg_demo, key)
+
 if __name__ == "__main__":
     pass
@@ -3,22 +3,108 @@ import pandas as pd
 import logging
 import os
 import glob
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.data_quality import validate_frame, combine_reports
+from src.dimensions import DIMENSIONS, load_registries, save_registries, encode, code_labels
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def load_raw_data(data_dir: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+# Raw entity columns, replaced by their int32 dimension codes during ingestion
+ENTITY_COLUMNS = ['state', 'district', 'pincode']
+# Raw drops: API pages as CSV, or as Parquet from the download cache (src/api_downloader.py)
+RAW_PATTERNS = ["*.csv", "*.parquet"]
+
+def raw_files(data_dir: str) -> List[str]:
+    return sorted(f for pattern in RAW_PATTERNS for f in glob.glob(os.path.join(data_dir, pattern)))
+
+def build_district_dim(pair_counts: List[pd.Series], registries: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combines per-file (state_code, district_code) row counts into a dimension table with one
+    row per district; names are looked up once per district from the registries.
+    
+    District codes are keyed on (state, district), so a district name used in several states
+    (e.g. Raigarh, Warangal) is one row, and one code, per state.
+    
+    Outputs:
+        pd.DataFrame: 'state', 'district', 'state_code', 'district_code', 'n_rows',
+                      'n_states' (states the district name appears in), 'is_ambiguous' (n_states > 1).
+    """
+    if not pair_counts:
+        return pd.DataFrame(columns=['state', 'district', 'state_code', 'district_code', 'n_rows', 'n_states',
+                                     'is_ambiguous'])
+    
+    dim = pd.concat(pair_counts).groupby(level=['state_code', 'district_code']).sum().rename('n_rows').reset_index()
+    dim.insert(0, 'state', code_labels(registries['state'], dim['state_code'], 'state', 'state_code').astype(str))
+    dim.insert(1, 'district', code_labels(registries['district'], dim['district_code']).astype(str))
+    dim['n_states'] = dim.groupby('district')['state_code'].transform('size')
+    dim['is_ambiguous'] = dim['n_states'] > 1
+    return dim.sort_values(['district', 'state']).reset_index(drop=True)
+
+def attach_district_names(df: pd.DataFrame, district_dim: pd.DataFrame, key: str = 'district_code') -> pd.DataFrame:
+    """
+    Attaches the district name ('district_id', first column) and its 'state' to a
+    district-coded frame, with one integer join on the dimension table.
+    """
+    names = district_dim[['district_code', 'district', 'state']].rename(columns={'district_code': key, 'district': 'district_id'})
+    
+    out = df.drop(columns=['district_id', 'state'], errors='ignore')
+    out = out.merge(names, on=key, how='left')
+    out['district_id'] = out['district_id'].fillna('Unknown')
+    out['state'] = out['state'].fillna('Unknown')
+    return out[['district_id'] + [c for c in out.columns if c != 'district_id']]
+
+def encode_entities(df: pd.DataFrame, registries: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Replaces the raw 'state', 'district' and 'pincode' columns by int32 codes ('state_code',
+    'district_code', 'pincode_code'; see src/dimensions.py), registering unseen values.
+    Districts are encoded as (state, district) pairs.
     """
-    Reads multiple CSV files from the data directory, separated by type:
+    out = df.drop(columns=[c for c in ENTITY_COLUMNS if c in df.columns])
+    for col in ENTITY_COLUMNS:
+        if col not in df.columns:
+            continue
+        if col == 'district':
+            keys = pd.DataFrame({'state': df['state'] if 'state' in df.columns else None, 'district_id': df[col]})
+            out[DIMENSIONS[col][2]] = encode(registries, col, keys)
+        else:
+            out[DIMENSIONS[col][2]] = encode(registries, col, df[col])
+    return out
+
+def state_mask(states: pd.Series, state: str) -> pd.Series:
+    """
+    Rows of one state, matched case- and whitespace-insensitively.
+    """
+    return states.astype(str).str.strip().str.lower() == state.strip().lower()
+
+def load_raw_data(data_dir: str, state: Optional[str] = None, today: Optional[pd.Timestamp] = None,
+                  registry_dir: Optional[str] = None,
+                  files: Optional[List[str]] = None) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+    """
+    Reads multiple CSV (or cached Parquet) files from the data directory, separated by type:
     - Biometric
     - Demographic
     - Enrolment
     
+    The (state, district) dimension table is collected in the same pass (see build_district_dim).
+    With state set, only that state's rows are kept (filtered per file, before concatenation).
+    
+    Each file is validated as it is read (src/data_quality.py): rejected rows (bad dates,
+    negative or non-numeric counts, malformed pincodes, unknown states, ...) are left out and
+    reported in metadata['quality'] ('quality_counts', 'quality_samples', 'quarantine').
+    Dates after `today` (default: now) are rejected.
+    
+    State, district and pincode are then replaced by stable int32 codes ('state_code',
+    'district_code', 'pincode_code') from the registries in registry_dir (extended with any new
+    values and saved back; None uses in-memory registries). Names are attached at export.
+    
+    files limits ingestion to those files (e.g. only the newly arrived ones, see src/data_watcher.py).
+    A file that cannot be read is logged and skipped; metadata lists the files read and failed.
+    
     Returns:
         dfs: Dictionary {'biometric': df, 'demographic': df, 'enrolment': df}
-        metadata: Summary stats
+        metadata: Summary stats, plus 'district_dim', 'registries' ({'district', 'state', 'pincode'}),
+                  'files_read' and 'files_failed' (paths)
     """
     logger.info(f"Scanning data directory: {data_dir}")
     
@@ -28,16 +114,29 @@ def load_raw_data(data_dir: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any
         'enrolment': []
     }
     
+    # (state, district) row counts per file, collected while each frame is in memory
+    pair_counts = []
+    reports = []
+    registries = load_registries(registry_dir)
+    known = {name: len(registry) for name, registry in registries.items()}
+    
     # Identify files
-    all_files = glob.glob(os.path.join(data_dir, "*.csv"))
+    all_files = raw_files(data_dir) if files is None else list(files)
+    files_read, files_failed = [], []
     
     for f in all_files:
         filename = os.path.basename(f)
         try:
-            df = pd.read_csv(f)
-            # Standardize date format
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
+            df = pd.read_parquet(f) if f.endswith('.parquet') else pd.read_csv(f)
+            # Validation parses dates, counts and states in the same pass
+            df, report = validate_frame(df, filename, today)
+            reports.append(report)
+            if state is not None and 'state' in df.columns:
+                df = df[state_mask(df['state'], state)].reset_index(drop=True)
+            
+            df = encode_entities(df, registries)
+            if {'state_code', 'district_code'}.issubset(df.columns):
+                pair_counts.append(df.groupby(['state_code', 'district_code']).size())
             
             if 'biometric' in filename:
                 datasets['biometric'].append(df)
@@ -47,9 +146,11 @@ def load_raw_data(data_dir: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any
                 datasets['enrolment'].append(df)
             else:
                 logger.warning(f"Unknown file type: {filename}")
+            files_read.append(f)
                 
         except Exception as e:
             logger.error(f"Failed to read {f}: {e}")
+            files_failed.append(f)
 
     # Merge and Validate
     final_dfs = {}
@@ -66,12 +167,43 @@ def load_raw_data(data_dir: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any
             row_counts[key] = 0
             logger.warning(f"No files found for {key}")
 
+    # Registries are only rewritten when new values were registered (they are cache-key inputs)
+    grown = {name: registry for name, registry in registries.items() if len(registry) > known[name]}
+    if registry_dir and grown:
+        save_registries(registry_dir, grown)
+    district_dim = build_district_dim(pair_counts, registries)
+    shared = district_dim[district_dim['is_ambiguous']]
+    if not shared.empty:
+        logger.info(f"{shared['district'].nunique()} district names appear in more than one state "
+                    f"(scored as separate districts).")
+
+    quality = combine_reports(reports)
+    if len(quality['quarantine']):
+        logger.warning(f"Quarantined {len(quality['quarantine'])} rows that failed validation.")
+
     metadata = {
         'row_counts': row_counts,
-        'source_dir': data_dir
+        'source_dir': data_dir,
+        'district_dim': district_dim,
+        'registries': registries,
+        'quality': quality,
+        'files_read': files_read,
+        'files_failed': files_failed
     }
     
     return final_dfs, metadata
 
+def load_raw_frames(data_dir: str, state: Optional[str] = None, today: Optional[pd.Timestamp] = None,
+                    registry_dir: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    load_raw_data as frames only (the pipeline DAG checkpoints stage outputs as tables):
+    'biometric', 'demographic', 'enrolment', 'district_dim', the registries ('district_registry',
+    'state_registry', 'pincode_registry') and the data-quality frames 'quality_counts',
+    'quality_samples', 'quarantine'.
+    """
+    dfs, metadata = load_raw_data(data_dir, state, today, registry_dir)
+    registries = {f"{name}_registry": registry for name, registry in metadata['registries'].items()}
+    return {**dfs, 'district_dim': metadata['district_dim'], **registries, **metadata['quality']}
+
 if __name__ == "__main__":
     pass
@@ -0,0 +1,223 @@
+
+import pandas as pd
+import numpy as np
+import logging
+import re
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ID_COLUMNS = ['date', 'state', 'district', 'pincode']
+DATE_FORMAT = '%d-%m-%Y'
+DEFAULT_SAMPLE_SIZE = 20
+QUARANTINE_FILENAME = "quarantine.csv"
+QUALITY_REPORT_FILENAME = "data_quality_report.csv"
+QUALITY_SAMPLES_FILENAME = "data_quality_samples.csv"
+
+# States and union territories (current names; Dadra and Nagar Haveli / Daman and Diu merged in 2020)
+KNOWN_STATES = [
+    'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh', 'Goa', 'Gujarat', 'Haryana',
+    'Himachal Pradesh', 'Jharkhand', 'Karnataka', 'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Manipur',
+    'Meghalaya', 'Mizoram', 'Nagaland', 'Odisha', 'Punjab', 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana',
+    'Tripura', 'Uttar Pradesh', 'Uttarakhand', 'West Bengal', 'Andaman and Nicobar Islands', 'Chandigarh',
+    'Dadra and Nagar Haveli and Daman and Diu', 'Delhi', 'Jammu and Kashmir', 'Ladakh', 'Lakshadweep', 'Puducherry'
+]
+# Old names and misspellings seen in the API files (keys as produced by _state_key)
+STATE_ALIASES = {
+    'orissa': 'Odisha',
+    'pondicherry': 'Puducherry',
+    'westbangal': 'West Bengal',
+    'dadraandnagarhaveli': 'Dadra and Nagar Haveli and Daman and Diu',
+    'damananddiu': 'Dadra and Nagar Haveli and Daman and Diu',
+    'nctofdelhi': 'Delhi',
+    'uttaranchal': 'Uttarakhand',
+    'chhatisgarh': 'Chhattisgarh'
+}
+
+def _state_key(name: str) -> str:
+    # 'West  Bengal', 'WESTBENGAL', 'Jammu & Kashmir' -> 'westbengal', 'jammuandkashmir'
+    return re.sub(r'[^a-z]', '', str(name).lower().replace('&', 'and'))
+
+STATE_LOOKUP = {**{_state_key(s): s for s in KNOWN_STATES}, **STATE_ALIASES}
+
+class Rule:
+    """
+    One vectorized data-quality rule.
+
+    - check: called with the per-file context (see _context); returns a boolean violation mask
+    - action: 'reject' (row is quarantined) or 'fix' (row is kept with the corrected value)
+    """
+
+    def __init__(self, name: str, check: Callable[[Dict[str, Any]], np.ndarray], action: str = 'reject',
+                 description: str = ''):
+        self.name = name
+        self.check = check
+        self.action = action
+        self.description = description
+
+RULES = [
+    Rule('unparseable_date', lambda c: c['date_present'] & np.isnat(c['date']),
+         description="date is not dd-mm-YYYY"),
+    Rule('future_date', lambda c: c['date'] > c['today'],
+         description="date after the reference date"),
+    Rule('non_numeric_count', lambda c: (np.isnan(c['counts']) & c['counts_present']).any(axis=1),
+         description="age-band count is not a number"),
+    Rule('negative_count', lambda c: (c['counts'] < 0).any(axis=1),
+         description="age-band count below zero"),
+    Rule('malformed_pincode', lambda c: ~((c['pincode'] >= 100000) & (c['pincode'] <= 999999)),
+         description="pincode is not 6 digits"),
+    Rule('missing_district', lambda c: c['district_missing'],
+         description="district name is empty"),
+    Rule('unknown_state', lambda c: c['state_unknown'],
+         description="state is not a known state/UT name or alias"),
+    Rule('state_alias', lambda c: c['state_changed'], action='fix',
+         description="state spelling normalized to the canonical name")
+]
+
+def _context(df: pd.DataFrame, count_cols: List[str], today: pd.Timestamp) -> Dict[str, Any]:
+    """
+    Parses every checked column once; rules only compare the parsed arrays.
+    """
+    n = len(df)
+    ctx: Dict[str, Any] = {'today': np.datetime64(today, 'ns')}
+
+    if 'date' in df.columns:
+        ctx['date_present'] = df['date'].notna().to_numpy()
+        ctx['date'] = pd.to_datetime(df['date'], format=DATE_FORMAT, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    else:
+        ctx['date_present'] = np.zeros(n, dtype=bool)
+        ctx['date'] = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    if count_cols:
+        raw = df[count_cols]
+        ctx['counts_present'] = raw.notna().to_numpy()
+        ctx['counts'] = raw.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        ctx['counts_present'] = np.zeros((n, 0), dtype=bool)
+        ctx['counts'] = np.zeros((n, 0))
+
+    if 'pincode' in df.columns:
+        ctx['pincode'] = pd.to_numeric(df['pincode'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        if not pd.api.types.is_numeric_dtype(df['pincode']):
+            # Text pincodes must be exactly six digits ('5600 01', '560001.0' are malformed)
+            digits = df['pincode'].astype(str).str.fullmatch(r'\d{6}').to_numpy(dtype=bool)
+            ctx['pincode'] = np.where(digits, ctx['pincode'], np.nan)
+    else:
+        ctx['pincode'] = np.full(n, np.nan)
+
+    if 'district' in df.columns:
+        codes, uniques = pd.factorize(df['district'])
+        blank = np.array([str(u).strip() == '' for u in uniques] + [True])
+        ctx['district_missing'] = blank[codes]
+    else:
+        ctx['district_missing'] = np.ones(n, dtype=bool)
+
+    # States: map the few distinct raw spellings, then broadcast through the factorized codes
+    if 'state' in df.columns:
+        codes, uniques = pd.factorize(df['state'])
+        canonical = np.array([STATE_LOOKUP.get(_state_key(u)) for u in uniques] + [None], dtype=object)
+        changed = np.array([c is not None and c != u for c, u in zip(canonical[:-1], uniques)] + [False])
+        ctx['state_codes'], ctx['state_names'] = codes, canonical
+        ctx['state_unknown'] = np.equal(canonical, None)[codes]
+        ctx['state_changed'] = changed[codes]
+    else:
+        ctx['state_codes'], ctx['state_names'] = np.full(n, -1), np.array([None], dtype=object)
+        ctx['state_unknown'] = np.ones(n, dtype=bool)
+        ctx['state_changed'] = np.zeros(n, dtype=bool)
+    return ctx
+
+def validate_frame(df: pd.DataFrame, source: str, today: Optional[pd.Timestamp] = None,
+                   rules: Optional[List[Rule]] = None,
+                   sample_size: int = DEFAULT_SAMPLE_SIZE) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Applies the data-quality rules to one raw file as it is ingested.
+
+    Every checked column is parsed once (dates, counts, pincodes, states); the parsed values
+    replace the raw ones in the clean frame, so ingestion does not parse them again.
+
+    Outputs:
+        (clean, report):
+            clean: accepted rows with parsed 'date', numeric counts and canonical 'state'.
+            report: 'counts' (one row per rule: source, rule, action, violations, rows),
+                    'samples' (up to sample_size violating raw rows per rule),
+                    'rejected' (raw rejected rows with 'source_file' and 'violations').
+    """
+    rules = RULES if rules is None else rules
+    today = pd.Timestamp.now().normalize() if today is None else pd.Timestamp(today)
+    count_cols = [c for c in df.columns if c not in ID_COLUMNS]
+
+    ctx = _context(df, count_cols, today)
+    masks = np.zeros((len(rules), len(df)), dtype=bool)
+    for i, rule in enumerate(rules):
+        masks[i] = rule.check(ctx)
+
+    reject_rules = np.array([r.action == 'reject' for r in rules], dtype=bool)
+    rejected_mask = masks[reject_rules].any(axis=0)
+    keep = ~rejected_mask
+
+    counts = pd.DataFrame({
+        'source_file': source,
+        'rule': [r.name for r in rules],
+        'action': [r.action for r in rules],
+        'violations': masks.sum(axis=1),
+        'rows': len(df)
+    })
+
+    samples = []
+    for i, rule in enumerate(rules):
+        hits = np.flatnonzero(masks[i])[:sample_size]
+        if len(hits):
+            samples.append(df.iloc[hits].assign(source_file=source, rule=rule.name))
+    samples = pd.concat(samples, ignore_index=True) if samples else pd.DataFrame()
+
+    rejected = df.iloc[np.flatnonzero(rejected_mask)].copy()
+    if len(rejected):
+        names = np.array([r.name for r in rules], dtype=object)[reject_rules]
+        hit = masks[reject_rules][:, rejected_mask].T
+        rejected['source_file'] = source
+        rejected['violations'] = [';'.join(names[row]) for row in hit]
+
+    # Accepted rows with the parsed values
+    clean = df[keep].copy() if rejected_mask.any() else df.copy()
+    if 'date' in clean.columns:
+        clean['date'] = ctx['date'][keep]
+    # Columns read_csv already parsed as int64 are kept as they are
+    parsed = [c for c in count_cols if not pd.api.types.is_integer_dtype(df[c])]
+    if parsed:
+        idx = [count_cols.index(c) for c in parsed]
+        clean[parsed] = np.nan_to_num(ctx['counts'][keep][:, idx], nan=0.0).astype(np.int64) # empty cells count 0
+    if 'state' in clean.columns and ctx['state_changed'].any():
+        # Canonical names are looked up once per distinct raw spelling and taken by code
+        dtype = df['state'].dtype if pd.api.types.is_string_dtype(df['state']) else object
+        names = pd.array(ctx['state_names'][:-1].astype(str), dtype=dtype)
+        clean['state'] = names.take(ctx['state_codes'][keep])
+    if 'pincode' in clean.columns and not pd.api.types.is_integer_dtype(df['pincode']):
+        clean['pincode'] = ctx['pincode'][keep].astype(np.int64)
+
+    if masks.any():
+        summary = ", ".join(f"{r.name}={int(n)}" for r, n in zip(rules, masks.sum(axis=1)) if n)
+        log = logger.warning if rejected_mask.any() else logger.info
+        log(f"{source}: {int(rejected_mask.sum())} of {len(df)} rows rejected ({summary})")
+    return clean.reset_index(drop=True), {'counts': counts, 'samples': samples, 'rejected': rejected}
+
+def combine_reports(reports: List[Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+    """
+    Concatenates per-file reports: 'quality_counts', 'quality_samples', 'quarantine'.
+    """
+    def _concat(key):
+        frames = [r[key] for r in reports if len(r[key])]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    counts = _concat('counts')
+    if counts.empty:
+        counts = pd.DataFrame(columns=['source_file', 'rule', 'action', 'violations', 'rows'])
+    return {'quality_counts': counts, 'quality_samples': _concat('samples'), 'quarantine': _concat('rejected')}
+
+def rule_totals(quality_counts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Violations per rule over all files.
+    """
+    return quality_counts.groupby(['rule', 'action'], sort=False)['violations'].sum().reset_index()
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,303 @@
+
+import pandas as pd
+import numpy as np
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.data_ingestion import load_raw_data, raw_files, build_district_dim
+from src.backfill import SOURCE_COUNTS, ROWS_COLUMN
+from src.pipeline_dag import PipelineDAG, Stage
+from src.result_export import export_results
+from src.history_store import append_run, HISTORY_DIRNAME
+from src.dimensions import load_registries
+from src.cohort_projection import MBU_STEM
+
+logger = logging.getLogger(__name__)
+
+WATCH_DIRNAME = "watch"
+CURRENT_FILENAME = "current.json"
+# Layout of the committed watch state; a state of another version is discarded and rebuilt
+STATE_VERSION = 2
+DEFAULT_DEBOUNCE_S = 2.0
+DEFAULT_INTERVAL_S = 1.0
+
+SOURCES = list(SOURCE_COUNTS)
+ID_COLUMN = 'district_code'
+DAILY_KEYS = ['date', ID_COLUMN]
+
+def file_signature(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def collapse_daily(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """
+    One row per (day, district) of an ingested frame: the summed count columns and the raw row
+    count (ROWS_COLUMN). This is all the scoring stages read (aggregation, cohort projection,
+    demand forecast, anomaly detection), at a fraction of the raw rows.
+    """
+    columns = [c for c in SOURCE_COUNTS[source] if c in df.columns]
+    if df.empty:
+        return pd.DataFrame(columns=DAILY_KEYS + columns + [ROWS_COLUMN])
+    daily = df[DAILY_KEYS + columns].assign(**{ROWS_COLUMN: 1})
+    return daily.groupby(DAILY_KEYS, sort=True).sum().reset_index()
+
+def combine_daily(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Folds the daily rows of newly ingested files into the running daily state (counts and row
+    counts add up), so earlier files are never re-read.
+    """
+    if old.empty:
+        return new.reset_index(drop=True)
+    if new.empty:
+        return old
+    out = pd.concat([old, new], ignore_index=True).groupby(DAILY_KEYS, sort=True).sum().reset_index()
+    out[ID_COLUMN] = out[ID_COLUMN].astype(np.int32)
+    return out
+
+def score_frames(frames: Dict[str, pd.DataFrame], as_of: str, adjacency_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs the pipeline's stages after ingestion (pipeline_orchestrator.add_scoring_stages: cohort
+    projection, demand forecast, anomaly detection, features, BSI [, spatial], CPS, strategy and
+    district names) on ingested frames.
+
+    Outputs:
+        dict: The stage outputs; 'attach_state' is the ranked district table.
+    """
+    from pipeline_orchestrator import add_scoring_stages # repository root module
+
+    dag = PipelineDAG()
+    dag.add(Stage('ingest', lambda: frames, cache=False, description="Step 1: Watch state"))
+    return add_scoring_stages(dag, as_of, adjacency_path=adjacency_path).run()
+
+class DataWatcher:
+    """
+    Re-scores districts as new raw files land in data_dir (polling; no platform file-event API needed).
+
+    - poll(): a file is pending once it appears; a batch is released when no pending file has
+      changed size or mtime for `debounce` seconds, so a burst of files becomes one batch and
+      half-written files are not read.
+    - process(files): ingests only those files, folds their daily per-district rows into the
+      running ones (collapse_daily), re-scores and publishes.
+    - publish(): scores the running state with the pipeline's own stages (score_frames), so the
+      published table has the same columns and values as a full pipeline run over the same files.
+      Every district is re-scored: normalization and ranks are relative to all districts.
+
+    The running daily rows, the district-state row counts and the manifest of processed files are
+    kept under <output_dir>/watch/ and committed with one atomic rename of current.json, so a
+    restart resumes without re-reading any processed file. Processed files are treated as
+    immutable: a processed file that changes is reported and ignored.
+    """
+
+    def __init__(self, data_dir: str, output_dir: str, history_dir: Optional[str] = None,
+                 adjacency_path: Optional[str] = None, debounce: float = DEFAULT_DEBOUNCE_S,
+                 write_history: bool = True):
+        self.data_dir = data_dir
+        self.output_dir = output_dir
+        self.history_dir = history_dir or os.path.join(output_dir, HISTORY_DIRNAME)
+        self.adjacency_path = adjacency_path
+        self.debounce = debounce
+        self.write_history = write_history
+        self.state_dir = os.path.join(output_dir, WATCH_DIRNAME)
+        self.pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self.published_as_of = None
+        self._load_state()
+
+    # --- State ---
+    def _load_state(self) -> None:
+        self.manifest: Dict[str, List[int]] = {}
+        self.daily = {source: pd.DataFrame() for source in SOURCES}
+        self.pairs = pd.Series(dtype=np.int64)
+        self.batch = 0
+        current = os.path.join(self.state_dir, CURRENT_FILENAME)
+        if not os.path.exists(current):
+            return
+        with open(current) as f:
+            state = json.load(f)
+        if state.get('version') != STATE_VERSION:
+            logger.warning(f"Watch state in {self.state_dir} has another layout; all files are ingested again.")
+            return
+        self.manifest, self.batch = state['manifest'], state['batch']
+        batch_dir = os.path.join(self.state_dir, state['batch_dir'])
+        for source in SOURCES:
+            path = os.path.join(batch_dir, f"{source}.parquet")
+            if os.path.exists(path):
+                self.daily[source] = pd.read_parquet(path)
+        pairs = pd.read_parquet(os.path.join(batch_dir, "district_pairs.parquet"))
+        self.pairs = pairs.set_index(['state_code', 'district_code'])['n_rows']
+        logger.info(f"Resumed watch state: {len(self.manifest)} processed files (batch {self.batch})")
+
+    def _commit_state(self) -> None:
+        # New state goes to a fresh directory; the rename of current.json is the commit point
+        batch_dir = f"batch_{self.batch:06d}"
+        path = os.path.join(self.state_dir, batch_dir)
+        os.makedirs(path, exist_ok=True)
+        for source, daily in self.daily.items():
+            if not daily.empty:
+                daily.to_parquet(os.path.join(path, f"{source}.parquet"), index=False)
+        self.pairs.rename('n_rows').reset_index().to_parquet(os.path.join(path, "district_pairs.parquet"), index=False)
+
+        current = os.path.join(self.state_dir, CURRENT_FILENAME)
+        with open(current + ".tmp", 'w') as f:
+            json.dump({'version': STATE_VERSION, 'batch': self.batch, 'batch_dir': batch_dir,
+                       'manifest': self.manifest}, f)
+        os.replace(current + ".tmp", current)
+        for old in glob.glob(os.path.join(self.state_dir, "batch_*")):
+            if os.path.basename(old) != batch_dir:
+                shutil.rmtree(old, ignore_errors=True)
+
+    # --- Detection ---
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        """
+        Scans data_dir once; returns the files of a settled batch (or an empty list).
+        """
+        now = time.monotonic() if now is None else now
+        for path in raw_files(self.data_dir):
+            try:
+                sig = file_signature(path)
+            except OSError:
+                continue # removed between glob and stat
+            name = os.path.basename(path)
+            if name in self.manifest:
+                if tuple(self.manifest[name]) != sig and name not in self.pending:
+                    logger.warning(f"{name} changed after it was processed; ignored (run the full pipeline to re-ingest it)")
+                    self.pending[name] = (sig, np.inf) # warn once
+                continue
+            seen = self.pending.get(name)
+            if seen is None or seen[0] != sig:
+                self.pending[name] = (sig, now)
+
+        ready = {n: v for n, v in self.pending.items() if np.isfinite(v[1])}
+        if not ready or now - max(t for _, t in ready.values()) < self.debounce:
+            return []
+        for name in ready:
+            del self.pending[name]
+        return [os.path.join(self.data_dir, name) for name in sorted(ready)]
+
+    # --- Update ---
+    def process(self, files: List[str], as_of: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Ingests `files`, updates the running daily rows, re-scores and publishes.
+
+        Outputs:
+            dict: 'files', 'rows', 'affected' (districts with new rows), 'districts', timings.
+        """
+        start = time.perf_counter()
+        as_of = as_of or pd.Timestamp.now().date().isoformat()
+        signatures = {os.path.basename(f): list(file_signature(f)) for f in files}
+        dfs, metadata = load_raw_data(self.data_dir, today=as_of, registry_dir=self.history_dir, files=files)
+        ingest_s = time.perf_counter() - start
+
+        affected = set()
+        for source in SOURCES:
+            new = collapse_daily(dfs[source], source)
+            if not new.empty:
+                affected.update(new[ID_COLUMN].unique().tolist())
+                self.daily[source] = combine_daily(self.daily[source], new)
+        dim = metadata['district_dim']
+        if len(dim):
+            pairs = [self.pairs] if len(self.pairs) else []
+            pairs.append(dim.set_index(['state_code', 'district_code'])['n_rows'])
+            self.pairs = pd.concat(pairs).groupby(level=['state_code', 'district_code']).sum()
+
+        # Only files actually ingested are recorded; a file that failed to read is retried once it changes
+        read = {os.path.basename(f) for f in metadata['files_read']}
+        self.manifest.update({name: sig for name, sig in signatures.items() if name in read})
+        for name, sig in signatures.items():
+            self.pending.pop(name, None) # re-seen by a poll between release and processing
+            if name not in read:
+                logger.warning(f"{name} could not be read; it is retried once it changes")
+                self.pending[name] = (tuple(sig), np.inf)
+        self.batch += 1
+        self._commit_state()
+
+        df = self.publish(as_of, metadata['registries'])
+        summary = {
+            'files': [os.path.basename(f) for f in metadata['files_read']],
+            'failed_files': [os.path.basename(f) for f in metadata['files_failed']],
+            'rows': int(sum(metadata['row_counts'].values())),
+            'quarantined_rows': int(len(metadata['quality']['quarantine'])),
+            'affected': len(affected),
+            'districts': len(df),
+            'ingest_s': round(ingest_s, 3),
+            'total_s': round(time.perf_counter() - start, 3)
+        }
+        logger.info(f"Batch {self.batch}: {len(summary['files'])} files, {summary['rows']} rows, {summary['affected']} districts "
+                    f"updated, published {summary['districts']} districts in {summary['total_s']}s",
+                    extra={'event': 'watch_batch', **summary})
+        return summary
+
+    def frames(self, registries: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        The running state as ingested frames (the input of the scoring stages).
+        """
+        registries = registries or load_registries(self.history_dir)
+        return {**self.daily, 'district_dim': build_district_dim([self.pairs] if len(self.pairs) else [], registries),
+                **{f"{name}_registry": registry for name, registry in registries.items()}}
+
+    def publish(self, as_of: Optional[str] = None, registries: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+        """
+        Scores the running state as of `as_of` and exports the ranking and the mandatory-update
+        projection (each result file is written to a temporary name and renamed into place, see
+        export_results).
+        """
+        as_of = as_of or pd.Timestamp.now().date().isoformat()
+        if self.daily['enrolment'].empty and self.daily['biometric'].empty:
+            logger.warning("Nothing to publish yet.")
+            return pd.DataFrame()
+        outputs = score_frames(self.frames(registries), as_of, self.adjacency_path)
+        df = outputs['attach_state']
+
+        timestamp = datetime.now()
+        run_metadata = {
+            'timestamp': timestamp.isoformat(), 'input_path': self.data_dir, 'as_of': as_of,
+            'mode': 'watch', 'watch_batch': self.batch, 'files_processed': len(self.manifest),
+            'district_count': len(df)
+        }
+        export_results(df, self.output_dir, run_metadata=run_metadata)
+        export_results(outputs['cohort']['monthly'], self.output_dir, run_metadata=run_metadata, stem=MBU_STEM,
+                       shard_column=None)
+        if self.write_history:
+            append_run(self.history_dir, df, run_ts=timestamp, run_date=pd.Timestamp(as_of).date())
+        self.published_as_of = as_of
+        return df
+
+    def run(self, interval: float = DEFAULT_INTERVAL_S, stop: Optional[threading.Event] = None,
+            once: bool = False) -> None:
+        """
+        Polls every `interval` seconds until `stop` is set. The rankings are also republished when
+        the date changes, since the recency features count days up to the as-of date.
+        With once=True, processes the files present now (without debounce) and returns.
+        """
+        if once:
+            files = [f for f in raw_files(self.data_dir) if os.path.basename(f) not in self.manifest]
+            if files:
+                self.process(files)
+            else:
+                self.publish()
+            return
+
+        stop = stop or threading.Event()
+        logger.info(f"Watching {self.data_dir} (every {interval}s, debounce {self.debounce}s)")
+        if self.manifest:
+            self.publish() # resumed state: refresh the output for today
+        while not stop.is_set():
+            try:
+                files = self.poll()
+                if files:
+                    self.process(files)
+                elif self.manifest and self.published_as_of != pd.Timestamp.now().date().isoformat():
+                    self.publish()
+            except Exception as e:
+                # Keep watching; the batch is retried on the next poll since it was not committed
+                logger.error(f"Watch batch failed: {e}")
+            stop.wait(interval)
+
+if __name__ == "__main__":
+    pass
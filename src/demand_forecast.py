@@ -0,0 +1,184 @@
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional, Tuple
+
+from src.data_aggregation import _id_column
+from src.anomaly_detection import SERIES, DEFAULT_HISTORY_DAYS, entity_count, update_series
+
+logger = logging.getLogger(__name__)
+
+HORIZONS = (30, 90)
+SEASON = 7
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5) # smoothing constants tried for every series
+NAIVE_WEEKS = 4 # the seasonal naive forecast averages the same weekday of the last 4 weeks
+HOLDOUT_DAYS = 28 # one-step errors over the last 28 days pick the model of each series
+INTERVAL_Z = 1.645 # two-sided 90% normal interval
+
+def weekday_factors(counts: np.ndarray) -> np.ndarray:
+    """
+    Multiplicative weekday profile of every series (entities x 7, mean 1; column j is the weekday
+    of the last day + j + 1). Add-one smoothed, so sparse series stay close to flat.
+    """
+    n = counts.shape[1]
+    phase = (np.arange(n) - n) % SEASON
+    sums = np.stack([counts[:, phase == j].sum(axis=1) for j in range(SEASON)], axis=1)
+    return SEASON * (sums + 1.0) / (sums.sum(axis=1, keepdims=True) + SEASON)
+
+def fit_ses(counts: np.ndarray, factors: np.ndarray, holdout: int = HOLDOUT_DAYS) -> Dict[str, np.ndarray]:
+    """
+    Simple exponential smoothing of the deseasonalized counts of all series at once: one pass
+    over the days updates the level of every (alpha, series) pair, and each series keeps the
+    alpha with the lowest one-step squared error.
+
+    Outputs:
+        dict: 'level', 'alpha', 'sigma' (sd of the deseasonalized one-step errors) and
+              'holdout_mae' (one-step absolute error over the last `holdout` days) per series.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.shape[1]
+    phase = (np.arange(n) - n) % SEASON
+    season = factors[:, phase]
+    y = counts / season
+    alphas = np.asarray(ALPHAS)[:, None]
+    level = np.repeat(y[:, :SEASON].mean(axis=1)[None], len(ALPHAS), axis=0)
+    sse = np.zeros_like(level)
+    abs_err = np.zeros_like(level)
+    for t in range(SEASON, n):
+        err = y[:, t] - level
+        sse += err ** 2
+        if t >= n - holdout:
+            abs_err += np.abs(err) * season[:, t]
+        level += alphas * err
+
+    best = np.argmin(sse, axis=0)
+    idx = np.arange(counts.shape[0])
+    return {
+        'level': level[best, idx],
+        'alpha': np.asarray(ALPHAS)[best],
+        'sigma': np.sqrt(sse[best, idx] / max(n - SEASON, 1)),
+        'holdout_mae': abs_err[best, idx] / max(min(holdout, n - SEASON), 1)
+    }
+
+def seasonal_naive(counts: np.ndarray, weeks: int = NAIVE_WEEKS, holdout: int = HOLDOUT_DAYS) -> Dict[str, np.ndarray]:
+    """
+    Seasonal naive forecast of all series: each future day is the mean of the same weekday over
+    the last `weeks` weeks.
+
+    Outputs:
+        dict: 'profile' (entities x 7, column j is the weekday of the last day + j + 1), 'sigma'
+              and 'holdout_mae' of the one-step forecasts over the last `holdout` days.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n_entities, n = counts.shape
+    span = SEASON * weeks
+    profile = counts[:, n - span:].reshape(n_entities, weeks, SEASON).mean(axis=1)
+    pred = sum(counts[:, n - holdout - SEASON * k:n - SEASON * k] for k in range(1, weeks + 1)) / weeks
+    err = counts[:, n - holdout:] - pred
+    return {'profile': profile, 'sigma': np.sqrt((err ** 2).mean(axis=1)), 'holdout_mae': np.abs(err).mean(axis=1)}
+
+def _horizon_sum(profile: np.ndarray, horizon: int) -> np.ndarray:
+    # Sum of a weekly profile over the next `horizon` days
+    weeks, rest = divmod(horizon, SEASON)
+    return weeks * profile.sum(axis=1) + profile[:, :rest].sum(axis=1)
+
+def forecast_series(counts: np.ndarray, horizons=HORIZONS) -> Tuple[np.ndarray, Dict[int, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Forecasts the total of every series over each horizon, with the better of smoothing and
+    seasonal naive (lower one-step error over the holdout; seasonal naive needs 8 weeks of data).
+
+    Variance of an H-day total (sigma: one-step error sd):
+    - smoothing: the level absorbs alpha of every future error, so error j counts 1 + alpha (H - j)
+      times: sigma^2 sum_{k<H} (1 + alpha k)^2
+    - seasonal naive: H independent errors plus the error of the weekday means (each the mean of
+      `weeks` days): sigma^2 (H + H^2 / (7 weeks))
+    Both are floored at the Poisson variance (the forecast itself). The smoothing variance assumes
+    a drifting level, so on stable series the intervals err on the wide side (for camp sizing).
+
+    Outputs:
+        (model, {horizon: (mean, variance)}): model is 'ses' or 'seasonal_naive' per series.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.shape[1]
+    factors = weekday_factors(counts)
+    ses = fit_ses(counts, factors)
+    naive_ok = n >= SEASON * NAIVE_WEEKS + HOLDOUT_DAYS
+    naive = seasonal_naive(counts) if naive_ok else None
+    use_naive = naive['holdout_mae'] < ses['holdout_mae'] if naive_ok else np.zeros(len(counts), dtype=bool)
+
+    out = {}
+    for h in horizons:
+        k = np.arange(h)
+        ses_mean = ses['level'] * _horizon_sum(factors, h)
+        ses_var = ses['sigma'] ** 2 * ((1.0 + ses['alpha'][:, None] * k) ** 2).sum(axis=1)
+        if naive_ok:
+            naive_mean = _horizon_sum(naive['profile'], h)
+            naive_var = naive['sigma'] ** 2 * (h + h ** 2 / (SEASON * NAIVE_WEEKS))
+            mean = np.where(use_naive, naive_mean, ses_mean)
+            var = np.where(use_naive, naive_var, ses_var)
+        else:
+            mean, var = ses_mean, ses_var
+        mean = np.maximum(mean, 0.0)
+        out[h] = (mean, np.maximum(var, mean))
+    return np.where(use_naive, 'seasonal_naive', 'ses'), out
+
+def forecast_demand(frames: Dict[str, pd.DataFrame], as_of: Optional[str] = None, key: str = 'district',
+                    history_days: int = DEFAULT_HISTORY_DAYS) -> pd.DataFrame:
+    """
+    Biometric and demographic update demand of every district (or pincode) over the next 30 and
+    90 days, fitted for all series at once on (entities x days) arrays (forecast_series). The
+    series are the daily counts of the last `history_days` days their feed covers (see
+    anomaly_detection.update_series); forecasts start the day after the last day of the feed.
+
+    Inputs:
+        frames: Ingested frames ('biometric', 'demographic' with parsed dates and int32 codes,
+                '<key>_registry' for the code space).
+        as_of: Last day considered (default: today).
+
+    Outputs:
+        pd.DataFrame: One row per entity with update rows in the window, keyed by 'district_code'
+                      (or 'pincode_code'): '<src>_forecast_model', '<src>_forecast_<H>d' with
+                      '_lo' / '_hi' (90% interval) per source, and the totals of both sources
+                      'forecast_updates_<H>d' / '_lo' / '_hi'.
+    """
+    id_col = _id_column(key)
+    end = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+    n_entities = entity_count(frames, key)
+    logger.info(f"Forecasting update demand of {n_entities} {key} series for the next {HORIZONS} days...")
+
+    active = np.zeros(n_entities, dtype=bool)
+    out = {id_col: np.arange(n_entities, dtype=np.int32)}
+    totals = {h: [np.zeros(n_entities), np.zeros(n_entities), np.zeros(n_entities, dtype=bool)] for h in HORIZONS}
+    for source, prefix in SERIES.items():
+        counts, rows, last = update_series(frames, source, end, history_days, n_entities, key)
+        if last is None or counts.shape[1] < 2 * SEASON:
+            out[f"{prefix}_forecast_model"] = np.full(n_entities, 'none', dtype=object)
+            for h in HORIZONS:
+                for suffix in ('', '_lo', '_hi'):
+                    out[f"{prefix}_forecast_{h}d{suffix}"] = np.full(n_entities, np.nan)
+            continue
+        active |= rows.any(axis=1)
+        model, forecasts = forecast_series(counts)
+        out[f"{prefix}_forecast_model"] = model
+        for h, (mean, var) in forecasts.items():
+            sd = np.sqrt(var)
+            out[f"{prefix}_forecast_{h}d"] = mean
+            out[f"{prefix}_forecast_{h}d_lo"] = np.maximum(mean - INTERVAL_Z * sd, 0.0)
+            out[f"{prefix}_forecast_{h}d_hi"] = mean + INTERVAL_Z * sd
+            totals[h][0] += mean
+            totals[h][1] += var
+            totals[h][2] = True
+
+    for h, (mean, var, fitted) in totals.items():
+        sd = np.sqrt(var)
+        out[f"forecast_updates_{h}d"] = np.where(fitted, mean, np.nan)
+        out[f"forecast_updates_{h}d_lo"] = np.where(fitted, np.maximum(mean - INTERVAL_Z * sd, 0.0), np.nan)
+        out[f"forecast_updates_{h}d_hi"] = np.where(fitted, mean + INTERVAL_Z * sd, np.nan)
+
+    df = pd.DataFrame(out)[active].reset_index(drop=True)
+    logger.info(f"Demand forecast complete for {len(df)} {key}s.")
+    return df
+
+if __name__ == "__main__":
+    pass
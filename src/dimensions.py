@@ -0,0 +1,159 @@
+
+import pandas as pd
+import numpy as np
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DISTRICT_REGISTRY_FILENAME = "district_registry.parquet"
+# District names are only unique within a state (e.g. Raigarh, Warangal), so districts are keyed on both
+DISTRICT_KEY_COLUMNS = ['state', 'district_id']
+CODE_COLUMN = 'district_code'
+CODE_DTYPE = np.int32
+
+# Entity dimensions: name -> (registry file, key column, code column)
+DIMENSIONS = {
+    'district': (DISTRICT_REGISTRY_FILENAME, 'district_id', CODE_COLUMN),
+    'state': ("state_registry.parquet", 'state', 'state_code'),
+    'pincode': ("pincode_registry.parquet", 'pincode', 'pincode_code')
+}
+# Columns qualifying a dimension's key column
+DIMENSION_SCOPES = {'district': ['state']}
+
+def key_columns(name: str) -> List[str]:
+    """
+    Registry key columns of a dimension: its scope columns, then its key (label) column.
+    """
+    return DIMENSION_SCOPES.get(name, []) + [DIMENSIONS[name][1]]
+
+def empty_registry(key_columns: Sequence[str] = DISTRICT_KEY_COLUMNS, code_column: str = CODE_COLUMN) -> pd.DataFrame:
+    return pd.DataFrame({
+        code_column: pd.Series(dtype=CODE_DTYPE),
+        **{col: pd.Series(dtype=object) for col in key_columns}
+    })
+
+def load_registry(path: str, key_columns: Sequence[str] = DISTRICT_KEY_COLUMNS,
+                  code_column: str = CODE_COLUMN) -> pd.DataFrame:
+    """
+    Reads a code registry (integer code <-> key columns); a missing file is an empty registry.
+
+    Key columns missing from an older registry (e.g. 'state' in a district registry keyed on the
+    name alone) are added empty: the stored codes still resolve, but no new key matches them.
+    """
+    if not os.path.exists(path):
+        return empty_registry(key_columns, code_column)
+    registry = pd.read_parquet(path)
+    registry[code_column] = registry[code_column].astype(CODE_DTYPE)
+    missing = [col for col in key_columns if col not in registry.columns]
+    if missing and len(registry):
+        logger.warning(f"Registry {path} has no {missing} columns; its {len(registry)} codes are kept "
+                       f"but matching keys are registered again.")
+    for col in missing:
+        registry[col] = ''
+    return registry
+
+def save_registry(path: str, registry: pd.DataFrame) -> None:
+    """
+    Writes the registry to a temporary file and publishes it with one rename.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    registry.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+def assign_codes(registry: pd.DataFrame, keys: pd.DataFrame, key_columns: Sequence[str] = DISTRICT_KEY_COLUMNS,
+                 code_column: str = CODE_COLUMN) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    Maps key rows to stable integer codes, registering unseen keys.
+
+    Codes are dense (0, 1, 2, ... in order of first appearance) and never reassigned, so a code
+    identifies the same entity in every run and can index NumPy arrays directly.
+
+    Outputs:
+        (codes, registry): int32 code per input row, and the registry including any new keys.
+    """
+    key_columns: List[str] = list(key_columns)
+    keys = keys[key_columns].astype(str).reset_index(drop=True)
+
+    unique = keys.drop_duplicates()
+    known = unique.merge(registry[key_columns + [code_column]].astype({c: str for c in key_columns}),
+                         on=key_columns, how='left')
+    new = known.loc[known[code_column].isna(), key_columns]
+    if len(new):
+        start = int(registry[code_column].max()) + 1 if len(registry) else 0
+        new = new.assign(**{code_column: np.arange(start, start + len(new), dtype=CODE_DTYPE)})
+        registry = pd.concat([registry, new[[code_column] + key_columns]], ignore_index=True)
+        registry[code_column] = registry[code_column].astype(CODE_DTYPE)
+        logger.info(f"Registered {len(new)} new keys (registry size {len(registry)})")
+
+    codes = keys.merge(registry[key_columns + [code_column]], on=key_columns, how='left')[code_column]
+    return codes.to_numpy(dtype=CODE_DTYPE), registry
+
+def load_registries(registry_dir: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    All entity registries (see DIMENSIONS) from registry_dir; None starts empty, in-memory registries.
+    """
+    registries = {}
+    for name, (filename, _, code) in DIMENSIONS.items():
+        path = os.path.join(registry_dir, filename) if registry_dir else None
+        columns = key_columns(name)
+        registries[name] = load_registry(path, columns, code) if path else empty_registry(columns, code)
+    return registries
+
+def save_registries(registry_dir: str, registries: Dict[str, pd.DataFrame]) -> None:
+    for name, registry in registries.items():
+        save_registry(os.path.join(registry_dir, DIMENSIONS[name][0]), registry)
+
+def _key_index(keys: pd.DataFrame, columns: List[str]) -> pd.Index:
+    if len(columns) == 1:
+        return pd.Index(keys[columns[0]].astype(str))
+    return pd.MultiIndex.from_frame(keys[columns].astype(str))
+
+def encode(registries: Dict[str, pd.DataFrame], name: str, values: Union[pd.Series, pd.DataFrame]) -> np.ndarray:
+    """
+    int32 codes of raw keys (states, pincodes, or a frame of 'state' and 'district_id' for
+    districts, see key_columns), registering unseen keys in registries[name]. Only the distinct
+    keys go through the registry lookup; keys with a missing value get -1.
+    """
+    _, key, code = DIMENSIONS[name]
+    columns = key_columns(name)
+    keys = values.to_frame(key) if isinstance(values, pd.Series) else values
+    # Every key column is factorized once and the per-column codes are combined into one int64
+    # per row, so multi-column keys are factorized without building tuples
+    combined = np.zeros(len(keys), dtype=np.int64)
+    missing = np.zeros(len(keys), dtype=bool)
+    column_uniques = []
+    for col in columns:
+        col_codes, col_uniques = pd.factorize(keys[col])
+        combined = combined * (len(col_uniques) + 1) + col_codes + 1
+        missing |= col_codes < 0
+        column_uniques.append(np.asarray(col_uniques).astype(str))
+    positions = np.full(len(keys), -1, dtype=np.int64)
+    positions[~missing], distinct = pd.factorize(combined[~missing])
+
+    uniques = {}
+    for col, col_uniques in reversed(list(zip(columns, column_uniques))):
+        distinct, digit = np.divmod(distinct, len(col_uniques) + 1)
+        uniques[col] = col_uniques[digit - 1]
+    uniques = pd.DataFrame(uniques)[columns]
+
+    # Distinct keys -> registry rows with one hash lookup; unseen keys are registered first
+    found = _key_index(registries[name], columns).get_indexer(_key_index(uniques, columns))
+    if (found < 0).any():
+        _, registries[name] = assign_codes(registries[name], uniques[found < 0], columns, code)
+        found = _key_index(registries[name], columns).get_indexer(_key_index(uniques, columns))
+    unique_codes = registries[name][code].to_numpy(dtype=CODE_DTYPE)[found]
+    return np.append(unique_codes, CODE_DTYPE(-1))[positions]
+
+def code_labels(registry: pd.DataFrame, codes: np.ndarray, column: str = 'district_id',
+                code_column: str = CODE_COLUMN) -> np.ndarray:
+    """
+    Looks up a key column for an array of codes (dense codes index the registry directly).
+    """
+    lookup = np.empty(int(registry[code_column].max()) + 1 if len(registry) else 0, dtype=object)
+    lookup[registry[code_column].to_numpy()] = registry[column].to_numpy(dtype=object)
+    return lookup[np.asarray(codes, dtype=np.int64)]
+
+if __name__ == "__main__":
+    pass
@@ -1,44 +1,34 @@
 
+# Run from the repository root: python -m src.extract_infographic_data
 import pandas as pd
-import glob
-import os
+from src.result_export import find_results, read_results
+from src.data_ingestion import attach_district_names
 
 def extract_for_infographic():
-    # 1. Load the Final Ranked Data
+    # 1. Load the Final Ranked Data (memory-mapped Arrow/Parquet when available, CSV otherwise)
     try:
-        df_final = pd.read_csv("final_output_real/final_ranked_districts.csv")
+        df_final = read_results(find_results("final_output_real"))
     except FileNotFoundError:
-        print("Error: Could not find final_output_real/final_ranked_districts.csv")
+        print("Error: Could not find final ranked results in final_output_real/")
         return
 
-    # 2. We need 'State' mapping. 
-    # The raw data has 'district' and 'state' columns. Let's build a mapping.
-    print("Building District-State mapping from raw data...")
-    district_state_map = {}
-    
-    # Scan all CSVs in data/ folder to find district-state pairs
-    all_files = glob.glob("data/*.csv")
-    for f in all_files:
-        try:
-            temp_df = pd.read_csv(f, usecols=['district', 'state'])
-            # Drop duplicates to speed up
-            temp_df = temp_df.drop_duplicates()
-            # Update map
-            for _, row in temp_df.iterrows():
-                # specific to our pipeline, district_id in output matches 'district' in raw
-                district_state_map[str(row['district'])] = row['state']
-        except ValueError:
-            # File might not have 'state' column (e.g. some might be different)
-            continue
-        except Exception as e:
-            print(f"Skipping {f}: {e}")
-            continue
+    # 2. State mapping comes from the (state, district) dimension written during ingestion.
+    # No second scan of the raw data is needed.
+    try:
+        district_dim = pd.read_csv("final_output_real/district_state_dim.csv")
+        district_dim['district'] = district_dim['district'].astype(str)
+    except FileNotFoundError:
+        district_dim = None
+
+    if 'state' not in df_final.columns:
+        if district_dim is None:
+            print("Error: Could not find final_output_real/district_state_dim.csv (re-run the pipeline)")
+            return
+        df_final['district_id'] = df_final['district_id'].astype(str)
+        df_final = attach_district_names(df_final, district_dim)
 
     # 3. Apply Mapping
-    df_final['State'] = df_final['district_id'].map(district_state_map)
-    
-    # Fill missing states if any
-    df_final['State'] = df_final['State'].fillna('Unknown')
+    df_final['State'] = df_final['state'].fillna('Unknown')
 
     # 4. Select and Rename Columns for Infographic
     # Target: Rank, District, State, Biometric Staleness Index, Camp Priority, Recommended Camp Type, Deployment Frequency
@@ -2,12 +2,12 @@
 import pandas as pd
 import numpy as np
 import logging
+from typing import Optional, Union
+from datetime import date
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def feature_engineer(district_df: pd.DataFrame) -> pd.DataFrame:
+def feature_engineer(district_df: pd.DataFrame, as_of: Optional[Union[str, date, pd.Timestamp]] = None) -> pd.DataFrame:
     """
     Derives 20+ analytical indicators from the aggregated district dataset.
     
@@ -16,6 +16,8 @@ def feature_engineer(district_df: pd.DataFrame) -> pd.DataFrame:
     
     Inputs:
         district_df (pd.DataFrame): District level master table.
+        as_of: Reference date for the recency features (default: today). Pass it explicitly
+               for reproducible (and cacheable) output.
     
     Outputs:
         pd.DataFrame: Original df + new features.
@@ -25,8 +27,8 @@ def feature_engineer(district_df: pd.DataFrame) -> pd.DataFrame:
     # Avoid modifying the original
     df = district_df.copy()
     
-    # Current Reference Date
-    today = pd.Timestamp.now()
+    # Reference Date (an explicit as_of is taken at midnight, so day counts do not depend on the time of the run)
+    today = pd.Timestamp.now() if as_of is None else pd.Timestamp(as_of).normalize()
     
     # --- 1. Temporal Neglect Features ---
     # Days since last update. If NaT (no updates ever), we assume high neglect (eg 10 years/3650 days)
@@ -110,22 +112,6 @@ def feature_engineer(district_df: pd.DataFrame) -> pd.DataFrame:
 
     logger.info(f"Feature engineering complete. Added {len(df.columns) - len(district_df.columns)} new features.")
     
-    # Print Summary as requested
-    print("\n--- Feature Summary ---")
-    new_features = [
-        'days_since_last_update', 'years_since_last_update', 'update_recency_rank',
-        'biometric_coverage_ratio', 'biometric_coverage_gap', 'uncovered_population',
-        'demographic_to_biometric_ratio', 'update_lag_proxy', 'adult_population_proxy',
-        'population_impact_score', 'update_consistency', 'operational_neglect_proxy',
-        'urgency_signal', 'governance_concern_score'
-    ]
-    
-    print(f"{'Feature':<35} {'Min':<10} {'Max':<10} {'Mean':<10}")
-    print("-" * 70)
-    for feat in new_features:
-        if feat in df.columns:
-            print(f"{feat:<35} {df[feat].min():<10.4f} {df[feat].max():<10.4f} {df[feat].mean():<10.4f}")
-    
     return df
 
 if __name__ == "__main__":
@@ -1,12 +1,42 @@
 
 import pandas as pd
+import numpy as np
 import logging
-from sklearn.preprocessing import MinMaxScaler
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Features to normalize: the explicitly requested ones and other relevant continuous indicators
+FEATURES_TO_SCALE = [
+    'days_since_last_update',
+    'years_since_last_update',
+    'update_recency_rank',
+    'biometric_coverage_ratio',
+    'biometric_coverage_gap',
+    'uncovered_population',
+    'demographic_to_biometric_ratio',
+    'update_lag_proxy',
+    'adult_population_proxy',
+    'population_impact_score',
+    'update_consistency',
+    'operational_neglect_proxy',
+    'urgency_signal',
+    'governance_concern_score',
+    'mbu_due_not_done'
+]
+
+def minmax_scale(values: np.ndarray) -> np.ndarray:
+    """
+    Column-wise Min-Max scaling to 0-1 with NumPy (same arithmetic as scikit-learn's MinMaxScaler).
+    
+    NaNs are ignored when fitting and stay NaN; a constant column maps to 0.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    data_min = np.nanmin(values, axis=0)
+    data_range = np.nanmax(values, axis=0) - data_min
+    data_range[data_range == 0.0] = 1.0
+    scale = 1.0 / data_range
+    return values * scale + (0.0 - data_min * scale)
+
 def normalize_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Applies Min-Max scaling to selected features.
@@ -25,37 +55,16 @@ def normalize_features(df: pd.DataFrame) -> pd.DataFrame:
     
     df_norm = df.copy()
     
-    # List of features to normalize
-    # We include the explicitly requested ones and other relevant continuous indicators
-    features_to_scale = [
-        'days_since_last_update',
-        'years_since_last_update',
-        'update_recency_rank',
-        'biometric_coverage_ratio',
-        'biometric_coverage_gap',
-        'uncovered_population',
-        'demographic_to_biometric_ratio',
-        'update_lag_proxy',
-        'adult_population_proxy',
-        'population_impact_score',
-        'update_consistency',
-        'operational_neglect_proxy',
-        'urgency_signal',
-        'governance_concern_score'
-    ]
-    
     # Filter to only those present in df
-    available_features = [f for f in features_to_scale if f in df.columns]
+    available_features = [f for f in FEATURES_TO_SCALE if f in df.columns]
     
     if not available_features:
         logger.warning("No features found to normalize.")
         return df_norm
 
-    scaler = MinMaxScaler()
-    
     try:
         # Fit and transform
-        scaled_values = scaler.fit_transform(df_norm[available_features])
+        scaled_values = minmax_scale(df_norm[available_features].to_numpy(dtype=np.float64, na_value=np.nan))
         
         # Create new column names
         norm_col_names = [f"{col}_norm" for col in available_features]
@@ -64,18 +73,6 @@ def normalize_features(df: pd.DataFrame) -> pd.DataFrame:
         df_norm[norm_col_names] = scaled_values
         
         logger.info(f"Normalized {len(available_features)} features.")
-        
-        # Print Summary
-        print("\n--- Normalization Summary ---")
-        print(f"{'Feature':<35} {'Orig Min':<10} {'Orig Max':<10} -> {'Norm Min':<10} {'Norm Max':<10}")
-        print("-" * 90)
-        
-        for i, col in enumerate(available_features):
-            orig_min = df_norm[col].min()
-            orig_max = df_norm[col].max()
-            norm_min = df_norm[norm_col_names[i]].min()
-            norm_max = df_norm[norm_col_names[i]].max()
-            print(f"{col:<35} {orig_min:<10.4f} {orig_max:<10.4f} -> {norm_min:<10.4f} {norm_max:<10.4f}")
             
     except Exception as e:
         logger.error(f"Normalization failed: {e}")
@@ -1,64 +1,209 @@
 
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
-
-def generate_mock_dataset(filepath, num_districts=50, records_per_district=20):
-    print(f"Generating mock dataset: {num_districts} districts, ~{records_per_district} records each...")
-    
-    data = []
-    today = datetime.now()
-    
-    for i in range(1, num_districts + 1):
-        d_id = f"D{i:03d}"
-        
-        # Randomly assign a profile to the district
-        # 0: Good (Recent updates, high coverage)
-        # 1: Average
-        # 2: Bad (Old updates, low coverage)
-        profile = random.choice([0, 1, 2])
-        
-        for j in range(records_per_district):
-            u_id = f"UID_{d_id}_{j:03d}"
-            
-            # Update Flags & Dates based on profile
-            if profile == 0:
-                bio_flag = 1 if random.random() > 0.1 else 0
-                days_ago = random.randint(0, 30)
-            elif profile == 1:
-                bio_flag = 1 if random.random() > 0.5 else 0
-                days_ago = random.randint(30, 365)
-            else:
-                bio_flag = 0 # No biometric updates
-                days_ago = random.randint(365, 1000)
-            
-            # Demographic updates
-            demo_flag = 1 if random.random() > 0.7 else 0
-            
-            # Date
-            if bio_flag == 1 or demo_flag == 1:
-                date_val = (today - timedelta(days=days_ago)).strftime('%Y-%m-%d')
-            else:
-                date_val = None # No update ever
-            
-            # Add noise (Malformed data)
-            if random.random() < 0.01:
-                date_val = "invalid-date"
-            
-            row = {
-                'district_id': d_id,
-                'aadhaar_id': u_id,
-                'biometric_update_flag': bio_flag,
-                'demographic_update_flag': demo_flag,
-                'last_update_date': date_val,
-                'total_aadhaar_holders': records_per_district # simplified
-            }
-            data.append(row)
-            
-    df = pd.DataFrame(data)
-    df.to_csv(filepath, index=False)
-    print(f"Saved to {filepath}")
+import argparse
+import multiprocessing
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError: # Optional dependency: pandas.to_csv is used without pyarrow (slower)
+    pa = pa_csv = None
+
+# Column layouts of the UIDAI API pages (see data/)
+SCHEMAS = {
+    'biometric': ['bio_age_5_17', 'bio_age_17_'],
+    'demographic': ['demo_age_5_17', 'demo_age_17_'],
+    'enrolment': ['age_0_5', 'age_5_17', 'age_18_greater']
+}
+# Mean count per row for each age band
+BAND_MEANS = {
+    'bio_age_5_17': 4.0, 'bio_age_17_': 9.0,
+    'demo_age_5_17': 1.5, 'demo_age_17_': 8.0,
+    'age_0_5': 3.0, 'age_5_17': 1.5, 'age_18_greater': 0.3
+}
+STATES = [
+    'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh', 'Goa', 'Gujarat', 'Haryana',
+    'Himachal Pradesh', 'Jharkhand', 'Karnataka', 'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Manipur',
+    'Meghalaya', 'Mizoram', 'Nagaland', 'Odisha', 'Punjab', 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana',
+    'Tripura', 'Uttar Pradesh', 'Uttarakhand', 'West Bengal', 'Delhi', 'Jammu And Kashmir', 'Ladakh',
+    'Puducherry', 'Chandigarh', 'Andaman And Nicobar Islands', 'Lakshadweep', 'Dadra And Nagar Haveli And Daman And Diu'
+]
+DEFAULT_PAGE_SIZE = 500_000
+
+def make_geography(n_districts: int = 750, pincodes_per_district: int = 25, skew: float = 1.1,
+                   seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Synthetic (state, district, pincode) hierarchy with Zipf-like activity weights per district.
+
+    Outputs:
+        dict: 'state' (per district), 'district', 'pincode' ((n_districts, pincodes_per_district) int),
+              'weight' (sampling probability per district)
+    """
+    rng = np.random.default_rng(seed)
+    states = np.array(STATES)[rng.integers(0, len(STATES), n_districts)]
+    districts = np.array([f"District {i:05d}" for i in range(n_districts)])
+
+    # Unique 6-digit pincodes, grouped by district
+    pincodes = (110000 + rng.permutation(n_districts * pincodes_per_district)).reshape(n_districts, pincodes_per_district)
+
+    weight = 1.0 / np.arange(1, n_districts + 1) ** skew
+    weight = rng.permutation(weight)
+    return {'state': states, 'district': districts, 'pincode': pincodes, 'weight': weight / weight.sum()}
+
+def make_calendar(start_date: str, end_date: str, seasonality: float = 0.3, missing_date_frac: float = 0.05,
+                  seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Reporting days with seasonal weights; a random fraction of days is dropped (no rows at all).
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start_date, end_date, freq='D')
+    keep = rng.random(len(days)) >= missing_date_frac
+    days = days[keep] if keep.any() else days[:1]
+
+    weight = 1.0 + seasonality * np.sin(2 * np.pi * days.dayofyear.to_numpy() / 365.25)
+    weight = np.clip(weight, 1e-6, None)
+    return {'label': days.strftime('%d-%m-%Y').to_numpy(dtype=object), 'weight': weight / weight.sum()}
+
+def generate_page(kind: str, n_rows: int, geography: Dict[str, np.ndarray], calendar: Dict[str, np.ndarray],
+                  duplicate_frac: float, seed) -> pd.DataFrame:
+    """
+    One API page of n_rows rows, fully vectorized. Duplicated rows are copies of other rows in the page.
+    """
+    rng = np.random.default_rng(seed)
+    n_unique = n_rows - int(n_rows * duplicate_frac)
+
+    district = rng.choice(len(geography['district']), size=n_unique, p=geography['weight'])
+    pin = geography['pincode'][district, rng.integers(0, geography['pincode'].shape[1], n_unique)]
+    day = rng.choice(len(calendar['label']), size=n_unique, p=calendar['weight'])
+
+    order = np.argsort(day, kind='stable') # API pages are ordered by date
+    district, pin, day = district[order], pin[order], day[order]
+
+    if n_rows > n_unique:
+        dup = np.sort(rng.integers(0, n_unique, n_rows - n_unique))
+        rows = np.sort(np.concatenate([np.arange(n_unique), dup]), kind='stable')
+        district, pin, day = district[rows], pin[rows], day[rows]
+
+    page = {
+        'date': calendar['label'][day],
+        'state': geography['state'][district],
+        'district': geography['district'][district],
+        'pincode': pin
+    }
+    for band in SCHEMAS[kind]:
+        counts = rng.poisson(BAND_MEANS[band], n_unique)
+        page[band] = counts[rows] if n_rows > n_unique else counts
+    return pd.DataFrame(page)
+
+def _write_csv(df: pd.DataFrame, path: str) -> None:
+    tmp_path = path + ".tmp"
+    if pa_csv is not None:
+        # Generated names never contain delimiters or quotes, so values (and the header) are written
+        # unquoted like the API files
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with open(tmp_path, 'wb') as f:
+            f.write((",".join(df.columns) + "\n").encode('utf-8'))
+            pa_csv.write_csv(table, f, write_options=pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+# Shared read-only state of worker processes (set once by the pool initializer)
+_WORKER: Dict[str, Any] = {}
+
+def _init_worker(geography, calendar, duplicate_frac, output_dir):
+    _WORKER.update(geography=geography, calendar=calendar, duplicate_frac=duplicate_frac, output_dir=output_dir)
+
+def _write_page(task) -> Dict[str, Any]:
+    kind, offset, n_rows, seed = task
+    df = generate_page(kind, n_rows, _WORKER['geography'], _WORKER['calendar'], _WORKER['duplicate_frac'], seed)
+    path = os.path.join(_WORKER['output_dir'], f"api_data_aadhar_{kind}_{offset}_{offset + n_rows}.csv")
+    _write_csv(df, path)
+    return {'kind': kind, 'path': path, 'rows': n_rows}
+
+def generate_mock_dataset(output_dir: str, rows: Optional[Dict[str, int]] = None, n_districts: int = 750,
+                          pincodes_per_district: int = 25, page_size: int = DEFAULT_PAGE_SIZE,
+                          start_date: str = '2025-03-01', end_date: str = '2025-12-31', skew: float = 1.1,
+                          seasonality: float = 0.3, missing_date_frac: float = 0.05, duplicate_frac: float = 0.01,
+                          workers: Optional[int] = None, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Writes synthetic biometric / demographic / enrolment files in the real API layout
+    (date, state, district, pincode, age bands), split into offset-named pages
+    (api_data_aadhar_<kind>_<offset>_<offset + rows>.csv).
+
+    Inputs:
+        rows: Rows per file type, e.g. {'biometric': 10_000_000, 'demographic': 10_000_000, 'enrolment': 1_000_000}
+        skew: Zipf exponent of district activity (0 = uniform)
+        seasonality: Amplitude of the yearly cycle in daily volume
+        missing_date_frac: Fraction of calendar days without any rows
+        duplicate_frac: Fraction of rows that repeat another row of the same page
+        workers: Processes generating pages in parallel (default: CPU count)
+
+    Outputs:
+        list: One {'kind', 'path', 'rows'} entry per written page.
+    """
+    rows = rows or {'biometric': 1_000_000, 'demographic': 1_000_000, 'enrolment': 100_000}
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    geography = make_geography(n_districts, pincodes_per_district, skew, seed)
+    calendar = make_calendar(start_date, end_date, seasonality, missing_date_frac, seed)
+
+    # One task per page; every page gets an independent random stream
+    tasks = []
+    for kind in SCHEMAS:
+        total = rows.get(kind, 0)
+        for offset in range(0, total, page_size):
+            tasks.append((kind, offset, min(page_size, total - offset)))
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    tasks = [task + (s,) for task, s in zip(tasks, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    init_args = (geography, calendar, duplicate_frac, output_dir)
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(*init_args)
+        manifest = [_write_page(t) for t in tasks]
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks)), initializer=_init_worker, initargs=init_args) as pool:
+            manifest = pool.map(_write_page, tasks, chunksize=1)
+
+    total_rows = sum(m['rows'] for m in manifest)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {total_rows:,} rows in {len(manifest)} files under {output_dir} "
+          f"({elapsed:.1f}s, {total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return manifest
 
 if __name__ == "__main__":
-    generate_mock_dataset("full_mock_data.csv")
+    parser = argparse.ArgumentParser(description="Synthetic UIDAI API data in the real file layout")
+    parser.add_argument("output_dir", nargs="?", default="mock_data")
+    parser.add_argument("--biometric-rows", type=int, default=1_000_000)
+    parser.add_argument("--demographic-rows", type=int, default=1_000_000)
+    parser.add_argument("--enrolment-rows", type=int, default=100_000)
+    parser.add_argument("--districts", type=int, default=750)
+    parser.add_argument("--pincodes-per-district", type=int, default=25)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seasonality", type=float, default=0.3)
+    parser.add_argument("--missing-date-frac", type=float, default=0.05)
+    parser.add_argument("--duplicate-frac", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_mock_dataset(
+        args.output_dir,
+        rows={'biometric': args.biometric_rows, 'demographic': args.demographic_rows, 'enrolment': args.enrolment_rows},
+        n_districts=args.districts,
+        pincodes_per_district=args.pincodes_per_district,
+        page_size=args.page_size,
+        skew=args.skew,
+        seasonality=args.seasonality,
+        missing_date_frac=args.missing_date_frac,
+        duplicate_frac=args.duplicate_frac,
+        workers=args.workers,
+        seed=args.seed
+    )
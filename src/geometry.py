@@ -0,0 +1,260 @@
+
+import pandas as pd
+import numpy as np
+import logging
+from scipy import sparse
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+STR_NODE_CAPACITY = 16
+
+def flatten_polygons(features: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Flattens the Polygon/MultiPolygon features of a GeoJSON FeatureCollection into contiguous arrays.
+
+    Rings of a feature are stored back to back, so every feature owns one contiguous run of edges.
+    Holes and multi-part features need no special handling under the even-odd rule.
+
+    Outputs:
+        dict:
+        - 'vertices': (V, 2) lon/lat of all closed rings
+        - 'ring_offsets': (R + 1,) ring boundaries into 'vertices'
+        - 'ring_feature': (R,) owning feature of each ring
+        - 'edge_start', 'edge_end': (E, 2) segment end points, grouped by feature
+        - 'edge_offsets': (F + 1,) edge boundaries per feature
+        - 'bbox': (F, 4) minx, miny, maxx, maxy (NaN for features without polygons)
+    """
+    rings, ring_feature = [], []
+    for i, feature in enumerate(features):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'Polygon':
+            polygons = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiPolygon':
+            polygons = geometry['coordinates']
+        else:
+            continue
+        for polygon in polygons:
+            for ring in polygon:
+                pts = np.asarray(ring, dtype=float)[:, :2]
+                if len(pts) < 3:
+                    continue
+                if not np.array_equal(pts[0], pts[-1]):
+                    pts = np.vstack([pts, pts[:1]])
+                rings.append(pts)
+                ring_feature.append(i)
+
+    n_features = len(features)
+    if not rings:
+        empty = np.empty((0, 2))
+        return {'vertices': empty, 'ring_offsets': np.zeros(1, dtype=np.int64), 'ring_feature': np.empty(0, dtype=np.int64),
+                'edge_start': empty, 'edge_end': empty, 'edge_offsets': np.zeros(n_features + 1, dtype=np.int64),
+                'bbox': np.full((n_features, 4), np.nan)}
+
+    ring_len = np.array([len(r) for r in rings])
+    ring_feature = np.array(ring_feature, dtype=np.int64)
+    vertices = np.concatenate(rings)
+    ring_offsets = np.concatenate([[0], np.cumsum(ring_len)])
+
+    # Edge i -> i+1 for every vertex except the closing one of each ring
+    is_edge = np.ones(len(vertices), dtype=bool)
+    is_edge[ring_offsets[1:] - 1] = False
+    idx = np.flatnonzero(is_edge)
+    edge_feature = np.repeat(ring_feature, ring_len - 1)
+    edge_offsets = np.concatenate([[0], np.cumsum(np.bincount(edge_feature, minlength=n_features))])
+
+    # Per-feature bounding boxes; vertices are already grouped by feature
+    vertex_feature = np.repeat(ring_feature, ring_len)
+    present = np.unique(vertex_feature)
+    starts = np.searchsorted(vertex_feature, present)
+    bbox = np.full((n_features, 4), np.nan)
+    bbox[present, 0] = np.minimum.reduceat(vertices[:, 0], starts)
+    bbox[present, 1] = np.minimum.reduceat(vertices[:, 1], starts)
+    bbox[present, 2] = np.maximum.reduceat(vertices[:, 0], starts)
+    bbox[present, 3] = np.maximum.reduceat(vertices[:, 1], starts)
+
+    return {
+        'vertices': vertices,
+        'ring_offsets': ring_offsets,
+        'ring_feature': ring_feature,
+        'edge_start': vertices[idx],
+        'edge_end': vertices[idx + 1],
+        'edge_offsets': edge_offsets,
+        'bbox': bbox
+    }
+
+def _str_order(bbox: np.ndarray, capacity: int) -> np.ndarray:
+    """
+    Sort-Tile-Recursive order: vertical slices by x-centre, then y-centre within each slice.
+    """
+    n = len(bbox)
+    n_slices = int(np.ceil(np.sqrt(np.ceil(n / capacity))))
+    cx = (bbox[:, 0] + bbox[:, 2]) / 2
+    cy = (bbox[:, 1] + bbox[:, 3]) / 2
+    by_x = np.argsort(cx, kind='stable')
+    slice_id = np.arange(n) // (n_slices * capacity)
+    return by_x[np.lexsort((cy[by_x], slice_id))]
+
+def _group_bbox(bbox: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    return np.column_stack([
+        np.minimum.reduceat(bbox[:, 0], starts),
+        np.minimum.reduceat(bbox[:, 1], starts),
+        np.maximum.reduceat(bbox[:, 2], starts),
+        np.maximum.reduceat(bbox[:, 3], starts)
+    ])
+
+def build_str_tree(bbox: np.ndarray, capacity: int = STR_NODE_CAPACITY) -> Dict[str, Any]:
+    """
+    Packs bounding boxes into a static STR R-tree, stored as flat arrays per level.
+
+    Outputs:
+        dict:
+        - 'items': feature index of each leaf entry (NaN boxes are left out)
+        - 'levels': bottom-up list of {'bbox', 'child_start', 'child_count'}; children of
+                    level 0 are leaf entries, children of level k are nodes of level k - 1.
+                    The last level holds the single root.
+    """
+    valid = np.flatnonzero(~np.isnan(bbox).any(axis=1))
+    order = valid[_str_order(bbox[valid], capacity)] if len(valid) else valid
+    entries = bbox[order]
+    levels = []
+
+    while True:
+        n = len(entries)
+        child_start = np.arange(0, max(n, 1), capacity)
+        child_count = np.minimum(capacity, n - child_start)
+        node_bbox = _group_bbox(entries, child_start) if n else np.full((1, 4), np.nan)
+
+        if len(node_bbox) > 1:
+            # Order this level's nodes for packing into the next one; children stay attached
+            node_order = _str_order(node_bbox, capacity)
+            node_bbox, child_start, child_count = node_bbox[node_order], child_start[node_order], child_count[node_order]
+
+        levels.append({'bbox': node_bbox, 'child_start': child_start, 'child_count': child_count})
+        if len(node_bbox) == 1:
+            break
+        entries = node_bbox
+
+    return {'items': order, 'levels': levels}
+
+def _contains(bbox: np.ndarray, points: np.ndarray) -> np.ndarray:
+    return ((points[:, 0] >= bbox[:, 0]) & (points[:, 0] <= bbox[:, 2]) &
+            (points[:, 1] >= bbox[:, 1]) & (points[:, 1] <= bbox[:, 3]))
+
+def _expand(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Concatenated ranges [start, start + count) without a Python loop.
+    """
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+
+def query_points(tree: Dict[str, Any], bbox: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bulk bounding-box query: all points descend the tree together, one level at a time.
+
+    Outputs:
+        (point_idx, feature_idx) candidate pairs whose feature bbox contains the point.
+    """
+    pt = np.arange(len(points))
+    node = np.zeros(len(points), dtype=np.int64)
+
+    for level in reversed(tree['levels']):
+        keep = _contains(level['bbox'][node], points[pt])
+        pt, node = pt[keep], node[keep]
+        counts = level['child_count'][node]
+        pt = np.repeat(pt, counts)
+        node = _expand(level['child_start'][node], counts)
+
+    feature = tree['items'][node]
+    keep = _contains(bbox[feature], points[pt])
+    return pt[keep], feature[keep]
+
+def points_in_polygons(points: np.ndarray, pt_idx: np.ndarray, feature_idx: np.ndarray, polygons: Dict[str, np.ndarray],
+                       max_chunk: int = 4_000_000) -> np.ndarray:
+    """
+    Even-odd ray casting for (point, feature) pairs.
+
+    Each pair is expanded to all edges of its feature (np.repeat); crossings are summed per pair
+    with np.add.reduceat. Pairs are processed in chunks of at most ~max_chunk point-edge tests.
+    """
+    edge_offsets = polygons['edge_offsets']
+    counts = edge_offsets[feature_idx + 1] - edge_offsets[feature_idx]
+    inside = np.zeros(len(pt_idx), dtype=bool)
+    if len(pt_idx) == 0:
+        return inside
+
+    cum = np.cumsum(counts)
+    start = 0
+    while start < len(pt_idx):
+        base = cum[start - 1] if start else 0
+        end = max(int(np.searchsorted(cum, base + max_chunk, side='right')), start + 1)
+        c = counts[start:end]
+        edges = _expand(edge_offsets[feature_idx[start:end]], c)
+        p = points[np.repeat(pt_idx[start:end], c)]
+        a, b = polygons['edge_start'][edges], polygons['edge_end'][edges]
+
+        straddles = (a[:, 1] > p[:, 1]) != (b[:, 1] > p[:, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = a[:, 0] + (p[:, 1] - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+        crossings = np.add.reduceat((straddles & (p[:, 0] < x_cross)).astype(np.int32), np.cumsum(c) - c)
+
+        inside[start:end] = (crossings % 2) == 1
+        start = end
+    return inside
+
+def assign_points(points: np.ndarray, polygons: Dict[str, np.ndarray], tree: Dict[str, Any] = None) -> np.ndarray:
+    """
+    Index of the polygon feature containing each point, or -1. Where polygons overlap,
+    the feature with the smallest bounding box wins.
+    """
+    points = np.asarray(points, dtype=float)
+    bbox = polygons['bbox']
+    tree = tree or build_str_tree(bbox)
+
+    pt, feature = query_points(tree, bbox, points)
+    inside = points_in_polygons(points, pt, feature, polygons)
+    pt, feature = pt[inside], feature[inside]
+
+    area = (bbox[feature, 2] - bbox[feature, 0]) * (bbox[feature, 3] - bbox[feature, 1])
+    order = np.lexsort((area, pt))
+    pt, feature = pt[order], feature[order]
+    first = np.concatenate([[True], pt[1:] != pt[:-1]]) if len(pt) else np.empty(0, dtype=bool)
+
+    assigned = np.full(len(points), -1, dtype=np.int64)
+    assigned[pt[first]] = feature[first]
+    return assigned
+
+def polygon_adjacency(polygons: Dict[str, np.ndarray], n_features: int, decimals: int = 4,
+                      min_shared_vertices: int = 2) -> sparse.csr_matrix:
+    """
+    Symmetric 0/1 adjacency between features that share boundary vertices.
+
+    Vertices are snapped to a 10^-decimals grid so that shared borders digitized twice still match.
+    min_shared_vertices=2 approximates rook contiguity (a shared edge); 1 gives queen contiguity.
+
+    Outputs:
+        scipy.sparse.csr_matrix: (n_features, n_features), zero diagonal.
+    """
+    vertices, ring_offsets = polygons['vertices'], polygons['ring_offsets']
+    ring_len = np.diff(ring_offsets)
+    vertex_feature = np.repeat(polygons['ring_feature'], ring_len)
+
+    # Skip each ring's closing vertex so it is not counted twice
+    is_open = np.ones(len(vertices), dtype=bool)
+    is_open[ring_offsets[1:] - 1] = False
+    grid = np.round(vertices[is_open] * 10 ** decimals).astype(np.int64)
+    pairs = np.unique(np.column_stack([grid, vertex_feature[is_open]]), axis=0)
+
+    shared = pd.DataFrame({'x': pairs[:, 0], 'y': pairs[:, 1], 'f': pairs[:, 2]})
+    shared = shared.merge(shared, on=['x', 'y'])
+    shared = shared[shared['f_x'] < shared['f_y']]
+    counts = shared.groupby(['f_x', 'f_y']).size()
+    counts = counts[counts >= min_shared_vertices]
+
+    i = counts.index.get_level_values(0).to_numpy()
+    j = counts.index.get_level_values(1).to_numpy()
+    ones = np.ones(2 * len(i), dtype=np.float64)
+    return sparse.csr_matrix((ones, (np.concatenate([i, j]), np.concatenate([j, i]))), shape=(n_features, n_features))
+
+if __name__ == "__main__":
+    pass
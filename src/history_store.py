@@ -0,0 +1,283 @@
+
+import pandas as pd
+import numpy as np
+import glob
+import json
+import logging
+import os
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional, Union
+
+from src.dimensions import (load_registry, save_registry, assign_codes, code_labels, encode,
+                            DISTRICT_REGISTRY_FILENAME, DISTRICT_KEY_COLUMNS, CODE_COLUMN)
+from src.scoring_bsi import BSI_TIERS
+from src.scoring_cps import CPS_TIERS
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIRNAME = "history"
+RUN_INDEX_FILENAME = "runs.jsonl"
+PARTITION_PREFIX = "run_date="
+
+RunRef = Optional[Union[str, date, datetime]]
+
+def _tier_codes(labels: pd.Series, tiers: List[str]) -> np.ndarray:
+    # Label -> index into tiers; anything else (e.g. 'Unknown') -> -1
+    return pd.Categorical(labels.astype(str), categories=tiers).codes.astype(np.int8)
+
+def history_frame(df: pd.DataFrame, codes: np.ndarray) -> pd.DataFrame:
+    """
+    Compact per-run record: integer district code, rank, float32 scores and int8 tier codes.
+    """
+    return pd.DataFrame({
+        CODE_COLUMN: codes,
+        'cps_rank': df['cps_rank'].to_numpy(dtype=np.int32),
+        'cps_score': df['cps_score'].to_numpy(dtype=np.float32),
+        'cps_tier_code': _tier_codes(df['cps_tier'], CPS_TIERS),
+        'bsi_score': df['bsi_score'].to_numpy(dtype=np.float32),
+        'bsi_tier_code': _tier_codes(df['bsi_tier'], BSI_TIERS)
+    })
+
+def append_run(history_dir: str, df: pd.DataFrame, run_ts: Optional[datetime] = None,
+               run_date: Optional[date] = None, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Appends one run's ranking to the history store. Files are only ever added, never rewritten.
+
+    Layout:
+        <history_dir>/district_registry.parquet               (state, district_id) <-> int32 district_code
+        <history_dir>/run_date=YYYY-MM-DD/<run_id>.parquet    one file per run
+        <history_dir>/runs.jsonl                              run index (one line per run)
+
+    Inputs:
+        df: Ranked output ('state', 'district_id', 'cps_rank', 'cps_score', 'cps_tier', 'bsi_score', 'bsi_tier').
+        run_date: Partition date (default: date of run_ts).
+
+    Outputs:
+        dict: The run index entry.
+    """
+    run_ts = run_ts or datetime.now()
+    run_date = run_date or run_ts.date()
+    run_id = run_id or run_ts.strftime('%Y%m%dT%H%M%S%f')
+    os.makedirs(history_dir, exist_ok=True)
+
+    # The registry is extended before the run file is written, so every stored code resolves
+    registry_path = os.path.join(history_dir, DISTRICT_REGISTRY_FILENAME)
+    known = load_registry(registry_path)
+    codes, registry = assign_codes(known, df[DISTRICT_KEY_COLUMNS])
+    if len(registry) > len(known):
+        save_registry(registry_path, registry)
+
+    entry = _write_run(history_dir, history_frame(df, codes), run_ts, run_date, run_id)
+    with open(os.path.join(history_dir, RUN_INDEX_FILENAME), 'a') as f:
+        f.write(json.dumps(entry) + "\n")
+    logger.info(f"Appended run {run_id} ({len(df)} districts) to history {history_dir}")
+    return entry
+
+def _write_run(history_dir: str, frame: pd.DataFrame, run_ts: datetime, run_date: date, run_id: str) -> Dict[str, Any]:
+    # Writes one run file (temporary file + rename) and returns its index entry
+    partition = f"{PARTITION_PREFIX}{run_date.isoformat()}"
+    os.makedirs(os.path.join(history_dir, partition), exist_ok=True)
+    rel_path = os.path.join(partition, f"{run_id}.parquet")
+    path = os.path.join(history_dir, rel_path)
+    if os.path.exists(path):
+        raise FileExistsError(f"Run {run_id} already exists in {history_dir}")
+    frame.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    return {'run_id': run_id, 'run_date': run_date.isoformat(), 'run_ts': run_ts.isoformat(),
+            'path': rel_path, 'districts': int(len(frame))}
+
+def append_backfill(history_dir: str, df: pd.DataFrame, date_column: str = 'as_of') -> List[Dict[str, Any]]:
+    """
+    Appends one run per as-of date of a long-format ranking (src/backfill.py) to the history store.
+
+    District codes are assigned once for the whole frame and the run index is appended once,
+    so a year of daily runs costs one file write per date. Each run is dated and timestamped at
+    midnight of its as-of date, with run id '<YYYYmmddTHHMMSSffffff>-backfill'.
+
+    Inputs:
+        df: 'state', 'district_id', date_column, and the columns append_run stores, ranked within each date.
+
+    Outputs:
+        list: The run index entries, oldest first.
+    """
+    os.makedirs(history_dir, exist_ok=True)
+    registry_path = os.path.join(history_dir, DISTRICT_REGISTRY_FILENAME)
+    registries = {'district': load_registry(registry_path)}
+    known = len(registries['district'])
+    codes = encode(registries, 'district', df[DISTRICT_KEY_COLUMNS]) # distinct districts only
+    if len(registries['district']) > known:
+        save_registry(registry_path, registries['district'])
+    frame = history_frame(df, codes)
+
+    entries = []
+    for as_of, rows in frame.groupby(pd.DatetimeIndex(df[date_column]).normalize(), sort=True).indices.items():
+        run_ts = as_of.to_pydatetime()
+        run_id = f"{run_ts.strftime('%Y%m%dT%H%M%S%f')}-backfill"
+        entries.append(_write_run(history_dir, frame.iloc[rows], run_ts, run_ts.date(), run_id))
+
+    with open(os.path.join(history_dir, RUN_INDEX_FILENAME), 'a') as f:
+        f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+    logger.info(f"Appended {len(entries)} backfilled runs to history {history_dir}")
+    return entries
+
+def list_runs(history_dir: str) -> pd.DataFrame:
+    """
+    Run index, oldest first.
+    """
+    path = os.path.join(history_dir, RUN_INDEX_FILENAME)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['run_id', 'run_date', 'run_ts', 'path', 'districts'])
+    runs = pd.read_json(path, lines=True, dtype={'run_id': str, 'run_date': str, 'run_ts': str, 'path': str})
+    return runs.sort_values(['run_ts', 'run_id'], kind='stable').reset_index(drop=True)
+
+def resolve_run(runs: pd.DataFrame, ref: RunRef = None, offset: int = 0) -> pd.Series:
+    """
+    Selects a run: a run_id, the latest run on or before a date (time travel), or the latest run.
+    offset=-1 picks the run before that one.
+    """
+    if runs.empty:
+        raise ValueError("History store has no runs")
+    if ref is None:
+        pos = len(runs) - 1
+    elif isinstance(ref, str) and (runs['run_id'] == ref).any():
+        pos = int(np.flatnonzero(runs['run_id'].to_numpy() == ref)[-1])
+    else:
+        day = pd.Timestamp(ref).date().isoformat()
+        eligible = np.flatnonzero(runs['run_date'].to_numpy(dtype=str) <= day)
+        if not len(eligible):
+            raise ValueError(f"No run on or before {day}")
+        pos = int(eligible[-1])
+    pos += offset
+    if not 0 <= pos < len(runs):
+        raise ValueError(f"No run at offset {offset} from {ref or 'latest'}")
+    return runs.iloc[pos]
+
+def _attach_labels(frame: pd.DataFrame, registry: pd.DataFrame) -> pd.DataFrame:
+    out = frame.copy()
+    out.insert(1, 'district_id', code_labels(registry, out[CODE_COLUMN].to_numpy()))
+    out.insert(2, 'state', code_labels(registry, out[CODE_COLUMN].to_numpy(), 'state'))
+    out['cps_score'] = out['cps_score'].astype(np.float64).round(2) # stored as float32
+    out['cps_tier'] = np.array(CPS_TIERS + ['Unknown'])[out['cps_tier_code'].to_numpy()]
+    out['bsi_tier'] = np.array(BSI_TIERS + ['Unknown'])[out['bsi_tier_code'].to_numpy()]
+    return out
+
+def read_run(history_dir: str, ref: RunRef = None, labels: bool = True) -> pd.DataFrame:
+    """
+    Time-travel read of one stored ranking (see resolve_run). Only that run's file is opened.
+    """
+    run = resolve_run(list_runs(history_dir), ref)
+    frame = pd.read_parquet(os.path.join(history_dir, run['path']))
+    if labels:
+        frame = _attach_labels(frame, load_registry(os.path.join(history_dir, DISTRICT_REGISTRY_FILENAME)))
+    return frame
+
+def read_history(history_dir: str, start: RunRef = None, end: RunRef = None,
+                 columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    All runs with start <= run_date <= end in long format ('run_id', 'run_date' + stored columns).
+    Partitions outside the range are pruned by directory name and never opened.
+    """
+    lo = pd.Timestamp(start).date().isoformat() if start is not None else ''
+    hi = pd.Timestamp(end).date().isoformat() if end is not None else '9999-12-31'
+
+    frames = []
+    for part in sorted(glob.glob(os.path.join(history_dir, f"{PARTITION_PREFIX}*"))):
+        run_date = os.path.basename(part)[len(PARTITION_PREFIX):]
+        if not lo <= run_date <= hi:
+            continue
+        for path in sorted(glob.glob(os.path.join(part, "*.parquet"))):
+            frame = pd.read_parquet(path, columns=columns)
+            frame.insert(0, 'run_id', os.path.basename(path)[:-len(".parquet")])
+            frame.insert(1, 'run_date', run_date)
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['run_id', 'run_date'] + (columns or []))
+    return pd.concat(frames, ignore_index=True)
+
+def compare_runs(history_dir: str, old: RunRef = None, new: RunRef = None) -> pd.DataFrame:
+    """
+    Per-district rank deltas and tier transitions between two runs (default: the last two).
+
+    District codes are dense, so both runs are scattered into code-indexed arrays and compared
+    element-wise, without a join.
+
+    Outputs:
+        pd.DataFrame: One row per district in either run: ranks, scores and tiers in both runs,
+                      'rank_delta' (old - new; positive = moved up), 'tier_delta' (positive = more
+                      urgent tier) and 'status' ('both', 'new', 'dropped').
+    """
+    runs = list_runs(history_dir)
+    new_run = resolve_run(runs, new)
+    old_run = resolve_run(runs, old) if old is not None else resolve_run(runs, new_run['run_id'], offset=-1)
+    registry = load_registry(os.path.join(history_dir, DISTRICT_REGISTRY_FILENAME))
+    size = int(registry[CODE_COLUMN].max()) + 1 if len(registry) else 0
+
+    arrays = {}
+    for side, run in [('old', old_run), ('new', new_run)]:
+        frame = pd.read_parquet(os.path.join(history_dir, run['path']))
+        codes = frame[CODE_COLUMN].to_numpy()
+        present = np.zeros(size, dtype=bool)
+        present[codes] = True
+        rank = np.zeros(size, dtype=np.int32)
+        rank[codes] = frame['cps_rank'].to_numpy()
+        score = np.full(size, np.nan, dtype=np.float32)
+        score[codes] = frame['cps_score'].to_numpy()
+        tier = np.full(size, -1, dtype=np.int8)
+        tier[codes] = frame['cps_tier_code'].to_numpy()
+        arrays[side] = (present, rank, score, tier)
+
+    (p_old, r_old, s_old, t_old), (p_new, r_new, s_new, t_new) = arrays['old'], arrays['new']
+    idx = np.flatnonzero(p_old | p_new)
+    p_old, r_old, s_old, t_old = p_old[idx], r_old[idx], s_old[idx], t_old[idx]
+    p_new, r_new, s_new, t_new = p_new[idx], r_new[idx], s_new[idx], t_new[idx]
+    both = p_old & p_new
+    tier_labels = np.array(CPS_TIERS + [None], dtype=object)
+
+    out = pd.DataFrame({
+        CODE_COLUMN: idx.astype(np.int32),
+        'district_id': code_labels(registry, idx),
+        'state': code_labels(registry, idx, 'state'),
+        'rank_old': pd.arrays.IntegerArray(r_old, ~p_old),
+        'rank_new': pd.arrays.IntegerArray(r_new, ~p_new),
+        'rank_delta': pd.arrays.IntegerArray(r_old - r_new, ~both),
+        'cps_score_old': s_old.astype(np.float64).round(2),
+        'cps_score_new': s_new.astype(np.float64).round(2),
+        'cps_tier_old': tier_labels[t_old],
+        'cps_tier_new': tier_labels[t_new],
+        'tier_delta': pd.arrays.IntegerArray((t_old - t_new).astype(np.int32), ~(both & (t_old >= 0) & (t_new >= 0))),
+        'status': np.select([both, p_new], ['both', 'new'], default='dropped')
+    })
+    out.attrs['old_run'], out.attrs['new_run'] = old_run['run_id'], new_run['run_id']
+    return out.sort_values('rank_new', na_position='last', kind='stable').reset_index(drop=True)
+
+def tier_transitions(comparison: pd.DataFrame) -> pd.DataFrame:
+    """
+    Old tier x new tier district counts ('Absent' for districts missing from a run), one bincount.
+    """
+    labels = CPS_TIERS + ['Absent']
+    k = len(labels)
+    old = pd.Categorical(comparison['cps_tier_old'], categories=CPS_TIERS).codes.astype(np.int64)
+    new = pd.Categorical(comparison['cps_tier_new'], categories=CPS_TIERS).codes.astype(np.int64)
+    old[old < 0], new[new < 0] = k - 1, k - 1
+    counts = np.bincount(old * k + new, minlength=k * k).reshape(k, k)
+    return pd.DataFrame(counts, index=pd.Index(labels, name='from'), columns=pd.Index(labels, name='to'))
+
+def moved_into_tier(comparison: pd.DataFrame, tier: str = CPS_TIERS[0]) -> pd.DataFrame:
+    """
+    Districts in `tier` in the new run that were in another tier (or absent) in the old run.
+    """
+    mask = (comparison['cps_tier_new'] == tier) & (comparison['cps_tier_old'] != tier)
+    return comparison[mask.to_numpy(dtype=bool)]
+
+def top_n_churn(comparison: pd.DataFrame, n: int = 20) -> Dict[str, Any]:
+    """
+    Districts entering / leaving the top n, and churn = entered / n.
+    """
+    in_old = (comparison['rank_old'] <= n).fillna(False).to_numpy(dtype=bool)
+    in_new = (comparison['rank_new'] <= n).fillna(False).to_numpy(dtype=bool)
+    ids = comparison['district_id'].to_numpy()
+    entered, exited = ids[in_new & ~in_old], ids[in_old & ~in_new]
+    return {'n': n, 'entered': entered.tolist(), 'exited': exited.tolist(), 'churn': len(entered) / n if n else 0.0}
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,126 @@
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import random
+import subprocess
+import sys
+import time
+import os
+from urllib.parse import urlparse, quote
+
+import numpy as np
+
+def _wait_for_health(host: str, port: int, timeout: float = 60.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/health")
+            return json.loads(conn.getresponse().read())
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Service at {host}:{port} did not become healthy")
+
+def _build_paths(host: str, port: int, n: int, seed: int) -> list:
+    """
+    Mixed workload drawn from the live service: district, prefix, state top-N and tier pages.
+    """
+    conn = http.client.HTTPConnection(host, port)
+    conn.request("GET", "/tier/1?page_size=500")
+    items = json.loads(conn.getresponse().read())['items']
+    for tier in range(2, 6):
+        conn.request("GET", f"/tier/{tier}?page_size=500")
+        items += json.loads(conn.getresponse().read())['items']
+
+    rng = random.Random(seed)
+    districts = [i['district_id'] for i in items] or ['unknown']
+    keys = [(i.get('state', 'Unknown'), i['district_id']) for i in items] or [('Unknown', 'unknown')]
+    states = sorted({i.get('state', 'Unknown') for i in items}) or ['Unknown']
+    paths = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.6:
+            state, district = rng.choice(keys)
+            paths.append(f"/district/{quote(state)}/{quote(district)}")
+        elif r < 0.8:
+            paths.append(f"/search?prefix={quote(rng.choice(districts)[:2])}&limit=10")
+        elif r < 0.9:
+            paths.append(f"/state/{quote(rng.choice(states))}/top")
+        else:
+            paths.append(f"/tier/{rng.randint(1, 5)}?page={rng.randint(1, 3)}&page_size=50")
+    return paths
+
+def _client(args) -> list:
+    host, port, paths, duration = args
+    conn = http.client.HTTPConnection(host, port)
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 500:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn = http.client.HTTPConnection(host, port)
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+def run_load_test(host: str, port: int, clients: int = 8, duration: float = 10.0, seed: int = 0) -> dict:
+    """
+    Drives the service from 'clients' processes with keep-alive connections and reports throughput
+    and latency percentiles (milliseconds).
+    """
+    paths = _build_paths(host, port, 5000, seed)
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(_client, [(host, port, paths[i::clients], duration) for i in range(clients)])
+
+    latencies = np.concatenate([np.asarray(r[0]) for r in results]) * 1000.0
+    errors = sum(r[1] for r in results)
+    return {
+        'requests': int(latencies.size),
+        'errors': int(errors),
+        'rps': latencies.size / duration,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max())
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for ranking_service.py")
+    parser.add_argument("--url", help="Running service, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--output-dir", default="final_output_real", help="Start a service on this pipeline output")
+    parser.add_argument("--data-dir", default=None, help="Raw data folder for pincode/state lookups")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        cmd = [sys.executable, "-m", "src.ranking_service", os.path.abspath(args.output_dir), "--port", str(port)]
+        if args.data_dir:
+            cmd += ["--data-dir", os.path.abspath(args.data_dir)]
+        server = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    try:
+        print(f"Service: {_wait_for_health(host, port)}")
+        print(json.dumps(run_load_test(host, port, args.clients, args.duration), indent=2))
+    finally:
+        if server is not None:
+            server.terminate()
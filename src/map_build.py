@@ -0,0 +1,217 @@
+
+import pandas as pd
+import numpy as np
+import json
+import logging
+import os
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# District-name property used by the common India boundary files
+NAME_PROPERTY_KEYS = ['DISTRICT', 'dtname', 'NAME_2', 'district', 'name']
+# State-name property of the same files
+STATE_PROPERTY_KEYS = ['ST_NM', 'STATE', 'stname', 'NAME_1', 'state']
+
+# Resolution level -> (Douglas-Peucker tolerance in degrees, coordinate decimals)
+# ~0.001 deg = ~100 m, ~0.01 deg = ~1 km at Indian latitudes
+DEFAULT_LEVELS = {
+    'high': (0.001, 5),
+    'medium': (0.005, 4),
+    'low': (0.02, 3)
+}
+
+def load_boundaries(path: str) -> Dict[str, Any]:
+    """
+    Reads a locally cached district boundary GeoJSON (FeatureCollection).
+    """
+    with open(path) as f:
+        geo_data = json.load(f)
+    if geo_data.get('type') != 'FeatureCollection':
+        raise ValueError(f"{path} is not a GeoJSON FeatureCollection")
+    logger.info(f"Loaded {len(geo_data['features'])} boundary features from {path}")
+    return geo_data
+
+def normalize_name(names: pd.Series) -> pd.Series:
+    """
+    Join key for district names: lowercase, collapsed whitespace.
+    """
+    return names.astype(str).str.strip().str.lower().str.replace(r'\s+', ' ', regex=True)
+
+def feature_names(features: List[Dict[str, Any]], keys: List[str] = NAME_PROPERTY_KEYS) -> pd.Series:
+    """
+    District name (or, with STATE_PROPERTY_KEYS, state name) of every feature, taken from the first known property.
+    """
+    props = pd.DataFrame([f.get('properties') or {} for f in features])
+    names = pd.Series([None] * len(features), dtype=object)
+    for k in keys:
+        if k in props.columns:
+            names = names.fillna(props[k])
+    return names
+
+def match_districts(left: pd.DataFrame, right: pd.DataFrame) -> np.ndarray:
+    """
+    Position in right of every row of left, matched on the normalized ('state', 'district') key; -1 if none.
+
+    District names repeat across states. A row whose state does not match (boundary files spell
+    some states differently) falls back to the district name alone, but only for names that occur
+    once on each side and whose right row no other row matched by state. Of repeated right keys,
+    the first row is used.
+    """
+    lhs = pd.DataFrame({'_state': normalize_name(left['state'].fillna('')), '_key': normalize_name(left['district'].fillna(''))})
+    rhs = pd.DataFrame({'_state': normalize_name(right['state'].fillna('')), '_key': normalize_name(right['district'].fillna('')),
+                        '_row': np.arange(len(right))}).drop_duplicates(['_state', '_key'])
+
+    by_state = lhs.merge(rhs, on=['_state', '_key'], how='left')['_row']
+    unique = rhs[~rhs['_key'].duplicated(keep=False) & ~rhs['_row'].isin(by_state)]
+    by_name = lhs[['_key']].merge(unique[['_key', '_row']], on='_key', how='left')['_row']
+    by_name[lhs['_key'].duplicated(keep=False).to_numpy()] = np.nan
+    return by_state.fillna(by_name).fillna(-1).to_numpy(dtype=np.int64)
+
+def join_scores(geo_data: Dict[str, Any], df: pd.DataFrame, name_col: str = 'District',
+                state_col: str = 'State') -> pd.DataFrame:
+    """
+    Joins score rows to boundary features on (state, district) with match_districts (vectorized
+    merges); the state is read from the feature's state property.
+
+    Outputs:
+        pd.DataFrame: One row per feature (in feature order) with the score columns and 'has_data'.
+    """
+    features = geo_data['features']
+    keys = pd.DataFrame({'state': feature_names(features, STATE_PROPERTY_KEYS), 'district': feature_names(features)})
+
+    scores = df.reset_index(drop=True)
+    state = scores[state_col] if state_col in scores.columns else pd.Series('', index=scores.index)
+    dupes = pd.DataFrame({'s': normalize_name(state), 'd': normalize_name(scores[name_col])}).duplicated()
+    if dupes.any():
+        logger.warning(f"{dupes.sum()} duplicate (state, district) rows in scores; keeping the first (highest ranked).")
+
+    row = match_districts(keys, pd.DataFrame({'state': state, 'district': scores[name_col]}))
+    joined = scores.reindex(row).reset_index(drop=True)
+    joined['has_data'] = row >= 0
+
+    logger.info(f"Matched {int(joined['has_data'].sum())} out of {len(features)} map districts.")
+    return joined
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker line simplification. Each split step is one vectorized distance computation.
+    """
+    n = len(points)
+    if n < 3 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        a, b = points[start], points[end]
+        seg = points[start + 1:end]
+        chord = b - a
+        chord_len = np.hypot(chord[0], chord[1])
+        if chord_len == 0:
+            # Closed ring: distance to the shared start/end point
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(chord[0] * (seg[:, 1] - a[1]) - chord[1] * (seg[:, 0] - a[0])) / chord_len
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+def simplify_ring(ring: List[List[float]], tolerance: float, decimals: int) -> Optional[List[List[float]]]:
+    """
+    Simplifies and quantizes one closed ring. Returns None if it collapses (e.g. a tiny hole).
+    """
+    points = np.asarray(ring, dtype=float)[:, :2]
+    simplified = np.round(douglas_peucker(points, tolerance), decimals)
+
+    # Drop consecutive duplicates introduced by quantization
+    if len(simplified) > 1:
+        moved = np.any(simplified[1:] != simplified[:-1], axis=1)
+        simplified = simplified[np.concatenate([[True], moved])]
+
+    if len(simplified) < 4:
+        return None
+    return simplified.tolist()
+
+def simplify_geometry(geometry: Dict[str, Any], tolerance: float, decimals: int) -> Optional[Dict[str, Any]]:
+    """
+    Simplifies a Polygon / MultiPolygon. Outer rings that would collapse keep a coarse triangle,
+    so no district disappears from the map.
+    """
+    if geometry is None:
+        return None
+
+    def _polygon(rings):
+        out = []
+        for r, ring in enumerate(rings):
+            simplified = simplify_ring(ring, tolerance, decimals)
+            if simplified is None and r == 0:
+                pts = np.round(np.asarray(ring, dtype=float)[:, :2], decimals)
+                idx = [0, len(pts) // 3, 2 * len(pts) // 3, 0]
+                simplified = pts[idx].tolist()
+            if simplified is not None:
+                out.append(simplified)
+        return out
+
+    if geometry['type'] == 'Polygon':
+        return {'type': 'Polygon', 'coordinates': _polygon(geometry['coordinates'])}
+    if geometry['type'] == 'MultiPolygon':
+        return {'type': 'MultiPolygon', 'coordinates': [_polygon(p) for p in geometry['coordinates']]}
+    return geometry
+
+def build_map(df: pd.DataFrame, boundary_path: str, output_dir: str, name_col: str = 'District',
+              levels: Optional[Dict[str, tuple]] = None, state_col: str = 'State') -> Dict[str, str]:
+    """
+    Map-build stage: joins scores to the cached boundary file and writes one simplified,
+    coordinate-quantized GeoJSON per resolution level.
+
+    Inputs:
+        df: Score table (e.g. infographic_data.csv) with district and state name columns.
+        boundary_path: Local district boundary GeoJSON.
+        output_dir: Destination folder.
+        levels: {level_name: (tolerance_degrees, decimals)}, defaults to DEFAULT_LEVELS.
+
+    Outputs:
+        dict: {level_name: output path}
+    """
+    levels = levels or DEFAULT_LEVELS
+    os.makedirs(output_dir, exist_ok=True)
+
+    geo_data = load_boundaries(boundary_path)
+    joined = join_scores(geo_data, df, name_col, state_col)
+
+    # Properties for all features in one conversion; NaN -> None for valid JSON
+    joined = joined.astype(object).where(joined.notna(), None)
+    properties = joined.to_dict('records')
+    base_props = [f.get('properties') or {} for f in geo_data['features']]
+
+    written = {}
+    for level, (tolerance, decimals) in levels.items():
+        features = []
+        n_points = 0
+        for feature, base, props in zip(geo_data['features'], base_props, properties):
+            geometry = simplify_geometry(feature.get('geometry'), tolerance, decimals)
+            if geometry is not None and geometry['type'] in ('Polygon', 'MultiPolygon'):
+                rings = geometry['coordinates'] if geometry['type'] == 'Polygon' else \
+                    [r for p in geometry['coordinates'] for r in p]
+                n_points += sum(len(r) for r in rings)
+            features.append({'type': 'Feature', 'properties': {**base, **props}, 'geometry': geometry})
+
+        path = os.path.join(output_dir, f"india_districts_{level}.geojson")
+        with open(path, 'w') as f:
+            json.dump({'type': 'FeatureCollection', 'features': features}, f, separators=(',', ':'))
+        written[level] = path
+        logger.info(f"Saved {level} map ({n_points} vertices, {os.path.getsize(path) / 1e6:.2f} MB) to {path}")
+
+    return written
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,145 @@
+
+import pandas as pd
+import numpy as np
+import argparse
+import logging
+import os
+import time
+from typing import Dict, Any
+
+from src.data_ingestion import load_raw_frames
+from src.dimensions import code_labels
+from src.geometry import flatten_polygons, build_str_tree, assign_points
+from src.map_build import load_boundaries, feature_names, normalize_name
+
+logger = logging.getLogger(__name__)
+
+LATITUDE_COLUMNS = ['latitude', 'lat', 'Latitude']
+LONGITUDE_COLUMNS = ['longitude', 'lon', 'lng', 'Longitude']
+
+def load_pincode_centroids(path: str) -> pd.DataFrame:
+    """
+    Reads a local pincode coordinate file (e.g. the India Post pincode directory export).
+
+    Several post offices share a pincode; their coordinates are averaged into one centroid.
+    Rows with missing or non-numeric coordinates are dropped.
+
+    Outputs:
+        pd.DataFrame: 'pincode', 'latitude', 'longitude'
+    """
+    df = pd.read_csv(path, low_memory=False)
+    lat_col = next((c for c in LATITUDE_COLUMNS if c in df.columns), None)
+    lon_col = next((c for c in LONGITUDE_COLUMNS if c in df.columns), None)
+    if 'pincode' not in df.columns or lat_col is None or lon_col is None:
+        raise ValueError(f"{path} needs 'pincode', latitude and longitude columns, found {list(df.columns)}")
+
+    df = pd.DataFrame({
+        'pincode': pd.to_numeric(df['pincode'], errors='coerce'),
+        'latitude': pd.to_numeric(df[lat_col], errors='coerce'),
+        'longitude': pd.to_numeric(df[lon_col], errors='coerce')
+    }).dropna()
+    df['pincode'] = df['pincode'].astype('int64')
+    return df.groupby('pincode', as_index=False)[['latitude', 'longitude']].mean()
+
+def load_raw_pincode_districts(data_dir: str) -> pd.DataFrame:
+    """
+    Name-based (pincode, state, district) pairs of the ingested raw files (load_raw_frames: validated
+    rows, canonical state names), with their row counts.
+    """
+    frames = load_raw_frames(data_dir)
+    codes = ['pincode_code', 'state_code', 'district_code']
+    counts = [frames[k].groupby(codes).size() for k in ['biometric', 'demographic', 'enrolment']
+              if set(codes) <= set(frames[k].columns)]
+    if not counts:
+        return pd.DataFrame(columns=['pincode', 'state', 'district', 'n_rows'])
+    pairs = pd.concat(counts).groupby(level=[0, 1, 2]).sum().rename('n_rows').reset_index()
+    return pd.DataFrame({
+        'pincode': code_labels(frames['pincode_registry'], pairs['pincode_code'], 'pincode', 'pincode_code').astype('int64'),
+        'state': code_labels(frames['state_registry'], pairs['state_code'], 'state', 'state_code').astype(str),
+        'district': code_labels(frames['district_registry'], pairs['district_code']).astype(str),
+        'n_rows': pairs['n_rows'].to_numpy()
+    })
+
+def assign_pincodes(centroids: pd.DataFrame, geo_data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Assigns every pincode centroid to the district polygon that contains it (STR-tree + ray casting).
+
+    Outputs:
+        pd.DataFrame: centroids plus 'feature_index' (-1 if outside every polygon) and 'spatial_district'.
+    """
+    features = geo_data['features']
+    polygons = flatten_polygons(features)
+    tree = build_str_tree(polygons['bbox'])
+
+    points = centroids[['longitude', 'latitude']].to_numpy(dtype=float)
+    assigned = assign_points(points, polygons, tree)
+
+    names = feature_names(features).to_numpy(dtype=object)
+    out = centroids.copy()
+    out['feature_index'] = assigned
+    out['spatial_district'] = np.where(assigned >= 0, names[np.maximum(assigned, 0)], None)
+    return out
+
+def reconcile_assignments(raw: pd.DataFrame, assigned: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compares the raw 'district' column with the spatial assignment, per (pincode, state, district).
+
+    Status:
+    - 'match': names agree
+    - 'conflict': the centroid lies in a differently named district
+    - 'unassigned': the centroid lies outside every polygon
+    - 'no_centroid': the pincode is missing from the coordinate file
+    """
+    out = raw.merge(assigned[['pincode', 'latitude', 'longitude', 'spatial_district']], on='pincode', how='left',
+                    indicator=True)
+    has_centroid = (out['_merge'] == 'both').to_numpy()
+    has_district = out['spatial_district'].notna().to_numpy()
+    same = (normalize_name(out['district']) == normalize_name(out['spatial_district'].fillna(''))).to_numpy()
+
+    out['status'] = np.select(
+        [~has_centroid, ~has_district, same],
+        ['no_centroid', 'unassigned', 'match'],
+        default='conflict'
+    )
+    return out.drop(columns=['_merge'])
+
+def run_pincode_assignment(data_dir: str, centroid_path: str, boundary_path: str, output_dir: str) -> pd.DataFrame:
+    """
+    Spatial-assignment stage. Writes:
+    - pincode_district_assignment.csv: every raw (pincode, state, district) with its spatial district and status
+    - pincode_district_conflicts.csv: only the conflicting rows, largest row counts first
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    centroids = load_pincode_centroids(centroid_path)
+    geo_data = load_boundaries(boundary_path)
+    assigned = assign_pincodes(centroids, geo_data)
+    logger.info(f"Assigned {int((assigned['feature_index'] >= 0).sum())} out of {len(assigned)} pincodes "
+                f"to {len(geo_data['features'])} polygons in {time.perf_counter() - start:.2f}s")
+
+    raw = load_raw_pincode_districts(data_dir)
+    report = reconcile_assignments(raw, assigned)
+    report.to_csv(os.path.join(output_dir, "pincode_district_assignment.csv"), index=False)
+
+    conflicts = report[report['status'] == 'conflict'].sort_values('n_rows', ascending=False)
+    conflicts.to_csv(os.path.join(output_dir, "pincode_district_conflicts.csv"), index=False)
+
+    summary = report.groupby('status').agg(pairs=('pincode', 'size'), rows=('n_rows', 'sum'))
+    print("\nPincode -> District Reconciliation")
+    print(summary.to_string())
+    if not conflicts.empty:
+        print("\nLargest conflicts (raw district vs. enclosing polygon):")
+        print(conflicts[['pincode', 'state', 'district', 'spatial_district', 'n_rows']].head(10).to_string(index=False))
+    return report
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.pincode_assignment data pincodes.csv geo_cache/india_district.geojson out
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Point-in-polygon pincode -> district assignment")
+    parser.add_argument("data_dir")
+    parser.add_argument("centroid_path", help="CSV with pincode, latitude, longitude")
+    parser.add_argument("boundary_path", help="District boundary GeoJSON")
+    parser.add_argument("output_dir")
+    args = parser.parse_args()
+    run_pincode_assignment(args.data_dir, args.centroid_path, args.boundary_path, args.output_dir)
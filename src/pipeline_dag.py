@@ -0,0 +1,248 @@
+
+import pandas as pd
+import ast
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUCCESS_MARKER = "_SUCCESS"
+HASH_CHUNK_BYTES = 1 << 20
+# Stage code versions cover the modules under the repository root (src/ and pipeline_orchestrator.py)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    - func: called as func(*upstream_outputs, **params); returns a DataFrame or a dict of DataFrames
+    - inputs: upstream stage names; 'stage:part' selects one frame of a dict-valued output
+    - params: JSON-serializable keyword arguments (part of the cache key)
+    - files: input files whose contents are part of the cache key (e.g. raw CSVs)
+    - cache: False for cheap stages or stages whose output should never be reused
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (), params: Optional[Dict[str, Any]] = None,
+                 files: Sequence[str] = (), description: Optional[str] = None, cache: bool = True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params or {}
+        self.files = list(files)
+        self.description = description or name
+        self.cache = cache
+
+    def upstream(self) -> List[str]:
+        return [i.split(':', 1)[0] for i in self.inputs]
+
+def _is_project_file(path: Optional[str]) -> bool:
+    return bool(path) and os.path.abspath(path).startswith(PROJECT_ROOT + os.sep) and 'site-packages' not in path
+
+@functools.lru_cache(maxsize=None)
+def _parse_module(path: str, mtime_ns: int) -> Tuple[str, Tuple[str, ...]]:
+    # (source hash, imported module names) of one file; re-read only when the file changes
+    with open(path, 'rb') as f:
+        source = f.read()
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names) # 'from src import dimensions'
+    return hashlib.sha256(source).hexdigest(), tuple(sorted(names))
+
+def _project_sources(path: str) -> Dict[str, str]:
+    """
+    Source hashes of a project file and of every project module it imports, directly or transitively
+    (imports inside functions included), keyed by path relative to the repository root.
+    """
+    hashes, pending = {}, [path]
+    while pending:
+        current = os.path.abspath(pending.pop())
+        rel = os.path.relpath(current, PROJECT_ROOT)
+        if rel in hashes:
+            continue
+        hashes[rel], names = _parse_module(current, os.stat(current).st_mtime_ns)
+        for name in names:
+            dependency = getattr(sys.modules.get(name), '__file__', None)
+            if _is_project_file(dependency):
+                pending.append(dependency)
+    return hashes
+
+def _code_version(func: Callable) -> str:
+    """
+    Hash of the stage function's module and of every project module it imports (e.g. a stage in
+    src/anomaly_detection.py also depends on src/backfill.py); editing any of them invalidates its checkpoints.
+    """
+    path = getattr(sys.modules.get(func.__module__), '__file__', None)
+    if _is_project_file(path):
+        return hashlib.sha256(json.dumps(_project_sources(path), sort_keys=True).encode('utf-8')).hexdigest()
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = func.__qualname__
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stage_key(stage: Stage, upstream_keys: Dict[str, str]) -> str:
+    """
+    Content address of a stage output: upstream keys + code version + parameters + input file contents.
+    """
+    payload = {
+        'stage': stage.name,
+        'inputs': [[i, upstream_keys[i.split(':', 1)[0]]] for i in stage.inputs],
+        'code': _code_version(stage.func),
+        'params': stage.params,
+        'files': sorted([os.path.basename(f), _file_digest(f)] for f in stage.files)
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _write_frame(df: pd.DataFrame, base: str) -> None:
+    try:
+        df.to_parquet(base + ".parquet", index=False)
+    except Exception as e:
+        # Mixed-type object columns (or no pyarrow) cannot go to Parquet; keep the checkpoint anyway
+        logger.debug(f"Parquet checkpoint failed for {base} ({e}); using pickle")
+        if os.path.exists(base + ".parquet"):
+            os.remove(base + ".parquet")
+        df.to_pickle(base + ".pkl")
+
+def _read_frame(base: str) -> pd.DataFrame:
+    if os.path.exists(base + ".parquet"):
+        return pd.read_parquet(base + ".parquet")
+    return pd.read_pickle(base + ".pkl")
+
+def save_checkpoint(path: str, output: Any) -> None:
+    """
+    Writes a stage output into a temporary directory and publishes it with one rename.
+    """
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    parts = output if isinstance(output, dict) else {'': output}
+    for part, df in parts.items():
+        _write_frame(df, os.path.join(tmp_path, part or "output"))
+    with open(os.path.join(tmp_path, SUCCESS_MARKER), 'w') as f:
+        json.dump({'parts': list(parts) if isinstance(output, dict) else None}, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path: str) -> Any:
+    with open(os.path.join(path, SUCCESS_MARKER)) as f:
+        parts = json.load(f)['parts']
+    if parts is None:
+        return _read_frame(os.path.join(path, "output"))
+    return {part: _read_frame(os.path.join(path, part)) for part in parts}
+
+class PipelineDAG:
+    """
+    Runs stages in dependency order with content-addressed checkpoints.
+
+    A stage whose key (see stage_key) already has a complete checkpoint is loaded instead of
+    executed, so unchanged stages are skipped and a failed run resumes from its last good stage.
+    Stages whose inputs are ready run concurrently on a thread pool.
+    """
+
+    def __init__(self, checkpoint_dir: Optional[str] = None, max_workers: int = 4, metrics: Optional[Any] = None):
+        self.checkpoint_dir = checkpoint_dir
+        self.max_workers = max_workers
+        self.metrics = metrics # StageMetrics (src/stage_metrics.py), optional
+        self.stages: Dict[str, Stage] = {}
+        self.status: Dict[str, str] = {}
+        self.keys: Dict[str, str] = {}
+
+    def add(self, stage: Stage) -> Stage:
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        missing = [u for u in stage.upstream() if u not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def _checkpoint_path(self, stage: Stage, key: str) -> Optional[str]:
+        if not self.checkpoint_dir or not stage.cache:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{stage.name}-{key[:16]}")
+
+    def _execute(self, stage: Stage, key: str, args: List[Any]) -> Any:
+        if self.metrics is None:
+            return self._execute_stage(stage, key, args)
+        with self.metrics.stage(stage.name, args) as record:
+            record['output'] = self._execute_stage(stage, key, args)
+            record['status'] = self.status[stage.name]
+            record['cache_key'] = key[:16]
+            return record['output']
+
+    def _execute_stage(self, stage: Stage, key: str, args: List[Any]) -> Any:
+        path = self._checkpoint_path(stage, key)
+        if path and os.path.exists(os.path.join(path, SUCCESS_MARKER)):
+            logger.info(f"{stage.description} (checkpoint {key[:12]})")
+            self.status[stage.name] = 'cached'
+            return load_checkpoint(path)
+
+        logger.info(stage.description)
+        output = stage.func(*args, **stage.params)
+        if path:
+            save_checkpoint(path, output)
+        self.status[stage.name] = 'ran'
+        return output
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Executes the DAG. Returns {stage name: output}; per-stage 'ran'/'cached' is kept in self.status.
+        """
+        if self.checkpoint_dir:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+        outputs: Dict[str, Any] = {}
+        keys: Dict[str, str] = {}
+        self.status = {}
+        pending = dict(self.stages)
+        running = {}
+
+        def _arg(ref: str) -> Any:
+            name, _, part = ref.partition(':')
+            return outputs[name][part] if part else outputs[name]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                ready = [s for s in pending.values() if all(u in outputs for u in s.upstream())]
+                for stage in ready:
+                    del pending[stage.name]
+                    keys[stage.name] = stage_key(stage, keys)
+                    args = [_arg(ref) for ref in stage.inputs]
+                    running[pool.submit(self._execute, stage, keys[stage.name], args)] = stage.name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        outputs[name] = future.result()
+                    except Exception:
+                        logger.error(f"Stage '{name}' failed; completed stages are checkpointed for resume")
+                        for other in running:
+                            other.cancel()
+                        raise
+
+        self.keys = keys
+        return outputs
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,288 @@
+
+import pandas as pd
+import argparse
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse, parse_qs, unquote
+
+from src.data_ingestion import load_raw_frames
+from src.dimensions import code_labels
+from src.result_export import find_results, read_results
+
+logger = logging.getLogger(__name__)
+
+# Columns exposed to dashboards
+SERVED_COLUMNS = [
+    'cps_rank', 'district_id', 'state', 'cps_score', 'cps_tier', 'bsi_score', 'bsi_tier',
+    'camp_type', 'deployment_freq_days', 'location_suitability'
+]
+DEFAULT_TOP_N = 20
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def _key(name: Any) -> str:
+    return str(name).strip().lower()
+
+def _int_param(query: Dict[str, List[str]], name: str, default: int) -> int:
+    # A ValueError is answered with 400
+    if name not in query:
+        return default
+    try:
+        return int(query[name][0])
+    except ValueError:
+        raise ValueError(f"query parameter '{name}' must be an integer, got {query[name][0]!r}")
+
+def load_geography(data_dir: str) -> pd.DataFrame:
+    """
+    (state, district, pincode) triples of the ingested raw files, for states and pincode lookups.
+    Names come from the ingestion registries, so state aliases are already canonical and match
+    the ranked output.
+    """
+    frames = load_raw_frames(data_dir)
+    codes = ['state_code', 'district_code', 'pincode_code']
+    pairs = [frames[k][codes].drop_duplicates() for k in ['biometric', 'demographic', 'enrolment']
+             if set(codes) <= set(frames[k].columns)]
+    if not pairs:
+        return pd.DataFrame(columns=['state', 'district', 'pincode'])
+    geo = pd.concat(pairs, ignore_index=True).drop_duplicates()
+    return pd.DataFrame({
+        'state': code_labels(frames['state_registry'], geo['state_code'], 'state', 'state_code').astype(str),
+        'district': code_labels(frames['district_registry'], geo['district_code']).astype(str),
+        'pincode': code_labels(frames['pincode_registry'], geo['pincode_code'], 'pincode', 'pincode_code')
+    })
+
+def build_ranking_store(df: pd.DataFrame, geography: Optional[pd.DataFrame] = None,
+                        top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+    """
+    Builds an immutable, indexed snapshot of the ranked output.
+
+    All responses are pre-serialized, so a request is one or two dict lookups plus a socket write.
+
+    Indexes:
+    - 'by_district': lowercase (state, district) -> position (O(1)); district names repeat across states
+    - 'by_name': lowercase district name -> positions, one per state with that name
+    - 'by_pincode': pincode -> positions of the districts it belongs to (O(1))
+    - 'names': sorted (lowercase name, position) pairs for bisect prefix search
+    - 'top_by_state': pre-serialized top-N per state
+    - 'by_tier': positions per CPS tier, in rank order (paginated by slicing)
+    """
+    df = df.sort_values('cps_rank').reset_index(drop=True)
+
+    if 'state' not in df.columns:
+        df['state'] = 'Unknown'
+        if geography is not None and not geography.empty:
+            # Most frequent state per district name
+            states = (geography.groupby(['district', 'state']).size().reset_index(name='n')
+                      .sort_values('n', ascending=False).drop_duplicates('district'))
+            state_map = dict(zip(states['district'].astype(str), states['state']))
+            df['state'] = df['district_id'].map(state_map).fillna('Unknown')
+
+    served = df[[c for c in SERVED_COLUMNS if c in df.columns]]
+    records = json.loads(served.to_json(orient='records'))
+    encoded = [json.dumps(r).encode('utf-8') for r in records]
+
+    by_district = {(_key(r['state']), _key(r['district_id'])): i for i, r in enumerate(records)}
+    by_name: Dict[str, List[int]] = {}
+    for i, r in enumerate(records):
+        by_name.setdefault(_key(r['district_id']), []).append(i)
+
+    by_pincode: Dict[str, List[int]] = {}
+    if geography is not None and not geography.empty:
+        for pin, state, district in zip(geography['pincode'].astype(str), geography['state'], geography['district']):
+            pos = by_district.get((_key(state), _key(district)))
+            if pos is not None and pos not in by_pincode.setdefault(pin, []):
+                by_pincode[pin].append(pos)
+
+    names = sorted((_key(r['district_id']), i) for i, r in enumerate(records))
+
+    top_by_state = {}
+    for state, idx in served.groupby(served['state'].map(_key)).groups.items():
+        top = sorted(idx)[:top_n]
+        top_by_state[state] = json.dumps([records[i] for i in top]).encode('utf-8')
+
+    by_tier = {_key(t): sorted(idx) for t, idx in served.groupby('cps_tier').groups.items()}
+
+    return {
+        'records': records,
+        'encoded': encoded,
+        'by_district': by_district,
+        'by_name': by_name,
+        'by_pincode': by_pincode,
+        'names': names,
+        'name_keys': [n for n, _ in names],
+        'top_by_state': top_by_state,
+        'by_tier': by_tier,
+        'loaded_at': time.time(),
+        'row_count': len(records)
+    }
+
+def prefix_search(store: Dict[str, Any], prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+    keys = store['name_keys']
+    prefix = _key(prefix)
+    start = bisect.bisect_left(keys, prefix)
+    end = bisect.bisect_left(keys, prefix + '\uffff', lo=start)
+    return [store['records'][pos] for _, pos in store['names'][start:min(end, start + limit)]]
+
+def tier_page(store: Dict[str, Any], tier: str, page: int, page_size: int) -> Dict[str, Any]:
+    tier_key = _key(tier)
+    if tier_key.isdigit():
+        tier_key = f"tier {tier_key}"
+    positions = store['by_tier'].get(tier_key, [])
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    start = (page - 1) * page_size
+    return {
+        'tier': tier,
+        'page': page,
+        'page_size': page_size,
+        'total': len(positions),
+        'items': [store['records'][i] for i in positions[start:start + page_size]]
+    }
+
+class StoreHolder:
+    """
+    Holds the current snapshot. Readers take one reference per request, so swapping in a new
+    snapshot is a single atomic assignment and in-flight requests finish on the old one.
+    """
+
+    def __init__(self, output_dir: str, data_dir: Optional[str] = None, top_n: int = DEFAULT_TOP_N):
+        self.output_dir = output_dir
+        self.data_dir = data_dir
+        self.top_n = top_n
+        self.geography = load_geography(data_dir) if data_dir else None
+        self.path = None
+        self.mtime = None
+        self.store = None
+        self.reload()
+
+    def reload(self) -> bool:
+        path = find_results(self.output_dir)
+        mtime = os.stat(path).st_mtime_ns
+        if path == self.path and mtime == self.mtime:
+            return False
+        store = build_ranking_store(read_results(path), self.geography, self.top_n)
+        self.store, self.path, self.mtime = store, path, mtime
+        logger.info(f"Loaded {store['row_count']} districts from {path}")
+        return True
+
+    def watch(self, interval: float = 2.0) -> threading.Thread:
+        def _loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    # Keep serving the previous snapshot (e.g. results mid-write)
+                    logger.warning(f"Reload failed, keeping current snapshot: {e}")
+
+        thread = threading.Thread(target=_loop, name="ranking-reload", daemon=True)
+        thread.start()
+        return thread
+
+def make_handler(holder: StoreHolder):
+    class RankingHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # keep-alive
+        disable_nagle_algorithm = True # headers and body are separate writes; avoid the 40 ms delayed-ACK stall
+
+        def _send(self, status: int, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, obj: Any) -> None:
+            self._send(status, json.dumps(obj).encode('utf-8'))
+
+        def do_GET(self):
+            store = holder.store
+            url = urlparse(self.path)
+            parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+            query = parse_qs(url.query, keep_blank_values=True)
+
+            if parts == ['health']:
+                return self._send_json(200, {'status': 'ok', 'rows': store['row_count'], 'loaded_at': store['loaded_at']})
+
+            if len(parts) == 3 and parts[0] == 'district':
+                pos = store['by_district'].get((_key(parts[1]), _key(parts[2])))
+                if pos is None:
+                    return self._send_json(404, {'error': 'district not found'})
+                return self._send(200, store['encoded'][pos])
+
+            if len(parts) == 2 and parts[0] == 'district':
+                positions = store['by_name'].get(_key(parts[1]), [])
+                if not positions:
+                    return self._send_json(404, {'error': 'district not found'})
+                if len(positions) > 1:
+                    return self._send_json(409, {'error': 'district name is used in several states; use /district/<state>/<name>',
+                                                 'states': [store['records'][i]['state'] for i in positions]})
+                return self._send(200, store['encoded'][positions[0]])
+
+            if len(parts) == 2 and parts[0] == 'pincode':
+                positions = store['by_pincode'].get(parts[1].strip())
+                if not positions:
+                    return self._send_json(404, {'error': 'pincode not found'})
+                return self._send_json(200, [store['records'][i] for i in positions])
+
+            if parts == ['search']:
+                try:
+                    limit = _int_param(query, 'limit', 10)
+                except ValueError as e:
+                    return self._send_json(400, {'error': str(e)})
+                return self._send_json(200, prefix_search(store, query.get('prefix', [''])[0], limit))
+
+            if len(parts) == 3 and parts[0] == 'state' and parts[2] == 'top':
+                body = store['top_by_state'].get(_key(parts[1]))
+                if body is None:
+                    return self._send_json(404, {'error': 'state not found'})
+                return self._send(200, body)
+
+            if len(parts) == 2 and parts[0] == 'tier':
+                try:
+                    page = _int_param(query, 'page', 1)
+                    page_size = _int_param(query, 'page_size', DEFAULT_PAGE_SIZE)
+                except ValueError as e:
+                    return self._send_json(400, {'error': str(e)})
+                return self._send_json(200, tier_page(store, parts[1], page, page_size))
+
+            return self._send_json(404, {'error': 'unknown endpoint'})
+
+        def log_message(self, format, *args):
+            # Per-request access logging would dominate latency
+            pass
+
+    return RankingHandler
+
+def serve(output_dir: str, data_dir: Optional[str] = None, host: str = "127.0.0.1", port: int = 8765,
+          reload_interval: float = 2.0) -> ThreadingHTTPServer:
+    """
+    Starts the ranking service (blocking). New pipeline output in output_dir is picked up automatically.
+
+    Endpoints:
+        /district/<state>/<name>, /district/<name> (409 if the name is in several states), /pincode/<pin>, /search?prefix=&limit=, /state/<state>/top,
+        /tier/<tier>?page=&page_size=, /health
+    """
+    holder = StoreHolder(output_dir, data_dir)
+    holder.watch(reload_interval)
+    server = ThreadingHTTPServer((host, port), make_handler(holder))
+    server.daemon_threads = True
+    logger.info(f"Ranking service listening on http://{host}:{port}")
+    server.serve_forever()
+    return server
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.ranking_service [output_dir] [--data-dir data]
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="In-memory ranking query service")
+    parser.add_argument("output_dir", nargs="?", default="final_output_real")
+    parser.add_argument("--data-dir", default=None, help="Raw data folder for pincode/state lookups")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    serve(args.output_dir, args.data_dir, args.host, args.port)
@@ -0,0 +1,231 @@
+
+import pandas as pd
+import numpy as np
+import logging
+import os
+import re
+import shutil
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    # Optional dependency: without pyarrow only CSV views are written
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+RESULT_STEM = "final_ranked_districts"
+PINCODE_RESULT_STEM = "final_ranked_pincodes"
+TOP20_STEM = "top_20_priority_districts"
+METADATA_KEY = b"aadhaar_netra"
+
+# Low-cardinality label columns are stored dictionary-encoded
+CATEGORICAL_COLUMNS = [
+    'state', 'bsi_tier', 'cps_tier', 'camp_type', 'deployment_freq_days', 'location_suitability'
+]
+INTEGER_COLUMNS = {'cps_rank': 'int32'}
+# Compact exports (pincode granularity) drop columns derivable from the rest
+# and keep only the CPS score (rounded to 2 decimals) in float64
+COMPACT_DROP_SUFFIXES = ('_norm',)
+COMPACT_DROP_COLUMNS = ['strategy_reasoning']
+COMPACT_FLOAT64_COLUMNS = ['cps_score']
+COMPACT_INTEGER_COLUMNS = {
+    'pincode': 'int32', 'total_aadhaar_holders': 'int64', 'total_biometric_updates': 'int64',
+    'total_demographic_updates': 'int64', 'biometric_coverage_count': 'int64'
+}
+
+def _typed_frame(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """
+    Casts the ranked output to compact, explicit dtypes before serialization.
+    With compact=True the '_norm' columns and the reasoning text are dropped, counts become
+    integers and the remaining float features float32.
+    """
+    typed = df.copy()
+    if compact:
+        drop = [c for c in typed.columns if c.endswith(COMPACT_DROP_SUFFIXES) or c in COMPACT_DROP_COLUMNS]
+        typed = typed.drop(columns=drop)
+        for col, dtype in COMPACT_INTEGER_COLUMNS.items():
+            if col in typed.columns:
+                typed[col] = typed[col].astype(dtype)
+        floats = [c for c in typed.select_dtypes('float64').columns if c not in COMPACT_FLOAT64_COLUMNS]
+        typed = typed.astype({c: np.float32 for c in floats})
+        if 'district_id' in typed.columns and 'pincode' in typed.columns:
+            typed['district_id'] = typed['district_id'].astype('category') # parent district, repeated per pincode
+    for col in CATEGORICAL_COLUMNS:
+        if col in typed.columns:
+            typed[col] = typed[col].astype('category')
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in typed.columns:
+            typed[col] = typed[col].astype(dtype)
+    if 'last_biometric_update_date' in typed.columns:
+        typed['last_biometric_update_date'] = pd.to_datetime(typed['last_biometric_update_date'], errors='coerce')
+    if 'district_id' in typed.columns and not isinstance(typed['district_id'].dtype, pd.CategoricalDtype):
+        typed['district_id'] = typed['district_id'].astype(str)
+    return typed
+
+def _to_table(df: pd.DataFrame, run_metadata: Dict[str, Any]) -> "pa.Table":
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_meta = dict(table.schema.metadata or {})
+    schema_meta[METADATA_KEY] = json.dumps(run_metadata, default=str).encode('utf-8')
+    return table.replace_schema_metadata(schema_meta)
+
+def _shard_name(value: Any) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(value)).strip('_').lower() or 'unknown'
+
+def write_csv_views(df: pd.DataFrame, output_dir: str, stem: str = RESULT_STEM) -> List[str]:
+    """
+    Writes the legacy CSV views (full ranked list + top 20).
+    """
+    final_csv_path = os.path.join(output_dir, f"{stem}.csv")
+    df.to_csv(final_csv_path, index=False)
+
+    top20_csv_path = os.path.join(output_dir, f"{TOP20_STEM}.csv" if stem == RESULT_STEM else f"{stem}_top_20.csv")
+    df[df['is_top_20']].to_csv(top20_csv_path, index=False)
+
+    logger.info(f"Saved CSV views to {final_csv_path} and {top20_csv_path}")
+    return [final_csv_path, top20_csv_path]
+
+def export_results(df: pd.DataFrame, output_dir: str, run_metadata: Optional[Dict[str, Any]] = None,
+                   shard_column: Optional[str] = 'state', write_csv: bool = False,
+                   compression: str = 'zstd', max_workers: Optional[int] = None,
+                   stem: str = RESULT_STEM, compact: bool = False) -> Dict[str, Any]:
+    """
+    Writes the final ranked dataset once, in typed columnar formats.
+
+    Artifacts:
+    - <stem>.parquet (final_ranked_districts): compressed Parquet with run metadata in the schema.
+    - <stem>.arrow: Arrow IPC file, uncompressed so readers can memory-map it.
+    - by_<shard_column>/<value>.parquet: one shard per state, written in parallel (skipped when None).
+      The directory is replaced as a whole, so shards of states missing from this run are removed.
+    - CSV views (full + top 20) only when write_csv is True.
+
+    compact=True drops derivable columns and narrows dtypes (see _typed_frame); used for the
+    pincode-level output, which has ~20x the rows of the district table.
+
+    Falls back to CSV views if pyarrow is not installed.
+
+    Inputs:
+        df: Output of recommend_camp_strategy.
+        output_dir: Destination folder.
+        run_metadata: JSON-serializable provenance (timestamp, input path, row counts, ...).
+
+    Outputs:
+        dict: Paths written, keyed by artifact type.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    run_metadata = dict(run_metadata or {})
+    run_metadata.setdefault('row_count', int(len(df)))
+    written: Dict[str, Any] = {}
+
+    if pa is None:
+        logger.warning("pyarrow not installed; exporting CSV views only.")
+        written['csv'] = write_csv_views(df, output_dir, stem)
+        return written
+
+    typed = _typed_frame(df, compact)
+    table = _to_table(typed, run_metadata)
+
+    # Write to a temporary name and rename, so readers (e.g. ranking_service) never see a partial file
+    parquet_path = os.path.join(output_dir, f"{stem}.parquet")
+    pq.write_table(table, parquet_path + ".tmp", compression=compression)
+    os.replace(parquet_path + ".tmp", parquet_path)
+    written['parquet'] = parquet_path
+
+    arrow_path = os.path.join(output_dir, f"{stem}.arrow")
+    with pa.OSFile(arrow_path + ".tmp", 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(arrow_path + ".tmp", arrow_path)
+    written['arrow'] = arrow_path
+    logger.info(f"Saved final ranked list to {parquet_path} and {arrow_path}")
+
+    # --- Per-shard files ---
+    if shard_column is not None and shard_column in typed.columns:
+        shard_dir = os.path.join(output_dir, f"by_{shard_column}")
+        staging = shard_dir + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        # One sort + split instead of a boolean filter per shard
+        keys = typed[shard_column].astype(str).to_numpy()
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(order)]])
+        sorted_table = table.take(pa.array(order))
+
+        def _write_shard(start: int, end: int) -> str:
+            name = f"{_shard_name(sorted_keys[start])}.parquet"
+            pq.write_table(sorted_table.slice(start, end - start), os.path.join(staging, name), compression=compression)
+            return os.path.join(shard_dir, name)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            written['shards'] = list(pool.map(_write_shard, starts, ends)) if len(order) else []
+
+        # Swap in the complete shard set; the previous run's directory goes with its stale shards
+        if os.path.exists(shard_dir):
+            os.replace(shard_dir, shard_dir + ".old")
+        os.replace(staging, shard_dir)
+        shutil.rmtree(shard_dir + ".old", ignore_errors=True)
+        logger.info(f"Saved {len(written['shards'])} '{shard_column}' shards to {shard_dir}")
+    elif shard_column is not None:
+        logger.warning(f"Column '{shard_column}' not present; skipping sharded export.")
+
+    if write_csv:
+        written['csv'] = write_csv_views(df, output_dir, stem)
+
+    return written
+
+def find_results(output_dir: str, stem: str = RESULT_STEM) -> str:
+    """
+    Returns the preferred results file in output_dir: Arrow IPC, then Parquet, then CSV.
+    """
+    candidates = [f"{stem}.arrow", f"{stem}.parquet", f"{stem}.csv"]
+    if pa is None:
+        candidates = candidates[2:]
+    for name in candidates:
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No {stem} results found in {output_dir}")
+
+def read_results(path: str, columns: Optional[List[str]] = None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Loads exported results. Arrow IPC files are memory-mapped rather than parsed.
+    """
+    if path.endswith('.csv'):
+        return pd.read_csv(path, usecols=columns)
+    if pa is None:
+        raise ImportError("pyarrow is required to read columnar results.")
+
+    if path.endswith('.arrow'):
+        source = pa.memory_map(path, 'r') if memory_map else pa.OSFile(path, 'rb')
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        table = pq.read_table(path, columns=columns, memory_map=memory_map)
+    return table.to_pandas()
+
+def read_run_metadata(path: str) -> Dict[str, Any]:
+    """
+    Returns the run metadata embedded in a Parquet or Arrow results file.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to read run metadata.")
+    if path.endswith('.arrow'):
+        schema = pa.ipc.open_file(pa.memory_map(path, 'r')).schema
+    else:
+        schema = pq.read_schema(path)
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+if __name__ == "__main__":
+    pass
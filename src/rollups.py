@@ -0,0 +1,149 @@
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict
+
+from src.scoring_cps import CPS_TIERS, cps_tier_codes
+from src.dimensions import code_labels
+
+logger = logging.getLogger(__name__)
+
+# Roll-up level -> (code column grouped on, name column carried along)
+ROLLUP_LEVELS = {'district': ('district_code', 'district_id'), 'state': ('state_code', 'state')}
+ROLLUP_STEM = "pincode_rollup"
+SUM_COLUMNS = ['total_aadhaar_holders', 'total_biometric_updates', 'total_demographic_updates', 'uncovered_population']
+# Pincode score means are weighted by Aadhaar holders, so a district's score reflects where its people are
+WEIGHTED_COLUMNS = ['bsi_score', 'cps_score']
+PARENT_CODES = ['pincode_code', 'state_code', 'district_code']
+
+def _pincode_pairs(df: pd.DataFrame, sizes: np.ndarray) -> pd.DataFrame:
+    # Row counts per (pincode, state, district) code triple of one ingested frame: the triple
+    # is packed into one int64 key, so the grouping is a single integer np.unique
+    codes = df[PARENT_CODES].to_numpy(dtype=np.int64)
+    codes = codes[(codes >= 0).all(axis=1)]
+    key = (codes[:, 0] * sizes[1] + codes[:, 1]) * sizes[2] + codes[:, 2]
+    key, n_rows = np.unique(key, return_counts=True)
+    return pd.DataFrame({
+        'pincode_code': key // (sizes[1] * sizes[2]),
+        'state_code': key // sizes[2] % sizes[1],
+        'district_code': key % sizes[2],
+        'n_rows': n_rows
+    })
+
+def build_pincode_dim(raw: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Parent (state, district) of every pincode seen in the ingested frames (biometric,
+    demographic, enrolment), with codes and names.
+
+    A pincode that appears under more than one district (boundary pincodes, spelling variants)
+    is assigned to the pair with the most rows; ties go to the lowest (earliest registered) codes.
+
+    Inputs:
+        raw: Output of load_raw_frames (coded frames and the '<dimension>_registry' tables).
+
+    Outputs:
+        pd.DataFrame: 'pincode_code', 'pincode', 'state_code', 'district_code', 'state',
+                      'district_id', 'n_rows', 'n_districts'.
+    """
+    columns = PARENT_CODES[:1] + ['pincode'] + PARENT_CODES[1:] + ['state', 'district_id', 'n_rows', 'n_districts']
+    frames = [raw[k] for k in ['biometric', 'demographic', 'enrolment']
+              if not raw[k].empty and set(PARENT_CODES) <= set(raw[k].columns)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    registries = {name: raw[f"{name}_registry"] for name in ['pincode', 'state', 'district']}
+    sizes = np.array([len(registries[name]) for name in ['pincode', 'state', 'district']], dtype=np.int64)
+    dim = pd.concat([_pincode_pairs(df, sizes) for df in frames])
+    dim = dim.groupby(PARENT_CODES, sort=False)['n_rows'].sum().reset_index()
+    dim['n_districts'] = dim.groupby('pincode_code')['district_code'].transform('size')
+    dim = dim.sort_values(['pincode_code', 'n_rows', 'state_code', 'district_code'], ascending=[True, False, True, True])
+    dim = dim.drop_duplicates('pincode_code').reset_index(drop=True)
+    dim = dim.astype({c: np.int32 for c in PARENT_CODES})
+
+    dim['pincode'] = code_labels(registries['pincode'], dim['pincode_code'], 'pincode', 'pincode_code').astype(np.int64)
+    dim['state'] = code_labels(registries['state'], dim['state_code'], 'state', 'state_code').astype(str)
+    dim['district_id'] = code_labels(registries['district'], dim['district_code']).astype(str)
+
+    split = int((dim['n_districts'] > 1).sum())
+    if split:
+        logger.info(f"{split} pincodes appear under more than one district; assigned to the most frequent.")
+    return dim[columns]
+
+def attach_parents(df: pd.DataFrame, pincode_dim: pd.DataFrame) -> pd.DataFrame:
+    """
+    Attaches 'pincode', the parent 'district_id' / 'state' (names, first columns) and their
+    codes to a pincode-coded frame, with one integer join on pincode_dim.
+    """
+    labels = ['pincode', 'district_id', 'state']
+    parents = pincode_dim[['pincode_code', 'state_code', 'district_code'] + labels]
+    out = df.drop(columns=labels + ['state_code', 'district_code'], errors='ignore')
+    out = out.merge(parents, on='pincode_code', how='left')
+    out['district_id'] = out['district_id'].fillna('Unknown')
+    out['state'] = out['state'].fillna('Unknown')
+    return out[labels + [c for c in out.columns if c not in labels]]
+
+def rollup(df: pd.DataFrame, level: str, label: str) -> pd.DataFrame:
+    """
+    Rolls scored pincodes up to one level of the hierarchy: the groups are the integer codes in
+    `level` ('district_code' or 'state_code'); `label` ('district_id' or 'state') is carried along.
+
+    Every aggregate is one pass over the pincode arrays: sums and holder-weighted means are
+    np.bincount over the group codes, the per-tier counts one bincount over group * tier,
+    and the top pincode per group comes from a single lexsort.
+
+    Outputs:
+        pd.DataFrame, one row per group ranked by weighted CPS: level, label, 'n_pincodes', summed counts,
+        'bsi_score' / 'cps_score' (holder-weighted), 'cps_score_max', 'top_pincode',
+        'pincodes_tier_1' ... 'pincodes_tier_5', 'cps_tier' (of the weighted score), 'cps_rank'.
+    """
+    codes, groups = pd.factorize(df[level], sort=True)
+    n = len(groups)
+    names = np.empty(n, dtype=object)
+    names[codes] = df[label].to_numpy(dtype=object) # one name per code
+    out = pd.DataFrame({level: groups.astype(np.int32), label: names, 'n_pincodes': np.bincount(codes, minlength=n)})
+
+    for col in SUM_COLUMNS:
+        if col in df.columns:
+            out[col] = np.bincount(codes, df[col].to_numpy(dtype=float), minlength=n)
+
+    holders = df['total_aadhaar_holders'].to_numpy(dtype=float) if 'total_aadhaar_holders' in df.columns \
+        else np.ones(len(df))
+    weight = np.bincount(codes, holders, minlength=n)
+    size = out['n_pincodes'].to_numpy(dtype=float)
+    for col in WEIGHTED_COLUMNS:
+        values = df[col].to_numpy(dtype=float)
+        weighted = np.bincount(codes, holders * values, minlength=n)
+        plain = np.bincount(codes, values, minlength=n)
+        # Groups without holders fall back to the unweighted mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[col] = np.where(weight > 0, weighted / weight, plain / size)
+    out['cps_score'] = out['cps_score'].round(2)
+
+    # Highest-CPS pincode per group: sort by group, then CPS descending; first row of each group
+    cps = df['cps_score'].to_numpy(dtype=float)
+    order = np.lexsort((-cps, codes))
+    first = order[np.r_[0, np.flatnonzero(np.diff(codes[order])) + 1]] if len(order) else order
+    out['cps_score_max'] = cps[first]
+    out['top_pincode'] = df['pincode'].to_numpy()[first]
+
+    tiers = cps_tier_codes(cps).astype(np.int64)
+    valid = tiers >= 0
+    counts = np.bincount(codes[valid] * len(CPS_TIERS) + tiers[valid], minlength=n * len(CPS_TIERS))
+    counts = counts.reshape(n, len(CPS_TIERS))
+    for i in range(len(CPS_TIERS)):
+        out[f"pincodes_tier_{i + 1}"] = counts[:, i]
+
+    out['cps_tier'] = np.array(CPS_TIERS + ['Unknown'])[cps_tier_codes(out['cps_score'].to_numpy(dtype=float))]
+    out = out.sort_values('cps_score', ascending=False, kind='stable').reset_index(drop=True)
+    out['cps_rank'] = np.arange(1, len(out) + 1, dtype=np.int32)
+    return out
+
+def rollup_all(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    District and state roll-ups of a scored pincode frame, keyed 'district' / 'state'.
+    """
+    return {name: rollup(df, level, label) for name, (level, label) in ROLLUP_LEVELS.items()}
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,87 @@
+
+import pandas as pd
+import numpy as np
+import logging
+import warnings
+from typing import Dict, Any, List
+
+from src.feature_normalization import FEATURES_TO_SCALE
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = ['bsi_score', 'cps_score']
+COUNT_COLUMNS = ['bsi_tier', 'cps_tier', 'camp_type', 'deployment_freq_days', 'location_suitability']
+PREVIEW_COLUMNS = ['pincode', 'district_id', 'state', 'cps_score', 'cps_tier', 'bsi_score', 'camp_type', 'deployment_freq_days']
+
+def summarize_run(df: pd.DataFrame, top_n: int = 20) -> Dict[str, Any]:
+    """
+    Summary statistics of a scored run, computed on request instead of inside every stage.
+
+    All numeric columns (raw features, their '_norm' versions and the scores) are stacked into
+    one float block, so min / max / mean are one vectorized reduction each rather than a scan
+    per column and statistic.
+
+    Outputs:
+        dict (JSON-serializable): 'districts', 'stats' {column: {'min', 'max', 'mean'}},
+                                  'counts' {label column: {value: n}}, 'top' (first top_n rows by CPS).
+    """
+    columns = FEATURES_TO_SCALE + [f"{c}_norm" for c in FEATURES_TO_SCALE] + SCORE_COLUMNS
+    columns = [c for c in columns if c in df.columns]
+
+    stats = {}
+    if columns and len(df):
+        block = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning) # all-NaN columns
+            mins, maxs, means = np.nanmin(block, axis=0), np.nanmax(block, axis=0), np.nanmean(block, axis=0)
+        stats = {
+            col: {'min': float(lo), 'max': float(hi), 'mean': float(mu)}
+            for col, lo, hi, mu in zip(columns, mins, maxs, means)
+        }
+
+    counts = {
+        col: {str(k): int(v) for k, v in df[col].astype(str).value_counts().sort_index().items()}
+        for col in COUNT_COLUMNS if col in df.columns
+    }
+
+    top: List[Dict[str, Any]] = []
+    if 'cps_score' in df.columns:
+        preview = [c for c in PREVIEW_COLUMNS if c in df.columns]
+        top = df.nlargest(top_n, 'cps_score')[preview].astype(object).where(lambda x: x.notna(), None).to_dict('records')
+
+    return {'districts': int(len(df)), 'stats': stats, 'counts': counts, 'top': top}
+
+def render_summary(summary: Dict[str, Any]) -> str:
+    """
+    Console rendering of summarize_run output (feature, normalization, score and strategy sections).
+    """
+    stats = summary['stats']
+    lines = [f"Districts: {summary['districts']}", "", "--- Feature Summary ---",
+             f"{'Feature':<35} {'Min':<10} {'Max':<10} {'Mean':<10}", "-" * 70]
+    for col in FEATURES_TO_SCALE:
+        if col in stats:
+            s = stats[col]
+            lines.append(f"{col:<35} {s['min']:<10.4f} {s['max']:<10.4f} {s['mean']:<10.4f}")
+
+    lines += ["", "--- Normalization Summary ---",
+              f"{'Feature':<35} {'Orig Min':<10} {'Orig Max':<10} -> {'Norm Min':<10} {'Norm Max':<10}", "-" * 90]
+    for col in FEATURES_TO_SCALE:
+        if col in stats and f"{col}_norm" in stats:
+            s, n = stats[col], stats[f"{col}_norm"]
+            lines.append(f"{col:<35} {s['min']:<10.4f} {s['max']:<10.4f} -> {n['min']:<10.4f} {n['max']:<10.4f}")
+
+    lines += ["", "--- Score Summary ---"]
+    for col in SCORE_COLUMNS:
+        if col in stats:
+            s = stats[col]
+            lines.append(f"{col:<35} min {s['min']:.4f}  max {s['max']:.4f}  mean {s['mean']:.4f}")
+
+    for col, values in summary['counts'].items():
+        lines += ["", f"{col} distribution:"] + [f"  {k:<30} {v}" for k, v in values.items()]
+
+    if summary['top']:
+        lines += ["", f"Top {len(summary['top'])} Districts:", pd.DataFrame(summary['top']).to_string(index=False)]
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    pass
@@ -3,10 +3,39 @@ import pandas as pd
 import logging
 import numpy as np
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# BSI weights and tier cut-offs are policy decisions (see TECHNICAL_README.md, Section 7).
+# They are module-level so that other stages (e.g. simulation) reuse the exact same definition.
+W_TIME = 0.40
+W_FREQ = 0.35
+W_GAP = 0.25
+
+BSI_TIERS = ['Critical', 'High', 'Moderate', 'Low']
+BSI_TIER_THRESHOLDS = [0.75, 0.50, 0.25]
+
+def bsi_from_terms(days_norm, consistency_norm, gap_norm):
+    """
+    Weighted BSI from already-normalized inputs, clipped to 0-1.
+    
+    Works element-wise on Series or NumPy arrays of any shape.
+    """
+    # Low update frequency is the inverse of update consistency
+    score = (W_TIME * days_norm) + (W_FREQ * (1.0 - consistency_norm)) + (W_GAP * gap_norm)
+    return score.clip(0.0, 1.0)
+
+def bsi_tier_codes(score, thresholds=None) -> np.ndarray:
+    """
+    Maps BSI scores to indices into BSI_TIERS (0 = Critical ... 3 = Low), -1 for NaN.
+    thresholds: descending cut-offs (default BSI_TIER_THRESHOLDS).
+    """
+    score = np.asarray(score)
+    codes = np.zeros(score.shape, dtype=np.int8)
+    for threshold in (BSI_TIER_THRESHOLDS if thresholds is None else thresholds):
+        codes += (score < threshold)
+    codes[np.isnan(score)] = -1
+    return codes
+
 def compute_bsi(df: pd.DataFrame) -> pd.DataFrame:
     """
     Computes the Biometric Staleness Index (BSI) and assigns priority tiers.
@@ -40,25 +69,14 @@ def compute_bsi(df: pd.DataFrame) -> pd.DataFrame:
     # Weighted indices were computed programmatically to ensure consistency and reproducibility.
     # Biometric Staleness Index captures temporal neglect and coverage gaps in a single explainable score.
     
-    w_time = 0.40
-    w_freq = 0.35
-    w_gap = 0.25
-    
-    # Calculate terms
-    term_time = df_bsi['days_since_last_update_norm']
-    
-    # Low update frequency is the inverse of update consistency
     # If update_consistency_norm is high (1.0), low_freq_term is 0.0 (Good)
     # If update_consistency_norm is low (0.0), low_freq_term is 1.0 (Bad)
-    term_freq = 1.0 - df_bsi['update_consistency_norm']
-    
-    term_gap = df_bsi['biometric_coverage_gap_norm']
-    
-    # Compute BSI
-    df_bsi['bsi_score'] = (w_time * term_time) + (w_freq * term_freq) + (w_gap * term_gap)
-    
-    # Clip to ensure 0-1 range (due to float precision)
-    df_bsi['bsi_score'] = df_bsi['bsi_score'].clip(0.0, 1.0)
+    # Result is clipped to ensure 0-1 range (due to float precision)
+    df_bsi['bsi_score'] = bsi_from_terms(
+        df_bsi['days_since_last_update_norm'],
+        df_bsi['update_consistency_norm'],
+        df_bsi['biometric_coverage_gap_norm']
+    )
     
     # Assign Tiers
     # BSI >= 0.75: Critical
@@ -66,29 +84,14 @@ def compute_bsi(df: pd.DataFrame) -> pd.DataFrame:
     # BSI 0.25–0.49: Moderate
     # BSI < 0.25: Low
     
-    conditions = [
-        (df_bsi['bsi_score'] >= 0.75),
-        (df_bsi['bsi_score'] >= 0.50) & (df_bsi['bsi_score'] < 0.75),
-        (df_bsi['bsi_score'] >= 0.25) & (df_bsi['bsi_score'] < 0.50),
-        (df_bsi['bsi_score'] < 0.25)
-    ]
-    tiers = ['Critical', 'High', 'Moderate', 'Low']
-    
-    df_bsi['bsi_tier'] = np.select(conditions, tiers, default='Unknown')
+    codes = bsi_tier_codes(df_bsi['bsi_score'].to_numpy(dtype=float))
+    df_bsi['bsi_tier'] = np.array(BSI_TIERS + ['Unknown'])[codes]
     
     # Sort descending by BSI (Highest urgency first)
     df_bsi = df_bsi.sort_values(by='bsi_score', ascending=False)
     
     logger.info("BSI computation complete.")
     
-    # Print Summary
-    print("\n--- BSI Summary ---")
-    print(f"Min Score: {df_bsi['bsi_score'].min():.4f}")
-    print(f"Max Score: {df_bsi['bsi_score'].max():.4f}")
-    print(f"Mean Score: {df_bsi['bsi_score'].mean():.4f}")
-    print("\nTier Distribution:")
-    print(df_bsi['bsi_tier'].value_counts())
-    
     return df_bsi
 
 if __name__ == "__main__":
@@ -3,10 +3,42 @@ import pandas as pd
 import numpy as np
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# CPS weights and tier cut-offs (see TECHNICAL_README.md, Section 7).
+W_STALE = 0.5
+W_POP = 0.3
+W_LOW_FREQ = 0.2
+
+CPS_TIERS = ['Tier 1', 'Tier 2', 'Tier 3', 'Tier 4', 'Tier 5']
+CPS_TIER_THRESHOLDS = [85, 70, 55, 40]
+
+def cps_from_terms(bsi_score, pop_norm, consistency_norm):
+    """
+    Camp Priority Score (0-100, rounded to 2 decimals) from BSI and normalized inputs.
+    
+    Works element-wise on Series or NumPy arrays of any shape.
+    """
+    term_freq = 1.0 - consistency_norm # Low frequency = High priority
+    raw_score = (W_STALE * bsi_score) + (W_POP * pop_norm) + (W_LOW_FREQ * term_freq)
+    return (raw_score * 100.0).round(2)
+
+def cps_tier_codes(score, thresholds=None) -> np.ndarray:
+    """
+    Maps CPS scores to indices into CPS_TIERS (0 = Tier 1 ... 4 = Tier 5), -1 for NaN.
+    thresholds: descending cut-offs (default CPS_TIER_THRESHOLDS).
+    """
+    score = np.asarray(score)
+    codes = np.zeros(score.shape, dtype=np.int8)
+    for threshold in (CPS_TIER_THRESHOLDS if thresholds is None else thresholds):
+        codes += (score < threshold)
+    codes[np.isnan(score)] = -1
+    return codes
+
+# Equal scores are ranked by entity code (the first of these present), as in src/backfill.py,
+# so a single run and a backfill of the same date store the same ranks
+TIE_BREAK_COLUMNS = ['pincode_code', 'district_code']
+
 def compute_camp_priority_score(df: pd.DataFrame) -> pd.DataFrame:
     """
     Computes the Camp Priority Score (CPS) and ranks districts.
@@ -38,19 +70,12 @@ def compute_camp_priority_score(df: pd.DataFrame) -> pd.DataFrame:
     # to ensure resources are allocated where they matter most.
     # Score is deterministic, fully traceable, and designed for human review and override.
 
-    w_stale = 0.5
-    w_pop = 0.3
-    w_freq = 0.2
-    
-    term_stale = df_cps['bsi_score']
-    term_pop = df_cps['adult_population_proxy_norm']
-    term_freq = 1.0 - df_cps['update_consistency_norm'] # Low frequency = High priority
-    
-    # Calculate raw 0-1 score
-    raw_score = (w_stale * term_stale) + (w_pop * term_pop) + (w_freq * term_freq)
-    
-    # Scale to 0-100 and round to 2 decimals to avoid floating point issues at thresholds
-    df_cps['cps_score'] = (raw_score * 100.0).round(2)
+    # Scaled to 0-100 and rounded to 2 decimals to avoid floating point issues at thresholds
+    df_cps['cps_score'] = cps_from_terms(
+        df_cps['bsi_score'],
+        df_cps['adult_population_proxy_norm'],
+        df_cps['update_consistency_norm']
+    )
     
     # Assign Tiers
     # Tier 1 (85-100): Immediate
@@ -59,19 +84,13 @@ def compute_camp_priority_score(df: pd.DataFrame) -> pd.DataFrame:
     # Tier 4 (40-54): Routine
     # Tier 5 (<40): Preventive
     
-    conditions = [
-        (df_cps['cps_score'] >= 85),
-        (df_cps['cps_score'] >= 70) & (df_cps['cps_score'] < 85),
-        (df_cps['cps_score'] >= 55) & (df_cps['cps_score'] < 70),
-        (df_cps['cps_score'] >= 40) & (df_cps['cps_score'] < 55),
-        (df_cps['cps_score'] < 40)
-    ]
-    tiers = ['Tier 1', 'Tier 2', 'Tier 3', 'Tier 4', 'Tier 5']
+    codes = cps_tier_codes(df_cps['cps_score'].to_numpy(dtype=float))
+    df_cps['cps_tier'] = np.array(CPS_TIERS + ['Unknown'])[codes]
     
-    df_cps['cps_tier'] = np.select(conditions, tiers, default='Unknown')
-    
-    # Sort descending
-    df_cps = df_cps.sort_values(by='cps_score', ascending=False).reset_index(drop=True)
+    # Sort descending; ties by entity code (input order for frames without codes)
+    tie_break = [c for c in TIE_BREAK_COLUMNS if c in df_cps.columns][:1]
+    df_cps = df_cps.sort_values(by=['cps_score'] + tie_break, ascending=[False] + [True] * len(tie_break),
+                                kind='mergesort').reset_index(drop=True)
     
     # Rank (1 to N)
     df_cps['cps_rank'] = df_cps.index + 1
@@ -82,18 +101,6 @@ def compute_camp_priority_score(df: pd.DataFrame) -> pd.DataFrame:
     
     logger.info("CPS computation complete.")
     
-    # Summary
-    print("\n--- CPS Summary ---")
-    print(f"Top Score: {df_cps['cps_score'].max():.2f}")
-    print(f"Low Score: {df_cps['cps_score'].min():.2f}")
-    
-    print("\nTier Distribution:")
-    print(df_cps['cps_tier'].value_counts().sort_index())
-    
-    print("\nTop 20 Districts (Preview):")
-    cols = ['district_id', 'cps_score', 'cps_tier', 'bsi_score', 'adult_population_proxy_norm']
-    print(df_cps[cols].head(20))
-    
     return df_cps
 
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, List, Any, Sequence
+
+from src.scoring_bsi import bsi_from_terms, bsi_tier_codes, BSI_TIERS
+from src.scoring_cps import cps_from_terms, cps_tier_codes, CPS_TIERS
+
+logger = logging.getLogger(__name__)
+
+# Lower bound of each deployment frequency band produced by recommend_camp_strategy
+FREQ_TO_INTERVAL_DAYS = {
+    '7-10 days': 7,
+    '14-21 days': 14,
+    '28-35 days': 28,
+    '90 days': 90,
+    '365 days': 365
+}
+
+def _minmax_over_districts(x: np.ndarray) -> np.ndarray:
+    """
+    Min-Max scales along the district axis (axis 0), independently for every (day, plan) slice.
+
+    Matches MinMaxScaler: a constant slice maps to 0.
+    """
+    x_min = x.min(axis=0, keepdims=True)
+    x_range = x.max(axis=0, keepdims=True) - x_min
+    x_range[x_range == 0] = 1.0
+    return (x - x_min) / x_range
+
+def district_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Plan keys of a scored frame: the int32 'district_code' (a district name can occur in several
+    states), or 'district_id' for frames without codes.
+    """
+    return df['district_code'] if 'district_code' in df.columns else df['district_id'].astype(str)
+
+def build_camp_schedule(district_ids: Sequence[Any], plans: List[Dict[str, Any]], horizon_days: int) -> np.ndarray:
+    """
+    Converts candidate camp plans into a daily updates array.
+
+    Inputs:
+        district_ids: District keys in the order of the simulation (axis 0), see district_keys.
+        plans: One dict per plan, {district key: (start_day, interval_days, updates_per_camp)}.
+               Days are counted from 1 (first day after the snapshot). Districts absent from a plan get no camps.
+        horizon_days: Number of simulated days.
+
+    Outputs:
+        np.ndarray: float32 array (districts x horizon_days + 1 x plans) of biometric updates delivered per day.
+                    Day 0 is the snapshot and is always empty.
+    """
+    n_dist, n_plans = len(district_ids), len(plans)
+    position = {str(d): i for i, d in enumerate(district_ids)}
+
+    # Per (district, plan) schedule parameters; start beyond the horizon means "no camps"
+    start = np.full((n_dist, n_plans), horizon_days + 1, dtype=np.int64)
+    interval = np.ones((n_dist, n_plans), dtype=np.int64)
+    capacity = np.zeros((n_dist, n_plans), dtype=np.float32)
+
+    for p, plan in enumerate(plans):
+        for district, (start_day, interval_days, updates_per_camp) in plan.items():
+            i = position.get(str(district))
+            if i is None:
+                logger.warning(f"Plan {p}: unknown district '{district}' ignored.")
+                continue
+            start[i, p] = max(int(start_day), 1)
+            interval[i, p] = max(int(interval_days), 1)
+            capacity[i, p] = updates_per_camp
+
+    days = np.arange(horizon_days + 1)[None, :, None]
+    offset = days - start[:, None, :]
+    camp_day = (offset >= 0) & (offset % interval[:, None, :] == 0)
+
+    return np.where(camp_day, capacity[:, None, :], np.float32(0.0)).astype(np.float32)
+
+def plan_from_strategy(df: pd.DataFrame, updates_per_camp: float = None, start_day: int = 1) -> Dict[Any, tuple]:
+    """
+    Builds a plan dict, keyed by district_keys(df), that follows the recommended 'deployment_freq_days' of every district.
+    Without updates_per_camp, each deployment serves the district's forecast 'expected_updates_per_camp'
+    times its 'camps_per_cycle' (parallel camps of an over-capacity district).
+    """
+    intervals = df['deployment_freq_days'].map(FREQ_TO_INTERVAL_DAYS)
+    if updates_per_camp is None:
+        updates = df['expected_updates_per_camp'] * df['camps_per_cycle'] if 'camps_per_cycle' in df.columns else df['expected_updates_per_camp']
+    else:
+        updates = pd.Series(updates_per_camp, index=df.index)
+    valid = intervals.notna() & updates.notna()
+    return {
+        d: (start_day, int(i), float(u))
+        for d, i, u in zip(district_keys(df)[valid], intervals[valid], updates[valid])
+    }
+
+def simulate_camp_plans(df: pd.DataFrame, camp_updates: np.ndarray, baseline_daily_updates=0.0) -> Dict[str, Any]:
+    """
+    Projects coverage and recency forward in daily steps under many camp plans at once,
+    re-scoring BSI and CPS for every (district, day, plan) with the pipeline's definitions.
+
+    The projection applies the same transformations as feature_engineer / normalize_features:
+    - biometric_coverage_ratio = clip(cumulative updates / holders, <= 1)
+    - days_since_last_update resets on any day with updates, otherwise ages by one day
+    - update_consistency = coverage ratio / (1 + years since last update)
+    - Min-Max normalization across districts, per day and plan
+    Population is held constant, so 'adult_population_proxy_norm' is taken from the snapshot.
+
+    Inputs:
+        df: Scored snapshot (output of compute_camp_priority_score or recommend_camp_strategy).
+        camp_updates: Array (districts x days + 1 x plans) from build_camp_schedule, rows aligned to df.
+        baseline_daily_updates: Organic updates per district per day (scalar or per-district array).
+
+    Outputs:
+        dict: 'district_id' (and 'state', 'district_code' when df has them), 'bsi_score', 'cps_score'
+              (float32, districts x days + 1 x plans),
+              'bsi_tier_code', 'cps_tier_code' (int8 indices into BSI_TIERS / CPS_TIERS).
+    """
+    required = ['district_id', 'total_aadhaar_holders', 'total_biometric_updates',
+                'days_since_last_update', 'adult_population_proxy_norm']
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for simulation: {missing}")
+
+    camp_updates = np.asarray(camp_updates, dtype=np.float32)
+    if camp_updates.ndim != 3 or camp_updates.shape[0] != len(df):
+        raise ValueError(f"camp_updates must be (districts={len(df)}, days, plans), got {camp_updates.shape}")
+
+    n_dist, n_days, n_plans = camp_updates.shape
+    logger.info(f"Simulating {n_plans} plans over {n_days - 1} days for {n_dist} districts...")
+
+    holders = df['total_aadhaar_holders'].to_numpy(dtype=np.float32).copy()
+    holders[holders == 0] = 1.0
+    base_updates = df['total_biometric_updates'].to_numpy(dtype=np.float32)
+    base_days = df['days_since_last_update'].to_numpy(dtype=np.float32)
+    pop_norm = df['adult_population_proxy_norm'].to_numpy(dtype=np.float32)[:, None, None]
+
+    # Daily delivered updates; the snapshot day carries no new activity
+    baseline = np.broadcast_to(np.asarray(baseline_daily_updates, dtype=np.float32).reshape(-1, 1, 1), (n_dist, 1, 1))
+    delivered = camp_updates + baseline
+    delivered[:, 0, :] = 0.0
+
+    # --- Coverage ---
+    coverage_ratio = np.cumsum(delivered, axis=1)
+    coverage_ratio += base_updates[:, None, None]
+    coverage_ratio /= holders[:, None, None]
+    np.minimum(coverage_ratio, 1.0, out=coverage_ratio)
+    coverage_gap = 1.0 - coverage_ratio
+
+    # --- Recency ---
+    # Running max of the last day with activity; -1 means "no activity since snapshot"
+    day_index = np.arange(n_days, dtype=np.int32)[None, :, None]
+    last_active = np.maximum.accumulate(np.where(delivered > 0, day_index, -1), axis=1)
+    days_since = np.where(
+        last_active >= 0,
+        (day_index - last_active).astype(np.float32),
+        base_days[:, None, None] + day_index
+    ).astype(np.float32)
+    del last_active
+
+    consistency = coverage_ratio / (1.0 + days_since / 365.0)
+    del coverage_ratio
+
+    # --- Scoring (same definitions as compute_bsi / compute_camp_priority_score) ---
+    consistency_norm = _minmax_over_districts(consistency)
+    bsi = bsi_from_terms(
+        _minmax_over_districts(days_since),
+        consistency_norm,
+        _minmax_over_districts(coverage_gap)
+    ).astype(np.float32)
+    cps = cps_from_terms(bsi, pop_norm, consistency_norm).astype(np.float32)
+
+    logger.info("Simulation complete.")
+
+    identity = {c: df[c].to_numpy() for c in ['state', 'district_code'] if c in df.columns}
+    return {
+        'district_id': df['district_id'].astype(str).to_numpy(),
+        **identity,
+        'bsi_score': bsi,
+        'cps_score': cps,
+        'bsi_tier_code': bsi_tier_codes(bsi),
+        'cps_tier_code': cps_tier_codes(cps)
+    }
+
+def summarize_simulation(result: Dict[str, Any], days: Sequence[int], plan_names: Sequence[str] = None) -> pd.DataFrame:
+    """
+    Compares plans at selected horizons: mean BSI/CPS and district counts per CPS tier.
+
+    Outputs:
+        pd.DataFrame: One row per (plan, day).
+    """
+    n_plans = result['bsi_score'].shape[2]
+    if plan_names is None:
+        plan_names = [f"plan_{p}" for p in range(n_plans)]
+    days = list(days)
+
+    bsi = result['bsi_score'][:, days, :]
+    cps = result['cps_score'][:, days, :]
+    tiers = result['cps_tier_code'][:, days, :]
+
+    # Tier counts for all (day, plan) at once: one-hot over tier codes summed across districts
+    tier_counts = (tiers[..., None] == np.arange(len(CPS_TIERS))).sum(axis=0)
+
+    rows = []
+    for j, day in enumerate(days):
+        for p, name in enumerate(plan_names):
+            row = {
+                'plan': name,
+                'day': day,
+                'mean_bsi_score': float(bsi[:, j, p].mean()),
+                'mean_cps_score': float(cps[:, j, p].mean())
+            }
+            for t, tier in enumerate(CPS_TIERS):
+                row[tier] = int(tier_counts[j, p, t])
+            rows.append(row)
+
+    return pd.DataFrame(rows)
+
+def district_trajectory(result: Dict[str, Any], plan: int, days: Sequence[int]) -> pd.DataFrame:
+    """
+    Long-format per-district scores and tiers for one plan at selected days.
+    """
+    days = list(days)
+    n_dist = len(result['district_id'])
+    bsi_labels = np.array(BSI_TIERS + ['Unknown'])
+    cps_labels = np.array(CPS_TIERS + ['Unknown'])
+
+    return pd.DataFrame({
+        'district_id': np.tile(result['district_id'], len(days)),
+        **{c: np.tile(result[c], len(days)) for c in ['state', 'district_code'] if c in result},
+        'day': np.repeat(days, n_dist),
+        'bsi_score': result['bsi_score'][:, days, plan].T.ravel(),
+        'bsi_tier': bsi_labels[result['bsi_tier_code'][:, days, plan].T.ravel()],
+        'cps_score': result['cps_score'][:, days, plan].T.ravel(),
+        'cps_tier': cps_labels[result['cps_tier_code'][:, days, plan].T.ravel()]
+    })
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,249 @@
+
+import pandas as pd
+import asyncio
+import hashlib
+import logging
+import random
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Message protocol (Post_MVP_Architecture.md, Module 1)
+MESSAGE_TEMPLATE = "Aadhaar Netra Update: Biometric camps scheduled in {district} on {start_date}. Visit: {portal}"
+DEFAULT_PORTAL_LINK = "https://uidai.gov.in"
+
+# Camp types that produce a scheduled camp (ANNUAL_PREVENTIVE / QUARTERLY_FIXED are routine)
+SCHEDULED_CAMP_TYPES = ('INTENSIVE', 'FREQUENT_MOBILE', 'MONTHLY_MOBILE')
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sms_outbox (
+    idempotency_key TEXT PRIMARY KEY,
+    state           TEXT NOT NULL DEFAULT '',
+    district_id     TEXT NOT NULL,
+    message         TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'PENDING' CHECK (status IN ('PENDING', 'SENT', 'FAILED')),
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    updated_at      REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON sms_outbox (status);
+"""
+
+class GatewayError(Exception):
+    """Transient gateway failure (timeouts, 5xx, throttling); the batch is retried."""
+
+def build_camp_messages(df: pd.DataFrame, camp_start: str, portal_link: str = DEFAULT_PORTAL_LINK,
+                        camp_types: Sequence[str] = SCHEDULED_CAMP_TYPES) -> pd.DataFrame:
+    """
+    Turns recommend_camp_strategy output into gateway messages (district + message content only).
+
+    The idempotency key is derived from (state, district, start date, camp type), so re-running the
+    same schedule never produces a second message, and districts sharing a name in different states
+    never share a key. Frames without 'state' use ''.
+
+    Outputs:
+        pd.DataFrame: 'idempotency_key', 'state', 'district_id', 'message'
+    """
+    required = ['district_id', 'camp_type']
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for SMS messages: {missing}")
+
+    scheduled = df[df['camp_type'].isin(camp_types)]
+    district = scheduled['district_id'].astype(str)
+    state = scheduled['state'].astype(str) if 'state' in scheduled.columns else pd.Series('', index=scheduled.index)
+    start = str(camp_start)
+
+    messages = pd.DataFrame({
+        'state': state.to_numpy(),
+        'district_id': district.to_numpy(),
+        'message': [MESSAGE_TEMPLATE.format(district=d, start_date=start, portal=portal_link) for d in district],
+        'idempotency_key': [
+            hashlib.sha256(f"{s}|{d}|{start}|{c}".encode('utf-8')).hexdigest()[:32]
+            for s, d, c in zip(state, district, scheduled['camp_type'].astype(str))
+        ]
+    })
+    logger.info(f"Built {len(messages)} camp messages for {start}.")
+    return messages
+
+def open_outbox(path: str = ":memory:") -> sqlite3.Connection:
+    """
+    Opens the durable outbox. Message state survives crashes; SENT is only recorded after the gateway ack.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.executescript(OUTBOX_SCHEMA)
+    if 'state' not in [row[1] for row in conn.execute("PRAGMA table_info(sms_outbox)")]:
+        # Outboxes created before messages carried the state
+        conn.execute("ALTER TABLE sms_outbox ADD COLUMN state TEXT NOT NULL DEFAULT ''")
+    return conn
+
+def enqueue_messages(conn: sqlite3.Connection, messages: pd.DataFrame) -> int:
+    """
+    Adds messages to the outbox; keys already present (sent or pending) are ignored.
+
+    Outputs:
+        int: Number of newly enqueued messages.
+    """
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO sms_outbox (idempotency_key, state, district_id, message, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            zip(messages['idempotency_key'], messages.get('state', pd.Series('', index=messages.index)),
+                messages['district_id'], messages['message'], [time.time()] * len(messages))
+        )
+        added = conn.total_changes - before
+    logger.info(f"Enqueued {added} new messages ({len(messages) - added} already in outbox).")
+    return added
+
+class TokenBucket:
+    """
+    Async token bucket: 'rate' tokens per second, bursts up to 'capacity'.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, n: int = 1) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                await asyncio.sleep((n - self.tokens) / self.rate)
+
+class FakeSmsGateway:
+    """
+    Local gateway stub: simulates latency and transient failures, and deduplicates by idempotency key
+    the way a production gateway does.
+    """
+
+    def __init__(self, latency: float = 0.005, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.delivered: Dict[str, str] = {}  # idempotency_key -> district_id
+        self.calls = 0
+        self.duplicates_suppressed = 0
+
+    async def send_batch(self, batch: List[Dict[str, str]]) -> Dict[str, str]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            raise GatewayError("simulated 503 from gateway")
+
+        for msg in batch:
+            if msg['idempotency_key'] in self.delivered:
+                self.duplicates_suppressed += 1
+            else:
+                self.delivered[msg['idempotency_key']] = msg['district_id']
+        return {msg['idempotency_key']: 'ACCEPTED' for msg in batch}
+
+async def _send_with_retry(gateway, batch: List[Dict[str, str]], bucket: TokenBucket,
+                           max_retries: int, base_backoff: float) -> Tuple[Optional[str], int]:
+    """
+    Returns (None on success, otherwise the last error message; number of gateway calls made).
+    """
+    for attempt in range(max_retries + 1):
+        await bucket.acquire(len(batch))
+        try:
+            await gateway.send_batch(batch)
+            return None, attempt + 1
+        except GatewayError as e:
+            if attempt == max_retries:
+                return str(e), attempt + 1
+            # Exponential backoff with full jitter
+            await asyncio.sleep(random.uniform(0, base_backoff * (2 ** attempt)))
+    return "retries exhausted", max_retries + 1
+
+async def dispatch_outbox(conn: sqlite3.Connection, gateway, batch_size: int = 100, concurrency: int = 8,
+                          rate_per_sec: float = 1000.0, max_retries: int = 5,
+                          base_backoff: float = 0.05) -> Dict[str, Any]:
+    """
+    Sends all PENDING outbox messages through the gateway.
+
+    - Messages are grouped into batches of 'batch_size' per gateway call.
+    - At most 'concurrency' gateway calls are in flight.
+    - A shared token bucket caps throughput at 'rate_per_sec' messages.
+    - Transient failures are retried with exponential backoff; a batch is marked SENT only after the
+      gateway acknowledges it. A crash before that commit re-sends the batch with the same idempotency
+      keys, which the gateway drops, so a message is never delivered twice.
+
+    Outputs:
+        dict: 'sent', 'failed', 'elapsed_sec', 'messages_per_sec'
+    """
+    pending = conn.execute(
+        "SELECT idempotency_key, district_id, message FROM sms_outbox WHERE status = 'PENDING' ORDER BY rowid"
+    ).fetchall()
+    batches = [
+        [{'idempotency_key': k, 'district_id': d, 'message': m} for k, d, m in pending[i:i + batch_size]]
+        for i in range(0, len(pending), batch_size)
+    ]
+    logger.info(f"Dispatching {len(pending)} messages in {len(batches)} batches...")
+
+    bucket = TokenBucket(rate_per_sec, capacity=max(rate_per_sec, batch_size))
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {'sent': 0, 'failed': 0}
+
+    async def _worker(batch: List[Dict[str, str]]) -> None:
+        async with semaphore:
+            error, attempts = await _send_with_retry(gateway, batch, bucket, max_retries, base_backoff)
+        status = 'SENT' if error is None else 'FAILED'
+        now = time.time()
+        # Event loop is single-threaded, so the connection is never used concurrently
+        with conn:
+            conn.executemany(
+                "UPDATE sms_outbox SET status = ?, attempts = attempts + ?, last_error = ?, updated_at = ? "
+                "WHERE idempotency_key = ?",
+                [(status, attempts, error, now, msg['idempotency_key']) for msg in batch]
+            )
+        counts['sent' if error is None else 'failed'] += len(batch)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(b) for b in batches))
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        'sent': counts['sent'],
+        'failed': counts['failed'],
+        'elapsed_sec': elapsed,
+        'messages_per_sec': (counts['sent'] / elapsed) if elapsed > 0 else 0.0
+    }
+    logger.info(f"Dispatch complete: {summary['sent']} sent, {summary['failed']} failed, "
+                f"{summary['messages_per_sec']:.0f} msg/s.")
+    return summary
+
+def benchmark_dispatch(n_messages: int = 50000, batch_size: int = 100, concurrency: int = 16,
+                       rate_per_sec: float = 1e6, latency: float = 0.005, failure_rate: float = 0.05) -> Dict[str, Any]:
+    """
+    Measures end-to-end messages/second against the local FakeSmsGateway (outbox writes included).
+    """
+    districts = [f"D{i % 1000:04d}" for i in range(n_messages)]
+    messages = pd.DataFrame({
+        'idempotency_key': [f"bench-{i}" for i in range(n_messages)],
+        'district_id': districts,
+        'message': [MESSAGE_TEMPLATE.format(district=d, start_date='2024-02-01', portal=DEFAULT_PORTAL_LINK)
+                    for d in districts]
+    })
+
+    conn = open_outbox(":memory:")
+    enqueue_messages(conn, messages)
+    gateway = FakeSmsGateway(latency=latency, failure_rate=failure_rate)
+    result = asyncio.run(dispatch_outbox(conn, gateway, batch_size=batch_size, concurrency=concurrency,
+                                         rate_per_sec=rate_per_sec))
+    result['gateway_calls'] = gateway.calls
+    return result
+
+if __name__ == "__main__":
+    print(benchmark_dispatch())
@@ -0,0 +1,178 @@
+
+import pandas as pd
+import numpy as np
+import argparse
+import logging
+from scipy import sparse
+from typing import Optional, Tuple
+
+from src.geometry import flatten_polygons, polygon_adjacency
+from src.map_build import load_boundaries, feature_names, normalize_name, match_districts, STATE_PROPERTY_KEYS
+from src.dimensions import code_labels
+
+logger = logging.getLogger(__name__)
+
+ADJACENCY_FILENAME = "district_adjacency.npz"
+MORAN_PERMUTATIONS = 499
+HOTSPOT_P_VALUE = 0.05
+
+def build_district_adjacency(boundary_path: str, decimals: int = 4,
+                             min_shared_vertices: int = 2) -> Tuple[sparse.csr_matrix, pd.DataFrame]:
+    """
+    Derives district adjacency once from the local boundary file.
+
+    Features with the same normalized (state, district) are merged into one node (multi-part
+    districts); districts of the same name in different states stay separate nodes.
+
+    Outputs:
+        (adjacency, nodes): symmetric 0/1 CSR matrix and the normalized 'state' and 'district' of each row.
+    """
+    geo_data = load_boundaries(boundary_path)
+    features = geo_data['features']
+    polygons = flatten_polygons(features)
+    feature_adj = polygon_adjacency(polygons, len(features), decimals, min_shared_vertices)
+
+    keys = pd.DataFrame({'state': normalize_name(feature_names(features, STATE_PROPERTY_KEYS).fillna('')),
+                         'district': normalize_name(feature_names(features).fillna(''))})
+    codes = keys.groupby(['state', 'district'], sort=False).ngroup().to_numpy() # first-appearance order
+    nodes = keys.drop_duplicates().reset_index(drop=True)
+    merge = sparse.csr_matrix((np.ones(len(codes)), (np.arange(len(codes)), codes)), shape=(len(codes), len(nodes)))
+
+    adjacency = (merge.T @ feature_adj @ merge).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.data[:] = 1.0
+
+    isolated = int((np.diff(adjacency.indptr) == 0).sum())
+    logger.info(f"Adjacency: {len(nodes)} districts, {adjacency.nnz // 2} neighbour pairs, {isolated} without neighbours")
+    return adjacency, nodes
+
+def save_adjacency(path: str, adjacency: sparse.csr_matrix, nodes: pd.DataFrame) -> None:
+    np.savez_compressed(path, data=adjacency.data, indices=adjacency.indices, indptr=adjacency.indptr,
+                        shape=adjacency.shape, names=nodes['district'].to_numpy(dtype=str),
+                        states=nodes['state'].to_numpy(dtype=str))
+
+def load_adjacency(path: str) -> Tuple[sparse.csr_matrix, pd.DataFrame]:
+    with np.load(path) as f:
+        adjacency = sparse.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+        # Files saved before nodes carried a state match on unique district names only
+        states = f['states'] if 'states' in f.files else np.full(len(f['names']), '')
+        return adjacency, pd.DataFrame({'state': states, 'district': f['names']})
+
+def align_adjacency(adjacency: sparse.csr_matrix, nodes: pd.DataFrame, districts: pd.DataFrame) -> sparse.csr_matrix:
+    """
+    Re-indexes the adjacency to the row order of a ('state', 'district') frame (S @ W @ S.T with a
+    selection matrix S), matched with match_districts. Districts missing from the boundary file get no neighbours.
+    """
+    pos = match_districts(districts, nodes)
+    rows = np.flatnonzero(pos >= 0)
+    select = sparse.csr_matrix((np.ones(len(rows)), (rows, pos[rows])), shape=(len(districts), adjacency.shape[0]))
+    return (select @ adjacency @ select.T).tocsr()
+
+def row_standardize(adjacency: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    Spatial weights with rows summing to 1 (rows without neighbours stay 0).
+    """
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+    return sparse.diags(inv) @ adjacency
+
+def local_morans_i(x: np.ndarray, weights: sparse.csr_matrix, permutations: int = MORAN_PERMUTATIONS,
+                   seed: int = 0, block: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Local Moran's I with permutation pseudo p-values.
+
+    Permuted values are drawn as (n, block) matrices so each block of permutations is a single
+    sparse matrix-matrix product.
+
+    Outputs:
+        (z, lag, I, p): standardized values, spatial lag of z, local I, pseudo p-value.
+    """
+    x = np.asarray(x, dtype=float)
+    x = np.where(np.isnan(x), np.nanmean(x), x)
+    std = x.std()
+    z = (x - x.mean()) / std if std > 0 else np.zeros_like(x)
+    lag = weights @ z
+    local_i = z * lag
+
+    rng = np.random.default_rng(seed)
+    extreme = np.zeros(len(z), dtype=np.int64)
+    done = 0
+    while done < permutations:
+        k = min(block, permutations - done)
+        shuffled = rng.permuted(np.tile(z, (k, 1)), axis=1).T
+        perm_i = z[:, None] * (weights @ shuffled)
+        extreme += (np.abs(perm_i) >= np.abs(local_i)[:, None]).sum(axis=1)
+        done += k
+
+    p_value = (extreme + 1) / (permutations + 1)
+    return z, lag, local_i, p_value
+
+def add_spatial_features(df: pd.DataFrame, adjacency: sparse.csr_matrix, nodes: pd.DataFrame,
+                         permutations: int = MORAN_PERMUTATIONS, seed: int = 0,
+                         districts: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Adds neighbourhood features from the district adjacency.
+
+    Features:
+    - neighbour_count: number of adjacent districts
+    - neighbour_avg_bsi: mean BSI of adjacent districts (NaN without neighbours)
+    - coverage_gap_spatial_lag: mean biometric coverage gap of adjacent districts
+    - bsi_local_morans_i / bsi_morans_p_value: local spatial autocorrelation of BSI
+    - bsi_hotspot: high-BSI district surrounded by high-BSI districts (High-High, p < HOTSPOT_P_VALUE)
+
+    Inputs:
+        df (pd.DataFrame): Output of compute_bsi ('district_id', 'bsi_score', 'biometric_coverage_gap', 'state').
+        districts: 'state' and 'district' names in df's row order, matched to the adjacency nodes
+                   (default: df['state'] and df['district_id']).
+    """
+    logger.info("Computing spatial neighbourhood features...")
+    out = df.copy()
+
+    if districts is None:
+        state = out['state'] if 'state' in out.columns else pd.Series('', index=out.index)
+        districts = pd.DataFrame({'state': state.to_numpy(), 'district': out['district_id'].to_numpy()})
+    adjacency = align_adjacency(adjacency, nodes, districts)
+    weights = row_standardize(adjacency)
+    degree = np.diff(adjacency.indptr)
+    has_neighbours = degree > 0
+
+    bsi = out['bsi_score'].to_numpy(dtype=float)
+    gap = out['biometric_coverage_gap'].to_numpy(dtype=float)
+    out['neighbour_count'] = degree.astype('int32')
+    out['neighbour_avg_bsi'] = np.where(has_neighbours, weights @ np.nan_to_num(bsi), np.nan)
+    out['coverage_gap_spatial_lag'] = np.where(has_neighbours, weights @ np.nan_to_num(gap), np.nan)
+
+    z, lag, local_i, p_value = local_morans_i(bsi, weights, permutations, seed)
+    out['bsi_local_morans_i'] = local_i
+    out['bsi_morans_p_value'] = np.where(has_neighbours, p_value, np.nan)
+    out['bsi_hotspot'] = has_neighbours & (z > 0) & (lag > 0) & (p_value < HOTSPOT_P_VALUE)
+
+    logger.info(f"Matched {int(has_neighbours.sum())} out of {len(out)} districts to neighbours; "
+                f"{int(out['bsi_hotspot'].sum())} BSI hotspots.")
+    return out
+
+def add_spatial_features_from_file(df: pd.DataFrame, district_dim: pd.DataFrame, adjacency_path: str,
+                                   permutations: int = MORAN_PERMUTATIONS, seed: int = 0) -> pd.DataFrame:
+    """
+    add_spatial_features with the adjacency read from a saved .npz (pipeline stage entry point).
+    Rows are district-coded; their state and district names are looked up in district_dim to match the adjacency.
+    """
+    adjacency, nodes = load_adjacency(adjacency_path)
+    codes = df['district_code'].to_numpy()
+    districts = pd.DataFrame({'state': code_labels(district_dim, codes, 'state'),
+                              'district': code_labels(district_dim, codes, 'district')})
+    return add_spatial_features(df, adjacency, nodes, permutations, seed, districts)
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.spatial_features geo_cache/india_district.geojson data/district_adjacency.npz
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Build the district adjacency used by the spatial features stage")
+    parser.add_argument("boundary_path")
+    parser.add_argument("output_path", nargs="?", default=ADJACENCY_FILENAME)
+    parser.add_argument("--decimals", type=int, default=4, help="Vertex snapping precision")
+    parser.add_argument("--min-shared", type=int, default=2, help="Shared vertices needed for two districts to touch")
+    args = parser.parse_args()
+    adjacency, nodes = build_district_adjacency(args.boundary_path, args.decimals, args.min_shared)
+    save_adjacency(args.output_path, adjacency, nodes)
+    print(f"Saved adjacency for {len(nodes)} districts to {args.output_path}")
@@ -0,0 +1,169 @@
+
+import pandas as pd
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILENAME = "stage_metrics.jsonl"
+PROFILE_DIRNAME = "profiles"
+RSS_SAMPLE_INTERVAL = 0.005
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+MB = 1024 * 1024
+
+def current_rss_bytes() -> int:
+    """
+    Resident set size of this process (Linux /proc; peak RSS from getrusage elsewhere).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+def frame_stats(obj: Any) -> Dict[str, Optional[int]]:
+    """
+    Rows and in-memory bytes of a DataFrame, or summed over a dict/list of DataFrames.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return {'rows': len(obj), 'bytes': int(obj.memory_usage(index=True, deep=True).sum())}
+    frames = list(obj.values()) if isinstance(obj, dict) else list(obj) if isinstance(obj, (list, tuple)) else []
+    frames = [f for f in frames if isinstance(f, pd.DataFrame)]
+    if not frames:
+        return {'rows': None, 'bytes': None}
+    stats = [frame_stats(f) for f in frames]
+    return {'rows': sum(s['rows'] for s in stats), 'bytes': sum(s['bytes'] for s in stats)}
+
+class RssSampler:
+    """
+    Samples RSS on a background thread and keeps the maximum seen between start() and stop().
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_rss = self.peak_rss = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss_bytes())
+
+    def start(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss_bytes())
+        return self.peak_rss
+
+class StageMetrics:
+    """
+    Per-stage instrumentation: wall and CPU time, peak RSS, optional tracemalloc peak,
+    rows/bytes in and out. One JSON record per stage is appended to stage_metrics.jsonl,
+    so successive runs can be compared for regressions.
+
+    With profile_dir set, every stage is also run under cProfile (<stage>.prof plus a
+    <stage>.txt summary). tracemalloc and the profiler are process-wide, so the orchestrator
+    runs stages serially when profiling.
+    """
+
+    def __init__(self, path: Optional[str] = None, profile_dir: Optional[str] = None, trace_memory: bool = False,
+                 run_id: Optional[str] = None):
+        self.path = path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.run_id = run_id or datetime.now().isoformat()
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, inputs: Sequence[Any] = ()):
+        """
+        Measures the enclosed block. The caller may set record['output'] (measured, then dropped)
+        and record['status'] ('ran' by default, e.g. 'cached').
+        """
+        record: Dict[str, Any] = {'run_id': self.run_id, 'stage': name, 'status': 'ran',
+                                  'started_at': datetime.now().isoformat()}
+        stats_in = frame_stats(list(inputs))
+        record['rows_in'], record['bytes_in'] = stats_in['rows'], stats_in['bytes']
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if self.profile_dir else None
+        sampler = RssSampler().start()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException:
+            record['status'] = 'failed'
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            record['wall_s'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_s'] = round(time.thread_time() - cpu_start, 6)
+            peak = sampler.stop()
+            record['rss_start_mb'] = round(sampler.start_rss / MB, 2)
+            record['rss_peak_mb'] = round(peak / MB, 2)
+            record['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / MB, 2) if self.trace_memory else None
+
+            stats_out = frame_stats(record.pop('output', None))
+            record['rows_out'], record['bytes_out'] = stats_out['rows'], stats_out['bytes']
+            if profiler:
+                record['profile'] = self._dump_profile(name, profiler)
+            self._write(record)
+
+    def _dump_profile(self, name: str, profiler: cProfile.Profile) -> str:
+        path = os.path.join(self.profile_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(25)
+        with open(os.path.join(self.profile_dir, f"{name}.txt"), 'w') as f:
+            f.write(summary.getvalue())
+        return path
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(record) + "\n")
+        logger.info(f"[metrics] {record['stage']} ({record['status']}): {record['wall_s']:.3f}s wall, "
+                    f"{record['cpu_s']:.3f}s CPU, peak RSS {record['rss_peak_mb']} MB, rows out {record['rows_out']}",
+                    extra={'event': 'stage_metrics', 'metrics': record})
+
+    def summary(self) -> pd.DataFrame:
+        cols = ['stage', 'status', 'wall_s', 'cpu_s', 'rss_peak_mb', 'tracemalloc_peak_mb', 'rows_in', 'rows_out', 'bytes_out']
+        return pd.DataFrame(self.records, columns=cols)
+
+def load_stage_metrics(path: str) -> pd.DataFrame:
+    """
+    Reads stage_metrics.jsonl (all runs) for regression comparisons.
+    """
+    return pd.read_json(path, lines=True)
+
+if __name__ == "__main__":
+    pass
@@ -2,27 +2,53 @@
 import pandas as pd
 import numpy as np
 import logging
+from typing import Optional
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def recommend_camp_strategy(df: pd.DataFrame) -> pd.DataFrame:
+# Updates one camp can serve (e.g. 5 kits x 40 updates a day x 10 days)
+MAX_UPDATES_PER_CAMP = 2000
+# Days between camps used for sizing: lower bound of each frequency band
+CYCLE_DAYS = [7, 14, 28, 90, 365]
+
+def _updates_per_cycle(df: pd.DataFrame, band: np.ndarray, suffix: str = '') -> np.ndarray:
+    # Forecast updates between two camps of each frequency band (NaN for an unknown band)
+    cycle = np.asarray(CYCLE_DAYS)[band]
+    daily = np.where(cycle <= 30, df[f'forecast_updates_30d{suffix}'] / 30, df[f'forecast_updates_90d{suffix}'] / 90)
+    return np.where(band >= 0, daily * cycle, np.nan)
+
+def recommend_camp_strategy(df: pd.DataFrame, forecast: Optional[pd.DataFrame] = None, key: str = 'district',
+                            max_updates_per_camp: float = MAX_UPDATES_PER_CAMP) -> pd.DataFrame:
     """
     Generates rule-based camp strategy recommendations.
     
     Recommendations are rule-based and deterministic, ensuring explainability.
     Each recommendation is traceable to specific data signals and can be reviewed/overridden by UIDAI officials.
     
+    With a demand forecast (src/demand_forecast.py, merged on the entity code), each camp is sized
+    for the updates expected between two camps: 'expected_updates_per_camp' from the forecast
+    mean, 'camp_capacity' from the upper end of its 90% interval (30-day forecast for cycles up
+    to 30 days, 90-day forecast beyond). While the capacity exceeds max_updates_per_camp, the
+    band (camp type and deployment frequency together) is raised to the next more frequent one.
+    A district whose demand exceeds one camp even every 7-10 days is flagged 'over_capacity'
+    and gets 'camps_per_cycle' parallel camps, each within max_updates_per_camp.
+    
     Inputs:
         df: Dataframe with 'cps_score', 'population_impact_score_norm', 'biometric_coverage_gap_norm'
+        forecast: Optional output of forecast_demand ('forecast_updates_30d' / '_90d' with '_hi')
         
     Outputs:
         df: Dataframe with 'camp_type', 'deployment_freq_days', 'location_suitability', 'strategy_reasoning'
+            (and 'expected_updates_per_camp', 'camp_capacity', 'camps_per_cycle', 'over_capacity'
+            with a forecast)
     """
     logger.info("Starting strategy recommendation...")
     
     df_strat = df.copy()
+    if forecast is not None:
+        id_col = f"{key}_code"
+        df_strat = df_strat.drop(columns=[c for c in forecast.columns if c != id_col and c in df_strat.columns])
+        df_strat = df_strat.merge(forecast, on=id_col, how='left')
     
     required = ['cps_score', 'population_impact_score_norm', 'biometric_coverage_gap_norm']
     missing = [col for col in required if col not in df_strat.columns]
@@ -49,8 +75,31 @@ def recommend_camp_strategy(df: pd.DataFrame) -> pd.DataFrame:
     camp_types = ['INTENSIVE', 'FREQUENT_MOBILE', 'MONTHLY_MOBILE', 'QUARTERLY_FIXED', 'ANNUAL_PREVENTIVE']
     freq_days = ['7-10 days', '14-21 days', '28-35 days', '90 days', '365 days']
     
-    df_strat['camp_type'] = np.select(conditions, camp_types, default='UNKNOWN')
-    df_strat['deployment_freq_days'] = np.select(conditions, freq_days, default='UNKNOWN')
+    cps_band = np.select(conditions, np.arange(len(CYCLE_DAYS)), default=-1)
+    band = cps_band
+    
+    # Camp sizing from the demand forecast: the band is raised until one camp per cycle fits the
+    # upper end of the forecast, i.e. the least frequent band at or above the CPS band that fits
+    sized = 'forecast_updates_30d' in df_strat.columns and 'forecast_updates_90d' in df_strat.columns
+    if sized:
+        bands = np.arange(len(CYCLE_DAYS))
+        upper = np.stack([_updates_per_cycle(df_strat, np.full(len(df_strat), b), '_hi') for b in bands], axis=1)
+        known = np.isfinite(upper).all(axis=1) & (cps_band >= 0)
+        fit_band = np.where((upper <= max_updates_per_camp) & (bands <= cps_band[:, None]), bands, -1).max(axis=1)
+        band = np.where(known, np.maximum(fit_band, 0), cps_band)
+        raised = known & (band < cps_band)
+        over_capacity = known & (fit_band < 0)
+    
+    df_strat['camp_type'] = np.where(band >= 0, np.asarray(camp_types)[band], 'UNKNOWN')
+    df_strat['deployment_freq_days'] = np.where(band >= 0, np.asarray(freq_days)[band], 'UNKNOWN')
+    if sized:
+        # Demand beyond one camp even at the most frequent band is split over parallel camps
+        upper_per_cycle = _updates_per_cycle(df_strat, band, '_hi')
+        camps = np.where(over_capacity, np.ceil(upper_per_cycle / max_updates_per_camp), 1.0)
+        df_strat['expected_updates_per_camp'] = _updates_per_cycle(df_strat, band) / camps
+        df_strat['camp_capacity'] = np.ceil(upper_per_cycle / camps)
+        df_strat['camps_per_cycle'] = np.where(np.isfinite(upper_per_cycle), camps, np.nan)
+        df_strat['over_capacity'] = over_capacity
     
     # --- 2. Location Suitability ---
     
@@ -74,27 +123,36 @@ def recommend_camp_strategy(df: pd.DataFrame) -> pd.DataFrame:
     
     # --- 3. Strategy Reasoning ---
     
-    def generate_reasoning(row):
-        return (f"Assigned {row['camp_type']} due to CPS {row['cps_score']}. "
-                f"Location is {row['location_suitability']} "
-                f"(Pop Score: {row['population_impact_score_norm']:.2f}, Gap: {row['biometric_coverage_gap_norm']:.2f}).")
-
-    df_strat['strategy_reasoning'] = df_strat.apply(generate_reasoning, axis=1)
+    # Built column-wise instead of a Python call per row (df.apply):
+    # "Assigned <camp_type> due to CPS <cps_score>. Location is <suitability> (Pop Score: 0.00, Gap: 0.00)."
+    cps_text = [repr(v) for v in df_strat['cps_score'].to_numpy(dtype=float).tolist()]
+    pop_text = np.char.mod('%.2f', pop.to_numpy(dtype=float)).astype(object)
+    gap_text = np.char.mod('%.2f', gap.to_numpy(dtype=float)).astype(object)
+    cause_text = np.array([" due to CPS "] * len(df_strat), dtype=object)
+    if sized:
+        # "Assigned INTENSIVE due to forecast demand and CPS 60.0 (MONTHLY_MOBILE by CPS alone)."
+        cps_type = np.asarray(camp_types + ['UNKNOWN'], dtype=object)[cps_band]
+        cause_text = np.where(raised, " due to forecast demand and CPS ", cause_text)
+        cps_text = np.where(raised, np.array(cps_text, dtype=object) + " (" + cps_type + " by CPS alone)", cps_text)
+    df_strat['strategy_reasoning'] = (
+        "Assigned " + df_strat['camp_type'] + cause_text + np.array(cps_text, dtype=object)
+        + ". Location is " + df_strat['location_suitability']
+        + " (Pop Score: " + pop_text + ", Gap: " + gap_text + ")."
+    )
+    if sized:
+        # " Size for 1234 updates per camp (forecast 1000)." or, over capacity,
+        # " Over capacity: 3 parallel camps of 1900 updates (forecast 1500 each) every 7-10 days."
+        capacity_text = np.char.mod('%.0f', np.nan_to_num(df_strat['camp_capacity'].to_numpy(dtype=float))).astype(object)
+        expected_text = np.char.mod('%.0f', np.nan_to_num(df_strat['expected_updates_per_camp'].to_numpy(dtype=float))).astype(object)
+        camps_text = np.char.mod('%.0f', np.nan_to_num(df_strat['camps_per_cycle'].to_numpy(dtype=float))).astype(object)
+        size_text = np.where(np.isfinite(df_strat['camp_capacity'].to_numpy(dtype=float)),
+                             " Size for " + capacity_text + " updates per camp (forecast " + expected_text + ").", "")
+        over_text = (" Over capacity: " + camps_text + " parallel camps of " + capacity_text + " updates (forecast "
+                     + expected_text + " each) every " + df_strat['deployment_freq_days'].to_numpy(dtype=object) + ".")
+        df_strat['strategy_reasoning'] = df_strat['strategy_reasoning'] + np.where(over_capacity, over_text, size_text)
     
     logger.info("Strategy recommendation complete.")
     
-    # Summary
-    print("\n--- Strategy Summary ---")
-    print("\nCamp Type Distribution:")
-    print(df_strat['camp_type'].value_counts())
-    
-    print("\nFrequency Distribution:")
-    print(df_strat['deployment_freq_days'].value_counts())
-    
-    print("\nTop 20 Recommendations:")
-    cols = ['district_id', 'camp_type', 'deployment_freq_days', 'location_suitability']
-    print(df_strat[cols].head(20))
-
     return df_strat
 
 if __name__ == "__main__":
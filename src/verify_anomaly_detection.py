@@ -0,0 +1,76 @@
+
+# Run from the repository root: python -m src.verify_anomaly_detection
+import time
+import numpy as np
+import pandas as pd
+from src.anomaly_detection import detect_anomalies, add_anomaly_flags, rolling_robust_z
+
+def frames_from_counts(counts, days):
+    e, d = np.nonzero(counts)
+    return {
+        'biometric': pd.DataFrame({'date': days[d], 'district_code': e.astype(np.int32),
+                                   'bio_age_5_17': counts[e, d], 'bio_age_17_': 0}),
+        'demographic': pd.DataFrame(),
+        'district_registry': pd.DataFrame({'district_code': np.arange(len(counts), dtype=np.int32)})
+    }
+
+def run_verification():
+    rng = np.random.default_rng(0)
+    n_entities, n_days = 1000, 730
+    days = pd.date_range('2024-01-01', periods=n_days)
+    lam = rng.gamma(2, 3, n_entities) + 2
+    counts = rng.poisson(lam[:, None] * np.ones(n_days))
+    counts[:10, -20:] = 0 # silent for 20 days
+    counts[10:20, -60:] = rng.poisson(lam[10:20, None] * 0.2 * np.ones(60)) # volume down 80%
+    counts[20:25, -3] += (lam[20:25] * 40).astype(int) # one-day spike
+    frames = frames_from_counts(counts, days)
+
+    print("Injected anomalies are flagged...")
+    detect_anomalies(frames, as_of=days[-1], history_days=n_days) # warm-up
+    start = time.perf_counter()
+    out = detect_anomalies(frames, as_of=days[-1], history_days=n_days)
+    elapsed = time.perf_counter() - start
+    print(f"  {n_entities} series x {n_days} days in {elapsed:.3f}s")
+    assert elapsed < 1.0, "anomaly detection too slow"
+    flag = out.set_index('district_code')['anomaly_flag']
+    assert (flag[:10] == 'drop_to_zero').all(), flag[:10]
+    assert (out['bio_zero_run_days'][:10] == 20).all()
+    assert (flag[10:20] == 'level_drop').all(), flag[10:20]
+    changed = out['bio_change_date'][10:20]
+    assert ((changed - days[-60]).abs() <= pd.Timedelta(days=3)).all(), "change point misplaced"
+    assert flag[20:25].isin(['high_outlier']).all(), flag[20:25]
+    assert (out['anomaly_severity'][flag != 'none'] >= 1).all()
+    false_positives = (flag[25:] != 'none').mean()
+    assert false_positives < 0.02, f"{false_positives:.1%} of undisturbed series flagged"
+
+    print("Robust z-scores of undisturbed series stay near 0...")
+    z = rolling_robust_z(counts[25:], last=14)
+    assert np.isnan(z[:, :-14]).all() and not np.isnan(z[:, -14:]).any()
+    assert np.median(np.abs(z[:, -14:])) < 1.0 and (np.abs(z[:, -14:]) < 4).mean() > 0.999
+
+    print("A lagging feed is not read as silence...")
+    lagging = frames_from_counts(counts[25:], days)
+    out = detect_anomalies(lagging, as_of=days[-1] + pd.Timedelta(days=30), history_days=n_days)
+    assert (out['bio_zero_run_days'] == 0).sum() > 0.9 * len(out)
+    assert (out['anomaly_flag'] != 'drop_to_zero').all()
+    assert out['demo_zscore'].isna().all(), "a source without data has no scores"
+
+    print("A feed covering fewer days than the change-point test needs...")
+    for n in (1, 13):
+        short = frames_from_counts(counts[:100, -n:], days[-n:])
+        out_short = detect_anomalies(short, as_of=days[-1], history_days=n_days)
+        assert len(out_short) > 0
+        assert out_short['bio_change_stat'].isna().all() and out_short['bio_change_date'].isna().all()
+        assert not out_short['anomaly_flag'].isin(['level_drop', 'level_rise']).any()
+
+    print("Flags merge into the ranked output...")
+    scored = pd.DataFrame({'district_code': np.arange(1200, dtype=np.int32), 'cps_score': 1.0})
+    merged = add_anomaly_flags(scored, out)
+    assert len(merged) == len(scored)
+    assert (merged.loc[merged['district_code'] < 25, 'anomaly_flag'] == 'none').all(), "inactive districts are 'none'"
+    assert (merged.loc[merged['district_code'] >= 1000, 'anomaly_severity'] == 0).all()
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
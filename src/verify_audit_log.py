@@ -0,0 +1,70 @@
+
+# Run from the repository root: python -m src.verify_audit_log
+import contextlib
+import io
+import logging
+import logging.handlers
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.audit_log import start_audit_log, stop_audit_log, read_audit_log, AUDIT_LOG_FILENAME
+from src.run_summary import summarize_run, render_summary
+
+def run_verification():
+    out_dir = tempfile.mkdtemp()
+    try:
+        print("Writing through the queued audit log (quiet)...")
+        console = io.StringIO()
+        with contextlib.redirect_stdout(console):
+            listener = start_audit_log(out_dir, quiet=True)
+            log = logging.getLogger("verify")
+            log.info("stage done", extra={'event': 'stage_metrics', 'metrics': {'stage': 'bsi', 'wall_s': 0.5}})
+            log.warning("odd value %s", 42)
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                log.exception("failed")
+            stop_audit_log(listener)
+        assert console.getvalue() == "", "quiet mode must not render to the console"
+        assert not any(isinstance(h, logging.handlers.QueueHandler) for h in logging.getLogger().handlers)
+
+        entries = read_audit_log(os.path.join(out_dir, AUDIT_LOG_FILENAME))
+        assert [e['level'] for e in entries] == ['INFO', 'WARNING', 'ERROR']
+        assert entries[0]['metrics'] == {'stage': 'bsi', 'wall_s': 0.5}
+        assert entries[1]['message'] == "odd value 42"
+        assert 'boom' in entries[2]['message'] or 'boom' in entries[2].get('exception', '')
+        assert len(read_audit_log(os.path.join(out_dir, AUDIT_LOG_FILENAME), 'stage_metrics')) == 1
+
+        print("Console output when not quiet...")
+        console = io.StringIO()
+        with contextlib.redirect_stdout(console):
+            listener = start_audit_log(out_dir)
+            logging.getLogger("verify").info("hello")
+            stop_audit_log(listener)
+        assert "hello" in console.getvalue()
+
+        print("Summary statistics...")
+        df = pd.DataFrame({
+            'district_id': ['A', 'B', 'C'],
+            'days_since_last_update': [10.0, 20.0, np.nan],
+            'days_since_last_update_norm': [0.0, 1.0, np.nan],
+            'bsi_score': [0.2, 0.8, 0.5],
+            'cps_score': [30.0, 90.0, 60.0],
+            'cps_tier': ['Tier 5', 'Tier 1', 'Tier 3']
+        })
+        summary = summarize_run(df, top_n=2)
+        assert summary['stats']['days_since_last_update'] == {'min': 10.0, 'max': 20.0, 'mean': 15.0}
+        assert summary['stats']['cps_score']['mean'] == 60.0
+        assert summary['counts']['cps_tier'] == {'Tier 1': 1, 'Tier 3': 1, 'Tier 5': 1}
+        assert [r['district_id'] for r in summary['top']] == ['B', 'C']
+        text = render_summary(summary)
+        assert "--- Normalization Summary ---" in text and "Tier 1" in text
+
+        print("Verification Passed!")
+    finally:
+        shutil.rmtree(out_dir)
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,37 @@
+
+# Run from the repository root: python -m src.verify_benchmark_pipeline
+from src.benchmark_pipeline import compare_to_baseline, measure, scenario_name
+
+def run_verification():
+    print("Checking measurement...")
+    m = measure(lambda n: sum(range(n)), (100_000,), repeats=2)
+    assert m['result'] == sum(range(100_000))
+    assert 0 < m['time_s'] <= m['time_median_s']
+    assert m['peak_mb'] >= 0
+    assert scenario_name(10, 20_000) == "10x_20k"
+
+    print("Checking regression detection...")
+    baseline = [
+        {'scenario': '1x_1k', 'stage': 'load', 'time_s': 1.0, 'peak_mb': 100.0},
+        {'scenario': '1x_1k', 'stage': 'bsi', 'time_s': 0.010, 'peak_mb': 1.0},
+        {'scenario': '1x_1k', 'stage': 'cps', 'time_s': 0.5, 'peak_mb': 50.0},
+    ]
+    results = [
+        {'scenario': '1x_1k', 'stage': 'load', 'time_s': 1.5, 'peak_mb': 100.0},  # +50% time
+        {'scenario': '1x_1k', 'stage': 'bsi', 'time_s': 0.020, 'peak_mb': 2.0},   # 2x, but below the noise floor
+        {'scenario': '1x_1k', 'stage': 'cps', 'time_s': 0.5, 'peak_mb': 80.0},    # +60% memory
+        {'scenario': '1x_1k', 'stage': 'new', 'time_s': 9.9, 'peak_mb': 999.0},   # not in the baseline
+    ]
+    cmp = compare_to_baseline(results, baseline).set_index('stage')
+    assert cmp.loc['load', 'time_regression'] and not cmp.loc['load', 'memory_regression']
+    assert not cmp.loc['bsi', 'regression']
+    assert cmp.loc['cps', 'memory_regression'] and not cmp.loc['cps', 'time_regression']
+    assert not cmp.loc['new', 'regression']
+
+    cmp = compare_to_baseline(results, baseline, time_tolerance=1.0, memory_tolerance=1.0).set_index('stage')
+    assert not cmp['regression'].any()
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,106 @@
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import pandas as pd
+from citizen_requests import open_request_db, submit_requests, aggregate_daily, refresh_hybrid_priority, get_hybrid_priority
+
+def run_verification():
+    print("Creating mock requests for hybrid priority test...")
+    conn = open_request_db(":memory:")
+
+    cps_df = pd.DataFrame({
+        'district_id': ['D1', 'D2', 'D3'],
+        'cps_score': [80.0, 60.0, 40.0],
+        'total_aadhaar_holders': [1000, 1000, 100000]
+    })
+
+    day1 = pd.Timestamp('2024-03-01 10:00', tz='UTC')
+    requests = pd.DataFrame({
+        'district_id': ['D2'] * 10 + ['D1', 'D1'],
+        'user_hash': [f"U{i}" for i in range(10)] + ['U100', 'U100'],
+        'timestamp': [day1] * 10 + [day1, day1 + pd.Timedelta(days=3)]
+    })
+
+    print("\nSubmitting batch...")
+    result = submit_requests(conn, requests)
+    # U100's second request falls inside the 30-day window
+    assert result == {'accepted': 11, 'rejected': 1}, f"Unexpected 30-day rule result: {result}"
+
+    changed = aggregate_daily(conn)
+    assert changed == {('', 'D1'), ('', 'D2')}, f"Unexpected changed districts: {changed}"
+
+    updated = refresh_hybrid_priority(conn, cps_df, changed, as_of=day1)
+    assert len(updated) == 3, "First refresh must score every district"
+
+    ranking = get_hybrid_priority(conn).set_index('district_id')
+    print("\nHybrid Ranking:")
+    print(ranking)
+
+    # D2: 10 requests / (0.01 * 1000) -> confidence 100 -> 0.7*60 + 0.3*100 = 72
+    assert ranking.loc['D2', 'confidence_score'] == 100.0, "D2 confidence mismatch"
+    assert ranking.loc['D2', 'hybrid_score'] == 72.0, f"D2 hybrid mismatch: {ranking.loc['D2', 'hybrid_score']}"
+    # D1: 1 request / 10 -> confidence 10 -> 0.7*80 + 0.3*10 = 59
+    assert ranking.loc['D1', 'hybrid_score'] == 59.0, f"D1 hybrid mismatch: {ranking.loc['D1', 'hybrid_score']}"
+    assert ranking.loc['D2', 'rank_shift'] == 1, "D2 should move up one rank"
+
+    # Same user again after the cooldown is accepted
+    result = submit_requests(conn, pd.DataFrame({
+        'district_id': ['D3'], 'user_hash': ['U100'], 'timestamp': [day1 + pd.Timedelta(days=31)]
+    }))
+    assert result['accepted'] == 1, "Request after 30 days should be accepted"
+
+    # Only D3 changed; 40 days later the D1/D2 requests also expire from the window
+    changed = aggregate_daily(conn)
+    updated = refresh_hybrid_priority(conn, cps_df, changed, as_of=day1 + pd.Timedelta(days=40))
+    assert set(updated['district_id']) == {'D1', 'D2', 'D3'}, "Expired windows must be recomputed"
+    assert (updated.set_index('district_id').loc[['D1', 'D2'], 'requests_30d'] == 0).all(), "Old requests should expire"
+
+    # Nothing changed -> nothing recomputed
+    updated = refresh_hybrid_priority(conn, cps_df, aggregate_daily(conn), as_of=day1 + pd.Timedelta(days=40))
+    assert updated.empty, "No districts should be recomputed"
+
+    print("\nSame district name in two states...")
+    twins = open_request_db(":memory:")
+    twin_cps = pd.DataFrame({'state': ['Chhattisgarh', 'Maharashtra'], 'district_id': ['Raigarh', 'Raigarh'],
+                             'cps_score': [80.0, 40.0], 'total_aadhaar_holders': [1000, 1000]})
+    submit_requests(twins, pd.DataFrame({
+        'state': ['Maharashtra'] * 5, 'district_id': ['Raigarh'] * 5,
+        'user_hash': [f"R{i}" for i in range(5)], 'timestamp': [day1] * 5
+    }))
+    assert aggregate_daily(twins) == {('Maharashtra', 'Raigarh')}
+    refresh_hybrid_priority(twins, twin_cps, {('Maharashtra', 'Raigarh')}, as_of=day1)
+    ranking = get_hybrid_priority(twins).set_index('state')
+    assert len(ranking) == 2, "Same-named districts overwrote each other"
+    assert ranking.loc['Chhattisgarh', 'cps_score'] == 80.0 and ranking.loc['Chhattisgarh', 'requests_30d'] == 0
+    assert ranking.loc['Maharashtra', 'cps_score'] == 40.0 and ranking.loc['Maharashtra', 'requests_30d'] == 5
+    try:
+        refresh_hybrid_priority(twins, pd.concat([twin_cps, twin_cps.tail(1)]), as_of=day1)
+        raise AssertionError("A repeated (state, district) must not silently overwrite the CPS input")
+    except sqlite3.IntegrityError:
+        pass
+
+    # A Request DB created before the state column is upgraded and its counts rebuilt
+    db_dir = tempfile.mkdtemp()
+    path = os.path.join(db_dir, 'requests.db')
+    legacy = sqlite3.connect(path)
+    legacy.executescript("""
+        CREATE TABLE requests (request_id TEXT PRIMARY KEY, district_id TEXT NOT NULL, locality_hash TEXT,
+                               user_hash TEXT NOT NULL, timestamp INTEGER NOT NULL, status TEXT NOT NULL DEFAULT 'PENDING');
+        CREATE TABLE daily_request_counts (district_id TEXT NOT NULL, day INTEGER NOT NULL, n_requests INTEGER NOT NULL,
+                                           PRIMARY KEY (district_id, day)) WITHOUT ROWID;
+        INSERT INTO requests VALUES ('r1', 'D1', NULL, 'U1', 1709287200, 'PENDING');
+    """)
+    legacy.commit()
+    legacy.close()
+    upgraded = open_request_db(path)
+    assert aggregate_daily(upgraded) == {('', 'D1')}
+    assert upgraded.execute("SELECT state, district_id, n_requests FROM daily_request_counts").fetchall() == [('', 'D1', 1)]
+    upgraded.close()
+    shutil.rmtree(db_dir)
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,67 @@
+
+# Run from the repository root: python -m src.verify_cohort_projection
+import time
+import numpy as np
+import pandas as pd
+from src.cohort_projection import project_mandatory_updates, add_cohort_features, box_shift, cohort_windows
+from src.feature_engineering import feature_engineer
+from src.feature_normalization import normalize_features
+
+def run_verification():
+    print("Cohort windows and the box-kernel shift...")
+    assert cohort_windows((0, 5)) == {5: (1, 60), 15: (121, 180)}
+    assert cohort_windows((5, 18)) == {15: (1, 120)}, "enrolled at 5+: biometrics already captured, due at 15 only"
+    x = np.random.default_rng(0).poisson(20, (3, 40)).astype(float)
+    direct = np.array([[x[e, max(t - 9, 0):max(t - 2, 0)].sum() for t in range(40)] for e in range(3)]) / 7
+    assert np.allclose(box_shift(x, 3, 9, 1 / 7), direct)
+
+    print("One cohort...")
+    registry = pd.DataFrame({'district_id': ['A', 'B', 'C'], 'district_code': np.int32([0, 1, 2])})
+    frames = {
+        # District 0: 600 children aged 0-5 and 156 aged 5-17 enrolled in January 2025
+        'enrolment': pd.DataFrame({'date': pd.to_datetime(['2025-01-15', '2025-01-20']), 'district_code': np.int32([0, 2]),
+                                   'age_0_5': [600, 0], 'age_5_17': [156, 0], 'age_18_greater': [5, 40]}),
+        'biometric': pd.DataFrame({'date': pd.to_datetime(['2025-03-01', '2025-09-01']), 'district_code': np.int32([0, 0]),
+                                   'bio_age_5_17': [5, 500], 'bio_age_17_': [0, 0]}),
+        'district_registry': registry
+    }
+    out = project_mandatory_updates(frames, as_of='2025-06-30', horizon_months=200)
+    features, monthly = out['features'], out['monthly']
+    assert features['district_code'].tolist() == [0], "only districts with child enrolments"
+    row = features.iloc[0]
+    # Due from February: 600 / 60 at age 5 and 156 / 156 at age 15 per month
+    assert np.isclose(row['mbu_due_to_date'], 5 * 11)
+    assert row['mbu_done_to_date'] == 5, "updates after the as-of date do not count"
+    assert np.isclose(row['mbu_due_not_done'], 50)
+    assert np.isclose(row['mbu_due_next_12m'], 12 * 11)
+    assert np.isclose(monthly['mbu_due_age_5'].sum(), 600), "every 0-5 child is due once at 5"
+    assert np.isclose(monthly['mbu_due_age_15'].sum(), 600 + 120), "and at 15, with the 5-14 year olds"
+    assert (monthly['district_id'] == 'A').all()
+    assert monthly.loc[monthly['projected'], 'mbu_done'].isna().all()
+    assert monthly['month'].iloc[0] == pd.Timestamp('2025-01-01') and len(monthly) == 6 + 200
+
+    print("Due but not done as a normalized feature...")
+    agg = pd.DataFrame({'district_code': np.int32([0, 1, 2]), 'total_aadhaar_holders': [2000.0, 1000.0, 500.0],
+                        'total_biometric_updates': [505.0, 10.0, 0.0], 'total_demographic_updates': [0.0, 0.0, 0.0],
+                        'last_biometric_update_date': pd.to_datetime(['2025-06-01', '2025-05-01', None])})
+    df = normalize_features(feature_engineer(add_cohort_features(agg, features), as_of='2025-06-30'))
+    assert df['mbu_due_not_done'].tolist() == [50.0, 0.0, 0.0]
+    assert df['mbu_due_not_done_norm'].tolist() == [1.0, 0.0, 0.0]
+
+    print("All districts at once...")
+    rng = np.random.default_rng(1)
+    n_districts, days = 20_000, pd.date_range('2024-01-01', '2025-12-31', freq='7D')
+    enrol = pd.DataFrame({'date': np.repeat(days, n_districts), 'district_code': np.tile(np.arange(n_districts, dtype=np.int32), len(days)),
+                          'age_0_5': rng.poisson(3, n_districts * len(days)), 'age_5_17': rng.poisson(2, n_districts * len(days))})
+    start = time.perf_counter()
+    out = project_mandatory_updates({'enrolment': enrol, 'biometric': pd.DataFrame()}, as_of='2025-12-31')
+    elapsed = time.perf_counter() - start
+    print(f"  {n_districts} districts x {out['monthly']['month'].nunique()} months in {elapsed:.2f}s")
+    assert elapsed < 5.0
+    assert len(out['features']) == n_districts
+    assert np.isclose(out['features']['mbu_due_not_done'], out['features']['mbu_due_to_date']).all()
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,107 @@
+
+# Run from the repository root: python -m src.verify_data_quality
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.data_quality import validate_frame, combine_reports, rule_totals
+from src.data_ingestion import load_raw_data
+
+TODAY = pd.Timestamp('2025-12-31')
+
+def dirty_demographic() -> pd.DataFrame:
+    return pd.DataFrame({
+        'date':          ['01-03-2025', '01-03-2025', '2025/03/01', '01-03-2026', '01-03-2025', '01-03-2025',
+                          '01-03-2025', '01-03-2025', '01-03-2025', '01-03-2025', '01-03-2025'],
+        'state':         ['Karnataka', 'WESTBENGAL', 'Karnataka', 'Karnataka', 'Karnataka', 'Karnataka',
+                          'Karnataka', 'Nagpur', 'Orissa', 'Karnataka', 'Jammu & Kashmir'],
+        'district':      ['Mysuru', 'Howrah', 'Mysuru', 'Mysuru', 'Mysuru', 'Mysuru',
+                          ' ', 'Nagpur', 'Puri', 'Mysuru', 'Jammu'],
+        'pincode':       ['570001', '711101', '570001', '570001', '570001', '5700',
+                          '570001', '440024', '752001', '570001', '180001'],
+        'demo_age_5_17': ['3', '4', '1', '1', '-2', '1', '1', '1', '2', 'abc', '5'],
+        'demo_age_17_':  ['7', '8', '1', '1', '1', '1', '1', '1', None, '1', '6']
+    })
+
+def run_verification():
+    print("Validating a frame with one violation per rule...")
+    raw = dirty_demographic()
+    clean, report = validate_frame(raw, 'demo.csv', today=TODAY)
+
+    counts = report['counts'].set_index('rule')['violations']
+    expected = {'unparseable_date': 1, 'future_date': 1, 'negative_count': 1, 'malformed_pincode': 1,
+                'missing_district': 1, 'unknown_state': 1, 'non_numeric_count': 1, 'state_alias': 3}
+    for rule, n in expected.items():
+        assert counts[rule] == n, f"{rule}: expected {n}, got {counts[rule]}"
+    assert (report['counts']['rows'] == len(raw)).all()
+
+    # Rejected rows go to quarantine with the rule names; fixes are kept
+    rejected = report['rejected']
+    assert len(rejected) == 7 and len(clean) == 4
+    assert (rejected['source_file'] == 'demo.csv').all()
+    assert rejected.set_index('state').loc['Nagpur', 'violations'] == 'unknown_state'
+    assert rejected['demo_age_5_17'].tolist()[-1] == 'abc', "quarantine keeps the raw values"
+
+    print("Parsed values in the clean frame...")
+    assert list(clean['state']) == ['Karnataka', 'West Bengal', 'Odisha', 'Jammu and Kashmir']
+    assert clean['date'].dtype.kind == 'M' and clean['date'].iloc[0] == pd.Timestamp('2025-03-01')
+    assert clean['pincode'].dtype == np.int64 and clean['pincode'].tolist()[0] == 570001
+    assert clean['demo_age_17_'].dtype == np.int64 and clean['demo_age_17_'].tolist()[2] == 0, "empty count -> 0"
+
+    print("Sample cap...")
+    many = pd.concat([raw] * 50, ignore_index=True)
+    _, report = validate_frame(many, 'many.csv', today=TODAY, sample_size=5)
+    per_rule = report['samples'].groupby('rule').size()
+    assert per_rule.max() == 5 and per_rule['state_alias'] == 5
+    assert len(report['rejected']) == 7 * 50
+
+    print("Combining reports...")
+    quality = combine_reports([report, validate_frame(raw, 'demo.csv', today=TODAY)[1]])
+    totals = rule_totals(quality['quality_counts']).set_index('rule')['violations']
+    assert totals['state_alias'] == 3 * 51 and len(quality['quarantine']) == 7 * 51
+    assert combine_reports([])['quality_counts'].empty
+
+    print("Validation fused into ingestion...")
+    data_dir = tempfile.mkdtemp()
+    try:
+        raw.to_csv(os.path.join(data_dir, "api_data_aadhar_demographic_0_11.csv"), index=False)
+        dfs, metadata = load_raw_data(data_dir, today=TODAY)
+        assert len(dfs['demographic']) == 4
+        assert len(metadata['quality']['quarantine']) == 7
+        assert set(metadata['district_dim']['state']) == {'Karnataka', 'West Bengal', 'Odisha', 'Jammu and Kashmir'}
+
+        # The state filter sees the canonical names
+        dfs, metadata = load_raw_data(data_dir, state='West Bengal', today=TODAY)
+        assert len(dfs['demographic']) == 1 and metadata['district_dim']['district'].tolist() == ['Howrah']
+
+        print("Entity codes stable across runs...")
+        registry_dir = os.path.join(data_dir, "registry")
+        first, _ = load_raw_data(data_dir, today=TODAY, registry_dir=registry_dir)
+        assert 'district' not in first['demographic'].columns
+        assert first['demographic']['pincode_code'].dtype == np.int32
+        # A new file registers its new districts after the existing ones; old codes do not move
+        extra = raw.iloc[[1, 1]].assign(district=['Kolkata', 'Howrah'])
+        extra.to_csv(os.path.join(data_dir, "api_data_aadhar_demographic_0_00.csv"), index=False)
+        second, metadata = load_raw_data(data_dir, today=TODAY, registry_dir=registry_dir)
+        codes = ['state_code', 'district_code', 'pincode_code']
+        old = first['demographic'][codes].drop_duplicates()
+        assert len(old.merge(second['demographic'][codes].drop_duplicates())) == len(old)
+        registry = metadata['registries']['district'].set_index('district_id')['district_code']
+        assert registry['Kolkata'] == registry.max() and registry['Howrah'] < registry['Kolkata']
+
+        print("District codes keyed on (state, district)...")
+        twins = raw.iloc[[1, 1]].assign(state=['Chhattisgarh', 'Maharashtra'], district='Raigarh')
+        twins.to_csv(os.path.join(data_dir, "api_data_aadhar_demographic_0_01.csv"), index=False)
+        third, metadata = load_raw_data(data_dir, today=TODAY, registry_dir=registry_dir)
+        raigarh = metadata['district_dim'][metadata['district_dim']['district'] == 'Raigarh']
+        assert sorted(raigarh['state']) == ['Chhattisgarh', 'Maharashtra'] and raigarh['district_code'].is_unique
+        assert raigarh['is_ambiguous'].all() and metadata['district_dim']['district_code'].is_unique
+        assert third['demographic']['district_code'].isin(raigarh['district_code']).sum() == 2
+    finally:
+        shutil.rmtree(data_dir)
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,141 @@
+
+# Run from the repository root: python -m src.verify_data_watcher
+import glob
+import os
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+from pipeline_orchestrator import run_aadhaar_netra_pipeline
+from src.generate_full_mock_data import generate_mock_dataset
+from src.data_watcher import DataWatcher
+from src.history_store import list_runs
+
+AS_OF = '2025-12-31'
+
+def full_run(data_dir, output_dir, registry_dir):
+    # Reference: the batch pipeline over every file at once, with the watcher's registries (same district codes)
+    run_aadhaar_netra_pipeline(data_dir, output_dir, use_checkpoints=False, quiet=True, history_dir=registry_dir,
+                               as_of=AS_OF)
+    return {stem: pd.read_parquet(os.path.join(output_dir, f"{stem}.parquet"))
+            for stem in ['final_ranked_districts', 'mbu_projection']}
+
+def assert_same_table(a, b, keys, name):
+    assert sorted(a.columns) == sorted(b.columns), f"{name}: columns differ: {set(a.columns) ^ set(b.columns)}"
+    a = a.sort_values(keys).reset_index(drop=True)
+    b = b[a.columns].sort_values(keys).reset_index(drop=True)
+    assert len(a) == len(b), f"{name}: {len(a)} rows vs {len(b)}"
+    for col in a.columns:
+        x, y = a[col], b[col]
+        if pd.api.types.is_float_dtype(x) or pd.api.types.is_float_dtype(y):
+            assert np.allclose(x.to_numpy(dtype=float), y.to_numpy(dtype=float), equal_nan=True), f"{name}: {col} differs"
+        else:
+            assert (x.isna() == y.isna()).all() and (x[x.notna()] == y[y.notna()]).all(), f"{name}: {col} differs"
+
+def run_verification():
+    pages, data_dir, output_dir = tempfile.mkdtemp(), tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        rows = {'biometric': 20_000, 'demographic': 10_000, 'enrolment': 4_000}
+        generate_mock_dataset(pages, rows, n_districts=40, page_size=5_000, workers=1, seed=3)
+        files = sorted(glob.glob(os.path.join(pages, '*.csv')))
+        first, second = files[::2], files[1::2]
+
+        print("Debounce...")
+        watcher = DataWatcher(data_dir, output_dir, debounce=2.0)
+        for f in first:
+            shutil.copy(f, data_dir)
+        assert watcher.poll(now=0.0) == []
+        assert watcher.poll(now=1.5) == [], "released before the debounce"
+        os.utime(os.path.join(data_dir, os.path.basename(first[0])), ns=(0, 1)) # same size, new mtime
+        assert watcher.poll(now=2.5) == [], "a changed file restarts the debounce"
+        batch = watcher.poll(now=4.6)
+        assert [os.path.basename(f) for f in batch] == [os.path.basename(f) for f in first]
+        assert watcher.poll(now=10.0) == [], "a released batch is not released twice"
+
+        print("Incremental batches against a full run...")
+        summary = watcher.process(batch, as_of=AS_OF)
+        assert summary['rows'] == sum(len(pd.read_csv(f)) for f in first)
+        for f in second:
+            shutil.copy(f, data_dir)
+        watcher.poll(now=20.0)
+        summary = watcher.process(watcher.poll(now=30.0), as_of=AS_OF)
+        assert summary['files'] == [os.path.basename(f) for f in second], summary['files']
+        assert 0 < summary['affected'] <= summary['districts']
+
+        registry_dir, ref_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+        try:
+            for f in glob.glob(os.path.join(watcher.history_dir, '*_registry.parquet')):
+                shutil.copy(f, registry_dir)
+            ref = full_run(data_dir, ref_dir, registry_dir)
+        finally:
+            shutil.rmtree(registry_dir)
+            shutil.rmtree(ref_dir)
+        published = pd.read_parquet(os.path.join(output_dir, 'final_ranked_districts.parquet'))
+        # Same stages as the batch pipeline: cohort, forecast and anomaly columns included
+        assert {'mbu_due_not_done', 'forecast_updates_30d', 'camp_capacity', 'anomaly_flag'} <= set(published.columns)
+        assert_same_table(published, ref['final_ranked_districts'], ['district_code'], "ranking")
+        assert_same_table(pd.read_parquet(os.path.join(output_dir, 'mbu_projection.parquet')), ref['mbu_projection'],
+                          ['district_code', 'month'], "mandatory update projection")
+        assert len(list_runs(watcher.history_dir)) == 2
+
+        print("Restart resumes from the committed state...")
+        resumed = DataWatcher(data_dir, output_dir, debounce=0.0)
+        assert resumed.manifest == watcher.manifest and resumed.batch == 2
+        for source, daily in watcher.daily.items():
+            assert resumed.daily[source].equals(daily), f"{source} daily rows not restored"
+        assert resumed.poll(now=100.0) == [], "processed files are not ingested again"
+        assert len(glob.glob(os.path.join(output_dir, 'watch', 'batch_*'))) == 1
+
+        # A processed file that changes is ignored
+        with open(os.path.join(data_dir, os.path.basename(second[0])), 'a') as f:
+            f.write('\n')
+        assert resumed.poll(now=200.0) == [] and resumed.poll(now=300.0) == []
+
+        print("Latency from a file landing to an updated ranking...")
+        extra = os.path.join(pages, 'late')
+        generate_mock_dataset(extra, {'enrolment': 2_000}, n_districts=40, page_size=2_000, workers=1, seed=4)
+        live = DataWatcher(data_dir, output_dir, debounce=0.2, write_history=False)
+        stop = threading.Event()
+        thread = threading.Thread(target=live.run, kwargs={'interval': 0.05, 'stop': stop})
+        thread.start()
+        try:
+            time.sleep(0.5) # startup republish of the resumed state
+            published_at = os.stat(os.path.join(output_dir, 'final_ranked_districts.parquet')).st_mtime_ns
+            start = time.perf_counter()
+            landed = os.path.join(data_dir, 'api_data_aadhar_enrolment_late.csv')
+            shutil.copy(glob.glob(os.path.join(extra, '*.csv'))[0], landed + '.part')
+            os.replace(landed + '.part', landed)
+            while live.batch < 3 and time.perf_counter() - start < 30:
+                time.sleep(0.02)
+            latency = time.perf_counter() - start
+        finally:
+            stop.set()
+            thread.join()
+        assert live.batch == 3, "the new file was not processed"
+        assert os.stat(os.path.join(output_dir, 'final_ranked_districts.parquet')).st_mtime_ns > published_at
+        print(f"  new file -> published ranking in {latency:.2f}s (debounce 0.2s)")
+
+        print("A file that fails to read is not recorded...")
+        bad = os.path.join(data_dir, 'api_data_aadhar_enrolment_bad.parquet')
+        with open(bad, 'w') as f:
+            f.write('not parquet')
+        retry = DataWatcher(data_dir, output_dir, debounce=0.0, write_history=False)
+        assert retry.poll(now=400.0) == [bad]
+        summary = retry.process([bad], as_of=AS_OF)
+        assert summary['files'] == [] and summary['failed_files'] == [os.path.basename(bad)]
+        assert os.path.basename(bad) not in DataWatcher(data_dir, output_dir).manifest, "failed file committed"
+        assert retry.poll(now=500.0) == [], "an unreadable file is not retried until it changes"
+        pd.read_csv(glob.glob(os.path.join(extra, '*.csv'))[0]).to_parquet(bad)
+        assert retry.poll(now=600.0) == [bad], "a rewritten file is retried"
+        assert retry.process([bad], as_of=AS_OF)['files'] == [os.path.basename(bad)]
+        assert os.path.basename(bad) in retry.manifest
+    finally:
+        for path in (pages, data_dir, output_dir):
+            shutil.rmtree(path, ignore_errors=True)
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,85 @@
+
+# Run from the repository root: python -m src.verify_demand_forecast
+import time
+import numpy as np
+import pandas as pd
+from src.demand_forecast import forecast_series, forecast_demand, INTERVAL_Z
+from src.strategy_recommendation import recommend_camp_strategy, MAX_UPDATES_PER_CAMP
+
+def run_verification():
+    rng = np.random.default_rng(1)
+    n_entities, n_days = 2000, 365 + 90
+    week = np.array([1.3, 1.2, 1.1, 1.0, 1.0, 0.9, 0.5])
+    rate = rng.gamma(2, 5, n_entities)[:, None] * week[np.arange(n_days) % 7][None, :]
+    rate[n_entities // 2:, 200:] *= 1.5 # level shift half-way through the history
+    counts = rng.poisson(rate)
+    history, future = counts[:, :365], counts[:, 365:]
+
+    print("Forecasts of all series in one fit...")
+    start = time.perf_counter()
+    model, forecasts = forecast_series(history)
+    elapsed = time.perf_counter() - start
+    print(f"  {n_entities} series x 365 days in {elapsed:.3f}s")
+    assert elapsed < 1.0, "forecast too slow"
+    assert set(model) <= {'ses', 'seasonal_naive'}
+    for h, (mean, var) in forecasts.items():
+        actual = future[:, :h].sum(axis=1)
+        error = np.median(np.abs(mean - actual) / np.maximum(actual, 1))
+        sd = np.sqrt(var)
+        covered = ((actual >= mean - INTERVAL_Z * sd) & (actual <= mean + INTERVAL_Z * sd)).mean()
+        print(f"  {h} days: median error {error:.1%}, 90% interval covers {covered:.1%}")
+        assert error < 0.1, f"{h}-day forecast error {error:.1%}"
+        assert 0.85 < covered < 0.995, f"{h}-day interval coverage {covered:.1%}"
+    shifted = forecasts[30][0][n_entities // 2:] / rate[n_entities // 2:, -30:].sum(axis=1)
+    assert abs(np.median(shifted) - 1) < 0.05, "forecast does not follow the level shift"
+
+    print("Per-district forecasts from the ingested frames...")
+    days = pd.date_range('2025-01-01', periods=365)
+    e, d = np.nonzero(history[:50])
+    frames = {
+        'biometric': pd.DataFrame({'date': days[d], 'district_code': e.astype(np.int32),
+                                   'bio_age_5_17': history[e, d], 'bio_age_17_': 0}),
+        'demographic': pd.DataFrame(),
+        'district_registry': pd.DataFrame({'district_code': np.arange(60, dtype=np.int32)})
+    }
+    fc = forecast_demand(frames, as_of=days[-1])
+    assert len(fc) == 50, "only districts with update rows are forecast"
+    assert np.allclose(fc['bio_forecast_30d'], forecasts[30][0][:50])
+    assert np.allclose(fc['forecast_updates_90d'], fc['bio_forecast_90d'])
+    assert (fc['demo_forecast_model'] == 'none').all() and fc['demo_forecast_30d'].isna().all()
+    assert (fc['forecast_updates_30d_lo'] <= fc['forecast_updates_30d']).all()
+    assert (fc['forecast_updates_30d'] <= fc['forecast_updates_30d_hi']).all()
+
+    print("Forecasts size the camps...")
+    df = pd.DataFrame({'district_code': np.arange(60, dtype=np.int32), 'cps_score': 60.0,
+                       'population_impact_score_norm': 0.5, 'biometric_coverage_gap_norm': 0.25})
+    fc.loc[0, ['forecast_updates_30d', 'forecast_updates_30d_hi']] = [1500.0, 3000.0] # 2800 per 28-day camp
+    fc.loc[1, ['forecast_updates_30d', 'forecast_updates_30d_hi']] = [600.0, 900.0]
+    fc.loc[2, ['forecast_updates_30d', 'forecast_updates_30d_hi']] = [4000.0, 6000.0] # 2800 per 14-day camp
+    fc.loc[3, ['forecast_updates_30d', 'forecast_updates_30d_hi']] = [15000.0, 18000.0] # 4200 per 7-day camp
+    strat = recommend_camp_strategy(df, fc).set_index('district_code')
+    assert strat.loc[0, 'deployment_freq_days'] == '14-21 days', "demand beyond one camp raises the frequency"
+    assert strat.loc[0, 'camp_type'] == 'FREQUENT_MOBILE', "camp type follows the raised frequency"
+    assert strat.loc[0, 'camp_capacity'] == 1400 and strat.loc[0, 'camp_capacity'] <= MAX_UPDATES_PER_CAMP
+    assert "due to forecast demand and CPS 60.0 (MONTHLY_MOBILE by CPS alone)" in strat.loc[0, 'strategy_reasoning']
+    assert strat.loc[2, ['camp_type', 'deployment_freq_days']].tolist() == ['INTENSIVE', '7-10 days'], "raised until it fits"
+    assert strat.loc[2, 'camp_capacity'] == 1400 and not strat.loc[2, 'over_capacity']
+    assert strat.loc[3, 'over_capacity'] and strat.loc[3, 'camps_per_cycle'] == 3 and strat.loc[3, 'camp_capacity'] == 1400
+    assert np.isclose(strat.loc[3, 'expected_updates_per_camp'], 15000 * 7 / 30 / 3)
+    assert "Over capacity: 3 parallel camps of 1400 updates" in strat.loc[3, 'strategy_reasoning']
+    assert "Size for" not in strat.loc[3, 'strategy_reasoning']
+    assert (strat['camp_capacity'].dropna() <= MAX_UPDATES_PER_CAMP).all()
+    # Camp type and frequency always name the same band
+    bands = dict(zip(['INTENSIVE', 'FREQUENT_MOBILE', 'MONTHLY_MOBILE', 'QUARTERLY_FIXED', 'ANNUAL_PREVENTIVE'],
+                     ['7-10 days', '14-21 days', '28-35 days', '90 days', '365 days']))
+    assert (strat['camp_type'].map(bands) == strat['deployment_freq_days']).all()
+    assert strat.loc[1, 'deployment_freq_days'] == '28-35 days' and strat.loc[1, 'camps_per_cycle'] == 1
+    assert np.isclose(strat.loc[1, 'expected_updates_per_camp'], 600 * 28 / 30)
+    assert strat.loc[55, 'deployment_freq_days'] == '28-35 days' and np.isnan(strat.loc[55, 'camp_capacity'])
+    assert strat.loc[55, 'strategy_reasoning'].endswith("Gap: 0.25)."), "no sizing text without a forecast"
+    assert recommend_camp_strategy(df)['deployment_freq_days'].eq('28-35 days').all()
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
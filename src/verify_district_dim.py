@@ -0,0 +1,92 @@
+
+# Run from the repository root: python -m src.verify_district_dim
+import os
+import shutil
+import tempfile
+import pandas as pd
+from src.data_ingestion import load_raw_data, load_raw_frames, build_district_dim, attach_district_names
+
+TODAY = pd.Timestamp('2025-12-31')
+
+def raw_drops(data_dir):
+    # Raigarh is a district of both Chhattisgarh and Maharashtra; Bilaspur of Chhattisgarh and Himachal Pradesh
+    enrolment = pd.DataFrame({
+        'date': ['01-03-2025'] * 6,
+        'state': ['Chhattisgarh', 'Maharashtra', 'Maharashtra', 'Chhattisgarh', 'Himachal Pradesh', 'Kerala'],
+        'district': ['Raigarh', 'Raigarh', 'Pune', 'Bilaspur', 'Bilaspur', 'Idukki'],
+        'pincode': ['496001', '402201', '411001', '495001', '174001', '685501'],
+        'age_0_5': [1, 2, 3, 4, 5, 6], 'age_5_17': [1] * 6, 'age_18_greater': [10] * 6
+    })
+    biometric = pd.DataFrame({
+        'date': ['02-03-2025'] * 4,
+        # State aliases are canonicalized before the dimension is built
+        'state': ['Chhatisgarh', 'Chhattisgarh', 'Maharashtra', 'Kerala'],
+        'district': ['Raigarh', 'Raigarh', 'Raigarh', 'Idukki'],
+        'pincode': ['496001', '496001', '402201', '685501'],
+        'bio_age_5_17': [1] * 4, 'bio_age_17_': [2] * 4
+    })
+    enrolment.to_csv(os.path.join(data_dir, "api_data_aadhar_enrolment_0_6.csv"), index=False)
+    biometric.to_csv(os.path.join(data_dir, "api_data_aadhar_biometric_0_4.csv"), index=False)
+
+def run_verification():
+    data_dir = tempfile.mkdtemp()
+    try:
+        raw_drops(data_dir)
+
+        print("Dimension emitted by ingestion...")
+        dfs, metadata = load_raw_data(data_dir, today=TODAY)
+        dim = metadata['district_dim']
+        assert list(dim.columns) == ['state', 'district', 'state_code', 'district_code', 'n_rows', 'n_states',
+                                     'is_ambiguous']
+        assert len(dim) == 6 and dim['district_code'].is_unique
+        assert list(zip(dim['district'], dim['state']))[:4] == [
+            ('Bilaspur', 'Chhattisgarh'), ('Bilaspur', 'Himachal Pradesh'), ('Idukki', 'Kerala'), ('Pune', 'Maharashtra')
+        ], "sorted by (district, state)"
+
+        raigarh = dim[dim['district'] == 'Raigarh'].set_index('state')
+        assert sorted(raigarh.index) == ['Chhattisgarh', 'Maharashtra']
+        # Row counts are summed over the enrolment and biometric files, per (state, district)
+        assert raigarh.loc['Chhattisgarh', 'n_rows'] == 3 and raigarh.loc['Maharashtra', 'n_rows'] == 2
+        assert (raigarh['n_states'] == 2).all() and raigarh['is_ambiguous'].all()
+        assert not dim.set_index('district').loc[['Pune', 'Idukki'], 'is_ambiguous'].any()
+        assert dim['n_rows'].sum() == len(dfs['enrolment']) + len(dfs['biometric'])
+
+        # Every ingested row's (state_code, district_code) pair is a dimension row
+        pairs = pd.concat([dfs['enrolment'], dfs['biometric']])[['state_code', 'district_code']].drop_duplicates()
+        assert len(pairs.merge(dim[['state_code', 'district_code']])) == len(pairs) == len(dim)
+        codes = dfs['biometric'].merge(dim, on=['state_code', 'district_code'])
+        assert codes.groupby('district_code')['state'].nunique().eq(1).all()
+
+        print("Names attached by district code...")
+        scores = pd.DataFrame({'district_code': dim['district_code'][::-1].to_numpy(), 'cps_score': range(len(dim))})
+        named = attach_district_names(scores, dim)
+        assert list(named.columns[:1]) == ['district_id'] and len(named) == len(scores)
+        assert sorted(named.loc[named['district_id'] == 'Raigarh', 'state']) == ['Chhattisgarh', 'Maharashtra']
+        assert named.set_index(['state', 'district_id']).index.is_unique
+        unknown = attach_district_names(pd.DataFrame({'district_code': [dim['district_code'].max() + 1]}), dim)
+        assert unknown[['district_id', 'state']].iloc[0].tolist() == ['Unknown', 'Unknown']
+
+        # district_state_dim.csv (pipeline_orchestrator) read back the way extract_infographic_data does
+        os.makedirs(os.path.join(data_dir, "output"))
+        dim_path = os.path.join(data_dir, "output", "district_state_dim.csv")
+        dim.to_csv(dim_path, index=False)
+        saved = pd.read_csv(dim_path)
+        saved['district'] = saved['district'].astype(str)
+        assert attach_district_names(scores, saved).equals(named)
+
+        print("Frames and state filter...")
+        frames = load_raw_frames(data_dir, today=TODAY)
+        assert frames['district_dim'].equals(dim)
+        _, metadata = load_raw_data(data_dir, state='Maharashtra', today=TODAY)
+        only = metadata['district_dim']
+        assert sorted(only['district']) == ['Pune', 'Raigarh'] and (only['state'] == 'Maharashtra').all()
+        assert not only['is_ambiguous'].any(), "the name is unique within the filtered run"
+
+        assert build_district_dim([], metadata['registries']).columns.tolist() == dim.columns.tolist()
+    finally:
+        shutil.rmtree(data_dir)
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
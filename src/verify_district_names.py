@@ -0,0 +1,132 @@
+
+# Run from the repository root: python -m src.verify_district_names
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.data_ingestion import load_raw_frames
+from src.data_watcher import score_frames
+from src.simulation import district_keys, plan_from_strategy, build_camp_schedule, simulate_camp_plans, district_trajectory
+from src.sms_dispatcher import build_camp_messages, open_outbox, enqueue_messages, dispatch_outbox, FakeSmsGateway
+from src.citizen_requests import open_request_db, submit_requests, aggregate_daily, refresh_hybrid_priority, get_hybrid_priority
+from src.map_build import load_boundaries, join_scores
+from src.spatial_features import build_district_adjacency, save_adjacency
+
+AS_OF = '2025-06-30'
+# Raigarh is a district of both Chhattisgarh and Maharashtra; each has one neighbour in its own state
+DISTRICTS = [
+    ('Chhattisgarh', 'Raigarh', '496001'),
+    ('Chhattisgarh', 'Janjgir-Champa', '495668'),
+    ('Maharashtra', 'Raigarh', '402201'),
+    ('Maharashtra', 'Pune', '411001'),
+    ('Kerala', 'Idukki', '685501')
+]
+
+def raw_drops(data_dir, seed=0):
+    # Daily rows per district; Chhattisgarh's Raigarh has had no biometric update for 60 days
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2025-03-01', AS_OF, freq='D')
+    grid = pd.DataFrame([(d, s, n, p) for d in days for s, n, p in DISTRICTS],
+                        columns=['date', 'state', 'district', 'pincode'])
+    grid['date'] = grid['date'].dt.strftime('%d-%m-%Y')
+    n = len(grid)
+
+    enrolment = grid.assign(age_0_5=rng.integers(0, 20, n), age_5_17=rng.integers(0, 20, n),
+                            age_18_greater=rng.integers(50, 200, n))
+    stale = (grid['state'] == 'Chhattisgarh') & (grid['district'] == 'Raigarh') & \
+            (pd.to_datetime(grid['date'], format='%d-%m-%Y') > pd.Timestamp(AS_OF) - pd.Timedelta(days=60))
+    biometric = grid[~stale].assign(bio_age_5_17=rng.integers(0, 20, (~stale).sum()),
+                                    bio_age_17_=rng.integers(10, 80, (~stale).sum()))
+    demographic = grid.assign(demo_age_5_17=rng.integers(0, 10, n), demo_age_17_=rng.integers(0, 40, n))
+
+    enrolment.to_csv(os.path.join(data_dir, "api_data_aadhar_enrolment_0_1.csv"), index=False)
+    biometric.to_csv(os.path.join(data_dir, "api_data_aadhar_biometric_0_1.csv"), index=False)
+    demographic.to_csv(os.path.join(data_dir, "api_data_aadhar_demographic_0_1.csv"), index=False)
+
+def boundaries(path):
+    # Unit squares; the two Raigarh squares are far apart and each touches its state neighbour
+    square = lambda x0, y0: [[x0, y0], [x0 + 1, y0], [x0 + 1, y0 + 1], [x0, y0 + 1], [x0, y0]]
+    corners = [(82, 21), (83, 21), (73, 18), (73, 19), (77, 9)]
+    features = [{'type': 'Feature', 'properties': {'DISTRICT': name, 'ST_NM': state},
+                 'geometry': {'type': 'Polygon', 'coordinates': [square(*corner)]}}
+                for (state, name, _), corner in zip(DISTRICTS, corners)]
+    with open(path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+def run_verification():
+    work = tempfile.mkdtemp()
+    try:
+        data_dir = os.path.join(work, 'data')
+        os.makedirs(data_dir)
+        raw_drops(data_dir)
+        boundary_path = os.path.join(work, 'districts.geojson')
+        boundaries(boundary_path)
+        adjacency_path = os.path.join(work, 'district_adjacency.npz')
+        save_adjacency(adjacency_path, *build_district_adjacency(boundary_path))
+
+        print("Scoring (pipeline stages with spatial features)...")
+        df = score_frames(load_raw_frames(data_dir, today=AS_OF), AS_OF, adjacency_path=adjacency_path)['attach_state']
+        assert len(df) == len(DISTRICTS) and df.set_index(['state', 'district_id']).index.is_unique
+        raigarh = df[df['district_id'] == 'Raigarh'].set_index('state')
+        assert sorted(raigarh.index) == ['Chhattisgarh', 'Maharashtra'] and raigarh['district_code'].is_unique
+        assert raigarh.loc['Chhattisgarh', 'days_since_last_update'] > raigarh.loc['Maharashtra', 'days_since_last_update']
+        assert raigarh.loc['Chhattisgarh', 'bsi_score'] != raigarh.loc['Maharashtra', 'bsi_score']
+
+        # Each Raigarh's neighbour is the district of its own state
+        bsi = df.set_index(['state', 'district_id'])['bsi_score']
+        assert (df['neighbour_count'] == [0 if s == 'Kerala' else 1 for s in df['state']]).all()
+        assert raigarh.loc['Chhattisgarh', 'neighbour_avg_bsi'] == bsi[('Chhattisgarh', 'Janjgir-Champa')]
+        assert raigarh.loc['Maharashtra', 'neighbour_avg_bsi'] == bsi[('Maharashtra', 'Pune')]
+
+        print("Map join...")
+        joined = join_scores(load_boundaries(boundary_path), df, name_col='district_id', state_col='state')
+        assert joined['has_data'].all()
+        assert joined['state'].tolist() == [s for s, _, _ in DISTRICTS], "feature joined to the other state's row"
+        cps = df.set_index(['state', 'district_id'])['cps_score']
+        assert joined['cps_score'].tolist() == [cps[(s, n)] for s, n, _ in DISTRICTS]
+
+        print("Simulation...")
+        plan = plan_from_strategy(df, updates_per_camp=500.0)
+        assert set(plan) == set(district_keys(df)) and len(plan) == len(df)
+        schedule = build_camp_schedule(district_keys(df), [plan], horizon_days=30)
+        assert (schedule.sum(axis=(1, 2)) > 0).all(), "a district got no camps"
+        result = simulate_camp_plans(df, schedule)
+        trajectory = district_trajectory(result, plan=0, days=[30])
+        assert trajectory.set_index(['state', 'district_id']).index.is_unique
+        assert sorted(trajectory.loc[trajectory['district_id'] == 'Raigarh', 'state']) == ['Chhattisgarh', 'Maharashtra']
+
+        print("SMS outbox...")
+        messages = build_camp_messages(df.assign(camp_type='INTENSIVE'), '2025-07-15')
+        assert len(messages) == len(df) and messages['idempotency_key'].is_unique
+        conn = open_outbox(":memory:")
+        assert enqueue_messages(conn, messages) == len(df)
+        gateway = FakeSmsGateway(latency=0.0)
+        assert asyncio.run(dispatch_outbox(conn, gateway))['sent'] == len(df)
+        assert len(gateway.delivered) == len(df) and gateway.duplicates_suppressed == 0
+        outbox = pd.read_sql_query("SELECT state FROM sms_outbox WHERE district_id = 'Raigarh'", conn)
+        assert sorted(outbox['state']) == ['Chhattisgarh', 'Maharashtra']
+
+        print("Citizen requests...")
+        conn = open_request_db(":memory:")
+        day = pd.Timestamp(AS_OF, tz='UTC')
+        submit_requests(conn, pd.DataFrame({'state': 'Chhattisgarh', 'district_id': 'Raigarh',
+                                            'user_hash': [f"U{i}" for i in range(5)], 'timestamp': day}))
+        changed = aggregate_daily(conn)
+        assert changed == {('Chhattisgarh', 'Raigarh')}
+        refresh_hybrid_priority(conn, df, changed, as_of=day)
+        hybrid = get_hybrid_priority(conn).set_index(['state', 'district_id'])
+        assert len(hybrid) == len(df)
+        assert hybrid.loc[('Chhattisgarh', 'Raigarh'), 'requests_30d'] == 5
+        assert hybrid.loc[('Maharashtra', 'Raigarh'), 'requests_30d'] == 0
+        for state in ['Chhattisgarh', 'Maharashtra']:
+            assert hybrid.loc[(state, 'Raigarh'), 'cps_score'] == raigarh.loc[state, 'cps_score']
+    finally:
+        shutil.rmtree(work)
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
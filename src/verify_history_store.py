@@ -0,0 +1,102 @@
+
+# Run from the repository root: python -m src.verify_history_store
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from src.dimensions import load_registry, DISTRICT_REGISTRY_FILENAME
+from src.history_store import (append_run, list_runs, read_run, read_history, compare_runs,
+                               tier_transitions, moved_into_tier, top_n_churn)
+from src.scoring_bsi import bsi_tier_codes, BSI_TIERS
+from src.scoring_cps import cps_tier_codes, CPS_TIERS
+
+def ranked(district_ids, cps, bsi, states='Kerala'):
+    df = pd.DataFrame({'state': states, 'district_id': district_ids, 'cps_score': np.round(cps, 2), 'bsi_score': bsi})
+    df['cps_tier'] = np.array(CPS_TIERS + ['Unknown'])[cps_tier_codes(df['cps_score'].to_numpy())]
+    df['bsi_tier'] = np.array(BSI_TIERS + ['Unknown'])[bsi_tier_codes(df['bsi_score'].to_numpy())]
+    df = df.sort_values('cps_score', ascending=False).reset_index(drop=True)
+    df['cps_rank'] = df.index + 1
+    return df
+
+def run_verification():
+    history_dir = tempfile.mkdtemp()
+    try:
+        print("Appending two runs...")
+        week1 = ranked(['A', 'B', 'C', 'D'], np.array([90.0, 72.0, 60.0, 30.0]), np.array([0.9, 0.6, 0.5, 0.1]))
+        week2 = ranked(['B', 'C', 'D', 'E'], np.array([88.0, 50.0, 86.0, 45.0]), np.array([0.8, 0.4, 0.8, 0.3]))
+        append_run(history_dir, week1, run_ts=datetime(2025, 1, 1, 6))
+        append_run(history_dir, week2, run_ts=datetime(2025, 1, 8, 6))
+
+        registry = load_registry(os.path.join(history_dir, DISTRICT_REGISTRY_FILENAME))
+        assert registry.set_index('district_id')['district_code'].to_dict() == {'A': 0, 'B': 1, 'C': 2, 'D': 3, 'E': 4}
+        assert registry['district_code'].dtype == np.int32
+
+        print("Time travel...")
+        assert list(list_runs(history_dir)['run_date']) == ['2025-01-01', '2025-01-08']
+        assert read_run(history_dir, '2025-01-05')['district_id'].tolist() == ['A', 'B', 'C', 'D']
+        latest = read_run(history_dir)
+        assert latest['district_id'].tolist() == ['B', 'D', 'C', 'E']
+        assert latest['cps_score'].tolist() == [88.0, 86.0, 50.0, 45.0]
+        try:
+            read_run(history_dir, '2024-12-31')
+            raise AssertionError("Read a run before the first one")
+        except ValueError:
+            pass
+
+        print("Rank deltas and tier transitions...")
+        cmp = compare_runs(history_dir).set_index('district_id')
+        assert cmp.loc['D', 'rank_old'] == 4 and cmp.loc['D', 'rank_new'] == 2 and cmp.loc['D', 'rank_delta'] == 2
+        assert cmp.loc['C', 'rank_delta'] == 0 and cmp.loc['C', 'tier_delta'] == -1 # Tier 3 -> Tier 4
+        assert cmp.loc['A', 'status'] == 'dropped' and pd.isna(cmp.loc['A', 'rank_new'])
+        assert cmp.loc['E', 'status'] == 'new' and pd.isna(cmp.loc['E', 'rank_delta'])
+
+        transitions = tier_transitions(cmp.reset_index())
+        assert transitions.loc['Tier 5', 'Tier 1'] == 1 # D
+        assert transitions.loc['Tier 2', 'Tier 1'] == 1 # B
+        assert transitions.loc['Tier 1', 'Absent'] == 1 # A
+        assert transitions.loc['Absent', 'Tier 4'] == 1 # E
+        assert transitions.to_numpy().sum() == 5
+
+        assert sorted(moved_into_tier(cmp.reset_index(), 'Tier 1')['district_id']) == ['B', 'D']
+        churn = top_n_churn(cmp.reset_index(), 2)
+        assert churn['entered'] == ['D'] and churn['exited'] == ['A'] and churn['churn'] == 0.5
+
+        print("Same district name in two states...")
+        shared = ranked(['Raigarh', 'Raigarh', 'B'], np.array([80.0, 20.0, 50.0]), np.array([0.7, 0.2, 0.5]),
+                        ['Chhattisgarh', 'Maharashtra', 'Kerala'])
+        append_run(history_dir, shared, run_ts=datetime(2025, 1, 15, 6))
+        registry = load_registry(os.path.join(history_dir, DISTRICT_REGISTRY_FILENAME))
+        assert len(registry) == 7 and (registry['district_id'] == 'Raigarh').sum() == 2
+        stored = read_run(history_dir)
+        assert stored[['district_id', 'state']].values.tolist() == [['Raigarh', 'Chhattisgarh'], ['B', 'Kerala'],
+                                                                   ['Raigarh', 'Maharashtra']]
+        cmp = compare_runs(history_dir)
+        assert (cmp['status'] == 'new').sum() == 2 and cmp['district_code'].is_unique
+
+        print("A year of daily runs...")
+        rng = np.random.default_rng(0)
+        ids = np.array([f"District {i:04d}" for i in range(1000)])
+        start = datetime(2025, 2, 1, 6)
+        for day in range(365):
+            append_run(history_dir, ranked(ids, rng.uniform(0, 100, len(ids)), rng.uniform(0, 1, len(ids))),
+                       run_ts=start + timedelta(days=day))
+
+        t0 = time.perf_counter()
+        past = read_run(history_dir, '2025-06-15')
+        cmp = compare_runs(history_dir, "2025-06-15", "2026-01-15")
+        elapsed = time.perf_counter() - t0
+        print(f"  time-travel read + comparison over {len(list_runs(history_dir))} runs: {elapsed:.3f}s")
+        assert len(past) == 1000 and len(cmp) == 1000 and elapsed < 2.0
+
+        window = read_history(history_dir, '2026-01-01', '2026-01-31', columns=['district_code', 'cps_rank'])
+        assert window['run_date'].nunique() == 31 and len(window) == 31 * 1000
+
+        print("Verification Passed!")
+    finally:
+        shutil.rmtree(history_dir)
+
+if __name__ == "__main__":
+    run_verification()
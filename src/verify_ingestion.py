@@ -1,7 +1,8 @@
 
+# Run from the repository root: python -m src.verify_ingestion
 import pandas as pd
 import os
-from data_ingestion import load_raw_data
+from src.data_ingestion import load_raw_data
 
 def create_sample_csv(filename):
     data = {
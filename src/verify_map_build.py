@@ -0,0 +1,93 @@
+
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from map_build import douglas_peucker, simplify_ring, join_scores, build_map
+
+def noisy_square(x0, y0, size=1.0, n=400, seed=0):
+    """Closed square ring with densified, slightly jittered edges."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 4, n, endpoint=False)
+    side, frac = np.floor(t), t - np.floor(t)
+    x = np.select([side == 0, side == 1, side == 2], [frac, 1.0, 1.0 - frac], 0.0)
+    y = np.select([side == 0, side == 1, side == 2], [0.0, frac, 1.0], 1.0 - frac)
+    pts = np.column_stack([x0 + size * x, y0 + size * y]) + rng.normal(0, 1e-5, (n, 2))
+    return np.vstack([pts, pts[:1]]).tolist()
+
+def run_verification():
+    print("Testing Douglas-Peucker simplification...")
+    line = np.array([[0, 0], [1, 0.1], [2, -0.1], [3, 5], [4, 6], [5, 7], [6, 8.1], [7, 9], [8, 9], [9, 9]], dtype=float)
+    simplified = douglas_peucker(line, 1.0)
+    assert simplified[0].tolist() == [0, 0] and simplified[-1].tolist() == [9, 9], "Endpoints must be kept"
+    assert [2, -0.1] in simplified.tolist() and [7, 9] in simplified.tolist(), f"Corners lost: {simplified}"
+    assert len(simplified) < len(line), "Nothing was simplified"
+
+    ring = simplify_ring(noisy_square(0, 0), 0.001, 4)
+    assert ring[0] == ring[-1], "Ring must stay closed"
+    assert 5 <= len(ring) <= 8, f"Square should reduce to about its corners, got {len(ring)} points"
+    assert simplify_ring([[0, 0], [1e-6, 0], [1e-6, 1e-6], [0, 0]], 0.01, 3) is None, "Tiny ring should collapse"
+
+    print("Testing vectorized score join...")
+    geo_data = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'DISTRICT': 'Pune'},
+         'geometry': {'type': 'Polygon', 'coordinates': [noisy_square(73, 18, seed=1)]}},
+        {'type': 'Feature', 'properties': {'dtname': ' West  Champaran '},
+         'geometry': {'type': 'MultiPolygon', 'coordinates': [[noisy_square(84, 27, seed=2)], [noisy_square(85, 27, 0.0001, 8)]]}},
+        {'type': 'Feature', 'properties': {'NAME_2': 'Leh'},
+         'geometry': {'type': 'Polygon', 'coordinates': [noisy_square(77, 34, seed=3)]}}
+    ]}
+    scores = pd.DataFrame({
+        'District': ['Pune', 'West Champaran', 'Pune', 'Nowhere'],
+        'CPS_Score': [91.5, 72.0, 10.0, 50.0],
+        'Priority_Tier': ['Tier 1', 'Tier 2', 'Tier 5', 'Tier 3']
+    })
+    joined = join_scores(geo_data, scores)
+    assert joined['has_data'].tolist() == [True, True, False], "Join mismatch"
+    assert joined['CPS_Score'].iloc[0] == 91.5, "Duplicate names should keep the first row"
+
+    # Raigarh is a district of two states: each polygon gets its own state's score
+    def feature(district, state, x):
+        return {'type': 'Feature', 'properties': {'NAME_2': district, 'NAME_1': state},
+                'geometry': {'type': 'Polygon', 'coordinates': [noisy_square(x, 20, seed=4)]}}
+    twin_geo = {'type': 'FeatureCollection', 'features': [
+        feature('Raigarh', 'Chhattisgarh', 83), feature('Raigarh', 'Maharashtra', 73),
+        feature('Raigarh', 'Odisha', 84), feature('Aurangabad', 'Bihar', 84), feature('Pune', 'Maharastra', 73)
+    ]}
+    twin_scores = pd.DataFrame({
+        'District': ['Raigarh', 'Raigarh', 'Aurangabad', 'Aurangabad', 'Pune'],
+        'State': ['Maharashtra', 'Chhattisgarh', 'Maharashtra', 'Bihar', 'Maharashtra'],
+        'CPS_Score': [80.0, 40.0, 70.0, 30.0, 60.0]
+    })
+    joined = join_scores(twin_geo, twin_scores)
+    assert joined['CPS_Score'].tolist()[:2] == [40.0, 80.0], f"Scores crossed states: {joined['CPS_Score'].tolist()}"
+    assert joined['has_data'].tolist() == [True, True, False, True, True], "A shared name must not match a third state"
+    assert joined['CPS_Score'].iloc[3] == 30.0 and joined['State'].iloc[3] == 'Bihar'
+    assert joined['CPS_Score'].iloc[4] == 60.0, "A unique name matches despite a misspelt state"
+
+    out_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(out_dir, 'boundaries.geojson')
+        with open(path, 'w') as f:
+            json.dump(geo_data, f)
+
+        written = build_map(scores, path, out_dir)
+        assert set(written) == {'high', 'medium', 'low'}, "Missing resolution levels"
+        sizes = {level: os.path.getsize(p) for level, p in written.items()}
+        assert sizes['low'] <= sizes['medium'] <= sizes['high'] < os.path.getsize(path), f"Maps not smaller: {sizes}"
+
+        with open(written['low']) as f:
+            low = json.load(f)
+        leh = low['features'][2]['properties']
+        assert leh['NAME_2'] == 'Leh' and leh['has_data'] is False and leh['CPS_Score'] is None, "Unmatched properties mismatch"
+        assert low['features'][0]['properties']['Priority_Tier'] == 'Tier 1', "Scores not embedded"
+        assert len(low['features'][1]['geometry']['coordinates']) == 2, "Collapsed outer rings must keep a shape"
+    finally:
+        shutil.rmtree(out_dir)
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
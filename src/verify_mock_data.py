@@ -0,0 +1,51 @@
+
+# Run from the repository root: python -m src.verify_mock_data
+import os
+import shutil
+import tempfile
+import pandas as pd
+from src.generate_full_mock_data import generate_mock_dataset, SCHEMAS
+from src.data_ingestion import load_raw_data
+from src.data_aggregation import aggregate_to_district_level
+
+def run_verification():
+    out_a, out_b = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        print("Generating mock API pages...")
+        rows = {'biometric': 25_000, 'demographic': 12_000, 'enrolment': 3_000}
+        manifest = generate_mock_dataset(out_a, rows, n_districts=40, page_size=10_000, duplicate_frac=0.02,
+                                         missing_date_frac=0.5, workers=2, seed=7)
+        names = sorted(os.path.basename(m['path']) for m in manifest)
+        assert names == sorted([
+            'api_data_aadhar_biometric_0_10000.csv', 'api_data_aadhar_biometric_10000_20000.csv',
+            'api_data_aadhar_biometric_20000_25000.csv', 'api_data_aadhar_demographic_0_10000.csv',
+            'api_data_aadhar_demographic_10000_12000.csv', 'api_data_aadhar_enrolment_0_3000.csv'
+        ]), f"Unexpected page names: {names}"
+
+        page = pd.read_csv(os.path.join(out_a, 'api_data_aadhar_enrolment_0_3000.csv'))
+        assert list(page.columns) == ['date', 'state', 'district', 'pincode'] + SCHEMAS['enrolment'], "Schema mismatch"
+        assert len(page) == 3000 and page['pincode'].between(100000, 999999).all(), "Row count / pincode mismatch"
+        dates = pd.to_datetime(page['date'], format='%d-%m-%Y', errors='coerce')
+        assert dates.notna().all() and dates.is_monotonic_increasing, "Dates must parse and be ordered"
+        assert dates.dt.normalize().nunique() < 200, "Missing dates were not applied"
+
+        print("Checking determinism across worker counts...")
+        generate_mock_dataset(out_b, rows, n_districts=40, page_size=10_000, duplicate_frac=0.02,
+                              missing_date_frac=0.5, workers=1, seed=7)
+        for name in names:
+            with open(os.path.join(out_a, name), 'rb') as fa, open(os.path.join(out_b, name), 'rb') as fb:
+                assert fa.read() == fb.read(), f"{name} differs between runs"
+
+        print("Loading through the pipeline...")
+        dfs, metadata = load_raw_data(out_a)
+        assert metadata['row_counts'] == rows, f"Row counts mismatch: {metadata['row_counts']}"
+        df_dist = aggregate_to_district_level(dfs)
+        assert len(df_dist) == 40 and df_dist['total_biometric_updates'].gt(0).all(), "Aggregation mismatch"
+    finally:
+        shutil.rmtree(out_a)
+        shutil.rmtree(out_b)
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,104 @@
+
+# Run from the repository root: python -m src.verify_pincode_assignment
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.geometry import flatten_polygons, build_str_tree, query_points, assign_points
+from src.pincode_assignment import assign_pincodes, reconcile_assignments, load_raw_pincode_districts
+
+def blob(cx, cy, r, n, rng):
+    """Closed, star-shaped ring around (cx, cy)."""
+    theta = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    radius = r * (0.7 + 0.3 * rng.random(n))
+    ring = np.column_stack([cx + radius * np.cos(theta), cy + radius * np.sin(theta)])
+    return np.vstack([ring, ring[:1]]).tolist()
+
+def naive_inside(point, rings):
+    inside = False
+    for ring in rings:
+        for (x1, y1), (x2, y2) in zip(ring[:-1], ring[1:]):
+            if (y1 > point[1]) != (y2 > point[1]) and point[0] < x1 + (point[1] - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+    return inside
+
+def run_verification():
+    print("Testing holes, multi-part features and overlaps...")
+    square = lambda x0, y0, s: [[x0, y0], [x0 + s, y0], [x0 + s, y0 + s], [x0, y0 + s], [x0, y0]]
+    features = [
+        {'properties': {'DISTRICT': 'Ring'}, 'geometry': {'type': 'Polygon', 'coordinates': [square(0, 0, 10), square(4, 4, 2)]}},
+        {'properties': {'DISTRICT': 'Islands'}, 'geometry': {'type': 'MultiPolygon', 'coordinates': [[square(20, 0, 1)], [square(30, 0, 1)]]}},
+        {'properties': {'DISTRICT': 'Enclave'}, 'geometry': {'type': 'Polygon', 'coordinates': [square(1, 1, 1)]}},
+        {'properties': {'DISTRICT': 'Empty'}, 'geometry': None}
+    ]
+    points = np.array([[5, 5], [2, 8], [20.5, 0.5], [30.5, 0.5], [25, 0.5], [1.5, 1.5], [-1, -1]], dtype=float)
+    polygons = flatten_polygons(features)
+    assigned = assign_points(points, polygons)
+    assert assigned.tolist() == [-1, 0, 1, 1, -1, 2, -1], f"Assignment mismatch: {assigned}"
+
+    print("Comparing against brute-force ray casting...")
+    rng = np.random.default_rng(0)
+    features = []
+    for i in range(30):
+        for j in range(25):
+            features.append({'properties': {'DISTRICT': f"D{i}_{j}"},
+                             'geometry': {'type': 'Polygon', 'coordinates': [blob(68 + i, 8 + j, 0.5, 400, rng)]}})
+    polygons = flatten_polygons(features)
+    tree = build_str_tree(polygons['bbox'])
+    sample = np.column_stack([rng.uniform(67, 99, 300), rng.uniform(7, 34, 300)])
+    assigned = assign_points(sample, polygons, tree)
+    for p, f in zip(sample, assigned):
+        near = [k for k in range(len(features)) if abs(p[0] - 68 - k // 25) < 1 and abs(p[1] - 8 - k % 25) < 1]
+        expected = [k for k in near if naive_inside(p, features[k]['geometry']['coordinates'])]
+        expected = expected[0] if expected else -1
+        assert f == expected, f"Point {p}: got {f}, expected {expected}"
+
+    pt, feat = query_points(tree, polygons['bbox'], sample)
+    bb = polygons['bbox']
+    brute = {(p, k) for p in range(len(sample)) for k in range(len(bb))
+             if bb[k, 0] <= sample[p, 0] <= bb[k, 2] and bb[k, 1] <= sample[p, 1] <= bb[k, 3]}
+    assert set(zip(pt.tolist(), feat.tolist())) == brute, "STR-tree query missed candidates"
+
+    print("Timing ~19k pincodes against 750 polygons...")
+    centroids = pd.DataFrame({
+        'pincode': np.arange(100000, 119000),
+        'longitude': rng.uniform(67, 99, 19000),
+        'latitude': rng.uniform(7, 34, 19000)
+    })
+    start = time.perf_counter()
+    result = assign_pincodes(centroids, {'type': 'FeatureCollection', 'features': features})
+    elapsed = time.perf_counter() - start
+    print(f"  {int((result['feature_index'] >= 0).sum())} assigned in {elapsed:.2f}s")
+    assert elapsed < 30, "Assignment is too slow"
+
+    print("Testing reconciliation...")
+    assigned_df = pd.DataFrame({'pincode': [1, 2, 3], 'latitude': [0.0] * 3, 'longitude': [0.0] * 3,
+                                'spatial_district': ['Pune', 'Satara', None]})
+    raw = pd.DataFrame({'pincode': [1, 2, 3, 4], 'state': ['MH'] * 4,
+                        'district': ['pune ', 'Pune', 'Pune', 'Pune'], 'n_rows': [5, 3, 2, 1]})
+    report = reconcile_assignments(raw, assigned_df)
+    assert report['status'].tolist() == ['match', 'conflict', 'unassigned', 'no_centroid'], report['status'].tolist()
+
+    print("Testing raw pairs from the ingested files...")
+    data_dir = tempfile.mkdtemp()
+    try:
+        pd.DataFrame({
+            'date': ['01-03-2025'] * 5,
+            'state': ['Orissa', 'Odisha', 'Chhattisgarh', 'Maharashtra', 'Nagpur'],
+            'district': ['Puri', 'Puri', 'Raigarh', 'Raigarh', 'Nagpur'],
+            'pincode': ['752001', '752001', '496001', '402201', '440024'],
+            'age_0_5': [1] * 5, 'age_5_17': [1] * 5, 'age_18_greater': [1] * 5
+        }).to_csv(os.path.join(data_dir, "api_data_aadhar_enrolment_0_5.csv"), index=False)
+        pairs = load_raw_pincode_districts(data_dir).sort_values('pincode').reset_index(drop=True)
+    finally:
+        shutil.rmtree(data_dir)
+    # State aliases are merged and rows rejected by validation (unknown state) are left out
+    assert pairs['pincode'].tolist() == [402201, 496001, 752001] and pairs['pincode'].dtype == np.int64
+    assert pairs['state'].tolist() == ['Maharashtra', 'Chhattisgarh', 'Odisha'] and pairs['n_rows'].tolist() == [1, 1, 2]
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,132 @@
+
+# Run from the repository root: python -m src.verify_ranking_service
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+import pandas as pd
+from src.result_export import export_results
+from src.ranking_service import load_geography, build_ranking_store, prefix_search, tier_page, StoreHolder, make_handler
+
+def make_ranked(scores):
+    df = pd.DataFrame({
+        'district_id': ['Pune', 'Patna', 'Purnia', 'Agra', 'Ajmer'],
+        'state': ['Maharashtra', 'Bihar', 'Bihar', 'Uttar Pradesh', 'Rajasthan'],
+        'cps_score': scores,
+        'bsi_score': [0.5] * 5,
+        'is_top_20': [True] * 5
+    })
+    df['cps_tier'] = ['Tier 1' if s >= 85 else 'Tier 4' for s in scores]
+    df = df.sort_values('cps_score', ascending=False).reset_index(drop=True)
+    df['cps_rank'] = df.index + 1
+    return df
+
+def get(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+def run_verification():
+    print("Creating mock ranked output for ranking service test...")
+    df = make_ranked([90, 88, 50, 45, 40])
+    geography = pd.DataFrame({
+        'state': ['Bihar', 'Bihar', 'Maharashtra'],
+        'district': ['Patna', 'Purnia', 'Pune'],
+        'pincode': [800001, 854301, 411001]
+    })
+    store = build_ranking_store(df, geography, top_n=1)
+
+    assert store['records'][store['by_district'][('bihar', 'patna')]]['cps_rank'] == 2, "District lookup mismatch"
+    assert [r['district_id'] for r in store['records'][0:1]] == ['Pune'], "Records must be in rank order"
+    assert store['by_pincode']['854301'] == [store['by_district'][('bihar', 'purnia')]], "Pincode lookup mismatch"
+
+    # A district name used in two states keeps both districts apart
+    twins = make_ranked([90, 88, 50, 45, 40]).assign(district_id=['Aurangabad', 'Aurangabad', 'Pune', 'Agra', 'Ajmer'],
+                                                    state=['Bihar', 'Maharashtra', 'Maharashtra', 'Uttar Pradesh', 'Rajasthan'])
+    twin_geo = pd.DataFrame({'state': ['Bihar', 'Maharashtra'], 'district': ['Aurangabad', 'Aurangabad'],
+                             'pincode': [824101, 431001]})
+    twin_store = build_ranking_store(twins, twin_geo)
+    assert twin_store['row_count'] == 5 and len(twin_store['by_name']['aurangabad']) == 2
+    for state, pin in [('Bihar', '824101'), ('Maharashtra', '431001')]:
+        pos = twin_store['by_district'][(state.lower(), 'aurangabad')]
+        assert twin_store['records'][pos]['state'] == state, "District keyed on the wrong state"
+        assert twin_store['by_pincode'][pin] == [pos], "Pincode mapped to the other state's district"
+    assert [r['state'] for r in prefix_search(twin_store, 'aur')] == ['Bihar', 'Maharashtra'], "Prefix search lost a district"
+
+    # Geography from the ingested raw files: state aliases resolve to the names of the ranked output
+    data_dir = tempfile.mkdtemp()
+    try:
+        pd.DataFrame({
+            'date': ['01-03-2025'] * 4,
+            'state': ['Bihar', 'Maharashtra', 'MAHARASHTRA', 'Uttar Pradesh'],
+            'district': ['Aurangabad', 'Aurangabad', 'Aurangabad', 'Agra'],
+            'pincode': ['824101', '431001', '431005', '282001'],
+            'age_0_5': [1] * 4, 'age_5_17': [1] * 4, 'age_18_greater': [1] * 4
+        }).to_csv(os.path.join(data_dir, "api_data_aadhar_enrolment_0_4.csv"), index=False)
+        raw_geo = load_geography(data_dir)
+    finally:
+        shutil.rmtree(data_dir)
+    assert sorted(raw_geo['state'].unique()) == ['Bihar', 'Maharashtra', 'Uttar Pradesh'], "State alias not canonical"
+    raw_store = build_ranking_store(twins, raw_geo)
+    for pin, state in [('824101', 'bihar'), ('431001', 'maharashtra'), ('431005', 'maharashtra'), ('282001', 'uttar pradesh')]:
+        pos = raw_store['by_district'][(state, 'agra' if pin == '282001' else 'aurangabad')]
+        assert raw_store['by_pincode'][pin] == [pos], f"Pincode {pin} not indexed"
+
+    names = [r['district_id'] for r in prefix_search(store, 'p', limit=10)]
+    assert names == ['Patna', 'Pune', 'Purnia'], f"Prefix search mismatch: {names}"
+    assert [r['district_id'] for r in prefix_search(store, 'aj')] == ['Ajmer'], "Prefix search mismatch"
+
+    page = tier_page(store, '4', page=2, page_size=2)
+    assert page['total'] == 3 and [r['district_id'] for r in page['items']] == ['Ajmer'], f"Tier page mismatch: {page}"
+    assert b'Patna' in store['top_by_state']['bihar'] and b'Purnia' not in store['top_by_state']['bihar'], "Top-N mismatch"
+
+    # Hot reload: a new pipeline run replaces the snapshot
+    out_dir = tempfile.mkdtemp()
+    try:
+        export_results(df, out_dir)
+        holder = StoreHolder(out_dir)
+        old_store = holder.store
+        assert holder.reload() is False, "Unchanged output should not reload"
+
+        # Bad query parameters are a 400 with a JSON error, not a dropped connection
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(holder))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            port = server.server_address[1]
+            for path in ['/tier/4?page=abc', '/tier/4?page_size=', '/search?prefix=p&limit=', '/search?limit=x']:
+                status, body = get(port, path)
+                assert status == 400 and 'must be an integer' in body['error'], f"{path}: {status} {body}"
+            status, body = get(port, '/tier/4?page=2&page_size=2')
+            assert status == 200 and [r['district_id'] for r in body['items']] == ['Ajmer']
+            assert get(port, '/district/Bihar/Patna')[1]['cps_rank'] == 2, "District lookup by state mismatch"
+            assert get(port, '/district/patna')[1]['cps_rank'] == 2, "Unique name lookup mismatch"
+            assert get(port, '/district/Maharashtra/Patna')[0] == 404
+            holder.store = twin_store
+            status, body = get(port, '/district/Aurangabad')
+            assert status == 409 and sorted(body['states']) == ['Bihar', 'Maharashtra'], f"Ambiguous name: {status} {body}"
+            assert get(port, '/district/Maharashtra/Aurangabad')[1]['cps_rank'] == 2
+        finally:
+            server.shutdown()
+            server.server_close()
+            holder.store = old_store
+
+        export_results(make_ranked([10, 20, 30, 40, 99]), out_dir)
+        os.utime(os.path.join(out_dir, 'final_ranked_districts.arrow'), ns=(1, 1))  # force a distinct mtime
+        assert holder.reload() is True, "New output should be picked up"
+        assert holder.store is not old_store, "Snapshot should be swapped"
+        assert holder.store['records'][0]['district_id'] == 'Ajmer', "New ranking not served"
+        assert old_store['records'][0]['district_id'] == 'Pune', "Old snapshot must stay intact for in-flight requests"
+    finally:
+        shutil.rmtree(out_dir)
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,85 @@
+
+# Run from the repository root: python -m src.verify_result_export
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.result_export import export_results, find_results, read_results, read_run_metadata
+
+def ranked_frame(states, n=120, seed=0):
+    # Shape of recommend_camp_strategy output
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'state': rng.choice(states, n),
+        'district_id': [f"D{i:03d}" for i in range(n)],
+        'total_aadhaar_holders': rng.integers(1000, 50000, n).astype(float),
+        'bsi_score': rng.random(n) * 100,
+        'bsi_score_norm': rng.random(n),
+        'bsi_tier': rng.choice(['Critical', 'High', 'Medium', 'Low'], n),
+        'cps_score': (rng.random(n) * 100).round(2),
+        'cps_tier': rng.choice(['Tier 1', 'Tier 2', 'Tier 3'], n),
+        'camp_type': rng.choice(['INTENSIVE', 'MONTHLY_MOBILE'], n),
+        'strategy_reasoning': 'reason',
+        'last_biometric_update_date': '2025-03-01'
+    }).sort_values('cps_score', ascending=False, kind='mergesort').reset_index(drop=True)
+    df['cps_rank'] = df.index + 1
+    df['is_top_20'] = df['cps_rank'] <= 20
+    return df
+
+def run_verification():
+    out = tempfile.mkdtemp()
+    try:
+        df = ranked_frame(['Kerala', 'Tamil Nadu', 'Jammu & Kashmir'])
+
+        print("Typed export and atomic rename...")
+        written = export_results(df, out, run_metadata={'input': 'data/'}, write_csv=True)
+        assert set(written) == {'parquet', 'arrow', 'shards', 'csv'}
+        assert not [f for f in os.listdir(out) if f.endswith(('.tmp', '.old'))], "temporary files left behind"
+        assert find_results(out) == written['arrow']
+
+        arrow = read_results(written['arrow'])
+        parquet = read_results(written['parquet'])
+        pd.testing.assert_frame_equal(arrow, parquet)
+        assert len(arrow) == len(df) and arrow['district_id'].tolist() == df['district_id'].tolist()
+        for col in ['state', 'bsi_tier', 'cps_tier', 'camp_type']:
+            assert isinstance(arrow[col].dtype, pd.CategoricalDtype), f"{col} is not categorical"
+        assert arrow['cps_rank'].dtype == np.int32
+        assert pd.api.types.is_datetime64_any_dtype(arrow['last_biometric_update_date'])
+        assert (arrow['cps_score'].to_numpy() == df['cps_score'].to_numpy()).all()
+
+        meta = read_run_metadata(written['parquet'])
+        assert meta['input'] == 'data/' and meta['row_count'] == len(df)
+        assert read_run_metadata(written['arrow']) == meta
+
+        print("Sharding by state...")
+        shard_dir = os.path.join(out, 'by_state')
+        assert sorted(os.listdir(shard_dir)) == ['jammu_kashmir.parquet', 'kerala.parquet', 'tamil_nadu.parquet']
+        assert sorted(written['shards']) == sorted(os.path.join(shard_dir, f) for f in os.listdir(shard_dir))
+        shards = [read_results(p) for p in written['shards']]
+        assert sum(len(s) for s in shards) == len(df)
+        for shard in shards:
+            assert shard['state'].nunique() == 1
+            assert (shard['cps_rank'].diff().dropna() > 0).all(), "shard rows keep the ranked order"
+
+        # A later run covering fewer states replaces the shard set
+        fewer = ranked_frame(['Kerala'], n=30, seed=1)
+        written = export_results(fewer, out)
+        assert os.listdir(shard_dir) == ['kerala.parquet'], "stale shards left behind"
+        assert not [f for f in os.listdir(out) if f.endswith(('.tmp', '.old'))]
+        assert len(read_results(written['shards'][0])) == len(fewer)
+        assert len(read_results(find_results(out))) == len(fewer)
+
+        print("Compact export...")
+        written = export_results(df, out, shard_column=None, stem='compact', compact=True)
+        compact = read_results(written['parquet'])
+        assert 'bsi_score_norm' not in compact.columns and 'strategy_reasoning' not in compact.columns
+        assert compact['bsi_score'].dtype == np.float32 and compact['cps_score'].dtype == np.float64
+        assert 'shards' not in written and os.listdir(shard_dir) == ['kerala.parquet']
+    finally:
+        shutil.rmtree(out)
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,119 @@
+
+# Run from the repository root: python -m src.verify_rollups
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.data_aggregation import aggregate_to_district_level
+from src.data_ingestion import encode_entities
+from src.dimensions import load_registries
+from src.rollups import build_pincode_dim, attach_parents, rollup, rollup_all
+from src.strategy_recommendation import recommend_camp_strategy
+from src.result_export import export_results, read_results, find_results, PINCODE_RESULT_STEM
+
+def raw_frames():
+    enrol = pd.DataFrame({
+        'date': pd.to_datetime(['2025-03-01'] * 5),
+        'state': ['Karnataka', 'Karnataka', 'Karnataka', 'Kerala', 'Karnataka'],
+        'district': ['Mysuru', 'Mysuru', 'Mandya', 'Wayanad', 'Mandya'],
+        'pincode': [570001, 570002, 571401, 673121, 570002],
+        'age_0_5': [10, 20, 5, 8, 1], 'age_5_17': [0, 0, 5, 2, 0], 'age_18_greater': [0, 0, 0, 0, 0]
+    })
+    bio = pd.DataFrame({
+        'date': pd.to_datetime(['2025-01-01', '2025-02-01', '2025-02-15', '2025-01-10']),
+        'state': ['Karnataka', 'Karnataka', 'Karnataka', 'Kerala'],
+        'district': ['Mysuru', 'Mysuru', 'Mysuru', 'Wayanad'],
+        'pincode': [570001, 570002, 570002, 673121],
+        'bio_age_5_17': [3, 4, 1, 5], 'bio_age_17_': [0, 0, 0, 0]
+    })
+    registries = load_registries()
+    frames = {'enrolment': encode_entities(enrol, registries), 'biometric': encode_entities(bio, registries),
+              'demographic': pd.DataFrame()}
+    return {**frames, **{f"{name}_registry": registry for name, registry in registries.items()}}
+
+def run_verification():
+    frames = raw_frames()
+
+    print("Aggregating by pincode...")
+    agg = aggregate_to_district_level(frames, key='pincode')
+    assert agg['pincode_code'].dtype == np.int32 and len(agg) == 4
+    dim = build_pincode_dim(frames)
+    agg = attach_parents(agg, dim)
+    assert sorted(agg['pincode']) == [570001, 570002, 571401, 673121]
+    by_pin = agg.set_index('pincode')
+    assert by_pin.loc[570002, 'total_aadhaar_holders'] == 21
+    assert by_pin.loc[570002, 'total_biometric_updates'] == 5
+    assert by_pin.loc[570002, 'last_biometric_update_date'] == pd.Timestamp('2025-02-15')
+    assert len(aggregate_to_district_level(frames)) == 3, "district granularity unchanged"
+
+    print("Pincode -> district/state dimension...")
+    dim = dim.set_index('pincode')
+    # 570002 appears 3x under Mysuru and 1x under Mandya: the most frequent parent wins
+    assert dim.loc[570002, 'district_id'] == 'Mysuru' and dim.loc[570002, 'n_districts'] == 2
+    assert dim.loc[673121, 'state'] == 'Kerala' and dim.loc[570001, 'n_rows'] == 2
+
+    print("Roll-ups against a groupby reference...")
+    rng = np.random.default_rng(0)
+    n = 5000
+    scored = pd.DataFrame({
+        'pincode': np.arange(100000, 100000 + n),
+        'district_id': rng.choice([f"D{i:03d}" for i in range(300)], n),
+        'total_aadhaar_holders': rng.integers(0, 500, n).astype(float),
+        'total_biometric_updates': rng.integers(0, 200, n).astype(float),
+        'bsi_score': rng.random(n),
+        'cps_score': np.round(rng.random(n) * 100, 2)
+    })
+    scored['district_code'] = scored['district_id'].str[1:].astype(np.int32)
+    scored['state'] = 'S' + scored['district_id'].str[-1]
+    scored['state_code'] = scored['state'].str[1:].astype(np.int32)
+    scored.loc[scored['district_id'] == 'D007', 'total_aadhaar_holders'] = 0.0 # no holders: plain mean
+
+    ranked = rollup(scored, 'district_code', 'district_id')
+    up = ranked.set_index('district_id').sort_index()
+    ref = scored.groupby('district_id')
+    assert (up['n_pincodes'] == ref.size()).all()
+    assert np.allclose(up['total_aadhaar_holders'], ref['total_aadhaar_holders'].sum())
+    assert np.allclose(up['cps_score_max'], ref['cps_score'].max())
+    weighted = (scored['cps_score'] * scored['total_aadhaar_holders']).groupby(scored['district_id']).sum() \
+        / ref['total_aadhaar_holders'].sum()
+    weighted['D007'] = ref.get_group('D007')['cps_score'].mean()
+    assert np.allclose(up['cps_score'], weighted.round(2))
+    top = scored.loc[ref['cps_score'].idxmax(), ['district_id', 'pincode']].set_index('district_id')['pincode']
+    assert (up['top_pincode'] == top).all()
+    assert (up[[f"pincodes_tier_{i}" for i in range(1, 6)]].sum(axis=1) == up['n_pincodes']).all()
+    assert (up['pincodes_tier_1'] == ref['cps_score'].apply(lambda s: (s >= 85).sum())).all()
+    assert ranked['cps_rank'].is_monotonic_increasing and ranked['cps_score'].is_monotonic_decreasing
+
+    states = rollup_all(scored)['state']
+    assert states['n_pincodes'].sum() == n and states['state'].nunique() == 10
+
+    print("Parents, strategy text and compact export...")
+    scored['population_impact_score_norm'] = rng.random(n)
+    scored['biometric_coverage_gap_norm'] = rng.random(n)
+    strat = recommend_camp_strategy(scored)
+    row = strat.iloc[0]
+    assert row['strategy_reasoning'] == (
+        f"Assigned {row['camp_type']} due to CPS {row['cps_score']}. Location is {row['location_suitability']} "
+        f"(Pop Score: {row['population_impact_score_norm']:.2f}, Gap: {row['biometric_coverage_gap_norm']:.2f}).")
+
+    parents = attach_parents(strat.drop(columns=['district_id', 'state']).head(3).assign(pincode_code=[0, 1, 99]),
+                             dim.reset_index())
+    assert parents['district_id'].tolist() == ['Mysuru', 'Mysuru', 'Unknown']
+
+    out_dir = tempfile.mkdtemp()
+    try:
+        strat = strat.assign(cps_rank=np.arange(1, n + 1), is_top_20=False, cps_tier='Tier 5', bsi_tier='Low')
+        export_results(strat, out_dir, stem=PINCODE_RESULT_STEM, compact=True, shard_column=None)
+        back = read_results(find_results(out_dir, PINCODE_RESULT_STEM))
+        assert 'strategy_reasoning' not in back.columns and not any(c.endswith('_norm') for c in back.columns)
+        assert back['bsi_score'].dtype == np.float32 and back['cps_score'].dtype == np.float64
+        assert back['pincode'].dtype == np.int32
+        assert not os.path.exists(os.path.join(out_dir, "by_state"))
+    finally:
+        shutil.rmtree(out_dir)
+
+    print("Verification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
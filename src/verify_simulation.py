@@ -0,0 +1,78 @@
+
+# Run from the repository root: python -m src.verify_simulation
+import pandas as pd
+import numpy as np
+from src.feature_engineering import feature_engineer
+from src.feature_normalization import normalize_features
+from src.scoring_bsi import compute_bsi
+from src.scoring_cps import compute_camp_priority_score
+from src.simulation import (build_camp_schedule, simulate_camp_plans, summarize_simulation, district_trajectory,
+                            plan_from_strategy, district_keys)
+
+def run_verification():
+    print("Creating mock district data for simulation test...")
+
+    today = pd.Timestamp.now().normalize()
+    data = {
+        'district_id': ['D1', 'D2', 'D3', 'D4'],
+        'total_aadhaar_holders': [10000, 5000, 8000, 2000],
+        'total_biometric_updates': [500, 4000, 100, 1500],
+        'total_demographic_updates': [300, 200, 100, 50],
+        'last_biometric_update_date': [
+            today - pd.Timedelta(days=400), today - pd.Timedelta(days=5),
+            pd.NaT, today - pd.Timedelta(days=60)
+        ]
+    }
+    df = pd.DataFrame(data)
+    df['biometric_coverage_count'] = df['total_biometric_updates']
+
+    df_cps = compute_camp_priority_score(compute_bsi(normalize_features(feature_engineer(df))))
+
+    horizon = 180
+    plans = [
+        {},                                       # Plan 0: do nothing
+        {'D1': (1, 7, 400), 'D3': (1, 7, 400)}    # Plan 1: weekly camps in D1 and D3
+    ]
+    camps = build_camp_schedule(df_cps['district_id'], plans, horizon)
+    assert camps.shape == (4, horizon + 1, 2), f"Unexpected schedule shape: {camps.shape}"
+    assert camps[:, :, 0].sum() == 0, "Empty plan should schedule nothing"
+    assert camps[:, 0, :].sum() == 0, "Snapshot day must be empty"
+
+    print("\nRunning simulation...")
+    result = simulate_camp_plans(df_cps, camps)
+
+    # Day 0 must reproduce the pipeline scores exactly (same definitions)
+    bsi_day0 = result['bsi_score'][:, 0, 0]
+    cps_day0 = result['cps_score'][:, 0, 0]
+    assert np.allclose(bsi_day0, df_cps['bsi_score'].to_numpy(), atol=1e-4), "Day-0 BSI mismatch"
+    assert np.allclose(cps_day0, df_cps['cps_score'].to_numpy(), atol=0.02), "Day-0 CPS mismatch"
+
+    # Camps must lower D1's staleness relative to doing nothing
+    d1 = df_cps.index[df_cps['district_id'] == 'D1'][0]
+    assert result['bsi_score'][d1, horizon, 1] < result['bsi_score'][d1, horizon, 0], "Camps did not reduce D1 BSI"
+
+    summary = summarize_simulation(result, days=[0, 90, 180], plan_names=['baseline', 'weekly_D1_D3'])
+    print("\nPlan Comparison:")
+    print(summary)
+    assert len(summary) == 6, "Expected one row per (plan, day)"
+    assert (summary[['Tier 1', 'Tier 2', 'Tier 3', 'Tier 4', 'Tier 5']].sum(axis=1) == 4).all(), "Tier counts must cover all districts"
+
+    traj = district_trajectory(result, plan=1, days=[0, 180])
+    assert len(traj) == 8, "Expected one row per (district, day)"
+
+    print("\nPlans for a district name used in two states...")
+    twins = df_cps.assign(district_id=['Raigarh', 'Raigarh', 'D3', 'D4'],
+                          state=['Chhattisgarh', 'Maharashtra', 'Kerala', 'Kerala'], district_code=[7, 3, 5, 1],
+                          deployment_freq_days=['7-10 days', '28-35 days', '90 days', None],
+                          expected_updates_per_camp=[100.0, 50.0, 20.0, 10.0], camps_per_cycle=[2, 1, 1, 1])
+    plan = plan_from_strategy(twins)
+    assert plan == {7: (1, 7, 200.0), 3: (1, 28, 50.0), 5: (1, 90, 20.0)}, f"Plans keyed by district code: {plan}"
+    camps = build_camp_schedule(district_keys(twins), [plan], horizon)
+    assert camps[0, 8, 0] == 200 and camps[1, 29, 0] == 50 and camps[1, 8, 0] == 0, "Camps landed on the other Raigarh"
+    traj = district_trajectory(simulate_camp_plans(twins, camps), plan=0, days=[horizon])
+    assert traj[['state', 'district_code']].drop_duplicates().shape[0] == 4, "Trajectory lost the district identity"
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,67 @@
+
+import asyncio
+import pandas as pd
+from sms_dispatcher import (build_camp_messages, open_outbox, enqueue_messages, dispatch_outbox,
+                            FakeSmsGateway, GatewayError)
+
+def run_verification():
+    print("Creating mock strategy output for SMS dispatch test...")
+    df = pd.DataFrame({
+        'district_id': [f"D{i:03d}" for i in range(250)],
+        'camp_type': ['INTENSIVE'] * 100 + ['MONTHLY_MOBILE'] * 100 + ['ANNUAL_PREVENTIVE'] * 50
+    })
+
+    messages = build_camp_messages(df, camp_start='2024-02-01')
+    assert len(messages) == 200, f"Only scheduled camps should produce messages, got {len(messages)}"
+    assert messages['idempotency_key'].is_unique, "Idempotency keys must be unique"
+    assert "D000" in messages.iloc[0]['message'] and "2024-02-01" in messages.iloc[0]['message'], "Message content mismatch"
+
+    # A district name used in two states: two messages, two keys, two outbox rows
+    twins = pd.DataFrame({'district_id': ['Raigarh', 'Raigarh'], 'state': ['Chhattisgarh', 'Maharashtra'],
+                          'camp_type': ['INTENSIVE', 'INTENSIVE']})
+    twin_messages = build_camp_messages(twins, camp_start='2024-02-01')
+    assert twin_messages['idempotency_key'].is_unique, "Same-named districts must not share a key"
+    twin_outbox = open_outbox(":memory:")
+    assert enqueue_messages(twin_outbox, twin_messages) == 2, "A same-named district's message was dropped"
+    assert twin_outbox.execute("SELECT state FROM sms_outbox ORDER BY state").fetchall() == [('Chhattisgarh',), ('Maharashtra',)]
+
+    conn = open_outbox(":memory:")
+    assert enqueue_messages(conn, messages) == 200, "All messages should be enqueued"
+    assert enqueue_messages(conn, messages) == 0, "Re-enqueueing the same schedule must be a no-op"
+
+    print("\nDispatching through a flaky gateway...")
+    gateway = FakeSmsGateway(latency=0.001, failure_rate=0.3, seed=42)
+    result = asyncio.run(dispatch_outbox(conn, gateway, batch_size=20, concurrency=4, rate_per_sec=5000,
+                                         max_retries=10, base_backoff=0.001))
+    print(result)
+    assert result['sent'] == 200 and result['failed'] == 0, f"Unexpected dispatch result: {result}"
+    assert len(gateway.delivered) == 200, "Every message should be delivered exactly once"
+    # Every gateway call counts as an attempt of each message in its batch, retries included
+    attempts = conn.execute("SELECT SUM(attempts) FROM sms_outbox").fetchone()[0]
+    assert attempts == gateway.calls * 20, f"{attempts} attempts recorded for {gateway.calls} gateway calls"
+    assert attempts > 200, "The flaky gateway should have caused retries"
+
+    # Simulate a crash after the gateway ack but before the outbox commit: rows revert to PENDING
+    conn.execute("UPDATE sms_outbox SET status = 'PENDING' WHERE rowid <= 40")
+    conn.commit()
+    result = asyncio.run(dispatch_outbox(conn, gateway, batch_size=20, concurrency=4, rate_per_sec=5000))
+    assert result['sent'] == 40, "Reverted rows should be re-sent"
+    assert len(gateway.delivered) == 200, "Re-sent messages must not be delivered twice"
+    assert gateway.duplicates_suppressed == 40, "Gateway should drop the duplicate keys"
+
+    # Permanent failure path
+    class DownGateway(FakeSmsGateway):
+        async def send_batch(self, batch):
+            raise GatewayError("gateway down")
+
+    conn2 = open_outbox(":memory:")
+    enqueue_messages(conn2, messages.head(5))
+    result = asyncio.run(dispatch_outbox(conn2, DownGateway(), max_retries=2, base_backoff=0.001))
+    assert result['failed'] == 5, "Messages should be marked FAILED after retries"
+    statuses = conn2.execute("SELECT DISTINCT status, attempts FROM sms_outbox").fetchall()
+    assert statuses == [('FAILED', 3)], f"Unexpected outbox state: {statuses}" # first try + 2 retries
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
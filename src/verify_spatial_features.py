@@ -0,0 +1,87 @@
+
+# Run from the repository root: python -m src.verify_spatial_features
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.spatial_features import (build_district_adjacency, save_adjacency, load_adjacency, align_adjacency,
+                                  add_spatial_features)
+
+def grid_boundaries(n, names=None, states=None):
+    """n x n unit squares named G<row>_<col>; every shared edge is digitized separately per square."""
+    features = []
+    for r in range(n):
+        for c in range(n):
+            ring = [[c, r], [c + 1, r], [c + 1, r + 1], [c, r + 1], [c, r]]
+            props = {'DISTRICT': (names or {}).get((r, c), f"G{r}_{c}"), 'ST_NM': (states or {}).get((r, c), 'Grid')}
+            features.append({'type': 'Feature', 'properties': props,
+                             'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    return {'type': 'FeatureCollection', 'features': features}
+
+def run_verification():
+    out_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(out_dir, 'grid.geojson')
+        with open(path, 'w') as f:
+            json.dump(grid_boundaries(3), f)
+
+        print("Testing adjacency from shared vertices...")
+        rook, nodes = build_district_adjacency(path)
+        queen, _ = build_district_adjacency(path, min_shared_vertices=1)
+        assert rook.nnz == 2 * 12 and queen.nnz == 2 * 20, f"Unexpected neighbour counts: {rook.nnz}, {queen.nnz}"
+        centre = list(nodes['district']).index('g1_1')
+        assert rook[centre].sum() == 4 and queen[centre].sum() == 8, "Centre cell neighbours mismatch"
+
+        npz = os.path.join(out_dir, 'adjacency.npz')
+        save_adjacency(npz, rook, nodes)
+        loaded, loaded_nodes = load_adjacency(npz)
+        assert (loaded != rook).nnz == 0 and loaded_nodes.equals(nodes), "Round trip mismatch"
+
+        aligned = align_adjacency(rook, nodes, pd.DataFrame({'state': ['Grid', 'Grid', 'Grid'],
+                                                             'district': ['G1_1', 'Elsewhere', 'G0_1']}))
+        assert aligned.toarray().tolist() == [[0, 0, 1], [0, 0, 0], [1, 0, 0]], "Alignment mismatch"
+
+        print("Testing a district name used in two states...")
+        # Opposite corners of a 4 x 4 grid are both 'Raigarh', in different states
+        with open(path, 'w') as f:
+            json.dump(grid_boundaries(4, names={(0, 0): 'Raigarh', (3, 3): 'Raigarh'},
+                                      states={(0, 0): 'Chhattisgarh', (3, 3): 'Maharashtra'}), f)
+        twin_adj, twin_nodes = build_district_adjacency(path)
+        assert len(twin_nodes) == 16, "Same-named districts of two states were merged into one node"
+        twins = pd.DataFrame({'state': ['Maharashtra', 'Chhattisgarh'], 'district': ['Raigarh', 'Raigarh']})
+        aligned = align_adjacency(twin_adj, twin_nodes, pd.concat([twins, pd.DataFrame(
+            {'state': ['Grid'] * 4, 'district': ['G0_1', 'G1_0', 'G2_3', 'G3_2']})], ignore_index=True)).toarray()
+        assert aligned[0].tolist() == [0, 0, 0, 0, 1, 1] and aligned[1].tolist() == [0, 0, 1, 1, 0, 0], \
+            f"Neighbourhoods mixed across states: {aligned[:2].tolist()}"
+
+        print("Testing neighbourhood features and hotspots...")
+        with open(path, 'w') as f:
+            json.dump(grid_boundaries(10), f)
+        rook, nodes = build_district_adjacency(path)
+        ids = [f"G{r}_{c}" for r in range(10) for c in range(10)]
+        hot = {f"G{r}_{c}" for r in range(3) for c in range(3)}
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({
+            'district_id': ids + ['Unmapped'],
+            'bsi_score': [0.9 if d in hot else 0.2 + 0.05 * rng.random() for d in ids] + [0.5],
+            'biometric_coverage_gap': [1.0 if d == 'G0_1' else 0.0 for d in ids] + [0.3]
+        })
+        out = add_spatial_features(df, rook, nodes)
+        row = out.set_index('district_id')
+
+        assert row.loc['G0_0', 'neighbour_count'] == 2 and row.loc['G5_5', 'neighbour_count'] == 4, "Degree mismatch"
+        assert np.isclose(row.loc['G0_0', 'coverage_gap_spatial_lag'], 0.5), "Spatial lag mismatch"
+        assert np.isclose(row.loc['G1_1', 'neighbour_avg_bsi'], 0.9), "Neighbour average mismatch"
+        assert row.loc['G1_1', 'bsi_hotspot'] and not row.loc['G8_8', 'bsi_hotspot'], "Hotspot flag mismatch"
+        assert set(out.loc[out['bsi_hotspot'], 'district_id']) <= hot, "Hotspots outside the high-BSI cluster"
+        assert np.isnan(row.loc['Unmapped', 'neighbour_avg_bsi']) and not row.loc['Unmapped', 'bsi_hotspot'], \
+            "Unmapped districts should have no neighbourhood features"
+    finally:
+        shutil.rmtree(out_dir)
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()
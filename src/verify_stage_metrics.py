@@ -0,0 +1,55 @@
+
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from stage_metrics import StageMetrics, load_stage_metrics
+
+def run_verification():
+    out_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(out_dir, 'stage_metrics.jsonl')
+        metrics = StageMetrics(path, profile_dir=os.path.join(out_dir, 'profiles'), trace_memory=True, run_id='test')
+
+        print("Measuring a stage...")
+        df_in = pd.DataFrame({'x': np.arange(1000)})
+        with metrics.stage('expand', [df_in]) as record:
+            big = np.ones(5_000_000) # ~40 MB
+            record['output'] = pd.DataFrame({'x': np.repeat(df_in['x'].to_numpy(), 3)})
+            del big
+
+        print("Measuring a failing stage...")
+        try:
+            with metrics.stage('broken'):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+
+        lines = [json.loads(l) for l in open(path)]
+        assert [l['stage'] for l in lines] == ['expand', 'broken'], "One JSON line per stage expected"
+        first = lines[0]
+        assert first['run_id'] == 'test' and first['status'] == 'ran', "Record metadata mismatch"
+        assert first['rows_in'] == 1000 and first['rows_out'] == 3000, "Row counts mismatch"
+        assert first['bytes_out'] >= 3000 * 8, "Byte counts mismatch"
+        assert first['wall_s'] > 0 and first['cpu_s'] > 0, "Timing missing"
+        assert first['tracemalloc_peak_mb'] >= 38, f"tracemalloc peak too low: {first['tracemalloc_peak_mb']}"
+        assert first['rss_peak_mb'] >= first['rss_start_mb'], "RSS peak below start"
+        assert os.path.exists(first['profile']), "Profile not written"
+        assert 'cumulative' in open(os.path.join(out_dir, 'profiles', 'expand.txt')).read(), "Profile summary missing"
+        assert lines[1]['status'] == 'failed' and lines[1]['rows_out'] is None, "Failed stage not recorded"
+
+        # Second run appends
+        StageMetrics(path, run_id='second')._write({'run_id': 'second', 'stage': 'noop', 'status': 'ran',
+                                                     'wall_s': 0.0, 'cpu_s': 0.0, 'rss_peak_mb': 0, 'rows_out': None})
+        history = load_stage_metrics(path)
+        assert history['run_id'].tolist() == ['test', 'test', 'second'], "Metrics must accumulate across runs"
+        assert metrics.summary()['stage'].tolist() == ['expand', 'broken'], "Summary mismatch"
+    finally:
+        shutil.rmtree(out_dir)
+
+    print("\nVerification Passed!")
+
+if __name__ == "__main__":
+    run_verification()